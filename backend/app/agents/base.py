@@ -1,8 +1,14 @@
 """Base agent configuration and utilities for the IncomeOS agent system."""
 
+from collections.abc import AsyncIterator
+
 from openai import AsyncOpenAI
 
+from app.agents.budget import plan_completion
 from app.core.config import settings
+from app.core.dependencies import get_llm_scheduler, get_response_cache, get_single_flight
+from app.services.credits import record_usage
+from app.services.response_cache import make_cache_key
 
 SYSTEM_DISCLAIMER = (
     "\n\nIMPORTANT: You are an AI assistant. Always be transparent that you are AI. "
@@ -26,6 +32,11 @@ def get_complex_model() -> str:
     return settings.OPENAI_MODEL_COMPLEX
 
 
+def get_embedding_model() -> str:
+    """Get the model for text embeddings."""
+    return settings.OPENAI_MODEL_EMBEDDING
+
+
 async def call_agent(
     client: AsyncOpenAI,
     system_prompt: str,
@@ -33,6 +44,10 @@ async def call_agent(
     model: str | None = None,
     temperature: float = 0.7,
     max_tokens: int = 2000,
+    cache_ttl: float | None = None,
+    priority: int | None = None,
+    history: list[dict] | None = None,
+    response_format: dict | None = None,
 ) -> str:
     """Call an AI agent with the given prompts.
 
@@ -42,18 +57,162 @@ async def call_agent(
         user_message: User's input message
         model: Model to use (defaults to specialist model)
         temperature: Response creativity (0-1)
-        max_tokens: Maximum response length
+        max_tokens: Maximum response length; lowered if the context window
+            or the user's remaining credits cannot fit it
+        cache_ttl: Seconds to cache the response for; None or 0 disables caching
+        priority: Scheduler queue priority (defaults to the current request's)
+        history: Earlier conversation messages to send before `user_message`
+        response_format: Output format to constrain the answer to, e.g. a
+            `json_schema` format from `app.agents.structured`
 
     Returns:
         The agent's text response
+
+    Raises:
+        PromptTooLargeError: If the prompt leaves no room for an answer
+        InsufficientCreditsError: If the user's credits cannot pay for the call
+
+    Identical calls that are shareable (cached, or deterministic at
+    temperature 0) are coalesced: while one is in flight, later callers wait
+    for its answer instead of making their own upstream request. Calls with
+    conversation history are never shared.
     """
-    response = await client.chat.completions.create(
-        model=model or get_specialist_model(),
-        messages=[
-            {"role": "system", "content": system_prompt + SYSTEM_DISCLAIMER},
-            {"role": "user", "content": user_message},
-        ],
-        temperature=temperature,
-        max_tokens=max_tokens,
+    model = model or get_specialist_model()
+    messages = _build_messages(system_prompt, user_message, history)
+    budget = plan_completion(model, messages, max_tokens)
+    request = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": budget.max_tokens,
+    }
+    if response_format is not None:
+        request["response_format"] = response_format
+    if history or (not cache_ttl and temperature != 0.0):
+        return await _complete(client, request, budget.estimated_tokens, priority)
+
+    key = make_cache_key(
+        model, system_prompt, user_message, temperature, budget.max_tokens, response_format
     )
+    if cache_ttl:
+        cached = await get_response_cache().get(key, cache_ttl)
+        if cached is not None:
+            return cached
+
+    async def complete_and_cache() -> str:
+        response = await _complete(client, request, budget.estimated_tokens, priority)
+        if cache_ttl:
+            await get_response_cache().set(key, response, cache_ttl)
+        return response
+
+    return await get_single_flight().do(key, complete_and_cache)
+
+
+def _build_messages(
+    system_prompt: str, user_message: str, history: list[dict] | None = None
+) -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt + SYSTEM_DISCLAIMER},
+        *(history or []),
+        {"role": "user", "content": user_message},
+    ]
+
+
+async def _complete(
+    client: AsyncOpenAI, request: dict, estimated_tokens: int, priority: int | None
+) -> str:
+    """Request a chat completion, once the scheduler admits it, and return its text."""
+    scheduler = get_llm_scheduler()
+    async with scheduler.slot(request["model"], estimated_tokens, priority) as slot:
+        response = await client.chat.completions.create(**request)
+        if response.usage is not None:
+            slot.used_tokens = response.usage.total_tokens
+            record_usage(response.usage)
     return response.choices[0].message.content or ""
+
+
+async def stream_agent(
+    client: AsyncOpenAI,
+    system_prompt: str,
+    user_message: str,
+    model: str | None = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2000,
+    history: list[dict] | None = None,
+    response_format: dict | None = None,
+) -> AsyncIterator[str]:
+    """Stream an AI agent's response token by token.
+
+    Streaming counterpart of `call_agent` — same prompts, sampling parameters
+    and budgeting, but text deltas are yielded as soon as the model produces them.
+
+    Args:
+        client: AsyncOpenAI client instance
+        system_prompt: System instructions for the agent
+        user_message: User's input message
+        model: Model to use (defaults to specialist model)
+        temperature: Response creativity (0-1)
+        max_tokens: Maximum response length
+        history: Earlier conversation messages to send before `user_message`
+        response_format: Output format to constrain the answer to
+
+    Yields:
+        Non-empty text deltas of the agent's response
+    """
+    model = model or get_specialist_model()
+    messages = _build_messages(system_prompt, user_message, history)
+    budget = plan_completion(model, messages, max_tokens)
+    request = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": budget.max_tokens,
+    }
+    if response_format is not None:
+        request["response_format"] = response_format
+    scheduler = get_llm_scheduler()
+    async with scheduler.slot(model, budget.estimated_tokens) as slot:
+        stream = await client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                slot.used_tokens = chunk.usage.total_tokens
+                record_usage(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+async def embed_texts(
+    client: AsyncOpenAI,
+    texts: list[str],
+    model: str | None = None,
+    batch_size: int = 256,
+    dimensions: int | None = None,
+) -> list[list[float]]:
+    """Embed texts, sending them to the API in batches.
+
+    Args:
+        client: AsyncOpenAI client instance
+        texts: Texts to embed
+        model: Embedding model (defaults to the configured embedding model)
+        batch_size: Maximum number of texts per API request
+        dimensions: Length to shorten the embeddings to (the model's full
+            length if None)
+
+    Returns:
+        One embedding vector per input text, in input order
+    """
+    options = {} if dimensions is None else {"dimensions": dimensions}
+    vectors: list[list[float]] = []
+    for start in range(0, len(texts), batch_size):
+        response = await client.embeddings.create(
+            model=model or get_embedding_model(),
+            input=texts[start : start + batch_size],
+            **options,
+        )
+        vectors.extend(item.embedding for item in response.data)
+    return vectors
@@ -0,0 +1,88 @@
+"""Prompt budgeting — sizes each agent call before it is sent.
+
+Every call is counted locally against the model's context window and the
+tokens the user's remaining credits can pay for. `max_tokens` is lowered to
+what actually fits, and calls that cannot produce a useful answer are
+rejected before they cost anything upstream.
+"""
+
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.services.credits import InsufficientCreditsError, remaining_tokens
+from app.services.tokens import count_message_tokens, count_tokens, truncate_to_tokens
+
+
+class PromptTooLargeError(ValueError):
+    """Raised when a prompt leaves no room in the model's context window for an answer."""
+
+
+@dataclass(frozen=True)
+class CompletionBudget:
+    """Pre-flight size of one agent call."""
+
+    prompt_tokens: int
+    max_tokens: int
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Upper bound on the tokens the call will consume."""
+        return self.prompt_tokens + self.max_tokens
+
+
+def get_context_window(model: str) -> int:
+    """Get a model's context window in tokens."""
+    return settings.MODEL_CONTEXT_WINDOWS.get(model, settings.DEFAULT_CONTEXT_WINDOW)
+
+
+def plan_completion(model: str, messages: list[dict], max_tokens: int) -> CompletionBudget:
+    """Size a chat completion to the model's context window and the user's credits.
+
+    Args:
+        model: Model the call is made to
+        messages: Prompt messages of the call
+        max_tokens: Longest answer the agent wants
+
+    Returns:
+        The call's prompt size and the `max_tokens` to send
+
+    Raises:
+        PromptTooLargeError: If the prompt leaves too little room for an answer
+        InsufficientCreditsError: If the user's remaining credits cannot pay
+            for the prompt plus a minimal answer
+    """
+    prompt_tokens = count_message_tokens(messages, model)
+    min_answer = min(max_tokens, settings.LLM_MIN_COMPLETION_TOKENS)
+
+    room = get_context_window(model) - prompt_tokens
+    if room < min_answer:
+        raise PromptTooLargeError(
+            f"Prompt of {prompt_tokens} tokens does not fit the {model} context window"
+        )
+    max_tokens = min(max_tokens, room)
+
+    affordable = remaining_tokens()
+    if affordable is not None:
+        affordable -= prompt_tokens
+        if affordable < min_answer:
+            raise InsufficientCreditsError()
+        max_tokens = min(max_tokens, affordable)
+
+    return CompletionBudget(prompt_tokens=prompt_tokens, max_tokens=max_tokens)
+
+
+def fit_user_context(user_context: str, model: str | None = None) -> str:
+    """Trim user context to settings.USER_CONTEXT_MAX_TOKENS.
+
+    Raises:
+        PromptTooLargeError: If the context is so large (over
+            settings.USER_CONTEXT_REJECT_TOKENS) that trimming would lose most of it
+    """
+    if not user_context:
+        return user_context
+    tokens = count_tokens(user_context, model)
+    if tokens <= settings.USER_CONTEXT_MAX_TOKENS:
+        return user_context
+    if tokens > settings.USER_CONTEXT_REJECT_TOKENS:
+        raise PromptTooLargeError(f"User context of {tokens} tokens is too large")
+    return truncate_to_tokens(user_context, settings.USER_CONTEXT_MAX_TOKENS, model)
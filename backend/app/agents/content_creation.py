@@ -1,8 +1,10 @@
 """Content Creation Agent — generates courses, templates, and marketing materials."""
 
+from collections.abc import AsyncIterator
+
 from openai import AsyncOpenAI
 
-from app.agents.base import call_agent, get_specialist_model
+from app.agents.base import call_agent, get_specialist_model, stream_agent
 
 CONTENT_CREATION_PROMPT = """You are the Content Creation Agent for IncomeOS.
 
@@ -28,12 +30,15 @@ Always create content that is:
 - Designed to build long-term audience trust"""
 
 
-async def create_content(client: AsyncOpenAI, user_request: str) -> str:
+async def create_content(
+    client: AsyncOpenAI, user_request: str, history: list[dict] | None = None
+) -> str:
     """Generate content based on the user's request.
 
     Args:
         client: AsyncOpenAI client instance
         user_request: Description of the content to create
+        history: Earlier conversation messages, if any
 
     Returns:
         Generated content ready for use or refinement
@@ -42,6 +47,22 @@ async def create_content(client: AsyncOpenAI, user_request: str) -> str:
         client=client,
         system_prompt=CONTENT_CREATION_PROMPT,
         user_message=user_request,
+        history=history,
+        model=get_specialist_model(),
+        temperature=0.8,
+        max_tokens=3000,
+    )
+
+
+def stream_content(
+    client: AsyncOpenAI, user_request: str, history: list[dict] | None = None
+) -> AsyncIterator[str]:
+    """Stream generated content as it is produced (see `create_content`)."""
+    return stream_agent(
+        client=client,
+        system_prompt=CONTENT_CREATION_PROMPT,
+        user_message=user_request,
+        history=history,
         model=get_specialist_model(),
         temperature=0.8,
         max_tokens=3000,
@@ -0,0 +1,132 @@
+"""Local intent classifier — an in-process fast path in front of the Router Agent.
+
+A multinomial Naive Bayes model over word unigrams and bigrams, trained at
+first use from a labelled examples file. Prediction is a handful of dict
+lookups, so it runs in microseconds; only low-confidence messages need the
+LLM router.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+INTENT_LABELS = ("SKILLS_DIAGNOSIS", "CONTENT_CREATION", "REVENUE_TRACKING", "GENERAL")
+
+DEFAULT_EXAMPLES_PATH = Path(__file__).parent / "data" / "intent_examples.jsonl"
+
+_TOKEN_RE = re.compile(r"[a-z0-9$%']+")
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    """Result of a local intent classification."""
+
+    label: str
+    confidence: float
+
+
+def extract_features(text: str) -> list[str]:
+    """Turn a message into lowercase unigram and bigram features."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class IntentClassifier:
+    """Multinomial Naive Bayes intent classifier."""
+
+    def __init__(
+        self,
+        labels: tuple[str, ...],
+        log_priors: tuple[float, ...],
+        log_likelihoods: dict[str, tuple[float, ...]],
+    ):
+        self.labels = labels
+        self._log_priors = log_priors
+        self._log_likelihoods = log_likelihoods
+
+    @classmethod
+    def train(cls, examples: Iterable[tuple[str, str]], alpha: float = 1.0) -> "IntentClassifier":
+        """Fit the classifier on (text, label) pairs with Laplace smoothing.
+
+        Args:
+            examples: Labelled training messages
+            alpha: Additive smoothing applied to every feature count
+
+        Returns:
+            A trained classifier
+        """
+        label_counts: Counter[str] = Counter()
+        feature_counts: dict[str, Counter[str]] = {label: Counter() for label in INTENT_LABELS}
+        for text, label in examples:
+            label_counts[label] += 1
+            feature_counts[label].update(extract_features(text))
+
+        labels = tuple(label for label in INTENT_LABELS if label_counts[label])
+        total = sum(label_counts.values())
+        vocabulary = set().union(*(feature_counts[label] for label in labels))
+        denominators = {
+            label: sum(feature_counts[label].values()) + alpha * len(vocabulary)
+            for label in labels
+        }
+
+        log_priors = tuple(math.log(label_counts[label] / total) for label in labels)
+        log_likelihoods = {
+            feature: tuple(
+                math.log((feature_counts[label][feature] + alpha) / denominators[label])
+                for label in labels
+            )
+            for feature in vocabulary
+        }
+        return cls(labels, log_priors, log_likelihoods)
+
+    def predict(self, text: str) -> IntentPrediction:
+        """Classify a message.
+
+        Features never seen in training are ignored, so a message with no
+        known features falls back to the class priors (a low confidence).
+
+        Args:
+            text: User's message
+
+        Returns:
+            The most likely label and its posterior probability
+        """
+        scores = list(self._log_priors)
+        for feature in extract_features(text):
+            likelihoods = self._log_likelihoods.get(feature)
+            if likelihoods is None:
+                continue
+            for i, value in enumerate(likelihoods):
+                scores[i] += value
+
+        best = max(range(len(scores)), key=scores.__getitem__)
+        top = scores[best]
+        normalizer = sum(math.exp(score - top) for score in scores)
+        return IntentPrediction(label=self.labels[best], confidence=1.0 / normalizer)
+
+
+def load_examples(path: Path = DEFAULT_EXAMPLES_PATH) -> list[tuple[str, str]]:
+    """Read labelled (text, label) pairs from a JSON-lines file."""
+    examples = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((record["text"], record["label"]))
+    return examples
+
+
+@lru_cache
+def get_intent_classifier() -> IntentClassifier:
+    """Get the classifier trained on the bundled examples (trained once)."""
+    return IntentClassifier.train(load_examples())
+
+
+def classify_intent(message: str) -> IntentPrediction:
+    """Classify a message with the bundled local model."""
+    return get_intent_classifier().predict(message)
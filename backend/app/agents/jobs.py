@@ -0,0 +1,69 @@
+"""Agent job handlers — the long-running agent tasks that can run as background jobs.
+
+Each handler takes the validated request body of its kind as the job input,
+reports partial results as progress events while the model writes them, and
+returns the JSON-serializable result stored with the job.
+"""
+
+from app.agents.content_creation import stream_content
+from app.agents.skills_diagnosis import (
+    diagnosis_input,
+    monetization_plan_input,
+    remember_skill_profile,
+    stream_monetization_plan,
+    stream_skill_cards,
+)
+from app.core.dependencies import get_openai_client, get_path_catalog, get_skill_profile_store
+from app.schemas.jobs import ContentCreationRequest
+from app.schemas.monetization import MonetizationPlanRequest
+from app.schemas.skills import SkillDiagnosisRequest, SkillProfile
+from app.services.jobs import JobContext, JobRegistry
+
+
+async def run_skills_diagnosis(context: JobContext) -> dict:
+    """Diagnose skills, reporting each skill as a `skill` event."""
+    client = get_openai_client()
+    request = SkillDiagnosisRequest.model_validate(context.input)
+    async for result in stream_skill_cards(client, diagnosis_input(request)):
+        if isinstance(result, SkillProfile):
+            context.report("skill", result.model_dump())
+        else:
+            diagnosis = result
+    await remember_skill_profile(client, context.user_id, diagnosis.skills)
+    return diagnosis.model_dump()
+
+
+async def run_content_creation(context: JobContext) -> dict:
+    """Generate content, reporting the text as `delta` events."""
+    request = ContentCreationRequest.model_validate(context.input)
+    parts = []
+    async for delta in stream_content(get_openai_client(), request.prompt):
+        parts.append(delta)
+        context.report("delta", delta)
+    return {"content": "".join(parts)}
+
+
+async def run_monetization_plan(context: JobContext) -> dict:
+    """Write an implementation plan for a catalog path, reporting the text as `delta` events."""
+    request = MonetizationPlanRequest.model_validate(context.input)
+    path = get_path_catalog().get(request.path_id)
+    if path is None:
+        raise ValueError(f"Unknown monetization path '{request.path_id}'")
+    skills = await get_skill_profile_store().get(context.user_id)
+    plan_input = monetization_plan_input(
+        path, skills, request.budget, request.time_commitment_hours_per_week
+    )
+    parts = []
+    async for delta in stream_monetization_plan(get_openai_client(), plan_input):
+        parts.append(delta)
+        context.report("delta", delta)
+    return {"path_id": path.id, "plan": "".join(parts)}
+
+
+def create_job_registry() -> JobRegistry:
+    """Create a registry holding every agent job kind."""
+    registry = JobRegistry()
+    registry.register("skills_diagnosis")(run_skills_diagnosis)
+    registry.register("content_creation")(run_content_creation)
+    registry.register("monetization_plan")(run_monetization_plan)
+    return registry
@@ -1,12 +1,22 @@
 """Agent Orchestrator — routes messages to specialist agents and manages conversations."""
 
-from openai import AsyncOpenAI
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 
-from app.agents.base import call_agent, get_specialist_model
-from app.agents.content_creation import create_content
-from app.agents.revenue_tracking import analyze_revenue
+from openai import AsyncOpenAI, OpenAIError
+
+from app.agents.base import call_agent, embed_texts, get_specialist_model, stream_agent
+from app.agents.budget import fit_user_context
+from app.agents.content_creation import create_content, stream_content
+from app.agents.intent_classifier import classify_intent
+from app.agents.revenue_tracking import analyze_revenue, stream_revenue_analysis
 from app.agents.router import route_message
-from app.agents.skills_diagnosis import diagnose_skills
+from app.agents.skills_diagnosis import diagnose_skills, stream_skills_diagnosis
+from app.core.config import settings
+from app.core.dependencies import get_semantic_cache
 
 GENERAL_AGENT_PROMPT = """You are the General AI Coach for IncomeOS, an AI-powered Income Operating System.
 
@@ -24,10 +34,55 @@ Always be transparent that you're an AI assistant. Never guarantee specific inco
 Frame all advice as educational guidance based on market data and best practices."""
 
 
+def _enrich_message(message: str, user_context: str) -> str:
+    """Prefix the user's message with their context (trimmed to budget), if any."""
+    user_context = fit_user_context(user_context)
+    if not user_context:
+        return message
+    return f"User context: {user_context}\n\nUser message: {message}"
+
+
+@dataclass
+class SpeculationStats:
+    """Running totals for speculative specialist execution."""
+
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0
+    wasted_seconds: float = 0.0
+
+    def record_hit(self, saved_seconds: float) -> None:
+        self.hits += 1
+        self.saved_seconds += saved_seconds
+
+    def record_miss(self, wasted_seconds: float) -> None:
+        self.misses += 1
+        self.wasted_seconds += wasted_seconds
+
+    def snapshot(self) -> dict:
+        """Summarize hit-rate, latency saved on hits and specialist time thrown away."""
+        attempts = self.hits + self.misses
+        return {
+            "attempts": attempts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / attempts if attempts else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "avg_saved_ms": round(1000 * self.saved_seconds / self.hits, 1) if self.hits else 0.0,
+            "wasted_seconds": round(self.wasted_seconds, 3),
+        }
+
+
+speculation_stats = SpeculationStats()
+
+
 async def process_message(
     client: AsyncOpenAI,
     message: str,
     user_context: str = "",
+    previous_agent_type: str | None = None,
+    speculative: bool | None = None,
+    history: list[dict] | None = None,
 ) -> tuple[str, str]:
     """Process a user message through the agent pipeline.
 
@@ -35,35 +90,222 @@ async def process_message(
     2. Call the appropriate specialist agent
     3. Return the response and agent type
 
+    In speculative mode, when the local classifier is not confident enough to
+    skip the LLM router, the most likely specialist is started while routing is
+    still in flight. Its answer is used if the router agrees and cancelled
+    otherwise.
+
     Args:
         client: AsyncOpenAI client instance
         message: User's message
         user_context: Additional context about the user
+        previous_agent_type: Agent that handled the conversation's last message,
+            used as the speculative guess
+        speculative: Enable speculative execution (defaults to
+            settings.ORCHESTRATOR_SPECULATIVE)
+        history: Earlier conversation messages for the specialist (the
+            router only sees the new message)
 
     Returns:
         Tuple of (response_text, agent_type)
     """
-    # Step 1: Route to determine agent
+    if speculative is None:
+        speculative = settings.ORCHESTRATOR_SPECULATIVE
+
+    prediction = classify_intent(message)
+    if speculative and prediction.confidence < settings.ROUTER_LOCAL_CONFIDENCE:
+        guess = previous_agent_type or prediction.label
+        return await _process_speculatively(client, message, user_context, guess, history)
+
     agent_type = await route_message(client, message)
+    response = await _run_specialist(client, agent_type, message, user_context, history)
+    return response, agent_type
 
-    # Step 2: Enrich message with context
-    enriched_message = message
-    if user_context:
-        enriched_message = f"User context: {user_context}\n\nUser message: {message}"
 
-    # Step 3: Call specialist agent
+async def _run_specialist(
+    client: AsyncOpenAI,
+    agent_type: str,
+    message: str,
+    user_context: str,
+    history: list[dict] | None = None,
+) -> str:
+    """Answer a routed message, from the semantic cache when possible."""
+    embedding, cached = await _semantic_lookup(client, agent_type, message, user_context, history)
+    if cached is not None:
+        return cached
+
+    response = await _call_specialist(
+        client, agent_type, _enrich_message(message, user_context), history
+    )
+    if embedding is not None:
+        get_semantic_cache().store(agent_type, embedding, response)
+    return response
+
+
+async def _semantic_lookup(
+    client: AsyncOpenAI,
+    agent_type: str,
+    message: str,
+    user_context: str,
+    history: list[dict] | None = None,
+) -> tuple[list[float] | None, str | None]:
+    """Look a message up in the semantic cache.
+
+    Only agents with a configured similarity threshold are cached, and only
+    for messages without user context or conversation history — answers to
+    those are personal.
+
+    Returns:
+        Tuple of (message embedding, cached answer); the embedding is None
+        when the answer must not be cached
+    """
+    threshold = settings.SEMANTIC_CACHE_THRESHOLDS.get(agent_type)
+    if threshold is None or user_context or history:
+        return None, None
+    try:
+        [embedding] = await embed_texts(client, [message])
+    except OpenAIError:
+        return None, None
+    return embedding, get_semantic_cache().lookup(agent_type, embedding, threshold)
+
+
+async def _call_specialist(
+    client: AsyncOpenAI,
+    agent_type: str,
+    enriched_message: str,
+    history: list[dict] | None = None,
+) -> str:
+    """Call the specialist agent for a routed agent type."""
     if agent_type == "SKILLS_DIAGNOSIS":
-        response = await diagnose_skills(client, enriched_message)
-    elif agent_type == "CONTENT_CREATION":
-        response = await create_content(client, enriched_message)
-    elif agent_type == "REVENUE_TRACKING":
-        response = await analyze_revenue(client, enriched_message)
-    else:
-        response = await call_agent(
-            client=client,
-            system_prompt=GENERAL_AGENT_PROMPT,
-            user_message=enriched_message,
-            model=get_specialist_model(),
-        )
+        return await diagnose_skills(client, enriched_message, history)
+    if agent_type == "CONTENT_CREATION":
+        return await create_content(client, enriched_message, history)
+    if agent_type == "REVENUE_TRACKING":
+        return await analyze_revenue(client, enriched_message, history)
+    return await call_agent(
+        client=client,
+        system_prompt=GENERAL_AGENT_PROMPT,
+        user_message=enriched_message,
+        model=get_specialist_model(),
+        cache_ttl=settings.CACHE_TTL_GENERAL,
+        history=history,
+    )
+
+
+async def _run_specialist_timed(
+    client: AsyncOpenAI,
+    agent_type: str,
+    message: str,
+    user_context: str,
+    history: list[dict] | None = None,
+) -> tuple[str, float]:
+    """Run a specialist agent and also return how long it took."""
+    start = time.perf_counter()
+    response = await _run_specialist(client, agent_type, message, user_context, history)
+    return response, time.perf_counter() - start
 
+
+async def _process_speculatively(
+    client: AsyncOpenAI,
+    message: str,
+    user_context: str,
+    guess: str,
+    history: list[dict] | None = None,
+) -> tuple[str, str]:
+    """Route and run the guessed specialist concurrently."""
+    start = time.perf_counter()
+    speculation = asyncio.create_task(
+        _run_specialist_timed(client, guess, message, user_context, history)
+    )
+
+    try:
+        agent_type = await route_message(client, message)
+    except BaseException:
+        speculation.cancel()
+        raise
+    route_seconds = time.perf_counter() - start
+
+    if agent_type == guess:
+        response, specialist_seconds = await speculation
+        # Run sequentially, the specialist would only have started after routing.
+        elapsed = time.perf_counter() - start
+        speculation_stats.record_hit(route_seconds + specialist_seconds - elapsed)
+        return response, agent_type
+
+    speculation.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await speculation
+    speculation_stats.record_miss(route_seconds)
+
+    response = await _run_specialist(client, agent_type, message, user_context, history)
     return response, agent_type
+
+
+async def stream_message(
+    client: AsyncOpenAI,
+    message: str,
+    user_context: str = "",
+    history: list[dict] | None = None,
+) -> tuple[str, AsyncIterator[str]]:
+    """Process a user message through the agent pipeline, streaming the answer.
+
+    Routing still completes first (it is a short, non-streamed call), so the
+    agent type is known before the specialist starts producing tokens.
+
+    Args:
+        client: AsyncOpenAI client instance
+        message: User's message
+        user_context: Additional context about the user
+        history: Earlier conversation messages for the specialist
+
+    Returns:
+        Tuple of (agent_type, async iterator of response text deltas)
+    """
+    agent_type = await route_message(client, message)
+
+    embedding, cached = await _semantic_lookup(client, agent_type, message, user_context, history)
+    if cached is not None:
+        return agent_type, _replay(cached)
+
+    deltas = _stream_specialist(client, agent_type, _enrich_message(message, user_context), history)
+    if embedding is not None:
+        deltas = _store_when_complete(deltas, agent_type, embedding)
+    return agent_type, deltas
+
+
+def _stream_specialist(
+    client: AsyncOpenAI,
+    agent_type: str,
+    enriched_message: str,
+    history: list[dict] | None = None,
+) -> AsyncIterator[str]:
+    """Stream the specialist agent for a routed agent type."""
+    if agent_type == "SKILLS_DIAGNOSIS":
+        return stream_skills_diagnosis(client, enriched_message, history)
+    if agent_type == "CONTENT_CREATION":
+        return stream_content(client, enriched_message, history)
+    if agent_type == "REVENUE_TRACKING":
+        return stream_revenue_analysis(client, enriched_message, history)
+    return stream_agent(
+        client=client,
+        system_prompt=GENERAL_AGENT_PROMPT,
+        user_message=enriched_message,
+        model=get_specialist_model(),
+        history=history,
+    )
+
+
+async def _replay(answer: str) -> AsyncIterator[str]:
+    """Stream a cached answer as a single delta."""
+    yield answer
+
+
+async def _store_when_complete(
+    deltas: AsyncIterator[str], agent_type: str, embedding: list[float]
+) -> AsyncIterator[str]:
+    """Pass deltas through, caching the full answer once the stream finishes."""
+    parts = []
+    async for delta in deltas:
+        parts.append(delta)
+        yield delta
+    get_semantic_cache().store(agent_type, embedding, "".join(parts))
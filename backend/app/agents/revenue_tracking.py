@@ -1,8 +1,11 @@
 """Revenue Tracking Agent — analyzes income streams and provides optimization insights."""
 
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextvars import ContextVar
+
 from openai import AsyncOpenAI
 
-from app.agents.base import call_agent, get_specialist_model
+from app.agents.base import call_agent, get_specialist_model, stream_agent
 
 REVENUE_TRACKING_PROMPT = """You are the Revenue Tracking Agent for IncomeOS.
 
@@ -32,12 +35,29 @@ Note: Revenue insights are analytical tools, not financial advice. Actual result
 market conditions, execution quality, and individual circumstances."""
 
 
-async def analyze_revenue(client: AsyncOpenAI, revenue_data: str) -> str:
+# Loads a summary of the current user's revenue; set per request by the chat API
+revenue_context: ContextVar[Callable[[], Awaitable[str]] | None] = ContextVar(
+    "revenue_context", default=None
+)
+
+
+async def with_revenue_context(revenue_data: str) -> str:
+    """Prefix a message with the current user's revenue summary, if one is available."""
+    load = revenue_context.get()
+    if load is None:
+        return revenue_data
+    return f"Revenue data:\n{await load()}\n\n{revenue_data}"
+
+
+async def analyze_revenue(
+    client: AsyncOpenAI, revenue_data: str, history: list[dict] | None = None
+) -> str:
     """Analyze revenue data and provide optimization insights.
 
     Args:
         client: AsyncOpenAI client instance
         revenue_data: Description or data of the user's revenue streams
+        history: Earlier conversation messages, if any
 
     Returns:
         Revenue analysis with actionable optimization recommendations
@@ -45,8 +65,54 @@ async def analyze_revenue(client: AsyncOpenAI, revenue_data: str) -> str:
     return await call_agent(
         client=client,
         system_prompt=REVENUE_TRACKING_PROMPT,
-        user_message=revenue_data,
+        user_message=await with_revenue_context(revenue_data),
+        history=history,
         model=get_specialist_model(),
         temperature=0.6,
         max_tokens=2500,
     )
+
+
+async def stream_revenue_analysis(
+    client: AsyncOpenAI, revenue_data: str, history: list[dict] | None = None
+) -> AsyncIterator[str]:
+    """Stream a revenue analysis as it is produced (see `analyze_revenue`)."""
+    deltas = stream_agent(
+        client=client,
+        system_prompt=REVENUE_TRACKING_PROMPT,
+        user_message=await with_revenue_context(revenue_data),
+        history=history,
+        model=get_specialist_model(),
+        temperature=0.6,
+        max_tokens=2500,
+    )
+    async for delta in deltas:
+        yield delta
+
+
+INSIGHTS_NARRATIVE_INSTRUCTIONS = """Write a short summary (at most 120 words) of the \
+findings below for the user's revenue dashboard. Lead with the most important one, say \
+what to do next, and use only the figures given; do not invent numbers.
+
+Findings:
+"""
+
+
+async def narrate_insights(client: AsyncOpenAI, findings: str) -> str:
+    """Phrase rule-based revenue findings as a short dashboard summary.
+
+    Args:
+        client: AsyncOpenAI client instance
+        findings: The findings, one per line, most important first
+
+    Returns:
+        A short narrative of the findings
+    """
+    return await call_agent(
+        client=client,
+        system_prompt=REVENUE_TRACKING_PROMPT,
+        user_message=INSIGHTS_NARRATIVE_INSTRUCTIONS + findings,
+        model=get_specialist_model(),
+        temperature=0.4,
+        max_tokens=300,
+    )
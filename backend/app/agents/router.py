@@ -3,6 +3,9 @@
 from openai import AsyncOpenAI
 
 from app.agents.base import call_agent, get_router_model
+from app.agents.intent_classifier import INTENT_LABELS, classify_intent
+from app.core.config import settings
+from app.services.llm_scheduler import PRIORITY_ROUTER
 
 ROUTER_SYSTEM_PROMPT = """You are the Router Agent for IncomeOS, an AI-powered Income Operating System.
 
@@ -20,6 +23,26 @@ Respond with ONLY the agent name (e.g., "SKILLS_DIAGNOSIS") and nothing else."""
 async def route_message(client: AsyncOpenAI, message: str) -> str:
     """Classify user intent and return the appropriate agent name.
 
+    The local intent classifier answers first; only messages it is unsure
+    about are sent to the LLM router.
+
+    Args:
+        client: AsyncOpenAI client instance
+        message: User's input message
+
+    Returns:
+        Agent name string: SKILLS_DIAGNOSIS, CONTENT_CREATION, REVENUE_TRACKING, or GENERAL
+    """
+    prediction = classify_intent(message)
+    if prediction.confidence >= settings.ROUTER_LOCAL_CONFIDENCE:
+        return prediction.label
+
+    return await route_message_with_llm(client, message)
+
+
+async def route_message_with_llm(client: AsyncOpenAI, message: str) -> str:
+    """Classify user intent with the Router Agent model.
+
     Args:
         client: AsyncOpenAI client instance
         message: User's input message
@@ -34,11 +57,11 @@ async def route_message(client: AsyncOpenAI, message: str) -> str:
         model=get_router_model(),
         temperature=0.0,
         max_tokens=50,
+        cache_ttl=settings.CACHE_TTL_ROUTER,
+        priority=PRIORITY_ROUTER,
     )
 
     agent_name = result.strip().upper()
-    valid_agents = {"SKILLS_DIAGNOSIS", "CONTENT_CREATION", "REVENUE_TRACKING", "GENERAL"}
-
-    if agent_name not in valid_agents:
+    if agent_name not in INTENT_LABELS:
         return "GENERAL"
     return agent_name
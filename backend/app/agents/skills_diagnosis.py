@@ -1,8 +1,23 @@
 """Skills Diagnosis Agent — analyzes skills and assesses monetization potential."""
 
+import json
+import logging
+from collections.abc import AsyncIterator
+
+import numpy as np
 from openai import AsyncOpenAI
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.agents.base import call_agent, embed_texts, get_specialist_model, stream_agent
+from app.agents.structured import ArrayItemScanner, json_schema_format, repair_json
+from app.core.config import settings
+from app.core.dependencies import get_skill_index, get_skill_profile_store
+from app.schemas.monetization import MonetizationPath
+from app.schemas.skills import SkillDiagnosisRequest, SkillDiagnosisResponse, SkillProfile
+from app.services.path_matching import PathTemplate
+from app.services.skill_index import profile_vector
 
-from app.agents.base import call_agent, get_specialist_model
+logger = logging.getLogger(__name__)
 
 SKILLS_DIAGNOSIS_PROMPT = """You are the Skills Diagnosis Agent for IncomeOS.
 
@@ -28,12 +43,27 @@ Creator economy context:
 - Skills combinations (e.g., design + development) command 2-3x premium"""
 
 
-async def diagnose_skills(client: AsyncOpenAI, user_input: str) -> str:
+def diagnosis_input(request: SkillDiagnosisRequest) -> str:
+    """Build the agent's input message from a diagnosis request."""
+    context_parts = [f"Skills and experience: {request.description}"]
+    if request.experience_years is not None:
+        context_parts.append(f"Years of experience: {request.experience_years}")
+    if request.current_monthly_income is not None:
+        context_parts.append(f"Current monthly income: ${request.current_monthly_income}")
+    if request.interests:
+        context_parts.append(f"Interests: {', '.join(request.interests)}")
+    return "\n".join(context_parts)
+
+
+async def diagnose_skills(
+    client: AsyncOpenAI, user_input: str, history: list[dict] | None = None
+) -> str:
     """Run a comprehensive skills diagnosis.
 
     Args:
         client: AsyncOpenAI client instance
         user_input: User's description of their skills and experience
+        history: Earlier conversation messages, if any
 
     Returns:
         Detailed skills analysis and monetization assessment
@@ -42,12 +72,172 @@ async def diagnose_skills(client: AsyncOpenAI, user_input: str) -> str:
         client=client,
         system_prompt=SKILLS_DIAGNOSIS_PROMPT,
         user_message=user_input,
+        history=history,
+        model=get_specialist_model(),
+        temperature=0.7,
+        max_tokens=3000,
+    )
+
+
+def stream_skills_diagnosis(
+    client: AsyncOpenAI, user_input: str, history: list[dict] | None = None
+) -> AsyncIterator[str]:
+    """Stream a skills diagnosis as it is produced (see `diagnose_skills`)."""
+    return stream_agent(
+        client=client,
+        system_prompt=SKILLS_DIAGNOSIS_PROMPT,
+        user_message=user_input,
+        history=history,
         model=get_specialist_model(),
         temperature=0.7,
         max_tokens=3000,
     )
 
 
+STRUCTURED_DIAGNOSIS_INSTRUCTIONS = """
+
+Answer with a JSON object matching the response schema:
+- skills: the user's 3-6 most monetizable skills, most promising first, each scored
+  0-100 for proficiency, monetization potential and market demand, with 2-4 specific
+  monetization paths
+- summary: the overall assessment with actionable next steps, in a few short paragraphs
+- top_opportunity: the name of the skill with the best income opportunity
+- total_monetization_potential: an overall 0-100 score for the user's skill set"""
+
+DIAGNOSIS_RESPONSE_FORMAT = json_schema_format("skills_diagnosis", SkillDiagnosisResponse)
+
+# Compiled once; validating straight from the model's JSON text skips a json.loads pass.
+_DIAGNOSIS = TypeAdapter(SkillDiagnosisResponse)
+_SKILL = TypeAdapter(SkillProfile)
+
+
+class DiagnosisFormatError(ValueError):
+    """Raised when the model's diagnosis cannot be read, even after repair."""
+
+
+async def diagnose_skills_structured(
+    client: AsyncOpenAI, user_input: str
+) -> SkillDiagnosisResponse:
+    """Run a skills diagnosis and parse it into skill profiles.
+
+    The skills and the summary come from one completion whose output is
+    constrained to the `SkillDiagnosisResponse` schema.
+
+    Args:
+        client: AsyncOpenAI client instance
+        user_input: User's description of their skills and experience
+
+    Returns:
+        The parsed diagnosis
+
+    Raises:
+        DiagnosisFormatError: If the answer is not a readable diagnosis
+    """
+    text = await call_agent(
+        client=client,
+        system_prompt=SKILLS_DIAGNOSIS_PROMPT + STRUCTURED_DIAGNOSIS_INSTRUCTIONS,
+        user_message=user_input,
+        model=get_specialist_model(),
+        temperature=0.7,
+        max_tokens=3000,
+        response_format=DIAGNOSIS_RESPONSE_FORMAT,
+    )
+    return parse_diagnosis(text)
+
+
+async def stream_skill_cards(
+    client: AsyncOpenAI, user_input: str
+) -> AsyncIterator[SkillProfile | SkillDiagnosisResponse]:
+    """Stream a structured skills diagnosis (see `diagnose_skills_structured`).
+
+    Yields each skill as soon as the model has finished writing it, then the
+    complete diagnosis.
+
+    Raises:
+        DiagnosisFormatError: If the answer is not a readable diagnosis
+    """
+    scanner = ArrayItemScanner()
+    deltas = stream_agent(
+        client=client,
+        system_prompt=SKILLS_DIAGNOSIS_PROMPT + STRUCTURED_DIAGNOSIS_INSTRUCTIONS,
+        user_message=user_input,
+        model=get_specialist_model(),
+        temperature=0.7,
+        max_tokens=3000,
+        response_format=DIAGNOSIS_RESPONSE_FORMAT,
+    )
+    async for delta in deltas:
+        for item in scanner.feed(delta):
+            try:
+                yield _SKILL.validate_json(item)
+            except ValidationError:
+                continue  # reported by the final parse if repair cannot fix it
+    yield parse_diagnosis(scanner.text)
+
+
+def parse_diagnosis(text: str) -> SkillDiagnosisResponse:
+    """Parse the model's JSON diagnosis.
+
+    Well-formed answers are validated in one pass. Otherwise the JSON is
+    repaired locally (see `repair_json`) and, if the answer was cut off
+    before the closing fields, those are derived from the skills it has.
+
+    Raises:
+        DiagnosisFormatError: If the answer is not a readable diagnosis
+    """
+    try:
+        return _DIAGNOSIS.validate_json(text)
+    except ValidationError:
+        pass
+    try:
+        data = json.loads(repair_json(text))
+        skills = [_SKILL.validate_python(skill) for skill in data.get("skills", [])]
+    except (ValueError, AttributeError, TypeError) as exc:
+        raise DiagnosisFormatError("Unreadable skills diagnosis") from exc
+    if not skills:
+        raise DiagnosisFormatError("Skills diagnosis has no skills")
+    best = max(skills, key=lambda skill: skill.monetization_potential)
+    data.setdefault("summary", "")
+    data.setdefault("top_opportunity", best.name)
+    data.setdefault(
+        "total_monetization_potential",
+        round(sum(skill.monetization_potential for skill in skills) / len(skills)),
+    )
+    try:
+        return _DIAGNOSIS.validate_python({**data, "skills": skills})
+    except ValidationError as exc:
+        raise DiagnosisFormatError("Unreadable skills diagnosis") from exc
+
+
+async def embed_skill_profile(client: AsyncOpenAI, skills: list[SkillProfile]) -> np.ndarray:
+    """Embed a diagnosed skill profile as one vector for the skill index.
+
+    Every skill is embedded in a single batched request; the profile vector
+    is their mean, weighted by proficiency.
+    """
+    texts = [
+        f"{skill.name} ({skill.category}): {', '.join(skill.suggested_paths)}" for skill in skills
+    ]
+    vectors = await embed_texts(client, texts, dimensions=settings.SKILL_EMBEDDING_DIMENSIONS)
+    return profile_vector(
+        np.array(vectors), np.array([skill.proficiency_level for skill in skills])
+    )
+
+
+async def remember_skill_profile(
+    client: AsyncOpenAI, user_id: str, skills: list[SkillProfile]
+) -> None:
+    """Save a user's newly diagnosed skills and add them to the similarity index."""
+    if not skills:
+        return
+    await get_skill_profile_store().save(user_id, skills)
+    try:
+        vector = await embed_skill_profile(client, skills)
+        await get_skill_index().upsert(user_id, vector)
+    except Exception:
+        logger.exception("Indexing the skill profile of %s failed", user_id)
+
+
 MONETIZATION_PATHS_PROMPT = """You are the Monetization Path Advisor for IncomeOS.
 
 Based on the user's skill profile, recommend specific monetization paths. For each path, provide:
@@ -81,3 +271,135 @@ async def suggest_monetization_paths(client: AsyncOpenAI, skill_profile: str) ->
         temperature=0.7,
         max_tokens=3000,
     )
+
+
+MONETIZATION_PLAN_PROMPT = """You are the Monetization Path Advisor for IncomeOS.
+
+Write a detailed implementation plan for the user to start earning from one monetization path.
+Use their skill profile, budget and weekly time commitment when given. Include:
+1. A week-by-week plan to first revenue, with concrete tasks per week
+2. Setup costs and the tools to use
+3. How to find the first customers
+4. Milestones that show the path is working, and what to adjust if it is not
+
+Be specific and realistic about timelines and revenue."""
+
+
+def monetization_plan_input(
+    path: PathTemplate,
+    skills: list[SkillProfile],
+    budget: float | None = None,
+    hours_per_week: int | None = None,
+) -> str:
+    """Describe a path and the user's situation as the planning agent's input."""
+    lines = [
+        f"Path: {path.title} ({path.category}, {path.difficulty})",
+        path.description,
+        f"Typical revenue: ${path.estimated_revenue_min:,.0f}-${path.estimated_revenue_max:,.0f}"
+        f"/month, first revenue in {path.time_to_revenue}",
+        "Outline: " + "; ".join(path.implementation_steps),
+    ]
+    if skills:
+        lines.append(
+            "My skills: "
+            + ", ".join(f"{skill.name} ({skill.proficiency_level}/100)" for skill in skills)
+        )
+    if budget is not None:
+        lines.append(f"Budget: ${budget:,.0f}")
+    if hours_per_week is not None:
+        lines.append(f"Time available: {hours_per_week} hours per week")
+    return "\n".join(lines)
+
+
+def stream_monetization_plan(client: AsyncOpenAI, plan_input: str) -> AsyncIterator[str]:
+    """Stream an implementation plan for a monetization path as it is written.
+
+    Args:
+        client: AsyncOpenAI client instance
+        plan_input: The path and the user's situation (see `monetization_plan_input`)
+
+    Returns:
+        Iterator of text deltas
+    """
+    return stream_agent(
+        client=client,
+        system_prompt=MONETIZATION_PLAN_PROMPT,
+        user_message=plan_input,
+        model=get_specialist_model(),
+        temperature=0.7,
+        max_tokens=3000,
+    )
+
+
+PATH_DESCRIPTIONS_PROMPT = """You are the Monetization Path Advisor for IncomeOS.
+
+You are given a user's diagnosed skills and the monetization paths that best match them.
+For each path, rewrite its description in two sentences addressed to the user: say which of
+their skills make it a good fit and what their first concrete step would be. Keep the path's
+facts (category, difficulty, revenue range) unchanged and never promise income."""
+
+
+class PathDescription(BaseModel):
+    """A path's description, rewritten for the user."""
+
+    id: str
+    description: str
+
+
+class PathDescriptions(BaseModel):
+    """The model's answer to PATH_DESCRIPTIONS_PROMPT."""
+
+    descriptions: list[PathDescription]
+
+
+PATH_DESCRIPTIONS_FORMAT = json_schema_format("path_descriptions", PathDescriptions)
+_PATH_DESCRIPTIONS = TypeAdapter(PathDescriptions)
+
+
+async def personalize_path_descriptions(
+    client: AsyncOpenAI,
+    skills: list[SkillProfile],
+    paths: list[MonetizationPath],
+    cache_ttl: float | None = None,
+) -> dict[str, str]:
+    """Rewrite ranked paths' descriptions for a user's skills in one call.
+
+    Args:
+        client: AsyncOpenAI client instance
+        skills: The user's diagnosed skills
+        paths: The ranked paths to describe
+        cache_ttl: Seconds to cache the descriptions for the same skills and paths
+
+    Returns:
+        New descriptions by path ID; paths missing from an unreadable answer
+        keep their catalog description
+    """
+    profile = "\n".join(
+        f"- {skill.name} ({skill.category}): proficiency {skill.proficiency_level}, "
+        f"demand {skill.demand_score}"
+        for skill in skills
+    )
+    listed = "\n".join(
+        f"- {path.id}: {path.title} ({path.category}, {path.difficulty}, "
+        f"${path.estimated_revenue_min:,.0f}-${path.estimated_revenue_max:,.0f}/month). "
+        f"{path.description}"
+        for path in paths
+    )
+    text = await call_agent(
+        client=client,
+        system_prompt=PATH_DESCRIPTIONS_PROMPT,
+        user_message=f"Skills:\n{profile}\n\nPaths:\n{listed}",
+        model=get_specialist_model(),
+        temperature=0.7,
+        max_tokens=120 * len(paths),
+        cache_ttl=cache_ttl,
+        response_format=PATH_DESCRIPTIONS_FORMAT,
+    )
+    try:
+        parsed = _PATH_DESCRIPTIONS.validate_json(text)
+    except ValidationError:
+        try:
+            parsed = _PATH_DESCRIPTIONS.validate_json(repair_json(text))
+        except ValidationError:
+            return {}
+    return {item.id: item.description for item in parsed.descriptions}
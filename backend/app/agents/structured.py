@@ -0,0 +1,143 @@
+"""Structured output — JSON-schema response formats and tolerant parsing of model JSON.
+
+Agents that need data rather than prose send a `json_schema` response
+format generated from the Pydantic model they parse into, so the model's
+answer is constrained to that shape and can be validated in one step.
+`repair_json` fixes the near-misses (code fences, trailing commas, answers
+cut off by the token limit) locally instead of asking the model again, and
+`ArrayItemScanner` picks finished array items out of a streamed answer so
+they can be shown before the rest of it arrives.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel
+
+
+def json_schema_format(name: str, model: type[BaseModel]) -> dict:
+    """Build a strict `json_schema` response format for a Pydantic model.
+
+    Strict mode requires every object to list all of its properties as
+    required and to forbid additional ones.
+    """
+    schema = model.model_json_schema()
+    _make_strict(schema)
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+
+def _make_strict(node: Any) -> None:
+    if isinstance(node, dict):
+        if node.get("type") == "object" and "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        for value in node.values():
+            _make_strict(value)
+    elif isinstance(node, list):
+        for value in node:
+            _make_strict(value)
+
+
+def repair_json(text: str) -> str:
+    """Best-effort fix of a model's almost-JSON object.
+
+    Drops anything around the outermost object (prose, code fences) and
+    trailing commas. If the object was cut off, keeps everything up to the
+    last complete value and closes the brackets still open there.
+
+    Args:
+        text: The model's answer
+
+    Returns:
+        JSON text that is syntactically complete unless the input was
+        malformed beyond these cases
+    """
+    start = text.find("{")
+    if start < 0:
+        return "{}"
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = escaped = False
+    safe_length, safe_stack = 0, []  # the last cut that leaves only complete values
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char in "}]":
+            end = len(out)
+            while end and out[end - 1].isspace():
+                end -= 1
+            if end and out[end - 1] == ",":
+                del out[end - 1]
+            out.append(char)
+            if stack:
+                stack.pop()
+            if not stack:
+                return "".join(out)
+            safe_length, safe_stack = len(out), stack.copy()
+            continue
+        if char == ",":
+            safe_length, safe_stack = len(out), stack.copy()
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        out.append(char)
+    closers = "".join("}" if opener == "{" else "]" for opener in reversed(safe_stack))
+    return "".join(out[:safe_length]).rstrip() + closers if safe_length else "{}"
+
+
+class ArrayItemScanner:
+    """Finds the complete objects of a top-level array in streamed JSON text.
+
+    Feed the text deltas of an answer shaped like `{"items": [{...}, ...], ...}`;
+    each call returns the JSON text of the array items the delta completed.
+    The scan is incremental, so the whole answer is read once.
+    """
+
+    _ITEM_PARENTS = ["{", "["]  # root object, then the array
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self._length = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._item_start: int | None = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._parts)
+
+    def feed(self, delta: str) -> list[str]:
+        ends = []
+        for offset, char in enumerate(delta):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._stack == self._ITEM_PARENTS:
+                    self._item_start = self._length + offset
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if char == "}" and self._stack == self._ITEM_PARENTS:
+                    ends.append((self._item_start, self._length + offset + 1))
+        self._parts.append(delta)
+        self._length += len(delta)
+        if not ends:
+            return []
+        text = self.text
+        return [text[start:end] for start, end in ends]
@@ -0,0 +1,41 @@
+"""Summarizer Agent — compacts older conversation turns into a rolling summary."""
+
+from openai import AsyncOpenAI
+
+from app.agents.base import call_agent, get_router_model
+from app.core.config import settings
+from app.services.conversations import Turn
+from app.services.llm_scheduler import PRIORITY_BACKGROUND
+
+SUMMARIZER_PROMPT = """You maintain the running summary of a conversation with the IncomeOS AI Coach.
+
+You are given the current summary (possibly empty) and the next turns of the conversation.
+Rewrite the summary so it also covers the new turns. Keep:
+- Facts the user shared about themselves (skills, audience, revenue, goals)
+- Decisions made and advice the user accepted
+- Open questions and next steps
+
+Drop greetings and small talk. Write plain prose in the third person, under 200 words."""
+
+
+async def summarize_conversation(client: AsyncOpenAI, summary: str, turns: list[Turn]) -> str:
+    """Fold conversation turns into the rolling summary.
+
+    Args:
+        client: AsyncOpenAI client instance
+        summary: Summary of the turns before these, or "" if there are none
+        turns: Turns to add to the summary, oldest first
+
+    Returns:
+        The updated summary
+    """
+    transcript = "\n".join(f"{turn.role.upper()}: {turn.content}" for turn in turns)
+    return await call_agent(
+        client=client,
+        system_prompt=SUMMARIZER_PROMPT,
+        user_message=f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}",
+        model=get_router_model(),
+        temperature=0.2,
+        max_tokens=settings.CONVERSATION_SUMMARY_MAX_TOKENS,
+        priority=PRIORITY_BACKGROUND,
+    )
@@ -1,50 +1,274 @@
 """Chat / AI Coach API routes."""
 
+import asyncio
+import json
+import logging
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from functools import partial
 
-from fastapi import APIRouter, Depends
-from openai import AsyncOpenAI
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from openai import AsyncOpenAI, OpenAIError
+from sse_starlette.sse import EventSourceResponse
 
-from app.agents.orchestrator import process_message
-from app.core.dependencies import get_current_user_id, get_openai_client
-from app.schemas.chat import ChatRequest, ChatResponse
+from app.agents.budget import PromptTooLargeError
+from app.agents.orchestrator import process_message, stream_message
+from app.agents.revenue_tracking import revenue_context
+from app.agents.summarizer import summarize_conversation
+from app.core.config import settings
+from app.core.dependencies import (
+    charge_rate_limit,
+    get_batch_rate_limiter,
+    get_conversation_memory,
+    get_credit_ledger,
+    get_current_user_id,
+    get_current_user_tier,
+    get_openai_client,
+    get_revenue_rollups,
+    reserve_credits,
+    set_llm_priority,
+)
+from app.schemas.chat import (
+    ChatBatchRequest,
+    ChatBatchResponse,
+    ChatBatchResult,
+    ChatRequest,
+    ChatResponse,
+)
+from app.services.conversations import Conversation, ConversationNotFoundError, Turn
+from app.services.credits import (
+    InsufficientCreditsError,
+    Reservation,
+    start_usage_tracking,
+)
+from app.services.llm_scheduler import PRIORITY_BACKGROUND, llm_priority
 
-router = APIRouter(prefix="/chat", tags=["chat"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/chat", tags=["chat"], dependencies=[Depends(set_llm_priority)])
+
+# Format agent type for display
+AGENT_DISPLAY_NAMES = {
+    "SKILLS_DIAGNOSIS": "Skills Diagnosis",
+    "CONTENT_CREATION": "Content Creation",
+    "REVENUE_TRACKING": "Revenue Tracking",
+    "GENERAL": "AI Coach",
+}
 
 
 @router.post("/message", response_model=ChatResponse)
 async def send_chat_message(
     request: ChatRequest,
     user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
 ):
     """Send a message to the AI Income Coach.
 
     The message is routed through the agent orchestrator which:
     1. Classifies intent using the Router Agent
-    2. Delegates to the appropriate specialist agent
+    2. Delegates to the appropriate specialist agent, with the conversation's
+       recent history and rolling summary
     3. Returns the response with agent type metadata
     """
+    return await _answer(get_openai_client(), request, user_id, tier)
+
+
+@router.post("/batch", response_model=ChatBatchResponse)
+async def send_chat_batch(
+    request: ChatBatchRequest,
+    stream: bool = False,
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
+    """Answer many independent messages to the AI Income Coach in one request.
+
+    Up to CHAT_BATCH_CONCURRENCY messages are processed at once, and their
+    agent calls queue behind interactive chat in the shared OpenAI limits.
+    Each message is answered and charged credits as if sent to `/chat/message`,
+    and counts against the user's hourly batch quota (429 once it is used up);
+    one failing (another user's conversation, no credits left, agent error) does
+    not affect the others. Messages run concurrently, so each conversation may
+    appear at most once per batch.
+
+    Returns every result in message order, or with `stream` set, streams
+    each result as an NDJSON line as soon as it completes.
+    """
+    max_messages = min(settings.CHAT_BATCH_MAX_MESSAGES, settings.CHAT_BATCH_MESSAGES_PER_HOUR)
+    if len(request.messages) > max_messages:
+        raise HTTPException(status_code=422, detail=f"At most {max_messages} messages per batch")
+    conversation_ids = [m.conversation_id for m in request.messages if m.conversation_id]
+    if len(set(conversation_ids)) < len(conversation_ids):
+        raise HTTPException(status_code=422, detail="A conversation may appear only once per batch")
+    await charge_rate_limit(user_id, len(request.messages), get_batch_rate_limiter())
+
+    llm_priority.set(PRIORITY_BACKGROUND)
     client = get_openai_client()
-    conversation_id = request.conversation_id or str(uuid.uuid4())
+    slots = asyncio.Semaphore(settings.CHAT_BATCH_CONCURRENCY)
 
-    # Process through agent pipeline
-    response_text, agent_type = await process_message(
-        client=client,
-        message=request.message,
-        user_context=f"User ID: {user_id}",
+    async def answer(index: int, message: ChatRequest) -> ChatBatchResult:
+        async with slots:
+            return await _batch_result(index, _answer(client, message, user_id, tier))
+
+    if stream:
+        return StreamingResponse(
+            _batch_lines(answer, request.messages), media_type="application/x-ndjson"
+        )
+    results = await asyncio.gather(
+        *(answer(index, message) for index, message in enumerate(request.messages))
     )
+    failed = sum(result.error is not None for result in results)
+    return ChatBatchResponse(results=results, succeeded=len(results) - failed, failed=failed)
 
-    # Format agent type for display
-    agent_display_names = {
-        "SKILLS_DIAGNOSIS": "Skills Diagnosis",
-        "CONTENT_CREATION": "Content Creation",
-        "REVENUE_TRACKING": "Revenue Tracking",
-        "GENERAL": "AI Coach",
-    }
 
+async def _batch_lines(
+    answer: Callable[[int, ChatRequest], Awaitable[ChatBatchResult]],
+    messages: list[ChatRequest],
+) -> AsyncIterator[str]:
+    """Yield each batch result as an NDJSON line, in completion order."""
+    tasks = [asyncio.create_task(answer(index, message)) for index, message in enumerate(messages)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield (await next_result).model_dump_json() + "\n"
+    finally:
+        # If the client went away, stop answering messages nobody will read.
+        for task in tasks:
+            task.cancel()
+
+
+async def _batch_result(index: int, answer: Awaitable[ChatResponse]) -> ChatBatchResult:
+    """Run one message of a batch, turning its failure into an error result."""
+    try:
+        return ChatBatchResult(index=index, response=await answer)
+    except HTTPException as exc:
+        return ChatBatchResult(index=index, error=exc.detail)
+    except (OpenAIError, PromptTooLargeError, InsufficientCreditsError) as exc:
+        return ChatBatchResult(index=index, error=_error_detail(exc))
+    except Exception:
+        logger.exception("Batch chat message %d failed", index)
+        return ChatBatchResult(index=index, error="AI agent unavailable")
+
+
+async def _answer(
+    client: AsyncOpenAI, request: ChatRequest, user_id: str, tier: str
+) -> ChatResponse:
+    """Answer one chat message through the agent pipeline and record the exchange."""
+    conversation = await _get_conversation(request.conversation_id, user_id)
+    reservation = await reserve_credits(user_id, tier, "chat_message")
+    revenue_context.set(partial(get_revenue_rollups().agent_context, user_id))
+
+    # Process through agent pipeline
+    async with get_credit_ledger().charge(reservation):
+        response_text, agent_type = await process_message(
+            client=client,
+            message=request.message,
+            previous_agent_type=conversation.last_agent_type,
+            history=get_conversation_memory().context(conversation),
+        )
+
+    credits_used = reservation.credits_used
+    await _remember(client, conversation, request.message, response_text, agent_type, credits_used)
     return ChatResponse(
         message=response_text,
-        agent_type=agent_display_names.get(agent_type, "AI Coach"),
-        conversation_id=conversation_id,
-        credits_used=1,
+        agent_type=AGENT_DISPLAY_NAMES.get(agent_type, "AI Coach"),
+        conversation_id=conversation.id,
+        credits_used=credits_used,
+    )
+
+
+@router.post("/message/stream")
+async def stream_chat_message(
+    request: ChatRequest,
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
+    """Send a message to the AI Income Coach and stream the answer as SSE.
+
+    Emits, in order:
+    - `agent`: the routed agent type, as soon as routing completes
+    - `delta`: one event per chunk of generated text
+    - `done`: the conversation ID and credits used
+    An `error` event replaces `done` if generation fails mid-stream or the
+    prompt does not fit the model or the user's remaining credits.
+    """
+    client = get_openai_client()
+    conversation = await _get_conversation(request.conversation_id, user_id)
+    reservation = await reserve_credits(user_id, tier, "chat_message")
+
+    return EventSourceResponse(_chat_events(client, request.message, conversation, reservation))
+
+
+async def _chat_events(
+    client: AsyncOpenAI,
+    message: str,
+    conversation: Conversation,
+    reservation: Reservation,
+) -> AsyncIterator[dict]:
+    """Produce the SSE event sequence for a streamed chat message."""
+    ledger = get_credit_ledger()
+    usage = start_usage_tracking(ledger.spendable_tokens(reservation))
+    revenue_context.set(partial(get_revenue_rollups().agent_context, conversation.user_id))
+    parts = []
+    try:
+        agent_type, deltas = await stream_message(
+            client=client,
+            message=message,
+            history=get_conversation_memory().context(conversation),
+        )
+        yield {
+            "event": "agent",
+            "data": json.dumps({"agent_type": AGENT_DISPLAY_NAMES.get(agent_type, "AI Coach")}),
+        }
+        async for delta in deltas:
+            parts.append(delta)
+            yield {"event": "delta", "data": json.dumps({"content": delta})}
+    except (OpenAIError, PromptTooLargeError, InsufficientCreditsError) as exc:
+        ledger.release(reservation)
+        yield {"event": "error", "data": json.dumps({"detail": _error_detail(exc)})}
+        return
+    except BaseException:
+        # The client went away mid-stream; charge for what was generated.
+        ledger.settle(reservation, usage)
+        raise
+
+    credits_used = ledger.settle(reservation, usage)
+    await _remember(client, conversation, message, "".join(parts), agent_type, credits_used)
+    yield {
+        "event": "done",
+        "data": json.dumps({"conversation_id": conversation.id, "credits_used": credits_used}),
+    }
+
+
+def _error_detail(exc: Exception) -> str:
+    if isinstance(exc, PromptTooLargeError):
+        return "Message too long"
+    if isinstance(exc, InsufficientCreditsError):
+        return "Insufficient AI credits"
+    return "AI agent unavailable"
+
+
+async def _get_conversation(conversation_id: uuid.UUID | None, user_id: str) -> Conversation:
+    """Load the requested conversation, or start a new one if no ID was given."""
+    try:
+        return await get_conversation_memory().get(str(conversation_id or uuid.uuid4()), user_id)
+    except ConversationNotFoundError:
+        raise HTTPException(status_code=404, detail="Conversation not found") from None
+
+
+async def _remember(
+    client: AsyncOpenAI,
+    conversation: Conversation,
+    message: str,
+    response: str,
+    agent_type: str,
+    credits_used: int,
+) -> None:
+    """Record a completed exchange in the conversation's history."""
+    await get_conversation_memory().append(
+        conversation,
+        [
+            Turn("user", message),
+            Turn("assistant", response, agent_type=agent_type, credits_used=credits_used),
+        ],
+        summarizer=partial(summarize_conversation, client),
     )
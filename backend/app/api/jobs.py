@@ -0,0 +1,105 @@
+"""Background Jobs API routes."""
+
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sse_starlette.sse import EventSourceResponse
+
+from app.core.dependencies import (
+    get_credit_ledger,
+    get_current_user_id,
+    get_current_user_tier,
+    get_job_queue,
+    reserve_credits,
+)
+from app.schemas.jobs import JobCreate, JobResponse
+from app.services.jobs import Job, JobQueueFullError
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+async def create_job(
+    request: JobCreate,
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
+    """Queue a long-running agent task and return its job ID at once.
+
+    Poll `GET /jobs/{id}` for the status and result, or follow
+    `GET /jobs/{id}/events` for progress as it happens. Credits are held
+    while the job waits and charged for the tokens it used when it finishes.
+    """
+    reservation = await reserve_credits(user_id, tier, request.kind)
+    try:
+        job = await get_job_queue().submit(
+            user_id, request.kind, request.input.model_dump(), tier, reservation
+        )
+    except JobQueueFullError:
+        get_credit_ledger().release(reservation)
+        raise HTTPException(
+            status_code=503, detail="Too many jobs queued", headers={"Retry-After": "30"}
+        ) from None
+    except BaseException:
+        get_credit_ledger().release(reservation)
+        raise
+    return _response(job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Get a job's status, and its result or error once it has finished."""
+    return _response(await _get_job(job_id, user_id))
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Follow a job as SSE.
+
+    Emits the job's progress events from the first (`skill` for diagnoses,
+    `delta` for content and plans), then `done` with the finished job or `error` if it
+    failed. Jobs running in another process only emit the final event.
+    """
+    await _get_job(job_id, user_id)
+    return EventSourceResponse(_job_events(job_id))
+
+
+async def _job_events(job_id: str) -> AsyncIterator[dict]:
+    """Produce the SSE event sequence for a followed job."""
+    async for event in get_job_queue().follow(job_id):
+        if event["event"] != "done":
+            yield {"event": event["event"], "data": json.dumps(event["data"])}
+            continue
+        job: Job | None = event["data"]
+        if job is None:
+            yield {"event": "error", "data": json.dumps({"detail": "Job expired"})}
+        elif job.status == "failed":
+            yield {"event": "error", "data": json.dumps({"detail": job.error})}
+        else:
+            yield {"event": "done", "data": _response(job).model_dump_json()}
+
+
+async def _get_job(job_id: str, user_id: str) -> Job:
+    job = await get_job_queue().get(job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        created_at=_format_date(job.created_at),
+        started_at=_format_date(job.started_at),
+        finished_at=_format_date(job.finished_at),
+    )
+
+
+def _format_date(timestamp: float | None) -> str | None:
+    return None if timestamp is None else datetime.fromtimestamp(timestamp, UTC).isoformat()
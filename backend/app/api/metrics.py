@@ -0,0 +1,40 @@
+"""Operational metrics API routes."""
+
+from fastapi import APIRouter
+
+from app.agents.orchestrator import speculation_stats
+from app.core.dependencies import (
+    get_conversation_memory,
+    get_llm_scheduler,
+    get_response_cache,
+    get_semantic_cache,
+    get_single_flight,
+    get_trigger_index,
+    get_trigger_scheduler,
+    get_workflow_engine,
+)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/agents")
+async def get_agent_metrics():
+    """Get counters for the agent pipeline's latency optimizations."""
+    return {
+        "speculation": speculation_stats.snapshot(),
+        "response_cache": get_response_cache().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "coalescing": get_single_flight().stats(),
+        "scheduler": get_llm_scheduler().stats(),
+        "conversations": get_conversation_memory().stats(),
+    }
+
+
+@router.get("/workflows")
+async def get_workflow_metrics():
+    """Get counters for workflow execution, scheduled triggers and event dispatch."""
+    return {
+        "engine": get_workflow_engine().stats(),
+        "scheduler": get_trigger_scheduler().stats(),
+        "events": get_trigger_index().stats(),
+    }
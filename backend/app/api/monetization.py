@@ -1,88 +1,94 @@
 """Monetization Paths API routes."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
-from app.core.dependencies import get_current_user_id
+from app.agents.skills_diagnosis import personalize_path_descriptions
+from app.core.config import settings
+from app.core.dependencies import (
+    get_credit_ledger,
+    get_current_user_id,
+    get_current_user_tier,
+    get_openai_client,
+    get_path_catalog,
+    get_skill_profile_store,
+    reserve_credits,
+    set_llm_priority,
+)
 from app.schemas.monetization import MonetizationPath, MonetizationPathsResponse
+from app.services.path_matching import PathMatch
 
-router = APIRouter(prefix="/monetization", tags=["monetization"])
+router = APIRouter(
+    prefix="/monetization", tags=["monetization"], dependencies=[Depends(set_llm_priority)]
+)
 
 
 @router.get("/paths", response_model=MonetizationPathsResponse)
-async def get_monetization_paths(user_id: str = Depends(get_current_user_id)):
-    """Get AI-recommended monetization paths based on the user's skill profile."""
-    # In production, these would be generated by the AI based on stored skill profiles
-    paths = [
-        MonetizationPath(
-            id="freelance-consulting",
-            title="UI/UX Consulting",
-            category="Services",
-            description="Offer high-value UI/UX consulting to startups and agencies.",
-            match_score=95,
-            estimated_revenue_min=3000,
-            estimated_revenue_max=8000,
-            time_to_revenue="1-2 weeks",
-            difficulty="intermediate",
-            required_skills=["UI/UX Design", "Project Management"],
-            implementation_steps=[
-                "Create a consulting portfolio page",
-                "Set up a booking system",
-                "Define service packages ($150-250/hr)",
-                "Publish case studies",
-                "Launch outreach campaign",
-            ],
-            recommended_tools=["Calendly", "Stripe", "Notion"],
-        ),
-        MonetizationPath(
-            id="online-course",
-            title="React & TypeScript Course",
-            category="Digital Products",
-            description="Create a comprehensive course leveraging your dev and teaching skills.",
-            match_score=91,
-            estimated_revenue_min=2000,
-            estimated_revenue_max=10000,
-            time_to_revenue="4-8 weeks",
-            difficulty="intermediate",
-            required_skills=["React Development", "Content Writing"],
-            implementation_steps=[
-                "Outline 8-12 module curriculum",
-                "Record video lessons",
-                "Build practice projects",
-                "Set up course platform",
-                "Launch with early-bird pricing",
-            ],
-            recommended_tools=["Gumroad", "Loom", "Notion"],
-        ),
-        MonetizationPath(
-            id="template-shop",
-            title="Design Template Store",
-            category="Digital Products",
-            description="Sell UI/UX templates and design kits for passive income.",
-            match_score=88,
-            estimated_revenue_min=500,
-            estimated_revenue_max=3000,
-            time_to_revenue="2-4 weeks",
-            difficulty="beginner",
-            required_skills=["UI/UX Design"],
-            implementation_steps=[
-                "Create 5-10 high-quality templates",
-                "Set up Gumroad store",
-                "Write product descriptions",
-                "Share on social media",
-                "Build email list for releases",
-            ],
-            recommended_tools=["Figma", "Gumroad", "ConvertKit"],
-        ),
-    ]
+async def get_monetization_paths(
+    limit: int = Query(settings.MONETIZATION_PATHS_LIMIT, ge=1, le=20),
+    personalize: bool = Query(False, description="Rewrite descriptions for the user with AI"),
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
+    """Get monetization paths ranked against the user's skill profile.
+
+    Paths are matched locally from the path catalog using the skills of the
+    user's latest diagnosis, so ranking costs no AI credits. With
+    `personalize`, one AI call rewrites the descriptions for the user.
+    """
+    skills = await get_skill_profile_store().get(user_id)
+    if not skills:
+        return MonetizationPathsResponse(
+            paths=[], summary="Run a skills diagnosis to get matched monetization paths."
+        )
+
+    catalog = get_path_catalog()
+    matches = catalog.rank(skills, limit)
+    paths = [_to_path(match) for match in matches]
+    if personalize:
+        reservation = await reserve_credits(user_id, tier, "monetization_paths")
+        async with get_credit_ledger().charge(reservation):
+            descriptions = await personalize_path_descriptions(
+                get_openai_client(),
+                skills,
+                paths,
+                cache_ttl=settings.MONETIZATION_DESCRIPTIONS_CACHE_TTL,
+            )
+        paths = [
+            path.model_copy(update={"description": descriptions.get(path.id, path.description)})
+            for path in paths
+        ]
+
+    return MonetizationPathsResponse(paths=paths, summary=_summary(matches, len(catalog)))
+
+
+def _to_path(match: PathMatch) -> MonetizationPath:
+    template = match.path
+    return MonetizationPath(
+        id=template.id,
+        title=template.title,
+        category=template.category,
+        description=template.description,
+        match_score=match.score,
+        estimated_revenue_min=template.estimated_revenue_min,
+        estimated_revenue_max=template.estimated_revenue_max,
+        time_to_revenue=template.time_to_revenue,
+        difficulty=template.difficulty,
+        required_skills=list(template.required_skills),
+        implementation_steps=list(template.implementation_steps),
+        recommended_tools=list(template.recommended_tools),
+    )
+
 
-    return MonetizationPathsResponse(
-        paths=paths,
-        summary=(
-            "Based on your skill profile, we identified 3 high-potential monetization paths. "
-            "UI/UX Consulting offers the quickest path to revenue, while the React course "
-            "has the highest revenue ceiling."
-        ),
+def _summary(matches: list[PathMatch], catalog_size: int) -> str:
+    best = matches[0].path
+    highest = max(matches, key=lambda match: match.path.estimated_revenue_max).path
+    summary = (
+        f"Based on your skill profile, these are the {len(matches)} best matches among "
+        f"{catalog_size} monetization paths. {best.title} fits your skills best"
     )
+    if highest is best:
+        return summary + " and also has the highest revenue ceiling."
+    return summary + f", while {highest.title} has the highest revenue ceiling."
 
 
 @router.post("/paths/{path_id}/plan")
@@ -1,9 +1,44 @@
 """Revenue Tracking API routes."""
 
-from fastapi import APIRouter, Depends
+import time
+from datetime import UTC, datetime
 
-from app.core.dependencies import get_current_user_id
-from app.schemas.revenue import RevenueOverview, RevenueStream
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.agents.revenue_tracking import narrate_insights
+from app.core.config import settings
+from app.core.dependencies import (
+    get_credit_ledger,
+    get_current_user_id,
+    get_current_user_tier,
+    get_forecast_store,
+    get_import_registry,
+    get_openai_client,
+    get_response_cache,
+    get_revenue_rollups,
+    get_revenue_store,
+    get_single_flight,
+    reserve_credits,
+    set_llm_priority,
+)
+from app.models.revenue import RevenueForecast
+from app.schemas.revenue import (
+    ForecastSeries,
+    PaymentCreate,
+    PaymentResponse,
+    RevenueForecastResponse,
+    RevenueImportResponse,
+    RevenueInsight,
+    RevenueInsightsResponse,
+    RevenueOverview,
+    RevenueStream,
+    StreamForecast,
+)
+from app.services.revenue_analytics import compute_overview, month_index, month_start
+from app.services.revenue_forecast import forecast_histories, is_current, load_histories
+from app.services.revenue_import import IMPORT_FORMATS, ImportFormatError, RevenueImporter
+from app.services.revenue_insights import Insight, detect_insights, history_version
+from app.services.revenue_rollups import Payment, StalePaymentError, UnknownStreamError
 
 router = APIRouter(prefix="/revenue", tags=["revenue"])
 
@@ -11,104 +46,222 @@ router = APIRouter(prefix="/revenue", tags=["revenue"])
 @router.get("/overview", response_model=RevenueOverview)
 async def get_revenue_overview(user_id: str = Depends(get_current_user_id)):
     """Get a comprehensive revenue overview with KPIs and stream details."""
-    streams = [
-        RevenueStream(
-            id="1",
-            name="Freelance Design",
-            type="Services",
-            monthly_revenue=2400,
-            trend="up",
-            trend_percent=12,
-            customers=3,
-            last_payment="Feb 25, 2026",
-        ),
-        RevenueStream(
-            id="2",
-            name="Consulting",
-            type="Services",
-            monthly_revenue=1200,
-            trend="down",
-            trend_percent=5,
-            customers=2,
-            last_payment="Feb 22, 2026",
-        ),
-        RevenueStream(
-            id="3",
-            name="Online Course",
-            type="Digital Products",
-            monthly_revenue=890,
-            trend="up",
-            trend_percent=45,
-            customers=42,
-            last_payment="Feb 27, 2026",
-        ),
-        RevenueStream(
-            id="4",
-            name="Template Shop",
-            type="Digital Products",
-            monthly_revenue=340,
-            trend="up",
-            trend_percent=28,
-            customers=18,
-            last_payment="Feb 26, 2026",
-        ),
-    ]
-
-    total = sum(s.monthly_revenue for s in streams)
-
+    history = await get_revenue_rollups().history(user_id)
+    metrics = compute_overview(history, settings.REVENUE_HISTORY_MONTHS)
+    forecast = await _forecast(user_id)
     return RevenueOverview(
-        total_monthly_revenue=total,
-        monthly_growth_percent=18,
-        projected_annual=total * 12,
-        active_streams=len(streams),
-        total_customers=sum(s.customers for s in streams),
-        streams=streams,
-        monthly_history=[
-            {"month": "Sep", "revenue": 2100},
-            {"month": "Oct", "revenue": 2800},
-            {"month": "Nov", "revenue": 3200},
-            {"month": "Dec", "revenue": 3600},
-            {"month": "Jan", "revenue": 4100},
-            {"month": "Feb", "revenue": 4830},
+        total_monthly_revenue=metrics.total_monthly_revenue,
+        monthly_growth_percent=metrics.monthly_growth_percent,
+        projected_annual=forecast.projected_annual,
+        active_streams=metrics.active_streams,
+        total_customers=metrics.total_customers,
+        streams=[
+            RevenueStream(
+                id=stream.id,
+                name=stream.name,
+                type=stream.type,
+                monthly_revenue=stream.monthly_revenue,
+                trend=stream.trend,
+                trend_percent=stream.trend_percent,
+                customers=stream.customers,
+                last_payment=_format_date(stream.last_payment_at),
+            )
+            for stream in metrics.streams
         ],
+        monthly_history=metrics.monthly_history,
     )
 
 
 @router.get("/streams")
 async def get_revenue_streams(user_id: str = Depends(get_current_user_id)):
     """Get all revenue streams for the current user."""
+    metrics = compute_overview(await get_revenue_rollups().history(user_id))
     return {
         "streams": [
-            {"id": "1", "name": "Freelance Design", "type": "Services", "monthly_revenue": 2400},
-            {"id": "2", "name": "Consulting", "type": "Services", "monthly_revenue": 1200},
-            {"id": "3", "name": "Online Course", "type": "Digital Products", "monthly_revenue": 890},
-            {"id": "4", "name": "Template Shop", "type": "Digital Products", "monthly_revenue": 340},
+            {
+                "id": stream.id,
+                "name": stream.name,
+                "type": stream.type,
+                "monthly_revenue": stream.monthly_revenue,
+            }
+            for stream in metrics.streams
         ]
     }
 
 
-@router.get("/insights")
-async def get_revenue_insights(user_id: str = Depends(get_current_user_id)):
-    """Get AI-generated revenue insights and optimization suggestions."""
-    return {
-        "insights": [
-            {
-                "title": "Design skills have high consulting demand",
-                "description": "UI/UX consulting at $150/hr could add $2,400/month.",
-                "impact": "+$2,400/month potential",
-                "priority": "high",
-            },
-            {
-                "title": "Template shop revenue accelerating",
-                "description": "28% growth — consider a premium bundle to capitalize.",
-                "impact": "+$500-1,000/month potential",
-                "priority": "medium",
-            },
-            {
-                "title": "Consulting revenue dipped",
-                "description": "Down 5%. Optimize booking page and add discovery call.",
-                "impact": "Recover $200/month",
-                "priority": "medium",
-            },
-        ]
-    }
+@router.get("/forecast", response_model=RevenueForecastResponse)
+async def get_revenue_forecast(user_id: str = Depends(get_current_user_id)):
+    """Get forecast monthly revenue, in total and per stream, with prediction intervals."""
+    forecast = await _forecast(user_id)
+    names = {stream.id: stream.name for stream in await get_revenue_store().streams(user_id)}
+    first = month_index(forecast.first_month)
+    return RevenueForecastResponse(
+        months=[f"{month_start(first + i):%b %Y}" for i in range(len(forecast.total["point"]))],
+        level=forecast.level,
+        projected_annual=forecast.projected_annual,
+        total=ForecastSeries(**forecast.total),
+        streams=[
+            StreamForecast(id=stream_id, name=names.get(stream_id, stream_id), **series)
+            for stream_id, series in forecast.streams.items()
+        ],
+        generated_at=datetime.fromtimestamp(forecast.generated_at, UTC),
+    )
+
+
+@router.post("/payments", response_model=PaymentResponse, status_code=201)
+async def record_payment(request: PaymentCreate, user_id: str = Depends(get_current_user_id)):
+    """Record a payment received by one of the current user's streams.
+
+    The stream's monthly revenue, customers and last payment are updated
+    immediately; payments older than the rollup window (12 months) must be
+    imported as history instead.
+    """
+    paid_at = request.paid_at.timestamp() if request.paid_at else time.time()
+    try:
+        rollup = await get_revenue_rollups().ingest(
+            Payment(user_id, request.stream_id, request.amount, paid_at, request.customer_id)
+        )
+    except UnknownStreamError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
+    except StalePaymentError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    return PaymentResponse(
+        stream_id=request.stream_id,
+        monthly_revenue=round(rollup.series.revenue[-1], 2),
+        customers=rollup.series.customers[-1],
+        last_payment=_format_date(rollup.stream.last_payment_at),
+    )
+
+
+@router.post("/import", response_model=RevenueImportResponse)
+async def import_revenue(
+    request: Request,
+    import_format: str | None = Query(
+        None, alias="format", description="csv or ndjson (default: from Content-Type)"
+    ),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Import payment history from a CSV (with a header row) or NDJSON upload.
+
+    Each row needs a stream (ID or name), an amount and a date; a customer
+    ID or email is optional. Rows are aggregated into monthly history that
+    replaces the imported months of each stream. The upload is processed as
+    it arrives; poll `GET /revenue/imports` for progress.
+    """
+    import_format = import_format or _import_format(request.headers.get("content-type", ""))
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=415, detail=f"Unsupported import format '{import_format}'")
+    store = get_revenue_store()
+    importer = RevenueImporter(
+        store,
+        user_id,
+        await store.streams(user_id),
+        batch_rows=settings.REVENUE_IMPORT_BATCH_ROWS,
+        upsert_batch_size=settings.REVENUE_IMPORT_UPSERT_BATCH,
+        max_errors=settings.REVENUE_IMPORT_MAX_ERRORS,
+    )
+    progress = get_import_registry().start(user_id, import_format)
+    try:
+        await importer.run(request.stream(), import_format, progress)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    await get_revenue_rollups().rebuild(user_id)
+    await _refresh_forecast(user_id)  # the imported history changes the fit
+    return RevenueImportResponse(**progress.snapshot())
+
+
+@router.get("/imports", response_model=list[RevenueImportResponse])
+async def list_revenue_imports(user_id: str = Depends(get_current_user_id)):
+    """List the current user's recent imports with their progress, newest first."""
+    return [
+        RevenueImportResponse(**progress.snapshot())
+        for progress in get_import_registry().for_user(user_id)
+    ]
+
+
+@router.get(
+    "/insights",
+    response_model=RevenueInsightsResponse,
+    dependencies=[Depends(set_llm_priority)],
+)
+async def get_revenue_insights(
+    narrative: bool = Query(False, description="Also phrase the top insights with AI"),
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
+    """Get revenue insights and optimization suggestions.
+
+    Insights are detected by rules over the user's revenue history and
+    cached until that data changes; with `narrative`, the AI summarizes
+    them (once per data version).
+    """
+    history = await get_revenue_rollups().history(user_id)
+    version = history_version(history)
+    key = f"revenue-insights:{user_id}:{version}:{int(narrative)}"
+    ttl = settings.REVENUE_INSIGHTS_CACHE_TTL
+    cached = await get_response_cache().get(key, ttl)
+    if cached is not None:
+        return RevenueInsightsResponse.model_validate_json(cached)
+
+    async def build() -> RevenueInsightsResponse:
+        insights = detect_insights(history, settings.REVENUE_INSIGHTS_LIMIT)
+        response = RevenueInsightsResponse(
+            insights=[
+                RevenueInsight(
+                    title=insight.title,
+                    description=insight.description,
+                    impact=insight.impact,
+                    priority=insight.priority,
+                    kind=insight.kind,
+                    stream_id=insight.stream_id,
+                )
+                for insight in insights
+            ],
+            data_version=version,
+        )
+        if narrative and insights:
+            response.narrative = await _narrate(user_id, tier, insights)
+        await get_response_cache().set(key, response.model_dump_json(), ttl)
+        return response
+
+    return await get_single_flight().do(key, build)
+
+
+async def _narrate(user_id: str, tier: str, insights: list[Insight]) -> str:
+    findings = "\n".join(f"- {i.title}: {i.description} ({i.impact})" for i in insights)
+    reservation = await reserve_credits(user_id, tier, "revenue_insights")
+    async with get_credit_ledger().charge(reservation):
+        return await narrate_insights(get_openai_client(), findings)
+
+
+async def _forecast(user_id: str) -> RevenueForecast:
+    """The user's stored forecast, refitted inline if it is missing or stale."""
+    forecast = await get_forecast_store().get(user_id)
+    if is_current(forecast, settings.FORECAST_MAX_AGE_HOURS * 3600):
+        return forecast
+    return await _refresh_forecast(user_id)
+
+
+async def _refresh_forecast(user_id: str) -> RevenueForecast:
+    histories = await load_histories(get_revenue_store(), [user_id])
+    (forecast,) = await forecast_histories(
+        histories,
+        settings.FORECAST_HORIZON_MONTHS,
+        settings.FORECAST_INTERVAL,
+        settings.FORECAST_FIT_MONTHS,
+    )
+    await get_forecast_store().save_many([forecast])
+    return forecast
+
+
+def _import_format(content_type: str) -> str:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in ("application/x-ndjson", "application/jsonl", "application/json"):
+        return "ndjson"
+    return "csv"
+
+
+def _format_date(timestamp: float | None) -> str | None:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, UTC).strftime("%b %-d, %Y")
@@ -1,81 +1,157 @@
 """Skills Diagnosis API routes."""
 
-import uuid
+import json
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, Depends
-from openai import AsyncOpenAI
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from openai import AsyncOpenAI, OpenAIError
+from sse_starlette.sse import EventSourceResponse
 
-from app.core.dependencies import get_current_user_id, get_openai_client
+from app.agents.budget import PromptTooLargeError
+from app.agents.skills_diagnosis import (
+    DiagnosisFormatError,
+    diagnose_skills_structured,
+    diagnosis_input,
+    remember_skill_profile,
+    stream_skill_cards,
+)
+from app.core.dependencies import (
+    get_credit_ledger,
+    get_current_user_id,
+    get_current_user_tier,
+    get_openai_client,
+    get_skill_handle_secret,
+    get_skill_index,
+    reserve_credits,
+    set_llm_priority,
+)
 from app.schemas.skills import (
+    SimilarProfile,
+    SimilarProfilesResponse,
     SkillDiagnosisRequest,
     SkillDiagnosisResponse,
     SkillProfile,
 )
-from app.agents.skills_diagnosis import diagnose_skills, suggest_monetization_paths
+from app.services.credits import (
+    InsufficientCreditsError,
+    Reservation,
+    start_usage_tracking,
+)
+from app.services.skill_index import profile_handle
 
-router = APIRouter(prefix="/skills", tags=["skills"])
+router = APIRouter(prefix="/skills", tags=["skills"], dependencies=[Depends(set_llm_priority)])
 
 
 @router.post("/diagnose", response_model=SkillDiagnosisResponse)
 async def run_skills_diagnosis(
     request: SkillDiagnosisRequest,
+    background_tasks: BackgroundTasks,
     user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
 ):
     """Run an AI-powered skills diagnosis.
 
     Analyzes the user's described skills, experience, and interests to identify
     monetizable opportunities with proficiency, demand, and potential scores.
+    The skills and the summary are parsed from a single schema-constrained
+    completion.
     """
     client = get_openai_client()
+    reservation = await reserve_credits(user_id, tier, "skills_diagnosis")
+    async with get_credit_ledger().charge(reservation):
+        try:
+            diagnosis = await diagnose_skills_structured(client, diagnosis_input(request))
+        except DiagnosisFormatError:
+            diagnosis = None  # the answer was generated, just unusable: still charged
+    if diagnosis is None:
+        raise HTTPException(status_code=502, detail="AI agent returned an unreadable diagnosis")
+    background_tasks.add_task(remember_skill_profile, client, user_id, diagnosis.skills)
+    return diagnosis
 
-    # Build context message
-    context_parts = [f"Skills and experience: {request.description}"]
-    if request.experience_years is not None:
-        context_parts.append(f"Years of experience: {request.experience_years}")
-    if request.current_monthly_income is not None:
-        context_parts.append(f"Current monthly income: ${request.current_monthly_income}")
-    if request.interests:
-        context_parts.append(f"Interests: {', '.join(request.interests)}")
-
-    user_input = "\n".join(context_parts)
-
-    # Call the skills diagnosis agent
-    analysis = await diagnose_skills(client, user_input)
-
-    # For MVP, return structured sample data with the AI analysis as summary
-    # In production, this would parse the AI response into structured data
-    sample_skills = [
-        SkillProfile(
-            name="UI/UX Design",
-            category="Design",
-            proficiency_level=85,
-            monetization_potential=92,
-            demand_score=88,
-            suggested_paths=["Freelance consulting", "Course creation", "Template shop"],
-        ),
-        SkillProfile(
-            name="React Development",
-            category="Engineering",
-            proficiency_level=78,
-            monetization_potential=95,
-            demand_score=94,
-            suggested_paths=["SaaS products", "Freelance development", "Technical writing"],
-        ),
-        SkillProfile(
-            name="Content Writing",
-            category="Marketing",
-            proficiency_level=72,
-            monetization_potential=75,
-            demand_score=82,
-            suggested_paths=["Blog monetization", "Copywriting services", "Newsletter"],
-        ),
-    ]
-
-    return SkillDiagnosisResponse(
-        skills=sample_skills,
-        summary=analysis,
-        top_opportunity="React Development",
-        total_monetization_potential=87,
+
+@router.post("/diagnose/stream")
+async def stream_skills_diagnosis(
+    request: SkillDiagnosisRequest,
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
+    """Run a skills diagnosis and stream its results as SSE.
+
+    Emits, in order:
+    - `skill`: one event per skill profile, as soon as the model has written it
+    - `done`: the complete diagnosis (a `SkillDiagnosisResponse`)
+    An `error` event replaces `done` if generation fails or the answer
+    cannot be read.
+    """
+    client = get_openai_client()
+    reservation = await reserve_credits(user_id, tier, "skills_diagnosis")
+    return EventSourceResponse(
+        _diagnosis_events(client, user_id, diagnosis_input(request), reservation)
+    )
+
+
+async def _diagnosis_events(
+    client: AsyncOpenAI, user_id: str, user_input: str, reservation: Reservation
+) -> AsyncIterator[dict]:
+    """Produce the SSE event sequence for a streamed skills diagnosis."""
+    ledger = get_credit_ledger()
+    usage = start_usage_tracking(ledger.spendable_tokens(reservation))
+    try:
+        async for result in stream_skill_cards(client, user_input):
+            event = "skill" if isinstance(result, SkillProfile) else "done"
+            yield {"event": event, "data": result.model_dump_json()}
+            diagnosis = result
+    except (OpenAIError, PromptTooLargeError, InsufficientCreditsError) as exc:
+        ledger.release(reservation)
+        yield {"event": "error", "data": json.dumps({"detail": _error_detail(exc)})}
+        return
+    except DiagnosisFormatError:
+        ledger.settle(reservation, usage)
+        yield {"event": "error", "data": json.dumps({"detail": "Unreadable diagnosis"})}
+        return
+    except BaseException:
+        # The client went away mid-stream; charge for what was generated.
+        ledger.settle(reservation, usage)
+        raise
+    ledger.settle(reservation, usage)
+    await remember_skill_profile(client, user_id, diagnosis.skills)
+
+
+def _error_detail(exc: Exception) -> str:
+    if isinstance(exc, PromptTooLargeError):
+        return "Description too long"
+    if isinstance(exc, InsufficientCreditsError):
+        return "Insufficient AI credits"
+    return "AI agent unavailable"
+
+
+@router.get("/similar", response_model=SimilarProfilesResponse)
+async def get_similar_profiles(
+    limit: int = Query(10, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Find the users whose latest skill diagnosis is most like the current user's.
+
+    Matches are identified by opaque handles, never by user ID; the endpoint
+    is unavailable (503) until a handle secret is configured. Empty until
+    the user has run a diagnosis.
+    """
+    secret = get_skill_handle_secret()
+    if not secret:
+        raise HTTPException(status_code=503, detail="Similar profiles are not configured")
+    index = get_skill_index()
+    vector = await index.get(user_id)
+    if vector is None:
+        return SimilarProfilesResponse(profiles=[])
+    matches = await index.search(vector, limit, exclude_user_id=user_id)
+    return SimilarProfilesResponse(
+        profiles=[
+            SimilarProfile(
+                handle=profile_handle(m.user_id, secret),
+                similarity=m.similarity,
+            )
+            for m in matches
+        ]
     )
 
 
@@ -2,21 +2,29 @@
 
 from fastapi import APIRouter, Depends
 
-from app.core.dependencies import get_current_user_id
+from app.core.dependencies import (
+    get_credit_ledger,
+    get_current_user_id,
+    get_current_user_tier,
+    get_tier_credits,
+)
 
 router = APIRouter(prefix="/user", tags=["user"])
 
 
 @router.get("/profile")
-async def get_user_profile(user_id: str = Depends(get_current_user_id)):
+async def get_user_profile(
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
     """Get the current user's profile and subscription details."""
     return {
         "id": user_id,
         "name": "Demo User",
         "email": "demo@incomeos.app",
-        "tier": "explorer",
-        "credits_remaining": 42,
-        "credits_total": 50,
+        "tier": tier,
+        "credits_remaining": await get_credit_ledger().balance(user_id, tier),
+        "credits_total": get_tier_credits()[tier],
         "credits_reset_days": 12,
         "income_goal": 10000,
         "active_streams": 4,
@@ -39,18 +47,19 @@ async def update_user_profile(
 
 
 @router.get("/credits")
-async def get_credits(user_id: str = Depends(get_current_user_id)):
-    """Get the user's AI credit balance and usage."""
+async def get_credits(
+    user_id: str = Depends(get_current_user_id),
+    tier: str = Depends(get_current_user_tier),
+):
+    """Get the user's AI credit balance and this month's usage."""
+    ledger = get_credit_ledger()
+    usage_breakdown = await ledger.monthly_usage(user_id)
     return {
         "user_id": user_id,
-        "tier": "explorer",
-        "credits_remaining": 42,
-        "credits_total": 50,
-        "credits_used_this_month": 8,
+        "tier": tier,
+        "credits_remaining": await ledger.balance(user_id, tier),
+        "credits_total": get_tier_credits()[tier],
+        "credits_used_this_month": sum(usage_breakdown.values()),
         "reset_date": "2026-03-01",
-        "usage_breakdown": {
-            "skills_diagnosis": 1,
-            "chat_messages": 5,
-            "content_generation": 2,
-        },
+        "usage_breakdown": usage_breakdown,
     }
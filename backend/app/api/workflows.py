@@ -1,69 +1,64 @@
 """Workflow Automation API routes."""
 
+import asyncio
+import time
 import uuid
+from datetime import UTC, datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 
-from app.core.dependencies import get_current_user_id
-from app.schemas.workflows import WorkflowCreate, WorkflowResponse, WorkflowAction
+from app.core.config import settings
+from app.core.dependencies import (
+    get_current_user_id,
+    get_trigger_index,
+    get_trigger_scheduler,
+    get_workflow_engine,
+    get_workflow_repository,
+)
+from app.models.workflow import Workflow
+from app.schemas.workflows import (
+    ActionRunResponse,
+    WorkflowAction,
+    WorkflowCreate,
+    WorkflowEvent,
+    WorkflowEventResponse,
+    WorkflowListResponse,
+    WorkflowResponse,
+    WorkflowRunResponse,
+)
+from app.services.triggers import TriggerParseError, event_type, parse_schedule
+from app.services.workflow_engine import WorkflowRun, WorkflowValidationError, compile_workflow
+from app.services.workflow_store import InvalidCursorError
 
 router = APIRouter(prefix="/workflows", tags=["workflows"])
 
-# In-memory store for MVP. Production uses Supabase.
-_workflows: dict[str, dict] = {}
-
-
-@router.get("/")
-async def list_workflows(user_id: str = Depends(get_current_user_id)):
-    """List all workflows for the current user."""
-    return {
-        "workflows": [
-            {
-                "id": "1",
-                "name": "Client Invoice Generator",
-                "description": "Automatically generates invoices after consulting sessions.",
-                "trigger": "Calendar event ended",
-                "actions": [
-                    {"type": "generate_invoice", "config": {}},
-                    {"type": "send_email", "config": {}},
-                    {"type": "log_revenue", "config": {}},
-                ],
-                "status": "active",
-                "last_run": "2 hours ago",
-                "runs_this_month": 8,
-            },
-            {
-                "id": "2",
-                "name": "Course Sales Notifier",
-                "description": "Notifications and tracking for course purchases.",
-                "trigger": "Gumroad sale webhook",
-                "actions": [
-                    {"type": "send_notification", "config": {}},
-                    {"type": "update_dashboard", "config": {}},
-                    {"type": "add_to_email_list", "config": {}},
-                ],
-                "status": "active",
-                "last_run": "5 hours ago",
-                "runs_this_month": 42,
-            },
-            {
-                "id": "3",
-                "name": "Weekly Revenue Report",
-                "description": "AI-generated weekly income summary with insights.",
-                "trigger": "Every Sunday 9:00 AM",
-                "actions": [
-                    {"type": "aggregate_data", "config": {}},
-                    {"type": "generate_insights", "config": {}},
-                    {"type": "send_report", "config": {}},
-                ],
-                "status": "active",
-                "last_run": "3 days ago",
-                "runs_this_month": 4,
-            },
-        ],
-        "total": 3,
-        "active": 3,
-    }
+
+@router.get("/", response_model=WorkflowListResponse)
+async def list_workflows(
+    status: Literal["draft", "active", "paused"] | None = None,
+    limit: int = Query(
+        default=settings.WORKFLOW_PAGE_SIZE, ge=1, le=settings.WORKFLOW_MAX_PAGE_SIZE
+    ),
+    cursor: str | None = None,
+    user_id: str = Depends(get_current_user_id),
+):
+    """List the current user's workflows, newest first.
+
+    Filter by `status`; page through with the `next_cursor` of the previous page.
+    """
+    repository = get_workflow_repository()
+    try:
+        page = await repository.list_by_user(user_id, status, limit, cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    counts = await repository.counts(user_id)
+    return WorkflowListResponse(
+        workflows=[_response(workflow) for workflow in page.workflows],
+        total=counts["total"],
+        active=counts["active"],
+        next_cursor=page.next_cursor,
+    )
 
 
 @router.post("/", response_model=WorkflowResponse)
@@ -72,25 +67,211 @@ async def create_workflow(
     user_id: str = Depends(get_current_user_id),
 ):
     """Create a new workflow automation."""
-    workflow_id = str(uuid.uuid4())
-
-    workflow = {
-        "id": workflow_id,
-        "name": request.name,
-        "description": request.description,
-        "trigger": request.trigger,
-        "actions": [a.model_dump() for a in request.actions],
-        "status": "draft",
-        "user_id": user_id,
-    }
-    _workflows[workflow_id] = workflow
+    actions = [a.model_dump() for a in request.actions]
+    try:
+        compile_workflow(actions)
+        schedule = parse_schedule(request.trigger)
+    except (WorkflowValidationError, TriggerParseError) as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
 
-    return WorkflowResponse(
-        id=workflow_id,
+    workflow = Workflow(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
         name=request.name,
         description=request.description,
         trigger=request.trigger,
-        actions=request.actions,
-        status="draft",
-        runs_this_month=0,
+        trigger_type="schedule" if schedule is not None else event_type(request.trigger),
+        actions=actions,
+        status=request.status,
+    )
+    await get_workflow_repository().save(workflow)
+    if workflow.status == "active":
+        _register(workflow)
+    return _response(workflow)
+
+
+@router.post("/{workflow_id}/activate", response_model=WorkflowResponse)
+async def activate_workflow(workflow_id: str, user_id: str = Depends(get_current_user_id)):
+    """Activate a workflow; its trigger starts firing it (on schedule or on events)."""
+    workflow = await _get_workflow(workflow_id, user_id)
+    workflow.status = "active"
+    await get_workflow_repository().save(workflow)
+    _register(workflow)
+    return _response(workflow)
+
+
+@router.post("/{workflow_id}/pause", response_model=WorkflowResponse)
+async def pause_workflow(workflow_id: str, user_id: str = Depends(get_current_user_id)):
+    """Pause a workflow; its trigger stops firing it until it is activated again."""
+    workflow = await _get_workflow(workflow_id, user_id)
+    workflow.status = "paused"
+    await get_workflow_repository().save(workflow)
+    _unregister(workflow_id)
+    return _response(workflow)
+
+
+@router.delete("/{workflow_id}", status_code=204)
+async def delete_workflow(workflow_id: str, user_id: str = Depends(get_current_user_id)):
+    """Delete a workflow. Runs already in progress finish."""
+    await _get_workflow(workflow_id, user_id)
+    await get_workflow_repository().delete(workflow_id)
+    _unregister(workflow_id)
+
+
+@router.post("/events", response_model=WorkflowEventResponse, status_code=202)
+async def trigger_event(event: WorkflowEvent, user_id: str = Depends(get_current_user_id)):
+    """Deliver an event (e.g. a Gumroad sale) to the current user's workflows.
+
+    Every active workflow whose trigger matches the event's type starts a
+    run with the event's payload.
+    """
+    runs = await dispatch_event(event.type, user_id, event.payload, event.id)
+    return WorkflowEventResponse(
+        type=event_type(event.type), matched=len(runs), runs=[run.id for run in runs]
+    )
+
+
+@router.post("/{workflow_id}/runs", response_model=WorkflowRunResponse, status_code=202)
+async def run_workflow(
+    workflow_id: str,
+    wait: bool = False,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Run a workflow now.
+
+    Independent actions run concurrently. Returns immediately with the run's
+    status unless `wait` is set. Repeating a request with the same
+    `Idempotency-Key` returns the original run instead of starting another.
+    """
+    workflow = await _get_workflow(workflow_id, user_id)
+    plan = compile_workflow(workflow.actions)
+    run = get_workflow_engine().start(plan, workflow_id, user_id, idempotency_key)
+    if wait and run.task is not None:
+        await asyncio.shield(run.task)
+    return _run_response(run)
+
+
+@router.get("/runs/{run_id}", response_model=WorkflowRunResponse)
+async def get_workflow_run(run_id: str, user_id: str = Depends(get_current_user_id)):
+    """Get the status and per-action timing of a workflow run."""
+    run = get_workflow_engine().get_run(run_id)
+    if run is None or run.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return _run_response(run)
+
+
+def _run_response(run: WorkflowRun) -> WorkflowRunResponse:
+    return WorkflowRunResponse(
+        id=run.id,
+        workflow_id=run.workflow_id,
+        status=run.status,
+        duration_ms=run.duration_ms,
+        actions=[
+            ActionRunResponse(
+                id=action.id,
+                type=action.type,
+                status=action.status,
+                attempts=action.attempts,
+                duration_ms=action.duration_ms,
+                error=action.error,
+                output=action.output,
+            )
+            for action in run.actions.values()
+        ],
+    )
+
+
+def _response(workflow: Workflow) -> WorkflowResponse:
+    last_run = None
+    if workflow.last_run_at is not None:
+        last_run = datetime.fromtimestamp(workflow.last_run_at, UTC).isoformat()
+    return WorkflowResponse(
+        id=workflow.id,
+        name=workflow.name,
+        description=workflow.description,
+        trigger=workflow.trigger,
+        actions=workflow.actions,
+        status=workflow.status,
+        last_run=last_run,
+        runs_this_month=workflow.runs_this_month,
+    )
+
+
+async def _get_workflow(workflow_id: str, user_id: str) -> Workflow:
+    workflow = await get_workflow_repository().get(workflow_id)
+    if workflow is None or workflow.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
+
+
+def _register(workflow: Workflow) -> None:
+    """Start firing an active workflow: on its schedule, or on matching events."""
+    if workflow.trigger_type == "schedule":
+        schedule = parse_schedule(workflow.trigger)
+        get_trigger_scheduler().add(workflow.id, schedule, workflow.last_run_at)
+    elif workflow.trigger_type != "manual":
+        get_trigger_index().add(workflow.id, workflow.user_id, workflow.trigger_type)
+
+
+def _unregister(workflow_id: str) -> None:
+    get_trigger_scheduler().remove(workflow_id)
+    get_trigger_index().remove(workflow_id)
+
+
+async def register_active_workflows() -> None:
+    """Register the trigger of every active workflow (on startup)."""
+    for workflow in await get_workflow_repository().active():
+        _register(workflow)
+
+
+async def dispatch_event(
+    type_: str, user_id: str, payload: dict | None = None, event_id: str | None = None
+) -> list[WorkflowRun]:
+    """Start a run of every active workflow of a user that an event triggers.
+
+    Args:
+        type_: Event type, e.g. "gumroad_sale" (normalized before matching)
+        user_id: User the event belongs to
+        payload: Event data passed to every action of the runs
+        event_id: ID of the event; redelivering it returns the original runs
+
+    Returns:
+        The started runs
+    """
+    repository = get_workflow_repository()
+    engine = get_workflow_engine()
+    now = time.time()
+    runs = []
+    for workflow_id in get_trigger_index().match(event_type(type_), user_id):
+        workflow = await repository.get(workflow_id)
+        if workflow is None or workflow.status != "active":
+            get_trigger_index().remove(workflow_id)  # changed by another worker
+            continue
+        key = f"event:{workflow_id}:{event_id}" if event_id else None
+        run = engine.start(compile_workflow(workflow.actions), workflow_id, user_id, key, payload)
+        if run.created_at >= now:  # not a redelivery of an event already run
+            workflow.last_run_at = now
+            workflow.runs_this_month += 1
+            await repository.save(workflow)
+        runs.append(run)
+    return runs
+
+
+async def fire_scheduled_workflow(workflow_id: str, fire_time: float) -> None:
+    """Run a workflow whose schedule came due (the trigger scheduler's callback)."""
+    repository = get_workflow_repository()
+    workflow = await repository.get(workflow_id)
+    if workflow is None or workflow.status != "active":
+        get_trigger_scheduler().remove(workflow_id)
+        return
+    if not await repository.claim_fire(workflow_id, fire_time):
+        return  # already fired, by this process or another one
+    # Keyed by workflow and fire time: repeated deliveries of one fire run once,
+    # while the user's other workflows due at the same moment still run.
+    await get_workflow_engine().run(
+        compile_workflow(workflow.actions),
+        workflow_id,
+        workflow.user_id,
+        idempotency_key=f"schedule:{workflow_id}:{int(fire_time)}",
     )
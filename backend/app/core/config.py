@@ -15,6 +15,22 @@ class Settings(BaseSettings):
     OPENAI_MODEL_ROUTER: str = "gpt-4o-mini"
     OPENAI_MODEL_SPECIALIST: str = "gpt-4o-mini"
     OPENAI_MODEL_COMPLEX: str = "gpt-4o"
+    OPENAI_MODEL_EMBEDDING: str = "text-embedding-3-small"
+
+    # Agent routing — messages the local intent classifier labels with at least
+    # this confidence skip the LLM router (set above 1.0 to always use the LLM)
+    ROUTER_LOCAL_CONFIDENCE: float = 0.9
+    # Start the likely specialist while the LLM router is still deciding
+    ORCHESTRATOR_SPECULATIVE: bool = False
+
+    # OpenAI scheduling — per-model budgets; calls over budget queue rather than fail
+    LLM_ROUTER_RPM: int = 5_000
+    LLM_ROUTER_TPM: int = 2_000_000
+    LLM_SPECIALIST_RPM: int = 5_000
+    LLM_SPECIALIST_TPM: int = 2_000_000
+    LLM_COMPLEX_RPM: int = 500
+    LLM_COMPLEX_TPM: int = 300_000
+    LLM_MAX_CONCURRENCY: int = 64
 
     # Supabase
     SUPABASE_URL: str = ""
@@ -24,6 +40,42 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Agent response cache — TTLs (seconds) opt agents in; 0 disables caching
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10_000
+    RESPONSE_CACHE_REDIS_ENABLED: bool = False
+    CACHE_TTL_ROUTER: int = 86_400
+    CACHE_TTL_GENERAL: int = 3_600
+
+    # Semantic cache — agents listed here may answer paraphrased questions from
+    # cache when cosine similarity reaches their threshold. The cache is shared
+    # by all users, so only list agents whose answers are not personalized.
+    SEMANTIC_CACHE_THRESHOLDS: dict[str, float] = {"GENERAL": 0.93}
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 5_000
+    SEMANTIC_CACHE_TTL: int = 86_400
+
+    # Skill profiles — each user's skills from their latest diagnosis; the memory
+    # backend seeds a demo profile for the demo user
+    SKILL_PROFILES_BACKEND: str = "memory"  # "memory" or "supabase"
+    SKILL_PROFILES_DEMO_DATA: bool = True
+
+    # Monetization paths — ranked locally against the path catalog; the LLM is
+    # only called to personalize descriptions when asked, cached per profile
+    MONETIZATION_PATHS_LIMIT: int = 5
+    MONETIZATION_DESCRIPTIONS_CACHE_TTL: int = 604_800
+
+    # Skill similarity index — one embedding of SKILL_EMBEDDING_DIMENSIONS per
+    # diagnosed profile. "local" searches in process and, with SKILL_INDEX_PATH,
+    # persists to a memory-mapped file there (single process only: give each
+    # process its own path, or use pgvector with several workers); "pgvector"
+    # uses the skill_profile_vectors table (its column size must match the
+    # dimensions). Matches are shown by an opaque handle keyed with
+    # SKILL_HANDLE_SECRET, never by user ID; if unset, the local index generates
+    # one (kept under SKILL_INDEX_PATH), and pgvector disables /skills/similar.
+    SKILL_INDEX_BACKEND: str = "local"  # "local" or "pgvector"
+    SKILL_INDEX_PATH: str = ""
+    SKILL_EMBEDDING_DIMENSIONS: int = 256
+    SKILL_HANDLE_SECRET: str = ""
+
     # Stripe
     STRIPE_SECRET_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
@@ -38,8 +90,17 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "https://incomeos.app"]
 
-    # Rate Limiting
+    # Rate Limiting — weight units per user per minute; routes not listed in
+    # RATE_LIMIT_ROUTE_WEIGHTS ("METHOD /path" below the API prefix) weigh 1
     RATE_LIMIT_PER_MINUTE: int = 30
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (single process) or "redis"
+    RATE_LIMIT_ROUTE_WEIGHTS: dict[str, int] = {
+        "POST /chat/message": 3,
+        "POST /chat/message/stream": 3,
+        "POST /chat/batch": 0,  # charged to the batch quota by the handler
+        "POST /skills/diagnose": 5,
+        "POST /jobs": 5,
+    }
 
     # AI Credits per tier
     CREDITS_EXPLORER: int = 50
@@ -47,6 +108,99 @@ class Settings(BaseSettings):
     CREDITS_OPERATOR: int = 2000
     CREDITS_CEO: int = 5000
 
+    # Credit accounting — requests hold CREDITS_RESERVE_PER_REQUEST up front and
+    # are charged one credit per CREDIT_TOKENS_PER_CREDIT tokens actually used
+    CREDIT_TOKENS_PER_CREDIT: int = 2_000
+    CREDITS_RESERVE_PER_REQUEST: int = 2
+    CREDITS_BACKEND: str = "memory"  # "memory" or "supabase"
+    CREDITS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    CREDITS_FLUSH_BATCH_SIZE: int = 500
+
+    # Prompt budgeting — calls are counted locally before they are sent;
+    # max_tokens is lowered to what fits the context window and the user's
+    # credits, and calls with less room than LLM_MIN_COMPLETION_TOKENS are refused
+    MODEL_CONTEXT_WINDOWS: dict[str, int] = {"gpt-4o-mini": 128_000, "gpt-4o": 128_000}
+    DEFAULT_CONTEXT_WINDOW: int = 128_000
+    LLM_MIN_COMPLETION_TOKENS: int = 256
+    USER_CONTEXT_MAX_TOKENS: int = 1_000  # longer user context is trimmed...
+    USER_CONTEXT_REJECT_TOKENS: int = 8_000  # ...or rejected past this
+    # Directory of pre-downloaded tiktoken encoding files, loaded at startup;
+    # without it token counts are estimated (nothing is downloaded)
+    TIKTOKEN_CACHE_DIR: str = ""
+
+    # Conversation memory — agents see a rolling summary plus the newest turns
+    # that fit in CONVERSATION_HISTORY_TOKENS; older turns are summarized in the
+    # background once the unsummarized history passes the threshold. The cache
+    # of active conversations is per process: with several workers on the
+    # supabase backend, set CONVERSATION_CACHE_MAX_ENTRIES=0 to reload each turn
+    CONVERSATION_BACKEND: str = "memory"  # "memory" or "supabase"
+    CONVERSATION_HISTORY_TOKENS: int = 1_500
+    CONVERSATION_SUMMARIZE_THRESHOLD_TOKENS: int = 3_000
+    CONVERSATION_SUMMARY_MAX_TOKENS: int = 300
+    CONVERSATION_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Batch chat — up to CHAT_BATCH_MAX_MESSAGES per request, CHAT_BATCH_CONCURRENCY
+    # in flight at once; their agent calls queue behind interactive traffic.
+    # Messages count against a per-user quota of CHAT_BATCH_MESSAGES_PER_HOUR
+    # (separate from the per-minute API limit); keep it at least the batch size.
+    CHAT_BATCH_MAX_MESSAGES: int = 500
+    CHAT_BATCH_CONCURRENCY: int = 16
+    CHAT_BATCH_MESSAGES_PER_HOUR: int = 1_000
+
+    # Revenue analytics; the memory backend seeds demo history for the demo user
+    REVENUE_BACKEND: str = "memory"  # "memory" or "supabase"
+    REVENUE_DEMO_DATA: bool = True
+    REVENUE_HISTORY_MONTHS: int = 6  # months in the overview's revenue chart
+    REVENUE_ROLLUP_MAX_USERS: int = 10_000  # users whose rollups are kept in memory
+
+    # Revenue imports — uploads are validated REVENUE_IMPORT_BATCH_ROWS rows at a
+    # time and written to revenue history REVENUE_IMPORT_UPSERT_BATCH rows per upsert
+    REVENUE_IMPORT_BATCH_ROWS: int = 10_000
+    REVENUE_IMPORT_UPSERT_BATCH: int = 5_000
+    REVENUE_IMPORT_MAX_ERRORS: int = 20  # rejected rows reported per import
+
+    # Revenue insights — rule-based findings cached per revenue data version; the
+    # LLM is only called to phrase the top findings when a narrative is requested
+    REVENUE_INSIGHTS_LIMIT: int = 5
+    REVENUE_INSIGHTS_CACHE_TTL: int = 604_800
+
+    # Revenue forecasts — precomputed for every user by the nightly batch
+    # (scripts/forecast_batch.py); a dashboard refits one user inline only when
+    # their stored forecast is missing, from an earlier month or older than
+    # FORECAST_MAX_AGE_HOURS
+    FORECAST_HORIZON_MONTHS: int = 12
+    FORECAST_INTERVAL: float = 0.8  # prediction interval coverage
+    FORECAST_FIT_MONTHS: int = 36  # complete months of history fitted
+    FORECAST_MAX_AGE_HOURS: float = 36.0
+    FORECAST_BATCH_USERS: int = 5_000  # users loaded and fitted per batch step
+    FORECAST_WORKERS: int = 0  # batch fitting processes; 0 = one per CPU
+
+    # Workflow storage; listings are paginated by keyset, WORKFLOW_PAGE_SIZE at a time
+    WORKFLOWS_BACKEND: str = "memory"  # "memory" or "supabase"
+    WORKFLOW_PAGE_SIZE: int = 50
+    WORKFLOW_MAX_PAGE_SIZE: int = 200
+
+    # Workflow engine — WORKFLOW_MAX_WORKERS bounds concurrent actions across all
+    # runs; failed attempts are retried with exponential backoff from
+    # WORKFLOW_RETRY_BACKOFF_SECONDS
+    WORKFLOW_MAX_WORKERS: int = 256
+    WORKFLOW_ACTION_TIMEOUT_SECONDS: float = 30.0
+    WORKFLOW_ACTION_MAX_RETRIES: int = 2
+    WORKFLOW_RETRY_BACKOFF_SECONDS: float = 0.5
+    WORKFLOW_RUN_HISTORY: int = 10_000  # finished runs kept for status lookups
+    # Scheduled workflows fired at once; further due fires wait for a slot
+    TRIGGER_SCHEDULER_MAX_CONCURRENCY: int = 100
+
+    # Background jobs — long-running agent tasks run by JOBS_MAX_WORKERS workers
+    # per process; at most JOBS_MAX_PENDING wait, further submissions get 503.
+    # Job records are kept JOBS_RESULT_TTL_SECONDS after they last change, in
+    # memory or in Redis ("redis" lets any process answer status lookups)
+    JOBS_BACKEND: str = "memory"  # "memory" or "redis"
+    JOBS_MAX_WORKERS: int = 8
+    JOBS_MAX_PENDING: int = 1_000
+    JOBS_TIMEOUT_SECONDS: float = 300.0
+    JOBS_RESULT_TTL_SECONDS: float = 3_600.0
+
     model_config = {"env_file": ".env", "case_sensitive": True}
 
 
@@ -1,8 +1,68 @@
+import math
 from functools import lru_cache
 
+from fastapi import Depends, HTTPException, Request
 from openai import AsyncOpenAI
 
 from app.core.config import settings
+from app.services.coalescing import SingleFlight
+from app.services.conversations import (
+    ConversationMemory,
+    MemoryConversationStore,
+    SupabaseConversationStore,
+)
+from app.services.credits import (
+    CreditLedger,
+    InsufficientCreditsError,
+    MemoryCreditSink,
+    Reservation,
+    SupabaseCreditSink,
+)
+from app.services.event_dispatch import WorkflowTriggerIndex
+from app.services.forecast_store import (
+    ForecastStore,
+    MemoryForecastStore,
+    SupabaseForecastStore,
+)
+from app.services.jobs import JobQueue, JobStore, MemoryJobStore, RedisJobStore
+from app.services.llm_scheduler import (
+    TIER_PRIORITIES,
+    LLMScheduler,
+    ModelLimits,
+    llm_priority,
+)
+from app.services.path_matching import PathCatalog, load_catalog
+from app.services.rate_limit import MemoryRateLimiter, RateLimiter, RedisRateLimiter
+from app.services.response_cache import MemoryCache, RedisCache, ResponseCache
+from app.services.revenue_import import ImportRegistry
+from app.services.revenue_rollups import RevenueRollups
+from app.services.revenue_store import (
+    MemoryRevenueStore,
+    RevenueStore,
+    SupabaseRevenueStore,
+    seed_demo_revenue,
+)
+from app.services.semantic_cache import SemanticCache
+from app.services.skill_index import (
+    LocalSkillIndex,
+    PgvectorSkillIndex,
+    SkillIndex,
+    load_handle_secret,
+)
+from app.services.skill_profiles import (
+    DEMO_SKILLS,
+    MemorySkillProfileStore,
+    SkillProfileStore,
+    SupabaseSkillProfileStore,
+)
+from app.services.trigger_scheduler import TriggerScheduler
+from app.services.workflow_actions import create_action_registry
+from app.services.workflow_engine import ActionRegistry, WorkflowEngine
+from app.services.workflow_store import (
+    MemoryWorkflowRepository,
+    SupabaseWorkflowRepository,
+    WorkflowRepository,
+)
 
 
 @lru_cache
@@ -11,8 +71,293 @@ def get_openai_client() -> AsyncOpenAI:
     return AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
 
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    """Get the shared agent response cache (in-process, plus Redis if enabled)."""
+    tiers = [MemoryCache(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)]
+    if settings.RESPONSE_CACHE_REDIS_ENABLED:
+        tiers.append(RedisCache(settings.REDIS_URL))
+    return ResponseCache(tiers)
+
+
+@lru_cache
+def get_semantic_cache() -> SemanticCache:
+    """Get the shared semantic cache for specialist answers."""
+    return SemanticCache(
+        max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl=settings.SEMANTIC_CACHE_TTL,
+    )
+
+
+@lru_cache
+def get_skill_profile_store() -> SkillProfileStore:
+    """Get the shared store of users' diagnosed skills."""
+    if settings.SKILL_PROFILES_BACKEND == "supabase":
+        return SupabaseSkillProfileStore(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    store = MemorySkillProfileStore()
+    if settings.SKILL_PROFILES_DEMO_DATA:
+        store.put("demo-user-id", DEMO_SKILLS)
+    return store
+
+
+@lru_cache
+def get_path_catalog() -> PathCatalog:
+    """Get the monetization path catalog (loaded and indexed once)."""
+    return load_catalog()
+
+
+@lru_cache
+def get_skill_index() -> SkillIndex:
+    """Get the shared index of skill profile embeddings."""
+    if settings.SKILL_INDEX_BACKEND == "pgvector":
+        return PgvectorSkillIndex(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return LocalSkillIndex(settings.SKILL_INDEX_PATH or None)
+
+
+@lru_cache
+def get_skill_handle_secret() -> str | None:
+    """Get the key of the handles that stand in for matched users' IDs.
+
+    A configured SKILL_HANDLE_SECRET wins; the local index otherwise keeps a
+    generated one with its files. pgvector without a secret has none, as a
+    per-process key would give every worker different handles.
+    """
+    if settings.SKILL_HANDLE_SECRET:
+        return settings.SKILL_HANDLE_SECRET
+    if settings.SKILL_INDEX_BACKEND == "pgvector":
+        return None
+    return load_handle_secret(settings.SKILL_INDEX_PATH or None)
+
+
+@lru_cache
+def get_single_flight() -> SingleFlight:
+    """Get the shared coalescer for identical in-flight agent calls."""
+    return SingleFlight()
+
+
+def get_model_limits(model: str) -> ModelLimits:
+    """Get the configured rate limits for a model.
+
+    Roles configured with the same model share that model's limits (OpenAI
+    enforces them per model), so the most restrictive role's settings win.
+    Unknown models get the specialist limits.
+    """
+    s = settings
+    specialist = (s.LLM_SPECIALIST_RPM, s.LLM_SPECIALIST_TPM)
+    roles = [
+        (s.OPENAI_MODEL_ROUTER, (s.LLM_ROUTER_RPM, s.LLM_ROUTER_TPM)),
+        (s.OPENAI_MODEL_SPECIALIST, specialist),
+        (s.OPENAI_MODEL_COMPLEX, (s.LLM_COMPLEX_RPM, s.LLM_COMPLEX_TPM)),
+    ]
+    matching = [limits for name, limits in roles if name == model] or [specialist]
+    return ModelLimits(
+        requests_per_minute=min(rpm for rpm, _ in matching),
+        tokens_per_minute=min(tpm for _, tpm in matching),
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    )
+
+
+@lru_cache
+def get_llm_scheduler() -> LLMScheduler:
+    """Get the shared scheduler that admits OpenAI calls."""
+    return LLMScheduler(get_model_limits)
+
+
 async def get_current_user_id() -> str:
     """Extract user ID from request. Placeholder for Clerk JWT verification."""
     # In production, this would verify the Clerk JWT token
     # and extract the user ID from the claims
     return "demo-user-id"
+
+
+async def get_current_user_tier() -> str:
+    """Get the current user's subscription tier. Placeholder until billing is wired up."""
+    # In production, this would come from the user's record, synced from Stripe
+    return "explorer"
+
+
+async def set_llm_priority(tier: str = Depends(get_current_user_tier)) -> None:
+    """Queue this request's agent calls in the lane for the user's tier."""
+    llm_priority.set(TIER_PRIORITIES.get(tier, TIER_PRIORITIES["explorer"]))
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    """Get the per-user API rate limiter."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(settings.REDIS_URL, limit=settings.RATE_LIMIT_PER_MINUTE)
+    return MemoryRateLimiter(limit=settings.RATE_LIMIT_PER_MINUTE)
+
+
+@lru_cache
+def get_batch_rate_limiter() -> RateLimiter:
+    """Get the per-user hourly quota of batch chat messages."""
+    limit, period = settings.CHAT_BATCH_MESSAGES_PER_HOUR, 3_600.0
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(
+            settings.REDIS_URL, limit=limit, period=period, namespace="rate-limit-batch:"
+        )
+    return MemoryRateLimiter(limit=limit, period=period)
+
+
+async def enforce_rate_limit(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+) -> None:
+    """Reject the request with 429 when the user has used up their rate limit."""
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path).removeprefix(settings.API_V1_PREFIX)
+    weight = settings.RATE_LIMIT_ROUTE_WEIGHTS.get(f"{request.method} {path}", 1)
+    await charge_rate_limit(user_id, weight)
+
+
+async def charge_rate_limit(user_id: str, weight: int, limiter: RateLimiter | None = None) -> None:
+    """Spend `weight` of the user's rate limit (or `limiter`), rejecting with 429 if used up."""
+    if weight <= 0:
+        return  # free route, e.g. one its handler charges itself
+    result = await (limiter or get_rate_limiter()).hit(user_id, weight)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(result.retry_after))},
+        )
+
+
+def get_tier_credits() -> dict[str, int]:
+    """Get the monthly AI credit allowance of each tier."""
+    return {
+        "explorer": settings.CREDITS_EXPLORER,
+        "builder": settings.CREDITS_BUILDER,
+        "operator": settings.CREDITS_OPERATOR,
+        "ceo": settings.CREDITS_CEO,
+    }
+
+
+@lru_cache
+def get_credit_ledger() -> CreditLedger:
+    """Get the shared AI credit ledger."""
+    if settings.CREDITS_BACKEND == "supabase":
+        sink = SupabaseCreditSink(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    else:
+        sink = MemoryCreditSink()
+    return CreditLedger(
+        sink,
+        tier_allowances=get_tier_credits(),
+        tokens_per_credit=settings.CREDIT_TOKENS_PER_CREDIT,
+        flush_interval=settings.CREDITS_FLUSH_INTERVAL_SECONDS,
+        flush_batch_size=settings.CREDITS_FLUSH_BATCH_SIZE,
+    )
+
+
+async def reserve_credits(user_id: str, tier: str, action_type: str) -> Reservation:
+    """Hold credits for an AI request, rejecting it with 402 if the user has run out."""
+    try:
+        return await get_credit_ledger().reserve(
+            user_id, tier, action_type, settings.CREDITS_RESERVE_PER_REQUEST
+        )
+    except InsufficientCreditsError:
+        raise HTTPException(status_code=402, detail="Insufficient AI credits") from None
+
+
+@lru_cache
+def get_conversation_memory() -> ConversationMemory:
+    """Get the shared conversation memory."""
+    if settings.CONVERSATION_BACKEND == "supabase":
+        store = SupabaseConversationStore(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    else:
+        store = MemoryConversationStore()
+    return ConversationMemory(
+        store,
+        history_tokens=settings.CONVERSATION_HISTORY_TOKENS,
+        summarize_threshold=settings.CONVERSATION_SUMMARIZE_THRESHOLD_TOKENS,
+        max_conversations=settings.CONVERSATION_CACHE_MAX_ENTRIES,
+    )
+
+
+@lru_cache
+def get_revenue_store() -> RevenueStore:
+    """Get the shared revenue store."""
+    if settings.REVENUE_BACKEND == "supabase":
+        return SupabaseRevenueStore(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    store = MemoryRevenueStore()
+    if settings.REVENUE_DEMO_DATA:
+        seed_demo_revenue(store, "demo-user-id")
+    return store
+
+
+@lru_cache
+def get_revenue_rollups() -> RevenueRollups:
+    """Get the shared revenue rollups."""
+    return RevenueRollups(get_revenue_store(), max_users=settings.REVENUE_ROLLUP_MAX_USERS)
+
+
+@lru_cache
+def get_forecast_store() -> ForecastStore:
+    """Get the shared revenue forecast store."""
+    if settings.REVENUE_BACKEND == "supabase":
+        return SupabaseForecastStore(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return MemoryForecastStore()
+
+
+@lru_cache
+def get_import_registry() -> ImportRegistry:
+    """Get the registry of recent revenue imports."""
+    return ImportRegistry()
+
+
+@lru_cache
+def get_workflow_repository() -> WorkflowRepository:
+    """Get the shared workflow repository."""
+    if settings.WORKFLOWS_BACKEND == "supabase":
+        return SupabaseWorkflowRepository(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return MemoryWorkflowRepository()
+
+
+@lru_cache
+def get_action_registry() -> ActionRegistry:
+    """Get the registry of workflow action types."""
+    return create_action_registry()
+
+
+@lru_cache
+def get_workflow_engine() -> WorkflowEngine:
+    """Get the shared workflow engine."""
+    return WorkflowEngine(
+        get_action_registry(),
+        max_workers=settings.WORKFLOW_MAX_WORKERS,
+        action_timeout=settings.WORKFLOW_ACTION_TIMEOUT_SECONDS,
+        max_retries=settings.WORKFLOW_ACTION_MAX_RETRIES,
+        backoff_base=settings.WORKFLOW_RETRY_BACKOFF_SECONDS,
+        max_runs=settings.WORKFLOW_RUN_HISTORY,
+    )
+
+
+@lru_cache
+def get_trigger_scheduler() -> TriggerScheduler:
+    """Get the scheduler that fires time-based workflows."""
+    return TriggerScheduler(max_concurrency=settings.TRIGGER_SCHEDULER_MAX_CONCURRENCY)
+
+
+@lru_cache
+def get_trigger_index() -> WorkflowTriggerIndex:
+    """Get the index of active event-triggered workflows."""
+    return WorkflowTriggerIndex()
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    """Get the queue that runs background agent jobs."""
+    store: JobStore
+    if settings.JOBS_BACKEND == "redis":
+        store = RedisJobStore(settings.REDIS_URL)
+    else:
+        store = MemoryJobStore()
+    return JobQueue(
+        store,
+        get_credit_ledger(),
+        max_workers=settings.JOBS_MAX_WORKERS,
+        max_pending=settings.JOBS_MAX_PENDING,
+        timeout=settings.JOBS_TIMEOUT_SECONDS,
+        result_ttl=settings.JOBS_RESULT_TTL_SECONDS,
+    )
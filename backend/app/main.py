@@ -1,10 +1,44 @@
 """IncomeOS Backend — AI-Powered Income Operating System API."""
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api import chat, monetization, revenue, skills, user, workflows
+from app.agents.base import get_complex_model, get_router_model, get_specialist_model
+from app.agents.budget import PromptTooLargeError
+from app.agents.jobs import create_job_registry
+from app.api import chat, jobs, metrics, monetization, revenue, skills, user, workflows
 from app.core.config import settings
+from app.core.dependencies import (
+    enforce_rate_limit,
+    get_credit_ledger,
+    get_job_queue,
+    get_trigger_scheduler,
+)
+from app.services.credits import InsufficientCreditsError
+from app.services.tokens import load_encodings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background services for the lifetime of the app."""
+    models = [get_router_model(), get_specialist_model(), get_complex_model()]
+    await asyncio.to_thread(load_encodings, settings.TIKTOKEN_CACHE_DIR, models)
+    ledger = get_credit_ledger()
+    ledger.start()
+    scheduler = get_trigger_scheduler()
+    await workflows.register_active_workflows()
+    scheduler.start(workflows.fire_scheduled_workflow)
+    job_queue = get_job_queue()
+    job_queue.start(create_job_registry())
+    yield
+    await job_queue.stop()
+    await scheduler.stop()
+    await ledger.stop()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -15,6 +49,7 @@ app = FastAPI(
     ),
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -26,13 +61,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Register API routers
-app.include_router(skills.router, prefix=settings.API_V1_PREFIX)
-app.include_router(monetization.router, prefix=settings.API_V1_PREFIX)
-app.include_router(revenue.router, prefix=settings.API_V1_PREFIX)
-app.include_router(chat.router, prefix=settings.API_V1_PREFIX)
-app.include_router(workflows.router, prefix=settings.API_V1_PREFIX)
-app.include_router(user.router, prefix=settings.API_V1_PREFIX)
+
+# Agent calls are budgeted before they are sent; map refusals to client errors
+@app.exception_handler(PromptTooLargeError)
+async def prompt_too_large_handler(request: Request, exc: PromptTooLargeError):
+    return JSONResponse(status_code=413, content={"detail": "Message too long"})
+
+
+@app.exception_handler(InsufficientCreditsError)
+async def insufficient_credits_handler(request: Request, exc: InsufficientCreditsError):
+    return JSONResponse(status_code=402, content={"detail": "Insufficient AI credits"})
+
+
+# Register API routers (every API route is rate limited per user)
+rate_limited = [Depends(enforce_rate_limit)]
+app.include_router(skills.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
+app.include_router(monetization.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
+app.include_router(revenue.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
+app.include_router(chat.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
+app.include_router(workflows.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
+app.include_router(jobs.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
+app.include_router(user.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
+app.include_router(metrics.router, prefix=settings.API_V1_PREFIX, dependencies=rate_limited)
 
 
 @app.get("/")
@@ -0,0 +1,48 @@
+"""Revenue records — income streams and their monthly history."""
+
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass(slots=True)
+class RevenueStreamRecord:
+    """A stored income stream (a `revenue_streams` row)."""
+
+    id: str
+    user_id: str
+    name: str
+    type: str
+    platform: str | None = None
+    last_payment_at: float | None = None
+    is_active: bool = True
+
+
+@dataclass(slots=True)
+class RevenueEntry:
+    """Revenue of one stream in one month (a `revenue_history` row)."""
+
+    stream_id: str
+    month: date  # first day of the month
+    revenue: float
+    customers: int = 0
+
+
+@dataclass(slots=True)
+class RevenueForecast:
+    """Forecast monthly revenue of a user (a `revenue_forecasts` row).
+
+    Each series holds one value per forecast month, starting at `first_month`;
+    `lower` and `upper` bound the prediction interval of coverage `level`.
+    """
+
+    user_id: str
+    first_month: date
+    level: float
+    total: dict[str, list[float]]  # {"point": [...], "lower": [...], "upper": [...]}
+    streams: dict[str, dict[str, list[float]]]  # stream ID -> series like `total`
+    generated_at: float
+
+    @property
+    def projected_annual(self) -> float:
+        """Forecast revenue of the first twelve forecast months."""
+        return round(sum(self.total["point"][:12]), 2)
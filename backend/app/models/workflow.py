@@ -0,0 +1,37 @@
+"""Workflow records — the stored form of a workflow automation.
+
+Records are slotted dataclasses: a user with thousands of workflows, or a
+node holding millions in memory, pays for the fields and nothing else.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+WORKFLOW_STATUSES = ("draft", "active", "paused")
+
+
+@dataclass(slots=True)
+class Workflow:
+    """A stored workflow automation.
+
+    `trigger_type` is "schedule" for time-based triggers, "manual" for
+    workflows only run on request, and otherwise the normalized event type
+    that fires the workflow (see `triggers.event_type`).
+    """
+
+    id: str
+    user_id: str
+    name: str
+    trigger: str
+    trigger_type: str
+    actions: list[dict]
+    description: str = ""
+    status: str = "draft"
+    last_run_at: float | None = None
+    runs_this_month: int = 0
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def sort_key(self) -> tuple[float, str]:
+        """Position of the workflow in listings (newest last)."""
+        return (self.created_at, self.id)
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
 
@@ -5,7 +7,7 @@ class ChatRequest(BaseModel):
     """Chat message request."""
 
     message: str = Field(..., min_length=1, max_length=10000)
-    conversation_id: str | None = None
+    conversation_id: UUID | None = None  # omit to start a new conversation
 
 
 class ChatResponse(BaseModel):
@@ -15,3 +17,25 @@ class ChatResponse(BaseModel):
     agent_type: str
     conversation_id: str
     credits_used: int = 1
+
+
+class ChatBatchRequest(BaseModel):
+    """Several independent chat messages to answer in one request."""
+
+    messages: list[ChatRequest] = Field(..., min_length=1)
+
+
+class ChatBatchResult(BaseModel):
+    """The outcome of one message of a batch: its response or why it failed."""
+
+    index: int
+    response: ChatResponse | None = None
+    error: str | None = None
+
+
+class ChatBatchResponse(BaseModel):
+    """Results of a chat batch, in the order of its messages."""
+
+    results: list[ChatBatchResult]
+    succeeded: int
+    failed: int
@@ -0,0 +1,55 @@
+from typing import Annotated, Any, Literal
+
+from pydantic import BaseModel, Field
+
+from app.schemas.monetization import MonetizationPlanRequest
+from app.schemas.skills import SkillDiagnosisRequest
+
+
+class ContentCreationRequest(BaseModel):
+    """Request to generate content."""
+
+    prompt: str = Field(..., min_length=1, max_length=10000)
+
+
+class SkillsDiagnosisJob(BaseModel):
+    """A skills diagnosis to run in the background."""
+
+    kind: Literal["skills_diagnosis"]
+    input: SkillDiagnosisRequest
+
+
+class ContentCreationJob(BaseModel):
+    """Content generation to run in the background."""
+
+    kind: Literal["content_creation"]
+    input: ContentCreationRequest
+
+
+class MonetizationPlanJob(BaseModel):
+    """An implementation plan for a monetization path to write in the background."""
+
+    kind: Literal["monetization_plan"]
+    input: MonetizationPlanRequest
+
+
+JobCreate = Annotated[
+    SkillsDiagnosisJob | ContentCreationJob | MonetizationPlanJob, Field(discriminator="kind")
+]
+
+
+class JobResponse(BaseModel):
+    """Background job status, and its result once it has finished.
+
+    `status` is queued, running, succeeded or failed; `result` is set when
+    the job succeeded and `error` when it failed.
+    """
+
+    id: str
+    kind: str
+    status: str
+    result: Any = None
+    error: str | None = None
+    created_at: str
+    started_at: str | None = None
+    finished_at: str | None = None
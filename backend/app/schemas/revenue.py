@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -26,10 +28,79 @@ class RevenueOverview(BaseModel):
     monthly_history: list[dict]
 
 
+class PaymentCreate(BaseModel):
+    """A payment received by one of the user's revenue streams."""
+
+    stream_id: str
+    amount: float = Field(..., gt=0)
+    paid_at: datetime | None = None  # default: now
+    customer_id: str | None = None  # counts the customer once per month
+
+
+class PaymentResponse(BaseModel):
+    """A stream's figures for the current month after a payment."""
+
+    stream_id: str
+    monthly_revenue: float
+    customers: int
+    last_payment: str | None = None
+
+
+class RevenueImportResponse(BaseModel):
+    """Progress of a revenue import (final once status is not "running")."""
+
+    id: str
+    format: str
+    status: str = Field(description="running, succeeded, or failed")
+    rows: int
+    accepted: int
+    rejected: int
+    buckets: int = Field(description="(stream, month) history rows written")
+    bytes: int
+    rows_per_second: float
+    errors: list[str] = Field(default_factory=list, description="First rejected rows")
+
+
+class ForecastSeries(BaseModel):
+    """Forecast monthly revenue with its prediction interval."""
+
+    point: list[float]
+    lower: list[float]
+    upper: list[float]
+
+
+class StreamForecast(ForecastSeries):
+    """Forecast of one revenue stream."""
+
+    id: str
+    name: str
+
+
+class RevenueForecastResponse(BaseModel):
+    """Revenue forecast for the coming months, starting with the current one."""
+
+    months: list[str] = Field(description='Forecast months, e.g. "Oct 2026"')
+    level: float = Field(description="Prediction interval coverage, e.g. 0.8")
+    projected_annual: float
+    total: ForecastSeries
+    streams: list[StreamForecast]
+    generated_at: datetime
+
+
 class RevenueInsight(BaseModel):
-    """AI-generated revenue insight."""
+    """A revenue insight detected from the user's revenue data."""
 
     title: str
     description: str
     impact: str
     priority: str = Field(description="high, medium, or low")
+    kind: str | None = Field(None, description="declining, accelerating, concentration, or pricing")
+    stream_id: str | None = None
+
+
+class RevenueInsightsResponse(BaseModel):
+    """Revenue insights, most revenue at stake first."""
+
+    insights: list[RevenueInsight]
+    narrative: str | None = Field(None, description="AI summary of the top insights, if requested")
+    data_version: str = Field(description="Fingerprint of the revenue data the insights are from")
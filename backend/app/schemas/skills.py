@@ -39,3 +39,16 @@ class SkillDiagnosisResponse(BaseModel):
     summary: str
     top_opportunity: str
     total_monetization_potential: int
+
+
+class SimilarProfile(BaseModel):
+    """A user with a skill profile like the current user's."""
+
+    handle: str = Field(description="Opaque, stable identifier of the user (not their user ID)")
+    similarity: float = Field(description="Cosine similarity of the profiles, 1.0 = identical")
+
+
+class SimilarProfilesResponse(BaseModel):
+    """Users with the most similar skill profiles, most similar first."""
+
+    profiles: list[SimilarProfile]
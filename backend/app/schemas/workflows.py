@@ -1,11 +1,21 @@
+from typing import Any, Literal
+
 from pydantic import BaseModel, Field
 
 
 class WorkflowAction(BaseModel):
-    """A single action in a workflow."""
+    """A single action in a workflow.
+
+    `depends_on` lists the IDs of actions that must succeed first; None means
+    "after the previous action" and an empty list means "no dependencies".
+    """
 
     type: str
     config: dict = Field(default_factory=dict)
+    id: str | None = None
+    depends_on: list[str] | None = None
+    timeout_seconds: float | None = Field(default=None, gt=0)
+    max_retries: int | None = Field(default=None, ge=0, le=10)
 
 
 class WorkflowCreate(BaseModel):
@@ -15,6 +25,7 @@ class WorkflowCreate(BaseModel):
     description: str = ""
     trigger: str
     actions: list[WorkflowAction]
+    status: Literal["draft", "active"] = "draft"
 
 
 class WorkflowResponse(BaseModel):
@@ -28,3 +39,59 @@ class WorkflowResponse(BaseModel):
     status: str
     last_run: str | None = None
     runs_this_month: int = 0
+
+
+class WorkflowListResponse(BaseModel):
+    """One page of the current user's workflows, newest first.
+
+    `total` and `active` count all of the user's workflows, not just this
+    page; pass `next_cursor` back as `cursor` to get the next page.
+    """
+
+    workflows: list[WorkflowResponse]
+    total: int
+    active: int
+    next_cursor: str | None = None
+
+
+class ActionRunResponse(BaseModel):
+    """Outcome of one action in a workflow run."""
+
+    id: str
+    type: str
+    status: str
+    attempts: int
+    duration_ms: float | None = None
+    error: str | None = None
+    output: Any = None
+
+
+class WorkflowEvent(BaseModel):
+    """An event that triggers the current user's matching workflows.
+
+    `type` is matched against workflow triggers after normalization, so
+    "gumroad.sale" triggers workflows whose trigger is "Gumroad sale webhook".
+    Delivering an event again with the same `id` does not start new runs.
+    """
+
+    type: str = Field(..., min_length=1, max_length=200)
+    id: str | None = Field(default=None, max_length=200)
+    payload: dict = Field(default_factory=dict)
+
+
+class WorkflowEventResponse(BaseModel):
+    """Runs started by an event."""
+
+    type: str
+    matched: int
+    runs: list[str]
+
+
+class WorkflowRunResponse(BaseModel):
+    """Workflow run status and timing."""
+
+    id: str
+    workflow_id: str
+    status: str
+    duration_ms: float | None = None
+    actions: list[ActionRunResponse]
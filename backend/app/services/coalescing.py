@@ -0,0 +1,54 @@
+"""Single-flight request coalescing for identical concurrent calls."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result.
+
+    The shared call is shielded, so a caller being cancelled (e.g. a client
+    disconnecting) does not cancel the work the other callers are waiting on.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.folded = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn`, or join the identical call already in flight for `key`.
+
+        Args:
+            key: Identity of the call; callers with equal keys share one result
+            fn: Starts the call when no identical call is in flight
+
+        Returns:
+            The shared call's result (its exception is raised to every caller)
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            self.leaders += 1
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.folded += 1
+        return await asyncio.shield(future)
+
+    def reset(self) -> None:
+        self.leaders = 0
+        self.folded = 0
+
+    def stats(self) -> dict:
+        """How many upstream calls were made and how many callers were folded into them."""
+        callers = self.leaders + self.folded
+        return {
+            "in_flight": len(self._in_flight),
+            "upstream_calls": self.leaders,
+            "folded_calls": self.folded,
+            "fold_rate": self.folded / callers if callers else 0.0,
+        }
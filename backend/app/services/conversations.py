@@ -0,0 +1,327 @@
+"""Conversation memory — bounded chat history for multi-turn conversations.
+
+Recent turns of active conversations are kept in memory and written through
+to the `conversations`/`messages` tables. Each agent call gets a context
+window of at most `history_tokens` of the newest turns plus a rolling summary
+of everything older, so the prompt stays the same size however long the
+conversation runs.
+
+Once the unsummarized turns of a conversation exceed `summarize_threshold`
+tokens, the oldest of them are folded into the summary by a background task;
+the request that crossed the threshold does not wait for it.
+
+The in-memory conversations are per process and never invalidated, so they
+are only correct while one process serves every turn of a conversation.
+With several workers sharing the Supabase store, set the cache size to 0:
+each turn then reloads the conversation from the store.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Protocol
+
+from app.services.tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# (previous summary, turns to fold in) -> new summary
+Summarizer = Callable[[str, list["Turn"]], Awaitable[str]]
+
+
+@dataclass
+class Turn:
+    """One message of a conversation."""
+
+    role: str  # "user" or "assistant"
+    content: str
+    agent_type: str | None = None
+    credits_used: int = 0
+    tokens: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(self.content)
+
+
+@dataclass
+class Conversation:
+    """Working state of one conversation.
+
+    `turns` holds only the turns not yet folded into `summary`;
+    `summarized_turns` counts those that were.
+    """
+
+    id: str
+    user_id: str
+    summary: str = ""
+    summarized_turns: int = 0
+    turns: list[Turn] = field(default_factory=list)
+    compaction: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def last_agent_type(self) -> str | None:
+        for turn in reversed(self.turns):
+            if turn.agent_type:
+                return turn.agent_type
+        return None
+
+    def unsummarized_tokens(self) -> int:
+        return sum(turn.tokens for turn in self.turns)
+
+
+class ConversationNotFoundError(Exception):
+    """Raised when a conversation belongs to a different user."""
+
+
+class ConversationStore(Protocol):
+    """Durable storage behind conversation memory."""
+
+    async def load(self, conversation_id: str) -> Conversation | None: ...
+
+    async def append(self, conversation: Conversation, turns: list[Turn]) -> None: ...
+
+    async def save_summary(self, conversation: Conversation) -> None: ...
+
+
+class MemoryConversationStore:
+    """Store that keeps every turn in memory (development and tests)."""
+
+    def __init__(self):
+        self._conversations: dict[str, Conversation] = {}
+        self._messages: dict[str, list[Turn]] = {}
+
+    async def load(self, conversation_id: str) -> Conversation | None:
+        stored = self._conversations.get(conversation_id)
+        if stored is None:
+            return None
+        messages = self._messages[conversation_id]
+        return Conversation(
+            id=stored.id,
+            user_id=stored.user_id,
+            summary=stored.summary,
+            summarized_turns=stored.summarized_turns,
+            turns=messages[stored.summarized_turns :],
+        )
+
+    async def append(self, conversation: Conversation, turns: list[Turn]) -> None:
+        self._conversations.setdefault(
+            conversation.id, Conversation(conversation.id, conversation.user_id)
+        )
+        self._messages.setdefault(conversation.id, []).extend(turns)
+
+    async def save_summary(self, conversation: Conversation) -> None:
+        stored = self._conversations[conversation.id]
+        stored.summary = conversation.summary
+        stored.summarized_turns = conversation.summarized_turns
+
+    def message_count(self, conversation_id: str) -> int:
+        return len(self._messages.get(conversation_id, []))
+
+
+class SupabaseConversationStore:
+    """Store backed by the `conversations` and `messages` tables."""
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self._client = create_client(url, key)
+
+    async def load(self, conversation_id: str) -> Conversation | None:
+        def query():
+            conversation = (
+                self._client.table("conversations")
+                .select("id, user_id, summary, summarized_turns")
+                .eq("id", conversation_id)
+                .limit(1)
+                .execute()
+            )
+            if not conversation.data:
+                return None, []
+            row = conversation.data[0]
+            messages = (
+                self._client.table("messages")
+                .select("role, content, agent_type, credits_used")
+                .eq("conversation_id", conversation_id)
+                .order("created_at")
+                .range(row["summarized_turns"] or 0, 100_000)
+                .execute()
+            )
+            return row, messages.data
+
+        row, messages = await asyncio.to_thread(query)
+        if row is None:
+            return None
+        return Conversation(
+            id=row["id"],
+            user_id=row["user_id"],
+            summary=row["summary"] or "",
+            summarized_turns=row["summarized_turns"] or 0,
+            turns=[Turn(**message) for message in messages],
+        )
+
+    async def append(self, conversation: Conversation, turns: list[Turn]) -> None:
+        # Explicit, strictly increasing timestamps keep the turns of one
+        # insert in order when they are read back.
+        now = datetime.now(UTC)
+
+        def persist():
+            self._client.table("conversations").upsert(
+                {
+                    "id": conversation.id,
+                    "user_id": conversation.user_id,
+                    "updated_at": now.isoformat(),
+                }
+            ).execute()
+            self._client.table("messages").insert(
+                [
+                    {
+                        "conversation_id": conversation.id,
+                        "role": turn.role,
+                        "content": turn.content,
+                        "agent_type": turn.agent_type,
+                        "credits_used": turn.credits_used,
+                        "created_at": (now + timedelta(microseconds=i)).isoformat(),
+                    }
+                    for i, turn in enumerate(turns)
+                ]
+            ).execute()
+
+        await asyncio.to_thread(persist)
+
+    async def save_summary(self, conversation: Conversation) -> None:
+        def persist():
+            self._client.table("conversations").update(
+                {
+                    "summary": conversation.summary,
+                    "summarized_turns": conversation.summarized_turns,
+                }
+            ).eq("id", conversation.id).execute()
+
+        await asyncio.to_thread(persist)
+
+
+class ConversationMemory:
+    """Recent history of active conversations, with background summarization.
+
+    Up to `max_conversations` are kept in memory between turns; 0 reloads
+    every turn from the store.
+    """
+
+    def __init__(
+        self,
+        store: ConversationStore,
+        history_tokens: int = 1500,
+        summarize_threshold: int = 3000,
+        max_conversations: int = 10_000,
+    ):
+        self.store = store
+        self.history_tokens = history_tokens
+        self.summarize_threshold = summarize_threshold
+        self.max_conversations = max_conversations
+        self._active: OrderedDict[str, Conversation] = OrderedDict()
+        self.compactions = 0
+
+    async def get(self, conversation_id: str, user_id: str) -> Conversation:
+        """Get a conversation, loading it from the store or starting a new one.
+
+        Raises:
+            ConversationNotFoundError: If the conversation belongs to another user
+        """
+        conversation = self._active.get(conversation_id)
+        if conversation is None:
+            conversation = await self.store.load(conversation_id) or Conversation(
+                conversation_id, user_id
+            )
+            if self.max_conversations > 0:
+                conversation = self._active.setdefault(conversation_id, conversation)
+        if conversation_id in self._active:
+            self._active.move_to_end(conversation_id)
+            if len(self._active) > self.max_conversations:
+                self._active.popitem(last=False)
+
+        if conversation.user_id != user_id:
+            raise ConversationNotFoundError(conversation_id)
+        return conversation
+
+    def context(self, conversation: Conversation) -> list[dict]:
+        """Build the history messages to send ahead of the user's new message.
+
+        Returns:
+            Chat messages: the rolling summary (if any) followed by as many of
+            the newest turns as fit in `history_tokens`
+        """
+        recent: list[dict] = []
+        budget = self.history_tokens
+        for turn in reversed(conversation.turns):
+            budget -= turn.tokens
+            if budget < 0:
+                break
+            recent.append({"role": turn.role, "content": turn.content})
+        recent.reverse()
+
+        if conversation.summary:
+            summary = f"Summary of the earlier conversation: {conversation.summary}"
+            recent.insert(0, {"role": "system", "content": summary})
+        return recent
+
+    async def append(
+        self,
+        conversation: Conversation,
+        turns: list[Turn],
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        """Record new turns and, if history has grown too long, compact it in the background.
+
+        Args:
+            conversation: Conversation the turns belong to
+            turns: The user's message and the agent's reply
+            summarizer: Produces the rolling summary; compaction is skipped
+                without one
+        """
+        conversation.turns.extend(turns)
+        await self.store.append(conversation, turns)
+
+        if (
+            summarizer is not None
+            and conversation.compaction is None
+            and conversation.unsummarized_tokens() > self.summarize_threshold
+        ):
+            conversation.compaction = asyncio.create_task(self._compact(conversation, summarizer))
+
+    async def _compact(self, conversation: Conversation, summarizer: Summarizer) -> None:
+        """Fold the turns that no longer fit the context window into the summary."""
+        try:
+            keep_tokens = 0
+            keep = 0
+            for turn in reversed(conversation.turns):
+                if keep_tokens + turn.tokens > self.history_tokens:
+                    break
+                keep_tokens += turn.tokens
+                keep += 1
+            count = len(conversation.turns) - keep
+            if count == 0:
+                return
+
+            summary = await summarizer(conversation.summary, conversation.turns[:count])
+            # Turns appended while summarizing went to the end; the first
+            # `count` are still the ones that were summarized.
+            del conversation.turns[:count]
+            conversation.summary = summary
+            conversation.summarized_turns += count
+            self.compactions += 1
+            await self.store.save_summary(conversation)
+        except Exception:
+            logger.exception("Summarizing conversation %s failed", conversation.id)
+        finally:
+            conversation.compaction = None
+
+    def stats(self) -> dict:
+        return {"active_conversations": len(self._active), "compactions": self.compactions}
+
+    def clear(self) -> None:
+        """Forget the active conversations; stored history is kept."""
+        self._active.clear()
+        self.compactions = 0
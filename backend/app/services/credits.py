@@ -0,0 +1,369 @@
+"""AI credit ledger — token-accurate charging without a database call per request.
+
+Balances are held in memory and updated atomically (no awaits between the
+check and the update). Usage rows are queued and written to `credit_usage`
+in batches by a background flush, which also deducts the charged credits
+from the users' stored `credits_remaining` (as a delta, so processes
+sharing the database never overwrite each other's spending) and corrects
+the in-memory balances from the stored ones.
+
+Per request:
+1. `reserve` holds an estimated number of credits (402 if the user can't cover it)
+2. the agent calls run inside `track_usage`, which sums their token usage
+3. `settle` charges the real cost from that usage and returns the difference,
+   or `release` returns the whole hold if the request failed
+
+`charge` does steps 2 and 3 around a block of agent calls.
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientCreditsError(Exception):
+    """Raised when a user's balance cannot cover a reservation."""
+
+
+@dataclass
+class UsageMeter:
+    """Token usage of the agent calls made within one `track_usage` block.
+
+    `token_limit`, if set, is how many tokens the user's credits can pay for.
+    """
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    calls: int = 0
+    token_limit: int | None = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+_usage_meter: ContextVar[UsageMeter | None] = ContextVar("usage_meter", default=None)
+
+
+@contextlib.contextmanager
+def track_usage(token_limit: int | None = None) -> Iterator[UsageMeter]:
+    """Sum the token usage of every agent call made inside the block.
+
+    Args:
+        token_limit: Tokens the calls may use between them, if limited
+    """
+    meter = UsageMeter(token_limit=token_limit)
+    token = _usage_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _usage_meter.reset(token)
+
+
+def start_usage_tracking(token_limit: int | None = None) -> UsageMeter:
+    """Sum the token usage of agent calls made for the rest of the current context.
+
+    For async generators, where a `track_usage` block spanning `yield`s may be
+    finalized from a different context than it was entered in.
+    """
+    meter = UsageMeter(token_limit=token_limit)
+    _usage_meter.set(meter)
+    return meter
+
+
+def record_usage(usage) -> None:
+    """Add an OpenAI `usage` object to the active meter, if any."""
+    meter = _usage_meter.get()
+    if meter is not None and usage is not None:
+        meter.prompt_tokens += usage.prompt_tokens
+        meter.completion_tokens += usage.completion_tokens
+        meter.calls += 1
+
+
+def remaining_tokens() -> int | None:
+    """Tokens the current request may still use, or None if it is not limited."""
+    meter = _usage_meter.get()
+    if meter is None or meter.token_limit is None:
+        return None
+    return meter.token_limit - meter.total_tokens
+
+
+@dataclass
+class Reservation:
+    """Credits held for one request until it is settled or released."""
+
+    user_id: str
+    action_type: str
+    amount: int
+    credits_used: int | None = None
+
+
+class CreditUsageSink(Protocol):
+    """Durable storage behind the ledger."""
+
+    async def fetch_balance(self, user_id: str) -> int | None: ...
+
+    async def write(self, rows: list[dict], initial: dict[str, int]) -> dict[str, int]:
+        """Store usage rows and deduct their credits from the users' balances.
+
+        Users without a stored balance start from `initial`. Returns the
+        users' stored balances after the deduction.
+        """
+        ...
+
+    async def usage_since(self, user_id: str, since: datetime) -> dict[str, int]:
+        """Credits a user was charged since `since`, by action type."""
+        ...
+
+
+class MemoryCreditSink:
+    """Sink that keeps everything in memory (development and tests)."""
+
+    def __init__(self):
+        self.rows: list[dict] = []
+        self.balances: dict[str, int] = {}
+        self.writes = 0
+
+    async def fetch_balance(self, user_id: str) -> int | None:
+        return self.balances.get(user_id)
+
+    async def write(self, rows: list[dict], initial: dict[str, int]) -> dict[str, int]:
+        self.rows.extend(rows)
+        self.writes += 1
+        charged = _credits_by_user(rows)
+        for user_id, credits in charged.items():
+            self.balances[user_id] = self.balances.get(user_id, initial[user_id]) - credits
+        return {user_id: self.balances[user_id] for user_id in charged}
+
+    async def usage_since(self, user_id: str, since: datetime) -> dict[str, int]:
+        return _usage_by_action(self.rows, user_id, since)
+
+    def clear(self) -> None:
+        self.rows.clear()
+        self.balances.clear()
+
+
+class SupabaseCreditSink:
+    """Sink backed by the `credit_usage` and `users` tables."""
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self._client = create_client(url, key)
+
+    async def fetch_balance(self, user_id: str) -> int | None:
+        def query():
+            return (
+                self._client.table("users")
+                .select("credits_remaining")
+                .eq("id", user_id)
+                .limit(1)
+                .execute()
+            )
+
+        result = await asyncio.to_thread(query)
+        return result.data[0]["credits_remaining"] if result.data else None
+
+    async def write(self, rows: list[dict], initial: dict[str, int]) -> dict[str, int]:
+        # One transaction inserts the rows and decrements credits_remaining, so a
+        # retried flush cannot charge twice. Every user has a row in `users`.
+        def persist():
+            return self._client.rpc("record_credit_usage", {"usage": rows}).execute()
+
+        result = await asyncio.to_thread(persist)
+        return {row["user_id"]: row["credits_remaining"] for row in result.data or []}
+
+    async def usage_since(self, user_id: str, since: datetime) -> dict[str, int]:
+        def query():
+            params = {"for_user_id": user_id, "since": since.isoformat()}
+            return self._client.rpc("credit_usage_since", params).execute()
+
+        result = await asyncio.to_thread(query)
+        return {row["action_type"]: row["credits_used"] for row in result.data or []}
+
+
+def _credits_by_user(rows: list[dict]) -> Counter[str]:
+    credits: Counter[str] = Counter()
+    for row in rows:
+        credits[row["user_id"]] += row["credits_used"]
+    return credits
+
+
+def _usage_by_action(rows: list[dict], user_id: str, since: datetime) -> dict[str, int]:
+    usage: Counter[str] = Counter()
+    for row in rows:
+        if row["user_id"] == user_id and row["created_at"] >= since.isoformat():
+            usage[row["action_type"]] += row["credits_used"]
+    return dict(usage)
+
+
+class CreditLedger:
+    """In-memory credit balances with write-behind persistence."""
+
+    def __init__(
+        self,
+        sink: CreditUsageSink,
+        tier_allowances: dict[str, int],
+        tokens_per_credit: int,
+        min_charge: int = 1,
+        flush_interval: float = 5.0,
+        flush_batch_size: int = 500,
+    ):
+        self.sink = sink
+        self.tier_allowances = tier_allowances
+        self.tokens_per_credit = tokens_per_credit
+        self.min_charge = min_charge
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._balances: dict[str, int] = {}
+        self._initial: dict[str, int] = {}  # balance each user was loaded with
+        self._held: Counter[str] = Counter()  # credits reserved by unfinished requests
+        self._used: dict[str, Counter[str]] = {}
+        self._pending: list[dict] = []
+        self._flush_task: asyncio.Task | None = None
+        self._flusher: asyncio.Task | None = None
+
+    async def balance(self, user_id: str, tier: str) -> int:
+        """Get a user's balance, loading it from the sink on first use."""
+        if user_id not in self._balances:
+            stored = await self.sink.fetch_balance(user_id)
+            initial = stored if stored is not None else self.tier_allowances[tier]
+            self._balances.setdefault(user_id, initial)
+            self._initial.setdefault(user_id, initial)
+        return self._balances[user_id]
+
+    def usage_breakdown(self, user_id: str) -> dict[str, int]:
+        """Credits charged to a user by this process since it started, by action type."""
+        return dict(self._used.get(user_id, {}))
+
+    async def monthly_usage(self, user_id: str) -> dict[str, int]:
+        """Credits charged to a user this calendar month (UTC), by action type.
+
+        Stored usage from every process, plus this process's unflushed rows.
+        """
+        since = datetime.now(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        usage = Counter(await self.sink.usage_since(user_id, since))
+        usage.update(_usage_by_action(self._pending, user_id, since))
+        return dict(usage)
+
+    async def reserve(self, user_id: str, tier: str, action_type: str, amount: int) -> Reservation:
+        """Hold credits for a request.
+
+        Raises:
+            InsufficientCreditsError: If the balance is below `amount`
+        """
+        if await self.balance(user_id, tier) < amount:
+            raise InsufficientCreditsError(user_id)
+        self._balances[user_id] -= amount
+        self._held[user_id] += amount
+        return Reservation(user_id=user_id, action_type=action_type, amount=amount)
+
+    def settle(self, reservation: Reservation, meter: UsageMeter) -> int:
+        """Charge the real cost of a request and return what was held beyond it.
+
+        Returns:
+            Credits charged
+        """
+        credits = max(self.min_charge, math.ceil(meter.total_tokens / self.tokens_per_credit))
+        user_id = reservation.user_id
+        self._balances[user_id] += reservation.amount - credits
+        self._held[user_id] -= reservation.amount
+        self._used.setdefault(user_id, Counter())[reservation.action_type] += credits
+        reservation.credits_used = credits
+
+        self._pending.append(
+            {
+                "user_id": user_id,
+                "action_type": reservation.action_type,
+                "credits_used": credits,
+                "created_at": datetime.now(UTC).isoformat(),
+                "metadata": {
+                    "prompt_tokens": meter.prompt_tokens,
+                    "completion_tokens": meter.completion_tokens,
+                    "calls": meter.calls,
+                },
+            }
+        )
+        if len(self._pending) >= self.flush_batch_size and self._flusher is None:
+            self._flusher = asyncio.create_task(self.flush())
+        return credits
+
+    @contextlib.asynccontextmanager
+    async def charge(self, reservation: Reservation) -> AsyncIterator[UsageMeter]:
+        """Track the usage of the agent calls made in the block and charge for it.
+
+        The reservation is settled if the block completes and released if it
+        raises; afterwards `reservation.credits_used` holds the charge.
+        """
+        with track_usage(self.spendable_tokens(reservation)) as usage:
+            try:
+                yield usage
+            except BaseException:
+                self.release(reservation)
+                raise
+        self.settle(reservation, usage)
+
+    def spendable_tokens(self, reservation: Reservation) -> int:
+        """Tokens a reserved request may use before the user's balance runs out."""
+        credits = self._balances[reservation.user_id] + reservation.amount
+        return max(0, credits) * self.tokens_per_credit
+
+    def release(self, reservation: Reservation) -> None:
+        """Return a failed request's held credits."""
+        self._balances[reservation.user_id] += reservation.amount
+        self._held[reservation.user_id] -= reservation.amount
+
+    async def flush(self) -> None:
+        """Write queued usage rows to the sink and catch up with the stored balances."""
+        rows, self._pending = self._pending, []
+        try:
+            if rows:
+                initial = {user_id: self._initial[user_id] for user_id in _credits_by_user(rows)}
+                stored = await self.sink.write(rows, initial)
+                # Other processes may have charged these users too: their balance is
+                # the stored one less what is charged here but not yet written, and
+                # what is held.
+                unflushed = _credits_by_user(self._pending)
+                for user_id, remaining in stored.items():
+                    self._balances[user_id] = remaining - unflushed[user_id] - self._held[user_id]
+        except Exception:
+            logger.exception("Credit usage flush failed; will retry")
+            self._pending[:0] = rows
+        finally:
+            if self._flusher is asyncio.current_task():
+                self._flusher = None
+
+    def start(self) -> None:
+        """Start flushing periodically in the background."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background flush and write whatever is still queued."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def reset(self) -> None:
+        self._balances.clear()
+        self._initial.clear()
+        self._held.clear()
+        self._used.clear()
+        self._pending.clear()
@@ -0,0 +1,92 @@
+"""Event dispatch index — finds the workflows an incoming event triggers.
+
+Active event-triggered workflows are indexed by trigger type, then by user,
+so matching an event costs O(matching workflows) no matter how many
+workflows are registered: a user's event is one dict lookup per level, and
+an event without a user only visits the users that have a workflow for its
+type. A reverse map from workflow to its key keeps removal O(1) when a
+workflow is paused, deleted or its trigger changes.
+"""
+
+from collections import defaultdict
+
+
+class WorkflowTriggerIndex:
+    """Active event-triggered workflows by trigger type and user."""
+
+    def __init__(self):
+        self._by_type: defaultdict[str, defaultdict[str, set[str]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self._keys: dict[str, tuple[str, str]] = {}  # workflow ID -> (trigger type, user ID)
+        self.dispatched = 0
+        self.matched = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, workflow_id: str) -> bool:
+        return workflow_id in self._keys
+
+    def add(self, workflow_id: str, user_id: str, trigger_type: str) -> None:
+        """Index a workflow, replacing any entry it already has."""
+        key = (trigger_type, user_id)
+        if self._keys.get(workflow_id) == key:
+            return
+        self.remove(workflow_id)
+        self._keys[workflow_id] = key
+        self._by_type[trigger_type][user_id].add(workflow_id)
+
+    def remove(self, workflow_id: str) -> bool:
+        """Stop matching a workflow.
+
+        Returns:
+            Whether the workflow was indexed
+        """
+        key = self._keys.pop(workflow_id, None)
+        if key is None:
+            return False
+        trigger_type, user_id = key
+        users = self._by_type[trigger_type]
+        workflows = users[user_id]
+        workflows.discard(workflow_id)
+        if not workflows:  # drop empty buckets so the index only holds live keys
+            del users[user_id]
+            if not users:
+                del self._by_type[trigger_type]
+        return True
+
+    def match(self, trigger_type: str, user_id: str | None = None) -> list[str]:
+        """Find the workflows an event triggers.
+
+        Args:
+            trigger_type: Normalized type of the event (see `triggers.event_type`)
+            user_id: User the event belongs to; None matches every user's
+                workflows for the type
+
+        Returns:
+            IDs of the matching workflows
+        """
+        self.dispatched += 1
+        users = self._by_type.get(trigger_type)
+        if not users:
+            return []
+        if user_id is not None:
+            matches = list(users.get(user_id, ()))
+        else:
+            matches = [workflow_id for workflows in users.values() for workflow_id in workflows]
+        self.matched += len(matches)
+        return matches
+
+    def stats(self) -> dict:
+        return {
+            "indexed": len(self._keys),
+            "trigger_types": len(self._by_type),
+            "dispatched": self.dispatched,
+            "matched": self.matched,
+        }
+
+    def clear(self) -> None:
+        self._by_type.clear()
+        self._keys.clear()
+        self.dispatched = self.matched = 0
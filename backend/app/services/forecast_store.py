@@ -0,0 +1,97 @@
+"""Forecast store — each user's latest precomputed revenue forecast.
+
+The nightly batch writes forecasts in bulk and dashboards read one user's
+forecast per request. The memory store backs development and tests; the
+Supabase store keeps one `revenue_forecasts` row per user.
+"""
+
+import asyncio
+from datetime import UTC, date, datetime
+from typing import Protocol
+
+from app.models.revenue import RevenueForecast
+
+
+class ForecastStore(Protocol):
+    """Persistence for revenue forecasts."""
+
+    async def get(self, user_id: str) -> RevenueForecast | None: ...
+
+    async def save_many(self, forecasts: list[RevenueForecast]) -> None:
+        """Store forecasts, replacing each user's previous one."""
+        ...
+
+
+class MemoryForecastStore:
+    """Store that keeps forecasts in memory (development and tests)."""
+
+    def __init__(self):
+        self._forecasts: dict[str, RevenueForecast] = {}
+
+    def __len__(self) -> int:
+        return len(self._forecasts)
+
+    async def get(self, user_id: str) -> RevenueForecast | None:
+        return self._forecasts.get(user_id)
+
+    async def save_many(self, forecasts: list[RevenueForecast]) -> None:
+        for forecast in forecasts:
+            self._forecasts[forecast.user_id] = forecast
+
+    def clear(self) -> None:
+        self._forecasts.clear()
+
+
+class SupabaseForecastStore:
+    """Store backed by the `revenue_forecasts` table."""
+
+    BATCH_SIZE = 500
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self._client = create_client(url, key)
+
+    async def get(self, user_id: str) -> RevenueForecast | None:
+        def query():
+            return (
+                self._client.table("revenue_forecasts")
+                .select("user_id, first_month, level, total, streams, generated_at")
+                .eq("user_id", user_id)
+                .limit(1)
+                .execute()
+            )
+
+        rows = (await asyncio.to_thread(query)).data
+        if not rows:
+            return None
+        row = rows[0]
+        return RevenueForecast(
+            user_id=row["user_id"],
+            first_month=date.fromisoformat(row["first_month"]),
+            level=float(row["level"]),
+            total=row["total"],
+            streams=row["streams"],
+            generated_at=datetime.fromisoformat(row["generated_at"]).timestamp(),
+        )
+
+    async def save_many(self, forecasts: list[RevenueForecast]) -> None:
+        rows = [
+            {
+                "user_id": forecast.user_id,
+                "first_month": forecast.first_month.isoformat(),
+                "level": forecast.level,
+                "total": forecast.total,
+                "streams": forecast.streams,
+                "generated_at": datetime.fromtimestamp(forecast.generated_at, UTC).isoformat(),
+            }
+            for forecast in forecasts
+        ]
+
+        def persist():
+            for start in range(0, len(rows), self.BATCH_SIZE):
+                self._client.table("revenue_forecasts").upsert(
+                    rows[start : start + self.BATCH_SIZE], on_conflict="user_id"
+                ).execute()
+
+        await asyncio.to_thread(persist)
@@ -0,0 +1,376 @@
+"""Background jobs — long-running agent tasks run outside the request.
+
+Submitting a job queues it and returns its ID at once, so an API call costs
+the same however slow the model is. A fixed set of worker tasks takes jobs
+off the queue, which bounds how many run at once on this node; a full queue
+rejects new jobs rather than growing without limit.
+
+Job records go to a result store that keeps them for a TTL after their last
+change: the memory store for single-process deployments and tests, Redis to
+share status and results between processes. Handlers can report progress
+events (e.g. each skill of a diagnosis as it is written); subscribers on the
+node running the job receive them as they happen, others see status changes
+by polling the store.
+
+Credits are reserved when a job is submitted and settled when it finishes,
+as for requests that run the agent inline.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from app.services.credits import CreditLedger, Reservation
+from app.services.llm_scheduler import TIER_PRIORITIES, llm_priority
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass(slots=True)
+class Job:
+    """A queued or executed background task."""
+
+    id: str
+    user_id: str
+    kind: str
+    input: dict
+    status: str = "queued"  # queued, running, succeeded, failed
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    # Progress events reported by the handler, in order (kept on the running node)
+    progress: list[dict] = field(default_factory=list)
+    tier: str = "explorer"
+    reservation: Reservation | None = field(default=None, repr=False)
+    _waiters: list[asyncio.Future] = field(default_factory=list, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> dict:
+        """The job's stored form (without progress events or credit state)."""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "kind": self.kind,
+            "input": self.input,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def _notify(self) -> None:
+        """Wake everyone waiting for the job to change."""
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+@dataclass
+class JobContext:
+    """What a job handler is given to do its work."""
+
+    job: Job
+
+    @property
+    def user_id(self) -> str:
+        return self.job.user_id
+
+    @property
+    def input(self) -> dict:
+        return self.job.input
+
+    def report(self, event: str, data: Any) -> None:
+        """Publish a progress event to the job's subscribers."""
+        self.job.progress.append({"event": event, "data": data})
+        self.job._notify()
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobRegistry:
+    """Maps job kinds to the handlers that run them."""
+
+    def __init__(self):
+        self._handlers: dict[str, JobHandler] = {}
+
+    def register(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Register a handler for a job kind (usable as a decorator)."""
+
+        def decorator(handler: JobHandler) -> JobHandler:
+            self._handlers[kind] = handler
+            return handler
+
+        return decorator
+
+    def get(self, kind: str) -> JobHandler | None:
+        return self._handlers.get(kind)
+
+    def kinds(self) -> list[str]:
+        return sorted(self._handlers)
+
+
+class JobStore(Protocol):
+    """Result store for job records, each kept for a TTL after its last save."""
+
+    async def save(self, job: Job, ttl: float) -> None: ...
+
+    async def get(self, job_id: str) -> Job | None: ...
+
+
+class MemoryJobStore:
+    """Store that keeps job records in process (single node and tests)."""
+
+    def __init__(self, max_jobs: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.max_jobs = max_jobs
+        self._clock = clock
+        self._jobs: OrderedDict[str, tuple[float, Job]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    async def save(self, job: Job, ttl: float) -> None:
+        self._jobs[job.id] = (self._clock() + ttl, job)
+        self._jobs.move_to_end(job.id)
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+    async def get(self, job_id: str) -> Job | None:
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            return None
+        expires_at, job = entry
+        if expires_at <= self._clock():
+            del self._jobs[job_id]
+            return None
+        return job
+
+    def clear(self) -> None:
+        self._jobs.clear()
+
+
+class RedisJobStore:
+    """Store backed by Redis, so any process can report a job's status and result."""
+
+    def __init__(self, url: str, namespace: str = "job:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._namespace = namespace
+
+    async def save(self, job: Job, ttl: float) -> None:
+        await self._redis.set(
+            self._namespace + job.id, json.dumps(job.to_dict()), px=int(ttl * 1000)
+        )
+
+    async def get(self, job_id: str) -> Job | None:
+        value = await self._redis.get(self._namespace + job_id)
+        return None if value is None else Job(**json.loads(value))
+
+
+class JobQueue:
+    """Runs submitted jobs on a bounded number of in-process workers."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        ledger: CreditLedger,
+        max_workers: int = 8,
+        max_pending: int = 1_000,
+        timeout: float = 300.0,
+        result_ttl: float = 3_600.0,
+        poll_interval: float = 0.5,
+    ):
+        self.store = store
+        self.ledger = ledger
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.max_pending = max_pending
+        self._pending: asyncio.Queue[Job] | None = None
+        self._registry: JobRegistry | None = None
+        self._workers: list[asyncio.Task] = []
+        self._local: dict[str, Job] = {}  # jobs queued or running on this node
+        self.jobs_succeeded = 0
+        self.jobs_failed = 0
+
+    def start(self, registry: JobRegistry) -> None:
+        """Start the workers, running jobs with the handlers in `registry`."""
+        self._registry = registry
+        if not self._workers:
+            # Created here, so the queue belongs to the running event loop
+            self._pending = asyncio.Queue(self.max_pending)
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs still queued or running fail and their credits are released."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._pending is not None:
+            while not self._pending.empty():
+                self._pending.get_nowait()
+        jobs, self._local = list(self._local.values()), {}
+        for job in jobs:
+            if not job.done:
+                # Never started, or stopped before it was charged
+                if job.reservation is not None:
+                    self.ledger.release(job.reservation)
+                await self._fail(job, "Server shutting down")
+
+    def kinds(self) -> list[str]:
+        return self._registry.kinds() if self._registry is not None else []
+
+    async def submit(
+        self,
+        user_id: str,
+        kind: str,
+        input: dict,
+        tier: str = "explorer",
+        reservation: Reservation | None = None,
+    ) -> Job:
+        """Queue a job and return its record immediately.
+
+        Args:
+            user_id: Owner of the job
+            kind: Registered job kind
+            input: The handler's input (JSON-serializable)
+            tier: Owner's tier, for the priority of the job's agent calls
+            reservation: Credits held for the job, settled when it finishes
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: If `max_pending` jobs are already waiting
+            ValueError: If the queue is not started or `kind` has no handler
+        """
+        if self._pending is None or self._registry.get(kind) is None:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job = Job(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            kind=kind,
+            input=input,
+            tier=tier,
+            reservation=reservation,
+        )
+        try:
+            self._pending.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(kind) from None
+        self._local[job.id] = job
+        await self.store.save(job, self.result_ttl)
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        """The job's latest record, from this node if it runs here, else from the store."""
+        return self._local.get(job_id) or await self.store.get(job_id)
+
+    async def follow(self, job_id: str) -> AsyncIterator[dict]:
+        """Yield a job's progress events from the first, then its final record.
+
+        For jobs running on this node every event is delivered as it is
+        reported; otherwise the store is polled and only the final record
+        is yielded. The last item is `{"event": "done", "data": job}`.
+        """
+        job = self._local.get(job_id)
+        sent = 0
+        while job is not None:
+            while sent < len(job.progress):
+                yield job.progress[sent]
+                sent += 1
+            if job.done:
+                yield {"event": "done", "data": job}
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            job._waiters.append(waiter)
+            await waiter
+
+        while True:
+            job = await self.store.get(job_id)
+            if job is None or job.done:
+                yield {"event": "done", "data": job}
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._pending.get()
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception("Job %s could not be recorded", job.id)
+            finally:
+                self._local.pop(job.id, None)
+
+    async def _run(self, job: Job) -> None:
+        handler = self._registry.get(job.kind)
+        llm_priority.set(TIER_PRIORITIES.get(job.tier, TIER_PRIORITIES["explorer"]))
+        job.status = "running"
+        job.started_at = time.time()
+        job._notify()
+        await self.store.save(job, self.result_ttl)
+
+        reservation = job.reservation
+        charge = self.ledger.charge(reservation) if reservation else contextlib.nullcontext()
+        try:
+            async with charge:
+                job.result = await asyncio.wait_for(handler(JobContext(job)), self.timeout)
+        except asyncio.CancelledError:
+            await self._fail(job, "Server shutting down")
+            raise
+        except Exception as exc:
+            error = (
+                f"Timed out after {self.timeout}s"
+                if isinstance(exc, TimeoutError)
+                else f"{type(exc).__name__}: {exc}"
+            )
+            logger.info("Job %s (%s) failed: %s", job.id, job.kind, error)
+            await self._fail(job, error)
+            return
+        job.status = "succeeded"
+        self.jobs_succeeded += 1
+        job.finished_at = time.time()
+        job._notify()
+        await self.store.save(job, self.result_ttl)
+
+    async def _fail(self, job: Job, error: str) -> None:
+        """Record a job as failed."""
+        job.status = "failed"
+        job.error = error
+        self.jobs_failed += 1
+        job.finished_at = time.time()
+        job._notify()
+        await self.store.save(job, self.result_ttl)
+
+    def stats(self) -> dict:
+        queued = self._pending.qsize() if self._pending is not None else 0
+        return {
+            "queued": queued,
+            "running": len(self._local) - queued,
+            "workers": len(self._workers),
+            "succeeded": self.jobs_succeeded,
+            "failed": self.jobs_failed,
+        }
@@ -0,0 +1,208 @@
+"""LLM call scheduler — smooths bursts of OpenAI calls instead of failing them.
+
+Each model gets a gate with a bounded number of concurrent requests and
+token buckets for requests/min and tokens/min. Callers that cannot start
+immediately wait in a priority queue (router calls first, then paid tiers
+from highest to lowest) and are admitted as capacity frees up.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+PRIORITY_ROUTER = 0
+TIER_PRIORITIES = {"ceo": 1, "operator": 2, "builder": 3, "explorer": 4}
+PRIORITY_BACKGROUND = 5
+
+LANE_NAMES = {
+    PRIORITY_ROUTER: "router",
+    **{priority: tier for tier, priority in TIER_PRIORITIES.items()},
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Priority of agent calls made while handling the current request; set per
+# request from the user's tier.
+llm_priority: ContextVar[int] = ContextVar("llm_priority", default=TIER_PRIORITIES["explorer"])
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Rate limits for one model."""
+
+    requests_per_minute: int
+    tokens_per_minute: int
+    max_concurrency: int
+
+
+class TokenBucket:
+    """Continuously refilling token bucket holding up to one minute of budget."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self._tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+@dataclass
+class Reservation:
+    """Capacity held by one admitted call; set `used_tokens` once usage is known."""
+
+    reserved_tokens: int
+    used_tokens: int | None = None
+
+
+@dataclass
+class LaneStats:
+    admitted: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.admitted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class ModelGate:
+    """Admission control for one model's calls."""
+
+    def __init__(self, limits: ModelLimits, clock: Callable[[], float] = time.monotonic):
+        self.limits = limits
+        self._clock = clock
+        self._requests = TokenBucket(limits.requests_per_minute, clock)
+        self._tokens = TokenBucket(limits.tokens_per_minute, clock)
+        self._waiters: list[tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.in_flight = 0
+        self.lanes: dict[int, LaneStats] = {}
+
+    async def acquire(self, priority: int, tokens: int) -> None:
+        """Wait until a call with `tokens` estimated tokens may start."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), tokens, future))
+        enqueued = self._clock()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(Reservation(tokens))  # admitted, then cancelled
+            raise
+        self.lanes.setdefault(priority, LaneStats()).record(self._clock() - enqueued)
+
+    def release(self, reservation: Reservation) -> None:
+        """Free a call's slot and refund tokens it reserved but did not use."""
+        self.in_flight -= 1
+        if reservation.used_tokens is not None:
+            unused = reservation.reserved_tokens - reservation.used_tokens
+            if unused > 0:
+                self._tokens.give_back(unused)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority order while capacity allows."""
+        while self._waiters and self.in_flight < self.limits.max_concurrency:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():  # cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(self._requests.delay(1), self._tokens.delay(tokens))
+            if delay > 0:
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+                return
+            heapq.heappop(self._waiters)
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": sum(not future.done() for *_, future in self._waiters),
+            "lanes": {
+                LANE_NAMES.get(priority, str(priority)): {
+                    "admitted": lane.admitted,
+                    "avg_wait_ms": round(1000 * lane.total_wait / lane.admitted, 2),
+                    "max_wait_ms": round(1000 * lane.max_wait, 2),
+                }
+                for priority, lane in sorted(self.lanes.items())
+            },
+        }
+
+
+class LLMScheduler:
+    """Per-model admission gates for OpenAI calls."""
+
+    def __init__(
+        self,
+        limits_for_model: Callable[[str], ModelLimits],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._limits_for_model = limits_for_model
+        self._clock = clock
+        self._gates: dict[str, ModelGate] = {}
+
+    def gate(self, model: str) -> ModelGate:
+        gate = self._gates.get(model)
+        if gate is None:
+            gate = self._gates[model] = ModelGate(self._limits_for_model(model), self._clock)
+        return gate
+
+    @asynccontextmanager
+    async def slot(
+        self, model: str, tokens: int, priority: int | None = None
+    ) -> AsyncIterator[Reservation]:
+        """Hold capacity for one call to `model` for the duration of the block.
+
+        Args:
+            model: Model the call is made to
+            tokens: Estimated prompt + completion tokens of the call
+            priority: Queue priority (lower first); defaults to the current
+                request's priority
+
+        Yields:
+            The reservation; set its `used_tokens` to refund unused budget
+        """
+        gate = self.gate(model)
+        await gate.acquire(llm_priority.get() if priority is None else priority, tokens)
+        reservation = Reservation(tokens)
+        try:
+            yield reservation
+        finally:
+            gate.release(reservation)
+
+    def stats(self) -> dict:
+        return {model: gate.stats() for model, gate in self._gates.items()}
@@ -0,0 +1,190 @@
+"""Path matching — ranks catalog monetization paths against a user's skills.
+
+Each catalog path lists the skills it needs. Skill names are compared as
+TF-IDF vectors over their words (so "UI/UX Design" matches "UX Design" more
+than "Graphic Design"), and a path's score combines, per required skill, the
+best-matching skill the user has:
+
+- fit: similarity × proficiency, the main signal
+- demand: similarity × market demand of that skill
+- revenue: the path's revenue ceiling, scaled by how well the skills match
+- difficulty: harder paths lose up to DIFFICULTY_PENALTY of their score when
+  the user's fit is below the level they require
+
+Scoring is a few array operations over every required skill of the catalog
+at once and the top paths are taken with a heap, so ranking thousands of
+paths takes milliseconds and equal scores keep catalog order.
+"""
+
+import heapq
+import json
+import math
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.schemas.skills import SkillProfile
+
+DEFAULT_CATALOG_PATH = Path(__file__).parent / "data" / "monetization_paths.jsonl"
+
+FIT_WEIGHT = 0.6
+DEMAND_WEIGHT = 0.25
+REVENUE_WEIGHT = 0.15
+CATEGORY_TERM_WEIGHT = 0.5  # a user skill's category words count half as much as its name
+# Fit a path's difficulty asks for, and the share of its score lost without it
+DIFFICULTY_FIT = {"beginner": 0.3, "intermediate": 0.5, "advanced": 0.7}
+DIFFICULTY_PENALTY = 0.3
+
+_TERM_RE = re.compile(r"[a-z0-9+#]+")
+
+
+@dataclass(frozen=True, slots=True)
+class PathTemplate:
+    """A monetization path in the catalog."""
+
+    id: str
+    title: str
+    category: str
+    description: str
+    required_skills: tuple[str, ...]
+    difficulty: str  # beginner, intermediate or advanced
+    estimated_revenue_min: float
+    estimated_revenue_max: float
+    time_to_revenue: str
+    implementation_steps: tuple[str, ...]
+    recommended_tools: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class PathMatch:
+    """A catalog path scored for one user."""
+
+    path: PathTemplate
+    score: int  # 0-100
+
+
+def skill_terms(name: str) -> list[str]:
+    """Lowercase words of a skill name ("UI/UX Design" -> ui, ux, design)."""
+    return _TERM_RE.findall(name.lower())
+
+
+class PathCatalog:
+    """Catalog of path templates, indexed for vectorized matching."""
+
+    def __init__(self, paths: Sequence[PathTemplate]):
+        self.paths = list(paths)
+        required = [skill_terms(skill) for path in self.paths for skill in path.required_skills]
+        if any(not path.required_skills for path in self.paths) or any(
+            not terms for terms in required
+        ):
+            raise ValueError("Every catalog path needs required skills with words in them")
+
+        counts = np.array([len(path.required_skills) for path in self.paths])
+        self._path_starts = np.r_[0, np.cumsum(counts)[:-1]]
+        self._counts = counts
+
+        # Sparse rows of the required-skill TF-IDF matrix: term indices and
+        # weights, ordered by required skill.
+        self._terms: dict[str, int] = {}
+        for terms in required:
+            for term in terms:
+                self._terms.setdefault(term, len(self._terms))
+        document_frequency = np.zeros(len(self._terms))
+        for terms in required:
+            document_frequency[[self._terms[term] for term in set(terms)]] += 1
+        self._idf = np.log((1 + len(required)) / (1 + document_frequency)) + 1
+
+        term_ids, weights, row_starts = [], [], []
+        for terms in required:
+            row_starts.append(len(term_ids))
+            ids = np.array(sorted({self._terms[term] for term in terms}))
+            row = self._idf[ids]
+            term_ids.extend(ids.tolist())
+            weights.extend((row / np.linalg.norm(row)).tolist())
+        self._term_ids = np.array(term_ids)
+        self._weights = np.array(weights, dtype=np.float32)
+        self._row_starts = np.array(row_starts)
+
+        self._difficulty_fit = np.array(
+            [DIFFICULTY_FIT.get(path.difficulty, DIFFICULTY_FIT["intermediate"]) for path in paths]
+        )
+        ceilings = np.log1p([path.estimated_revenue_max for path in self.paths])
+        spread = ceilings.max() - ceilings.min()
+        self._revenue = (ceilings - ceilings.min()) / spread if spread else np.ones(len(paths))
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def get(self, path_id: str) -> PathTemplate | None:
+        """The catalog path with ID `path_id`, if any."""
+        return next((path for path in self.paths if path.id == path_id), None)
+
+    def _skill_vectors(self, skills: Sequence[SkillProfile]) -> np.ndarray:
+        """TF-IDF vectors of the user's skills over the catalog vocabulary, one column each."""
+        vectors = np.zeros((len(self._terms), len(skills)), dtype=np.float32)
+        for column, skill in enumerate(skills):
+            for terms, weight in (
+                (skill_terms(skill.name), 1.0),
+                (skill_terms(skill.category), CATEGORY_TERM_WEIGHT),
+            ):
+                for term in terms:
+                    index = self._terms.get(term)
+                    if index is not None:
+                        vectors[index, column] = max(vectors[index, column], weight)
+        vectors *= self._idf[:, None].astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=0)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+    def scores(self, skills: Sequence[SkillProfile]) -> np.ndarray:
+        """Match score (0-100, unrounded) of every catalog path for a user's skills."""
+        if not skills:
+            return np.zeros(len(self.paths))
+        vectors = self._skill_vectors(skills)
+        # Cosine similarity of every required skill with every user skill
+        similarity = np.add.reduceat(
+            self._weights[:, None] * vectors[self._term_ids], self._row_starts, axis=0
+        )
+        proficiency = np.array([skill.proficiency_level for skill in skills]) / 100
+        demand = np.array([skill.demand_score for skill in skills]) / 100
+
+        def per_path(values: np.ndarray) -> np.ndarray:
+            return np.add.reduceat(values, self._path_starts) / self._counts
+
+        fit = per_path((similarity * proficiency).max(axis=1))
+        market = per_path((similarity * demand).max(axis=1))
+        coverage = per_path(similarity.max(axis=1))
+        readiness = np.minimum(1.0, fit / self._difficulty_fit)
+        score = (
+            FIT_WEIGHT * fit + DEMAND_WEIGHT * market + REVENUE_WEIGHT * self._revenue * coverage
+        )
+        return 100 * score * (1 - DIFFICULTY_PENALTY * (1 - readiness))
+
+    def rank(self, skills: Sequence[SkillProfile], k: int = 5) -> list[PathMatch]:
+        """Find the `k` catalog paths that best match a user's skills.
+
+        Args:
+            skills: The user's diagnosed skills
+            k: Number of paths to return
+
+        Returns:
+            The best matches, highest score first; ties keep catalog order
+        """
+        scores = self.scores(skills).tolist()
+        top = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        return [PathMatch(self.paths[i], min(100, math.floor(scores[i] + 0.5))) for i in top]
+
+
+def load_catalog(path: Path = DEFAULT_CATALOG_PATH) -> PathCatalog:
+    """Read path templates from a JSON-lines file."""
+    templates = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                for field in ("required_skills", "implementation_steps", "recommended_tools"):
+                    record[field] = tuple(record[field])
+                templates.append(PathTemplate(**record))
+    return PathCatalog(templates)
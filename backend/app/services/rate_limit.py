@@ -0,0 +1,111 @@
+"""Per-user rate limiting with the generic cell rate algorithm (GCRA).
+
+GCRA keeps a single number per key — the theoretical arrival time (TAT) of
+the next request — so every check is O(1) in time and memory. It behaves
+like a sliding window of `period` seconds that admits `limit` weight units,
+spread evenly but allowing a burst of up to the full limit.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class RateLimiter(Protocol):
+    """Rate limiter keyed by caller identity."""
+
+    async def hit(self, key: str, weight: int = 1) -> RateLimitResult: ...
+
+
+class MemoryRateLimiter:
+    """Single-process GCRA limiter."""
+
+    def __init__(
+        self,
+        limit: int,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_keys: int = 100_000,
+    ):
+        self.limit = limit
+        self.period = period
+        self.emission_interval = period / limit
+        self._clock = clock
+        self._max_keys = max_keys
+        self._tats: dict[str, float] = {}
+
+    async def hit(self, key: str, weight: int = 1) -> RateLimitResult:
+        now = self._clock()
+        tat = max(self._tats.get(key, now), now)
+        new_tat = tat + min(weight, self.limit) * self.emission_interval
+        allow_at = new_tat - self.period
+        if now < allow_at:
+            return RateLimitResult(allowed=False, retry_after=allow_at - now)
+
+        self._tats[key] = new_tat
+        if len(self._tats) > self._max_keys:
+            self._prune(now)
+        return RateLimitResult(allowed=True)
+
+    def _prune(self, now: float) -> None:
+        """Forget keys whose TAT has passed — they are indistinguishable from new keys."""
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+
+    def reset(self) -> None:
+        self._tats.clear()
+
+
+# Atomic GCRA step. Uses the Redis server clock so workers never disagree.
+# Returns the seconds to wait as a string ("0" when the request is allowed).
+_GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local increment = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+if increment <= 0 then return '0' end
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local new_tat = tat + increment
+local allow_at = new_tat - period
+if now < allow_at then
+    return tostring(allow_at - now)
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(1, math.ceil((new_tat - now) * 1000)))
+return '0'
+"""
+
+
+class RedisRateLimiter:
+    """GCRA limiter shared by all workers, evaluated atomically in a Redis script."""
+
+    def __init__(
+        self,
+        url: str,
+        limit: int,
+        period: float = 60.0,
+        namespace: str = "rate-limit:",
+    ):
+        import redis.asyncio as redis
+
+        self.limit = limit
+        self.period = period
+        self.emission_interval = period / limit
+        self._namespace = namespace
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._script = self._redis.register_script(_GCRA_SCRIPT)
+
+    async def hit(self, key: str, weight: int = 1) -> RateLimitResult:
+        increment = min(weight, self.limit) * self.emission_interval
+        retry_after = float(
+            await self._script(keys=[self._namespace + key], args=[increment, self.period])
+        )
+        return RateLimitResult(allowed=retry_after == 0, retry_after=retry_after)
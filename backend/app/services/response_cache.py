@@ -0,0 +1,153 @@
+"""Response cache for agent calls — in-process LRU with an optional Redis tier."""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage tier for cached agent responses."""
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCache:
+    """Shared cache tier backed by Redis, so workers reuse each other's answers."""
+
+    def __init__(self, url: str, namespace: str = "agent-cache:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._namespace = namespace
+
+    async def get(self, key: str) -> str | None:
+        return await self._redis.get(self._namespace + key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self._redis.set(self._namespace + key, value, px=int(ttl * 1000))
+
+    async def clear(self) -> None:
+        async for key in self._redis.scan_iter(match=self._namespace + "*"):
+            await self._redis.delete(key)
+
+
+class ResponseCache:
+    """Read-through cache over an ordered list of tiers (fastest first).
+
+    A hit in a slower tier is copied into the faster ones. Tier errors are
+    logged and treated as misses so a Redis outage never fails a request.
+    """
+
+    def __init__(self, tiers: list[CacheBackend]):
+        self.tiers = tiers
+        self.hits = [0] * len(tiers)
+        self.misses = 0
+
+    async def get(self, key: str, ttl: float) -> str | None:
+        for i, tier in enumerate(self.tiers):
+            try:
+                value = await tier.get(key)
+            except Exception:
+                logger.warning("Response cache tier %s failed on get", type(tier).__name__)
+                continue
+            if value is not None:
+                self.hits[i] += 1
+                for faster in self.tiers[:i]:
+                    await faster.set(key, value, ttl)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        for tier in self.tiers:
+            try:
+                await tier.set(key, value, ttl)
+            except Exception:
+                logger.warning("Response cache tier %s failed on set", type(tier).__name__)
+
+    async def clear(self) -> None:
+        for tier in self.tiers:
+            await tier.clear()
+        self.hits = [0] * len(self.tiers)
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters, with hits broken down per tier."""
+        total_hits = sum(self.hits)
+        lookups = total_hits + self.misses
+        return {
+            "hits": total_hits,
+            "misses": self.misses,
+            "hit_rate": total_hits / lookups if lookups else 0.0,
+            "hits_by_tier": {
+                type(tier).__name__: hits for tier, hits in zip(self.tiers, self.hits)
+            },
+        }
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    user_message: str,
+    temperature: float,
+    max_tokens: int,
+    response_format: dict | None = None,
+) -> str:
+    """Build a cache key from everything that determines an agent's answer.
+
+    Whitespace in the user message is collapsed so trivially different
+    spellings of the same prompt share an entry.
+    """
+    parts = [
+        model,
+        hashlib.sha256(system_prompt.encode()).hexdigest(),
+        " ".join(user_message.split()),
+        temperature,
+        max_tokens,
+    ]
+    if response_format is not None:
+        parts.append(response_format)
+    payload = json.dumps(parts, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
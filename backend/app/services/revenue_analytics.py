@@ -0,0 +1,271 @@
+"""Revenue analytics — dashboard KPIs computed over columnar revenue history.
+
+A user's `revenue_history` is loaded once into dense NumPy matrices indexed
+by (stream, month): revenue and customers, one row per stream, one column
+per month up to the month being reported on. Every KPI of the overview
+(per-stream trends, month-over-month growth, totals, customer sums, the
+monthly history chart and the annual projection) is then a handful of
+whole-array operations, so a user with hundreds of streams and years of
+history is summarized in well under a few milliseconds.
+
+`compute_overview_reference` computes the same overview with plain Python
+loops; it is the specification the vectorized version is tested against.
+"""
+
+import calendar
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+
+import numpy as np
+
+from app.models.revenue import RevenueEntry, RevenueStreamRecord
+
+# Streams whose revenue moved less than this (percent) are "stable"
+STABLE_TREND_PERCENT = 1.0
+# The annual projection compounds the average growth of the last few months,
+# capped so one unusual month does not project runaway growth or collapse
+GROWTH_WINDOW_MONTHS = 3
+MAX_MONTHLY_GROWTH = 0.10
+
+
+def month_index(month: date) -> int:
+    """Months since year 0 (consecutive months have consecutive indexes)."""
+    return month.year * 12 + month.month - 1
+
+
+def month_start(index: int) -> date:
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    return datetime.now(UTC).date().replace(day=1)
+
+
+@dataclass
+class RevenueHistory:
+    """A user's active streams and their monthly revenue as (stream, month) matrices."""
+
+    streams: list[RevenueStreamRecord]
+    first_month: int  # month index of column 0; the last column is the reported month
+    revenue: np.ndarray  # float64, shape (streams, months)
+    customers: np.ndarray  # int64, shape (streams, months)
+
+    @property
+    def months(self) -> list[date]:
+        return [month_start(self.first_month + i) for i in range(self.revenue.shape[1])]
+
+    @classmethod
+    def from_entries(
+        cls,
+        streams: Iterable[RevenueStreamRecord],
+        entries: Iterable[RevenueEntry],
+        as_of: date | None = None,
+    ) -> "RevenueHistory":
+        """Build the matrices from history rows.
+
+        Args:
+            streams: The user's streams; inactive ones are left out
+            entries: Monthly history rows of the streams
+            as_of: Month to report on (default: the current month); later
+                rows are ignored
+
+        Returns:
+            History with at least two months, so every KPI has a previous month
+        """
+        streams = [stream for stream in streams if stream.is_active]
+        rows = {stream.id: row for row, stream in enumerate(streams)}
+        last = month_index(as_of or current_month())
+
+        entries = [e for e in entries if e.stream_id in rows and month_index(e.month) <= last]
+        stream_rows = np.fromiter((rows[e.stream_id] for e in entries), np.int64, len(entries))
+        month_cols = np.fromiter((month_index(e.month) for e in entries), np.int64, len(entries))
+        first = min(int(month_cols.min()) if entries else last, last - 1)
+
+        shape = (len(streams), last - first + 1)
+        revenue = np.zeros(shape)
+        customers = np.zeros(shape, dtype=np.int64)
+        # (stream, month) is unique in revenue_history, so a scatter suffices
+        revenue[stream_rows, month_cols - first] = np.fromiter(
+            (e.revenue for e in entries), np.float64, len(entries)
+        )
+        customers[stream_rows, month_cols - first] = np.fromiter(
+            (e.customers for e in entries), np.int64, len(entries)
+        )
+        return cls(streams=streams, first_month=first, revenue=revenue, customers=customers)
+
+
+@dataclass(frozen=True, slots=True)
+class StreamMetrics:
+    """KPIs of one stream in the reported month."""
+
+    id: str
+    name: str
+    type: str
+    monthly_revenue: float
+    trend: str  # up, down or stable
+    trend_percent: float  # size of the change since last month; its sign is `trend`
+    customers: int
+    last_payment_at: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class RevenueMetrics:
+    """KPIs of a user's revenue in the reported month."""
+
+    total_monthly_revenue: float
+    monthly_growth_percent: float
+    projected_annual: float
+    active_streams: int
+    total_customers: int
+    streams: list[StreamMetrics]  # highest revenue first
+    monthly_history: list[dict]  # {"month": "Sep", "revenue": 2100.0}, oldest first
+
+
+def _change_percent(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Percent change; from nothing to something counts as +100%."""
+    no_base = np.where(current > 0, 1.0, 0.0)
+    change = np.divide(current - previous, previous, out=no_base, where=previous > 0)
+    return np.round(100 * change, 1)
+
+
+def _trend_labels(percent: np.ndarray) -> np.ndarray:
+    return np.where(
+        percent >= STABLE_TREND_PERCENT,
+        "up",
+        np.where(percent <= -STABLE_TREND_PERCENT, "down", "stable"),
+    )
+
+
+def _projected_annual(totals: np.ndarray) -> float:
+    """Next 12 months of revenue at the recent compound monthly growth rate."""
+    window = min(GROWTH_WINDOW_MONTHS, len(totals) - 1)
+    base, latest = totals[-1 - window], totals[-1]
+    growth = (latest / base) ** (1 / window) - 1 if base > 0 and latest > 0 else 0.0
+    growth = min(max(growth, -MAX_MONTHLY_GROWTH), MAX_MONTHLY_GROWTH)
+    return round(float(latest * np.sum((1 + growth) ** np.arange(1, 13))), 2)
+
+
+def compute_overview(history: RevenueHistory, history_months: int = 6) -> RevenueMetrics:
+    """Compute the revenue overview of the last month of `history`.
+
+    Args:
+        history: The user's revenue matrices
+        history_months: Months of total revenue to return for the chart
+
+    Returns:
+        Totals, growth, projection and per-stream KPIs
+    """
+    revenue = history.revenue
+    current, previous = revenue[:, -1], revenue[:, -2]
+    trend_percent = _change_percent(current, previous)
+    trends = _trend_labels(trend_percent)
+    customers = history.customers[:, -1]
+
+    totals = revenue.sum(axis=0)
+    growth = _change_percent(totals[-1:], totals[-2:-1])[0]
+
+    order = np.argsort(-current, kind="stable")
+    streams = [
+        StreamMetrics(
+            id=history.streams[i].id,
+            name=history.streams[i].name,
+            type=history.streams[i].type,
+            monthly_revenue=round(float(current[i]), 2),
+            trend=str(trends[i]),
+            trend_percent=abs(float(trend_percent[i])),
+            customers=int(customers[i]),
+            last_payment_at=history.streams[i].last_payment_at,
+        )
+        for i in order.tolist()
+    ]
+    chart = totals[-history_months:]
+    labels = history.months[-len(chart) :]
+    return RevenueMetrics(
+        total_monthly_revenue=round(float(totals[-1]), 2),
+        monthly_growth_percent=float(growth),
+        projected_annual=_projected_annual(totals),
+        active_streams=len(history.streams),
+        total_customers=int(customers.sum()),
+        streams=streams,
+        monthly_history=[
+            {"month": calendar.month_abbr[month.month], "revenue": round(float(value), 2)}
+            for month, value in zip(labels, chart.tolist(), strict=True)
+        ],
+    )
+
+
+def compute_overview_reference(
+    streams: Iterable[RevenueStreamRecord],
+    entries: Iterable[RevenueEntry],
+    as_of: date,
+    history_months: int = 6,
+) -> RevenueMetrics:
+    """Pure-Python equivalent of `compute_overview` (for tests and benchmarks)."""
+    streams = [stream for stream in streams if stream.is_active]
+    ids = {stream.id for stream in streams}
+    last = month_index(as_of)
+    revenue: dict[tuple[str, int], float] = {}
+    customers: dict[tuple[str, int], int] = {}
+    first = last - 1
+    for entry in entries:
+        month = month_index(entry.month)
+        if entry.stream_id in ids and month <= last:
+            revenue[entry.stream_id, month] = entry.revenue
+            customers[entry.stream_id, month] = entry.customers
+            first = min(first, month)
+
+    def change(current: float, previous: float) -> float:
+        if previous > 0:
+            return round(100 * (current - previous) / previous, 1)
+        return 100.0 if current > 0 else 0.0
+
+    def trend(percent: float) -> str:
+        if percent >= STABLE_TREND_PERCENT:
+            return "up"
+        return "down" if percent <= -STABLE_TREND_PERCENT else "stable"
+
+    metrics = []
+    for stream in streams:
+        current = revenue.get((stream.id, last), 0.0)
+        percent = change(current, revenue.get((stream.id, last - 1), 0.0))
+        metrics.append(
+            StreamMetrics(
+                id=stream.id,
+                name=stream.name,
+                type=stream.type,
+                monthly_revenue=round(current, 2),
+                trend=trend(percent),
+                trend_percent=abs(percent),
+                customers=customers.get((stream.id, last), 0),
+                last_payment_at=stream.last_payment_at,
+            )
+        )
+    metrics.sort(key=lambda stream: -stream.monthly_revenue)
+
+    totals = [
+        sum(revenue.get((stream.id, month), 0.0) for stream in streams)
+        for month in range(first, last + 1)
+    ]
+    window = min(GROWTH_WINDOW_MONTHS, len(totals) - 1)
+    base, latest = totals[-1 - window], totals[-1]
+    growth = (latest / base) ** (1 / window) - 1 if base > 0 and latest > 0 else 0.0
+    growth = min(max(growth, -MAX_MONTHLY_GROWTH), MAX_MONTHLY_GROWTH)
+    projected = sum(latest * (1 + growth) ** k for k in range(1, 13))
+
+    months = range(first, last + 1)[-history_months:]
+    return RevenueMetrics(
+        total_monthly_revenue=round(latest, 2),
+        monthly_growth_percent=change(totals[-1], totals[-2]),
+        projected_annual=round(projected, 2),
+        active_streams=len(streams),
+        total_customers=sum(stream.customers for stream in metrics),
+        streams=metrics,
+        monthly_history=[
+            {
+                "month": calendar.month_abbr[month_start(month).month],
+                "revenue": round(totals[month - first], 2),
+            }
+            for month in months
+        ],
+    )
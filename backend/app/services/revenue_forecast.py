@@ -0,0 +1,262 @@
+"""Revenue forecasting — damped-trend exponential smoothing over many series at once.
+
+Every stream's monthly revenue (and each user's total) is forecast with
+Holt's linear method with a damped trend (ETS(A,Ad,N)). Series are the rows
+of one matrix, so a fit is a loop over months, not over streams: each step
+updates the level and trend of every series under every candidate
+smoothing parameter with whole-array operations, and each series then keeps
+the parameters with the smallest one-step-ahead squared error. Point
+forecasts come with prediction intervals from the fitted residual variance.
+
+Months before a series' first revenue are treated as "not started" rather
+than as zero revenue. Only complete months are fitted: the current month is
+the first forecast month.
+
+`forecast_histories` forecasts many users in batches of rows, fanning the fits
+out to a process pool when one is given; the nightly batch
+(`scripts/forecast_batch.py`) uses it to precompute every user's forecast,
+and dashboards read the stored result.
+"""
+
+import asyncio
+import itertools
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import date
+from statistics import NormalDist
+
+import numpy as np
+
+from app.models.revenue import RevenueForecast
+from app.services.forecast_store import ForecastStore
+from app.services.revenue_analytics import RevenueHistory, current_month, month_index, month_start
+from app.services.revenue_store import RevenueStore
+
+# Candidate (alpha, beta, phi) smoothing parameters; beta scales alpha
+_ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+_BETAS = (0.05, 0.2, 0.5)
+_PHIS = (0.8, 0.95)
+_PARAMS = np.array(list(itertools.product(_ALPHAS, _BETAS, _PHIS))).T  # (3, params)
+# Series fitted on fewer than this many errors get a spread relative to their level
+MIN_FIT_ERRORS = 2
+FALLBACK_SPREAD = 0.25
+# Series fitted together; larger blocks spill the working arrays out of cache
+BLOCK_ROWS = 1_024
+
+
+@dataclass(frozen=True, slots=True)
+class SeriesForecast:
+    """Forecasts of a batch of series, one row per series."""
+
+    point: np.ndarray  # (series, horizon)
+    lower: np.ndarray
+    upper: np.ndarray
+
+    def rows(self) -> list[dict[str, list[float]]]:
+        """Each series as {"point": [...], "lower": [...], "upper": [...]}, rounded to cents."""
+        columns = [np.round(values, 2).tolist() for values in (self.point, self.lower, self.upper)]
+        return [
+            {"point": point, "lower": lower, "upper": upper}
+            for point, lower, upper in zip(*columns, strict=True)
+        ]
+
+
+def fit_forecast(series: np.ndarray, horizon: int = 12, level: float = 0.8) -> SeriesForecast:
+    """Fit every row of `series` and forecast the next `horizon` months.
+
+    Args:
+        series: Monthly revenue, shape (series, months), oldest month first
+        horizon: Months to forecast after the last column
+        level: Coverage of the prediction intervals (e.g. 0.8 for 80%)
+
+    Returns:
+        Point forecasts and interval bounds, never below zero
+    """
+    series = np.asarray(series, dtype=np.float64)
+    if len(series) <= BLOCK_ROWS:
+        return _fit_block(series, horizon, level)
+    # Blocks whose working arrays stay in cache fit several times faster
+    blocks = [
+        _fit_block(series[start : start + BLOCK_ROWS], horizon, level)
+        for start in range(0, len(series), BLOCK_ROWS)
+    ]
+    return SeriesForecast(
+        *(np.vstack([getattr(b, name) for b in blocks]) for name in ("point", "lower", "upper"))
+    )
+
+
+def _fit_block(series: np.ndarray, horizon: int, level: float) -> SeriesForecast:
+    rows, months = series.shape
+    alpha, beta, phi = (p[:, None] for p in _PARAMS)  # (params, 1)
+    started_at = np.where(series.any(axis=1), (series != 0).argmax(axis=1), months)
+
+    shape = (_PARAMS.shape[1], rows)
+    level_, trend = np.zeros(shape), np.zeros(shape)
+    sse, errors = np.zeros(shape), np.zeros(rows)
+    prediction, error = np.empty(shape), np.empty(shape)
+    alpha_beta = alpha * beta
+    for t in range(months):
+        y = series[:, t]
+        fitting = (t > started_at).astype(np.float64)
+        # Before its start a series' level and trend stay zero; at its start
+        # the level becomes the first value, and one-step errors count after.
+        np.multiply(phi, trend, out=prediction)
+        prediction += level_
+        np.subtract(y, prediction, out=error)
+        error *= fitting
+        sse += error * error
+        errors += fitting
+        np.multiply(alpha, error, out=level_)
+        level_ += prediction
+        level_ += y * (t == started_at)
+        trend *= phi
+        trend += alpha_beta * error
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(rows)
+    level_, trend = level_[best, columns], trend[best, columns]
+    alpha, beta, phi = (p[best] for p in _PARAMS)
+
+    steps = np.arange(1, horizon + 1)
+    damping = np.cumsum(phi[:, None] ** steps, axis=1)  # phi + phi^2 + ... + phi^h
+    point = level_[:, None] + damping * trend[:, None]
+
+    # Var(h) = sigma^2 (1 + sum_{j<h} c_j^2), c_j = alpha (1 + beta (phi + ... + phi^j))
+    c = alpha[:, None] * (1 + beta[:, None] * damping[:, :-1])
+    variance_factor = 1 + np.concatenate([np.zeros((rows, 1)), np.cumsum(c**2, axis=1)], axis=1)
+    sigma = np.where(
+        errors >= MIN_FIT_ERRORS,
+        np.sqrt(sse[best, columns] / np.maximum(errors, 1)),
+        FALLBACK_SPREAD * np.abs(level_),
+    )
+    spread = NormalDist().inv_cdf((1 + level) / 2) * sigma[:, None] * np.sqrt(variance_factor)
+    point = np.maximum(point, 0.0)
+    return SeriesForecast(
+        point=point,
+        lower=np.maximum(point - spread, 0.0),
+        upper=point + spread,
+    )
+
+
+def _fit_matrix(histories: list[RevenueHistory], fit_months: int) -> np.ndarray:
+    """Stack the streams and total of each history over their last `fit_months` complete months."""
+    blocks = []
+    for history in histories:
+        complete = history.revenue[:, :-1]  # the last column is the current, partial month
+        block = np.vstack([complete, complete.sum(axis=0, keepdims=True)])[:, -fit_months:]
+        blocks.append(np.pad(block, ((0, 0), (fit_months - block.shape[1], 0))))
+    return np.vstack(blocks) if blocks else np.zeros((0, fit_months))
+
+
+async def forecast_histories(
+    histories: dict[str, RevenueHistory],
+    horizon: int = 12,
+    level: float = 0.8,
+    fit_months: int = 36,
+    executor: Executor | None = None,
+    chunk_rows: int = 8_192,
+) -> list[RevenueForecast]:
+    """Forecast each user's streams and total from their history.
+
+    Args:
+        histories: User ID -> revenue history ending at the first forecast month
+        horizon: Months to forecast
+        level: Coverage of the prediction intervals
+        fit_months: Complete months of history fitted
+        executor: Process pool to fit chunks of `chunk_rows` series in; fitted
+            inline when None
+
+    Returns:
+        One forecast per user
+    """
+    if not histories:
+        return []
+    matrix = _fit_matrix(list(histories.values()), fit_months)
+    if executor is None:
+        forecast = fit_forecast(matrix, horizon, level)
+    else:
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor, fit_forecast, matrix[start : start + chunk_rows], horizon, level
+                )
+                for start in range(0, len(matrix), chunk_rows)
+            )
+        )
+        forecast = SeriesForecast(
+            *(np.vstack([getattr(c, name) for c in chunks]) for name in ("point", "lower", "upper"))
+        )
+
+    series, now, forecasts, row = forecast.rows(), time.time(), [], 0
+    for user_id, history in histories.items():
+        streams = {stream.id: series[row + i] for i, stream in enumerate(history.streams)}
+        row += len(history.streams)
+        forecasts.append(
+            RevenueForecast(
+                user_id=user_id,
+                first_month=month_start(history.first_month + history.revenue.shape[1] - 1),
+                level=level,
+                total=series[row],
+                streams=streams,
+                generated_at=now,
+            )
+        )
+        row += 1
+    return forecasts
+
+
+async def load_histories(
+    store: RevenueStore, user_ids: list[str], as_of: date | None = None
+) -> dict[str, RevenueHistory]:
+    """Load the revenue history of several users concurrently."""
+
+    async def load(user_id: str) -> RevenueHistory:
+        streams, entries = await asyncio.gather(store.streams(user_id), store.entries(user_id))
+        return RevenueHistory.from_entries(streams, entries, as_of)
+
+    histories = await asyncio.gather(*(load(user_id) for user_id in user_ids))
+    return dict(zip(user_ids, histories, strict=True))
+
+
+def is_current(forecast: RevenueForecast | None, max_age_seconds: float) -> bool:
+    """Whether a stored forecast starts at this month and is recent enough to show."""
+    return (
+        forecast is not None
+        and month_index(forecast.first_month) == month_index(current_month())
+        and time.time() - forecast.generated_at <= max_age_seconds
+    )
+
+
+async def forecast_all_users(
+    store: RevenueStore,
+    forecasts: ForecastStore,
+    horizon: int = 12,
+    level: float = 0.8,
+    fit_months: int = 36,
+    batch_users: int = 5_000,
+    executor: Executor | None = None,
+) -> int:
+    """Precompute and store the forecast of every user with revenue streams.
+
+    Users are loaded, fitted and stored `batch_users` at a time, so memory
+    stays bounded however many users there are; the next batch is loaded
+    while the current one is fitted.
+
+    Returns:
+        Number of forecasts stored
+    """
+    user_ids = await store.user_ids()
+    batches = [user_ids[i : i + batch_users] for i in range(0, len(user_ids), batch_users)]
+    stored = 0
+    loading = asyncio.ensure_future(load_histories(store, batches[0])) if batches else None
+    for i in range(len(batches)):
+        histories = await loading
+        if i + 1 < len(batches):
+            loading = asyncio.ensure_future(load_histories(store, batches[i + 1]))
+        histories = {user_id: h for user_id, h in histories.items() if h.streams}
+        results = await forecast_histories(histories, horizon, level, fit_months, executor)
+        await forecasts.save_many(results)
+        stored += len(results)
+    return stored
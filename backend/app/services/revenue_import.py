@@ -0,0 +1,473 @@
+"""Revenue import — bulk-loads payment exports into revenue history.
+
+Payment rows (a Stripe or Gumroad export, or any CSV/NDJSON with a stream,
+an amount and a date per row) are parsed straight off the request body:
+bytes are split into lines as they arrive, and rows are validated and
+aggregated a batch at a time with NumPy instead of one model per row. Each
+batch is folded into (stream, month) buckets, so memory holds one batch
+plus one bucket per stream and month however large the file is. When the
+upload ends, the buckets are upserted into `revenue_history` in large
+batches, replacing the imported months of each stream.
+
+Rows are matched to the user's active streams by ID or (case-insensitive)
+name. Rows with an unknown stream, an unparseable amount or date, or a date
+after the current month are rejected and counted; the first few are
+reported with their line numbers.
+"""
+
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from operator import itemgetter
+
+import numpy as np
+
+from app.models.revenue import RevenueEntry, RevenueStreamRecord
+from app.services.revenue_analytics import current_month, month_index, month_start
+from app.services.revenue_store import RevenueStore
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Column names accepted for each field (lowercased), covering common exports
+_ALIASES = {
+    "stream": ("stream_id", "stream", "product", "product_name", "product name", "item name"),
+    "amount": ("amount", "price", "total", "sale_price", "sale price", "net"),
+    "date": ("paid_at", "date", "created", "created (utc)", "created_at", "sale_date", "sale date"),
+    "customer": (
+        "customer_id",
+        "customer",
+        "customer_email",
+        "customer email",
+        "email",
+        "purchase_email",
+    ),
+}
+
+# Bucket keys pack (stream row, month index) into one int64
+_MONTH_BITS = 20
+# Mixes a bucket key into a customer hash (the 64-bit golden ratio, as int64)
+_PAIR_MULTIPLIER = np.int64(-0x61C8864680B583EB)
+# Stands in for rows that cannot be read; every field fails validation
+_REJECTED_ROW = ("", "", "", "")
+
+
+class ImportFormatError(ValueError):
+    """Raised when an upload cannot be imported at all (e.g. a required column is missing)."""
+
+
+@dataclass
+class ImportProgress:
+    """Status of one import, updated while it runs."""
+
+    id: str
+    user_id: str
+    format: str
+    status: str = "running"  # running, succeeded, failed
+    rows: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    buckets: int = 0
+    bytes: int = 0
+    errors: list[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return round(self.rows / elapsed, 1) if elapsed > 0 else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "format": self.format,
+            "status": self.status,
+            "rows": self.rows,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "buckets": self.buckets,
+            "bytes": self.bytes,
+            "rows_per_second": self.rows_per_second,
+            "errors": self.errors,
+        }
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], progress: ImportProgress
+) -> AsyncIterator[list[str]]:
+    """Split a byte stream into UTF-8 lines, yielding the complete lines of each chunk.
+
+    Lines keep their terminators, as `csv.reader` needs them to read quoted
+    fields that span lines.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        progress.bytes += len(chunk)
+        text = pending + decoder.decode(chunk)
+        end = text.rfind("\n") + 1
+        pending = text[end:]
+        if end:
+            yield io.StringIO(text[:end], newline="\n").readlines()
+    tail = pending + decoder.decode(b"", final=True)
+    if tail.strip():
+        yield [tail]
+
+
+async def iter_csv_lines(
+    chunks: AsyncIterator[bytes], progress: ImportProgress
+) -> AsyncIterator[list[str]]:
+    """Like `iter_lines`, but never ends a batch inside a quoted CSV field.
+
+    Lines after the last complete record of a chunk (an odd number of quotes
+    leaves a field open) are carried into the next batch.
+    """
+    carried: list[str] = []
+    open_quote = False
+    async for lines in iter_lines(chunks, progress):
+        end = 0
+        for number, line in enumerate(lines, 1):
+            if line.count('"') % 2:
+                open_quote = not open_quote
+            if not open_quote:
+                end = number
+        if end:
+            yield carried + lines[:end]
+            carried = lines[end:]
+        else:
+            carried += lines
+    if carried:
+        yield carried  # an unterminated quote runs to the end of the upload
+
+
+def _month_keys(dates: list[str]) -> np.ndarray:
+    """Month indexes of ISO-style dates ("2026-02-25", "2026/02/25 10:00"); -1 if invalid."""
+    # The first 7 characters as code points: YYYY-MM
+    chars = np.array(dates, dtype="U7").view(np.uint32).reshape(len(dates), 7).astype(np.int64)
+    digits = chars[:, [0, 1, 2, 3, 5, 6]] - ord("0")
+    year = digits[:, :4] @ np.array([1000, 100, 10, 1])
+    month = digits[:, 4] * 10 + digits[:, 5]
+    valid = (
+        ((digits >= 0) & (digits <= 9)).all(axis=1)
+        & ((chars[:, 4] == ord("-")) | (chars[:, 4] == ord("/")))
+        & (month >= 1)
+        & (month <= 12)
+    )
+    return np.where(valid, year * 12 + month - 1, -1)
+
+
+def _parse_amounts(values: list[str]) -> np.ndarray:
+    """Parse amounts in one pass; values that fail are retried leniently, else NaN."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        amounts = np.empty(len(values))
+        for i, value in enumerate(values):
+            try:
+                amounts[i] = float(value.replace("$", "").replace(",", ""))
+            except ValueError:
+                amounts[i] = np.nan
+        return amounts
+
+
+def _parse_timestamp(value: str, month: int) -> float:
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("/", "-"))
+    except ValueError:
+        parsed = datetime.combine(month_start(month), datetime.min.time())
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+class RevenueImporter:
+    """Imports one upload of payment rows for one user.
+
+    Rows are buffered as (stream, amount, date[, customer]) string tuples and
+    processed `batch_rows` at a time. Distinct customers are counted exactly
+    per (stream, month): each batch contributes the 64-bit hashes of its
+    (bucket, customer) pairs, deduplicated with NumPy, so that state grows
+    with the number of distinct pairs (16 bytes each), not with the rows.
+    """
+
+    def __init__(
+        self,
+        store: RevenueStore,
+        user_id: str,
+        streams: Iterable[RevenueStreamRecord],
+        batch_rows: int = 10_000,
+        upsert_batch_size: int = 5_000,
+        max_errors: int = 20,
+    ):
+        self.store = store
+        self.user_id = user_id
+        self.streams = [stream for stream in streams if stream.is_active]
+        self.batch_rows = batch_rows
+        self.upsert_batch_size = upsert_batch_size
+        self.max_errors = max_errors
+        self._stream_rows: dict[str, int] = {}
+        for row, stream in enumerate(self.streams):
+            self._stream_rows[stream.name.strip().lower()] = row
+        for row, stream in enumerate(self.streams):
+            self._stream_rows[stream.id.lower()] = row  # IDs win over names
+        self._last_month = month_index(current_month())
+        self._rows: list[tuple[str, ...]] = []
+        self._line_numbers: list[int] = []
+        self._revenue: dict[int, float] = {}  # bucket key -> revenue
+        self._last_payment: dict[int, str] = {}  # stream row -> latest date string
+        # Deduplicated (bucket, customer) pair hashes and their bucket keys
+        self._pairs: list[np.ndarray] = []
+        self._pair_keys: list[np.ndarray] = []
+        self._pairs_compacted = 0
+
+    async def run(
+        self, chunks: AsyncIterator[bytes], format: str, progress: ImportProgress
+    ) -> ImportProgress:
+        """Parse, aggregate and store an upload.
+
+        Args:
+            chunks: The upload's bytes as they arrive
+            format: "csv" (with a header row) or "ndjson"
+            progress: Updated as rows are processed
+
+        Raises:
+            ImportFormatError: If the upload cannot be parsed as `format`
+        """
+        try:
+            if format == "csv":
+                await self._read_csv(chunks, progress)
+            elif format == "ndjson":
+                await self._read_ndjson(chunks, progress)
+            else:
+                raise ImportFormatError(f"Unsupported import format '{format}'")
+            self._flush_batch(progress)
+            await self._store()
+        except BaseException:
+            progress.status = "failed"
+            raise
+        finally:
+            progress.finished_at = time.time()
+        progress.status = "succeeded"
+        logger.info(
+            "Imported %d of %d revenue rows for %s (%.0f rows/s)",
+            progress.accepted,
+            progress.rows,
+            self.user_id,
+            progress.rows_per_second,
+        )
+        return progress
+
+    async def _read_csv(self, chunks: AsyncIterator[bytes], progress: ImportProgress) -> None:
+        pick = None
+        rows, line_numbers = self._rows, self._line_numbers
+        lines_read = 0
+        async for lines in iter_csv_lines(chunks, progress):
+            reader = csv.reader(lines)
+            batch_start = lines_read
+            for row in reader:
+                line_number = lines_read + 1  # the record's first line; it may span several
+                lines_read = batch_start + reader.line_num
+                if pick is None:
+                    if row:
+                        indexes = self._resolve_columns([name.strip().lower() for name in row])
+                        pick = itemgetter(*indexes)
+                    continue
+                try:
+                    rows.append(pick(row))
+                except IndexError:
+                    if not row:
+                        continue  # blank line
+                    rows.append(_REJECTED_ROW)  # too few columns
+                line_numbers.append(line_number)
+            self._maybe_flush(progress)
+        if pick is None:
+            raise ImportFormatError("The upload is empty")
+
+    async def _read_ndjson(self, chunks: AsyncIterator[bytes], progress: ImportProgress) -> None:
+        keys = None
+        rows, line_numbers = self._rows, self._line_numbers
+        line_number = 0
+        async for lines in iter_lines(chunks, progress):
+            for line in lines:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if isinstance(record, dict):
+                    keys = keys or self._resolve_keys(record)
+                    rows.append(
+                        tuple("" if (v := record.get(key)) is None else str(v) for key in keys)
+                    )
+                else:
+                    rows.append(_REJECTED_ROW)
+                line_numbers.append(line_number)
+            self._maybe_flush(progress)
+
+    def _resolve_columns(self, header: list[str]) -> list[int]:
+        """Indexes of the stream, amount, date and (if present) customer columns."""
+        indexes = []
+        for name, aliases in _ALIASES.items():
+            index = next((header.index(alias) for alias in aliases if alias in header), None)
+            if index is not None:
+                indexes.append(index)
+            elif name != "customer":
+                raise ImportFormatError(f"No {name} column (expected one of: {', '.join(aliases)})")
+        return indexes
+
+    def _resolve_keys(self, record: dict) -> list[str]:
+        """Keys of the stream, amount, date and (if present) customer fields."""
+        keys = {key.lower(): key for key in record}
+        fields = []
+        for name, aliases in _ALIASES.items():
+            key = next((keys[alias] for alias in aliases if alias in keys), None)
+            if key is not None:
+                fields.append(key)
+            elif name != "customer":
+                raise ImportFormatError(f"No {name} field (expected one of: {', '.join(aliases)})")
+        return fields
+
+    def _maybe_flush(self, progress: ImportProgress) -> None:
+        if len(self._rows) >= self.batch_rows:
+            self._flush_batch(progress)
+
+    def _flush_batch(self, progress: ImportProgress) -> None:
+        """Validate and aggregate the buffered rows as one batch."""
+        count = len(self._rows)
+        if not count:
+            return
+        # Rows without a customer column are 3-tuples; zip drops the 4th of rejected rows.
+        streams, amounts, dates, *customers = zip(*self._rows, strict=False)
+        lookup = {value: self._stream_row(value) for value in set(streams)}
+        stream_rows = np.fromiter(map(lookup.__getitem__, streams), np.int64, count)
+        amount = _parse_amounts(amounts)
+        months = _month_keys(dates)
+        valid = (
+            (stream_rows >= 0) & np.isfinite(amount) & (months >= 0) & (months <= self._last_month)
+        )
+
+        progress.rows += count
+        accepted = int(valid.sum())
+        progress.accepted += accepted
+        progress.rejected += count - accepted
+        if accepted < count and len(progress.errors) < self.max_errors:
+            for i in np.flatnonzero(~valid)[: self.max_errors - len(progress.errors)].tolist():
+                reason = self._rejection(stream_rows[i], amount[i], months[i])
+                progress.errors.append(f"Line {self._line_numbers[i]}: {reason}")
+
+        if accepted:
+            rows = stream_rows[valid]
+            keys = (rows << _MONTH_BITS) | months[valid]
+            unique, inverse = np.unique(keys, return_inverse=True)
+            totals = np.bincount(inverse, weights=amount[valid])
+            for key, total in zip(unique.tolist(), totals.tolist(), strict=True):
+                self._revenue[key] = self._revenue.get(key, 0.0) + total
+            progress.buckets = len(self._revenue)
+
+            if customers:
+                hashes = np.fromiter(map(hash, customers[0]), np.int64, count)[valid]
+                named = hashes != hash("")
+                self._add_pairs(keys[named], hashes[named])
+
+            # Latest date per stream: sort by (stream, date) and take each group's last.
+            dates = np.array(dates, dtype=str)[valid]
+            order = np.lexsort((dates, rows))
+            for end in np.flatnonzero(np.diff(rows[order], append=-1)).tolist():
+                row, date = int(rows[order[end]]), str(dates[order[end]])
+                if date > self._last_payment.get(row, ""):
+                    self._last_payment[row] = date
+
+        self._rows.clear()
+        self._line_numbers.clear()
+
+    def _stream_row(self, value: str) -> int:
+        return self._stream_rows.get(value.strip().lower(), -1)
+
+    def _add_pairs(self, keys: np.ndarray, hashes: np.ndarray) -> None:
+        pairs = hashes ^ (keys * _PAIR_MULTIPLIER)
+        pairs, first = np.unique(pairs, return_index=True)
+        self._pairs.append(pairs)
+        self._pair_keys.append(keys[first])
+        # Deduplicate across batches whenever the new pairs outgrow the compacted ones.
+        if sum(map(len, self._pairs)) > 2 * self._pairs_compacted + self.batch_rows:
+            self._compact_pairs()
+
+    def _compact_pairs(self) -> None:
+        if not self._pairs:
+            return
+        pairs, first = np.unique(np.concatenate(self._pairs), return_index=True)
+        self._pairs = [pairs]
+        self._pair_keys = [np.concatenate(self._pair_keys)[first]]
+        self._pairs_compacted = len(pairs)
+
+    def _rejection(self, stream_row: int, amount: float, month: int) -> str:
+        if stream_row < 0:
+            return "unknown stream"
+        if not np.isfinite(amount):
+            return "invalid amount"
+        if month < 0:
+            return "invalid date"
+        return "date is in the future"
+
+    async def _store(self) -> None:
+        """Upsert the buckets and move each stream's last payment forward."""
+        self._compact_pairs()
+        customers = {}
+        if self._pair_keys:
+            keys, counts = np.unique(self._pair_keys[0], return_counts=True)
+            customers = dict(zip(keys.tolist(), counts.tolist(), strict=True))
+        mask = (1 << _MONTH_BITS) - 1
+        entries = [
+            RevenueEntry(
+                stream_id=self.streams[key >> _MONTH_BITS].id,
+                month=month_start(key & mask),
+                revenue=round(total, 2),
+                customers=customers.get(key, 0),
+            )
+            for key, total in self._revenue.items()
+        ]
+        for start in range(0, len(entries), self.upsert_batch_size):
+            await self.store.upsert_entries(
+                self.user_id, entries[start : start + self.upsert_batch_size]
+            )
+
+        for row, date in self._last_payment.items():
+            stream = self.streams[row]
+            paid_at = _parse_timestamp(date, int(_month_keys([date])[0]))
+            if stream.last_payment_at is None or paid_at > stream.last_payment_at:
+                stream.last_payment_at = paid_at
+                await self.store.save_stream(stream)
+
+
+class ImportRegistry:
+    """Recent imports and their progress, for status polling."""
+
+    def __init__(self, max_imports: int = 1_000):
+        self.max_imports = max_imports
+        self._imports: OrderedDict[str, ImportProgress] = OrderedDict()
+
+    def start(self, user_id: str, format: str) -> ImportProgress:
+        progress = ImportProgress(id=str(uuid.uuid4()), user_id=user_id, format=format)
+        self._imports[progress.id] = progress
+        if len(self._imports) > self.max_imports:
+            self._imports.popitem(last=False)
+        return progress
+
+    def get(self, import_id: str) -> ImportProgress | None:
+        return self._imports.get(import_id)
+
+    def for_user(self, user_id: str) -> list[ImportProgress]:
+        """A user's imports, newest first."""
+        return [p for p in reversed(self._imports.values()) if p.user_id == user_id]
@@ -0,0 +1,200 @@
+"""Revenue insights — rule-based findings over a user's revenue matrices.
+
+Each rule is a few whole-array operations over the (stream, month) history
+the dashboard already reads, so every stream is checked in one pass:
+
+- declining: average revenue of the last INSIGHT_WINDOW_MONTHS months fell
+  by DECLINE_PERCENT or more against the months before
+- accelerating: month-over-month growth of the last months is at least
+  MIN_ACCELERATING_GROWTH percent and ACCELERATION_POINTS above before
+- concentration: one stream earns CONCENTRATION_SHARE or more of the total
+- pricing: revenue per customer is below UNDERPRICED_RATIO of the median of
+  the user's other streams of the same type
+
+Findings are ranked by the monthly revenue they put at stake. The last
+month of the history is the current, partial month, so the rules only read
+the complete months before it (as forecasting does); otherwise every stream
+would look like it is declining early in the month.
+`history_version` fingerprints the history, so results derived from it
+(e.g. an LLM narrative) can be cached until the data changes.
+"""
+
+import hashlib
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from app.services.revenue_analytics import RevenueHistory
+
+INSIGHT_WINDOW_MONTHS = 3
+DECLINE_PERCENT = 10.0
+MIN_ACCELERATING_GROWTH = 5.0
+ACCELERATION_POINTS = 5.0
+CONCENTRATION_SHARE = 0.6
+UNDERPRICED_RATIO = 0.5
+# Findings worth at least this share of monthly revenue are high / medium priority
+HIGH_PRIORITY_SHARE = 0.10
+MEDIUM_PRIORITY_SHARE = 0.03
+
+
+@dataclass(frozen=True, slots=True)
+class Insight:
+    """A finding about a user's revenue."""
+
+    kind: str  # declining, accelerating, concentration or pricing
+    stream_id: str | None
+    title: str
+    description: str
+    impact: str
+    impact_value: float  # monthly revenue at stake; findings are ranked by it
+    priority: str = "low"  # high, medium or low
+
+
+def history_version(history: RevenueHistory) -> str:
+    """Fingerprint of the streams and figures of a history."""
+    digest = hashlib.sha256()
+    for stream in history.streams:
+        digest.update(f"{stream.id}\0{stream.name}\0{stream.type}\0".encode())
+    digest.update(history.first_month.to_bytes(4, "little"))
+    digest.update(np.ascontiguousarray(history.revenue).tobytes())
+    digest.update(np.ascontiguousarray(history.customers).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _mean_growth(revenue: np.ndarray) -> np.ndarray:
+    """Mean month-over-month growth (percent) of each row; months from zero are skipped."""
+    previous, current = revenue[:, :-1], revenue[:, 1:]
+    growth = np.divide(current - previous, previous, out=np.zeros_like(current), where=previous > 0)
+    months = np.maximum((previous > 0).sum(axis=1), 1)
+    return 100 * growth.sum(axis=1) / months
+
+
+def detect_insights(history: RevenueHistory, limit: int = 5) -> list[Insight]:
+    """Run every rule over a user's history.
+
+    Args:
+        history: The user's revenue matrices
+        limit: Maximum number of findings returned
+
+    Returns:
+        The findings with the most revenue at stake, highest first
+    """
+    window = INSIGHT_WINDOW_MONTHS
+    # Complete months only: the last column is the current, partial month
+    revenue, customers = history.revenue[:, :-1], history.customers[:, :-1]
+    missing = max(0, 2 * window + 1 - revenue.shape[1])  # pad short histories
+    revenue = np.pad(revenue, ((0, 0), (missing, 0)))
+    customers = np.pad(customers, ((0, 0), (missing, 0)))
+    recent, earlier = (
+        revenue[:, -window:].mean(axis=1),
+        revenue[:, -2 * window : -window].mean(axis=1),
+    )
+    total = max(float(revenue[:, -1].sum()), float(recent.sum()))
+    names = [stream.name for stream in history.streams]
+    insights = []
+
+    change = np.divide(
+        100 * (recent - earlier), earlier, out=np.zeros_like(recent), where=earlier > 0
+    )
+    for i in np.flatnonzero(change <= -DECLINE_PERCENT).tolist():
+        lost = float(earlier[i] - recent[i])
+        insights.append(
+            Insight(
+                kind="declining",
+                stream_id=history.streams[i].id,
+                title=f"{names[i]} revenue is declining",
+                description=(
+                    f"Down {-change[i]:.0f}% over the last {window} months "
+                    f"(${recent[i]:,.0f}/month vs ${earlier[i]:,.0f}/month before)."
+                ),
+                impact=f"Recover ${lost:,.0f}/month",
+                impact_value=lost,
+            )
+        )
+
+    recent_growth = _mean_growth(revenue[:, -window - 1 :])
+    earlier_growth = _mean_growth(revenue[:, -2 * window - 1 : -window])
+    accelerating = (recent_growth >= MIN_ACCELERATING_GROWTH) & (
+        recent_growth - earlier_growth >= ACCELERATION_POINTS
+    )
+    for i in np.flatnonzero(accelerating).tolist():
+        # Monthly revenue added if the recent growth holds for another window
+        gain = float(revenue[i, -1] * ((1 + recent_growth[i] / 100) ** window - 1))
+        insights.append(
+            Insight(
+                kind="accelerating",
+                stream_id=history.streams[i].id,
+                title=f"{names[i]} growth is accelerating",
+                description=(
+                    f"Growing {recent_growth[i]:.0f}% a month lately, up from "
+                    f"{earlier_growth[i]:.0f}% — a good time to invest more in it."
+                ),
+                impact=f"+${gain:,.0f}/month potential",
+                impact_value=gain,
+            )
+        )
+
+    if recent.sum() > 0:
+        shares = recent / recent.sum()
+        top = int(shares.argmax())
+        if shares[top] >= CONCENTRATION_SHARE:
+            # Revenue above the threshold share
+            exposed = float(recent[top] - CONCENTRATION_SHARE * recent.sum())
+            insights.append(
+                Insight(
+                    kind="concentration",
+                    stream_id=history.streams[top].id,
+                    title=f"{shares[top]:.0%} of your income depends on {names[top]}",
+                    description=(
+                        "A dip in one stream would hit your income hard. Growing a "
+                        "second stream reduces that risk."
+                    ),
+                    impact=f"${exposed:,.0f}/month over a {CONCENTRATION_SHARE:.0%} share",
+                    impact_value=exposed,
+                )
+            )
+
+    window_customers = customers[:, -window:].sum(axis=1)
+    per_customer = np.divide(
+        revenue[:, -window:].sum(axis=1),
+        window_customers,
+        out=np.full(len(recent), np.nan),
+        where=window_customers > 0,
+    )
+    types = np.array([stream.type for stream in history.streams])
+    for type_ in np.unique(types).tolist():
+        peers = np.flatnonzero((types == type_) & ~np.isnan(per_customer))
+        if len(peers) < 2:
+            continue
+        for i in peers.tolist():
+            median = float(np.median(per_customer[peers[peers != i]]))
+            if per_customer[i] < UNDERPRICED_RATIO * median:
+                # Closing half the gap to the peers' price, at the current customer count
+                gain = float((median - per_customer[i]) / 2 * window_customers[i] / window)
+                insights.append(
+                    Insight(
+                        kind="pricing",
+                        stream_id=history.streams[i].id,
+                        title=f"{names[i]} may be underpriced",
+                        description=(
+                            f"${per_customer[i]:,.0f} per customer vs ${median:,.0f} for "
+                            f"your other {type_} streams."
+                        ),
+                        impact=f"+${gain:,.0f}/month potential",
+                        impact_value=gain,
+                    )
+                )
+
+    insights.sort(key=lambda insight: -insight.impact_value)
+    return [_prioritized(insight, total) for insight in insights[:limit]]
+
+
+def _prioritized(insight: Insight, total: float) -> Insight:
+    share = insight.impact_value / total if total > 0 else 0.0
+    if share >= HIGH_PRIORITY_SHARE:
+        priority = "high"
+    elif share >= MEDIUM_PRIORITY_SHARE:
+        priority = "medium"
+    else:
+        priority = "low"
+    return replace(insight, priority=priority)
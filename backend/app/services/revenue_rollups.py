@@ -0,0 +1,281 @@
+"""Revenue rollups — dashboard figures kept current as payments arrive.
+
+For every user and each of their active streams, the rollups hold the last
+ROLLUP_MONTHS months of revenue and customer counts (newest last), this
+month's distinct customers and the last payment time. A payment adds to
+one slot of its stream and of its user, and its (stream, month) history
+row is written through to the store: O(1) whatever the length of the
+history. Dashboard reads turn the rollups into ROLLUP_MONTHS-column
+matrices for `compute_overview`, so their cost depends on the number of
+streams, never on how many years of history a user has.
+
+A user's rollups are built from the store on first use and kept in an LRU
+of `max_users` users. `snapshot` and `rebuild` let a consistency check
+compare the incrementally maintained figures with a fresh build.
+
+Customers are counted once per customer ID per stream and month, for the
+current month; a rebuild mid-month forgets which customers were already
+counted, so a returning customer may be counted again that month.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+
+import numpy as np
+
+from app.models.revenue import RevenueEntry, RevenueStreamRecord
+from app.services.revenue_analytics import (
+    RevenueHistory,
+    compute_overview,
+    current_month,
+    month_index,
+    month_start,
+)
+from app.services.revenue_store import RevenueStore
+
+ROLLUP_MONTHS = 12
+
+
+class UnknownStreamError(LookupError):
+    """Raised when a payment names a stream the user does not have (or is inactive)."""
+
+
+class StalePaymentError(ValueError):
+    """Raised when a payment is older than the rollup window (import it as history instead)."""
+
+
+@dataclass(slots=True)
+class Payment:
+    """A payment received by one of a user's streams."""
+
+    user_id: str
+    stream_id: str
+    amount: float
+    paid_at: float  # epoch seconds
+    customer_id: str | None = None
+
+
+class _Series:
+    """Monthly revenue and customers for the last ROLLUP_MONTHS months, newest last."""
+
+    __slots__ = ("last_month", "revenue", "customers")
+
+    def __init__(self, last_month: int, revenue=None, customers=None):
+        self.last_month = last_month
+        self.revenue = deque(revenue or [0.0] * ROLLUP_MONTHS, maxlen=ROLLUP_MONTHS)
+        self.customers = deque(customers or [0] * ROLLUP_MONTHS, maxlen=ROLLUP_MONTHS)
+
+    def advance(self, month: int) -> bool:
+        """Move the window forward so `month` is the newest slot.
+
+        Returns:
+            Whether the newest month changed
+        """
+        steps = month - self.last_month
+        if steps <= 0:
+            return False
+        for _ in range(min(steps, ROLLUP_MONTHS)):
+            self.revenue.append(0.0)
+            self.customers.append(0)
+        self.last_month = month
+        return True
+
+    def slot(self, month: int) -> int:
+        """Index of `month` in the window.
+
+        Raises:
+            StalePaymentError: If the month has left the window
+        """
+        offset = self.last_month - month
+        if offset >= ROLLUP_MONTHS:
+            raise StalePaymentError(f"{month_start(month):%Y-%m} is outside the rollup window")
+        return ROLLUP_MONTHS - 1 - offset
+
+    def snapshot(self) -> dict:
+        return {
+            "month": f"{month_start(self.last_month):%Y-%m}",
+            "revenue": [round(value, 2) for value in self.revenue],
+            "customers": list(self.customers),
+        }
+
+
+@dataclass(slots=True)
+class StreamRollup:
+    stream: RevenueStreamRecord
+    series: _Series
+    month_customers: set[str] = field(default_factory=set)  # counted this month
+
+
+@dataclass(slots=True)
+class UserRollup:
+    series: _Series
+    streams: dict[str, StreamRollup]
+    last_payment_at: float | None = None
+
+    def advance(self, month: int) -> None:
+        self.series.advance(month)
+        for rollup in self.streams.values():
+            if rollup.series.advance(month):
+                rollup.month_customers.clear()
+
+
+class RevenueRollups:
+    """Per-user and per-stream revenue rollups, updated on payment ingest."""
+
+    def __init__(self, store: RevenueStore, max_users: int = 10_000):
+        self.store = store
+        self.max_users = max_users
+        self._users: OrderedDict[str, UserRollup] = OrderedDict()
+        self._loading: dict[str, asyncio.Task] = {}
+        self.builds = 0
+        self.payments = 0
+
+    async def get(self, user_id: str) -> UserRollup:
+        """Get a user's rollups, building them from the store if not cached."""
+        rollup = self._users.get(user_id)
+        if rollup is not None:
+            self._users.move_to_end(user_id)
+            return rollup
+        task = self._loading.get(user_id)
+        if task is None:  # concurrent first reads share one build
+            task = asyncio.ensure_future(self._build(user_id))
+            self._loading[user_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(user_id, None))
+        return await asyncio.shield(task)
+
+    async def rebuild(self, user_id: str) -> UserRollup:
+        """Discard a user's rollups and build them again from the store."""
+        self._users.pop(user_id, None)
+        return await self.get(user_id)
+
+    async def _build(self, user_id: str) -> UserRollup:
+        streams, entries = await asyncio.gather(
+            self.store.streams(user_id), self.store.entries(user_id)
+        )
+        history = RevenueHistory.from_entries(streams, entries)
+        last = history.first_month + history.revenue.shape[1] - 1
+        # Pad to the window length, then keep its newest ROLLUP_MONTHS columns.
+        revenue = np.pad(history.revenue, ((0, 0), (ROLLUP_MONTHS, 0)))[:, -ROLLUP_MONTHS:]
+        customers = np.pad(history.customers, ((0, 0), (ROLLUP_MONTHS, 0)))[:, -ROLLUP_MONTHS:]
+
+        rollup = UserRollup(
+            series=_Series(last, revenue.sum(axis=0).tolist(), customers.sum(axis=0).tolist()),
+            streams={
+                stream.id: StreamRollup(
+                    stream, _Series(last, revenue[row].tolist(), customers[row].tolist())
+                )
+                for row, stream in enumerate(history.streams)
+            },
+            last_payment_at=max(
+                (s.last_payment_at for s in history.streams if s.last_payment_at), default=None
+            ),
+        )
+        self.builds += 1
+        self._users[user_id] = rollup
+        if len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return rollup
+
+    async def ingest(self, payment: Payment) -> StreamRollup:
+        """Add a payment to the rollups and write its history row through.
+
+        Raises:
+            UnknownStreamError: If the user has no active stream with the payment's ID
+            StalePaymentError: If the payment is older than the rollup window
+        """
+        user = await self.get(payment.user_id)
+        stream = user.streams.get(payment.stream_id)
+        if stream is None:
+            raise UnknownStreamError(f"Unknown revenue stream '{payment.stream_id}'")
+
+        now = month_index(current_month())
+        month = min(month_index(datetime.fromtimestamp(payment.paid_at, UTC).date()), now)
+        user.advance(now)
+        slot = stream.series.slot(month)
+
+        stream.series.revenue[slot] += payment.amount
+        user.series.revenue[slot] += payment.amount
+        if (
+            payment.customer_id is not None
+            and month == stream.series.last_month
+            and payment.customer_id not in stream.month_customers
+        ):
+            stream.month_customers.add(payment.customer_id)
+            stream.series.customers[slot] += 1
+            user.series.customers[slot] += 1
+        if stream.stream.last_payment_at is None or payment.paid_at > stream.stream.last_payment_at:
+            stream.stream.last_payment_at = payment.paid_at
+            user.last_payment_at = max(user.last_payment_at or 0.0, payment.paid_at)
+            await self.store.save_stream(stream.stream)
+        self.payments += 1
+
+        entry = RevenueEntry(
+            stream_id=payment.stream_id,
+            month=month_start(month),
+            revenue=round(stream.series.revenue[slot], 2),
+            customers=stream.series.customers[slot],
+        )
+        await self.store.upsert_entries(payment.user_id, [entry])
+        return stream
+
+    async def history(self, user_id: str, as_of: date | None = None) -> RevenueHistory:
+        """A user's last ROLLUP_MONTHS months of revenue as (stream, month) matrices."""
+        user = await self.get(user_id)
+        user.advance(month_index(as_of or current_month()))
+        streams = list(user.streams.values())
+        shape = (len(streams), ROLLUP_MONTHS)
+        return RevenueHistory(
+            streams=[rollup.stream for rollup in streams],
+            first_month=user.series.last_month - ROLLUP_MONTHS + 1,
+            revenue=np.array([rollup.series.revenue for rollup in streams]).reshape(shape),
+            customers=np.array(
+                [rollup.series.customers for rollup in streams], dtype=np.int64
+            ).reshape(shape),
+        )
+
+    async def agent_context(self, user_id: str) -> str:
+        """Summarize a user's revenue for the revenue agent's prompt."""
+        overview = compute_overview(await self.history(user_id))
+        if not overview.streams:
+            return "The user has not added any revenue streams yet."
+        trailing = sum((await self.get(user_id)).series.revenue)
+        lines = [
+            f"Revenue this month: ${overview.total_monthly_revenue:,.2f} "
+            f"({overview.monthly_growth_percent:+.1f}% vs last month); "
+            f"last {ROLLUP_MONTHS} months: ${trailing:,.2f}; "
+            f"customers this month: {overview.total_customers}.",
+            "Streams:",
+        ]
+        for stream in overview.streams:
+            sign = "-" if stream.trend == "down" else "+"
+            lines.append(
+                f"- {stream.name} ({stream.type}): ${stream.monthly_revenue:,.2f}/month, "
+                f"{sign}{stream.trend_percent:.1f}% vs last month, {stream.customers} customers"
+            )
+        return "\n".join(lines)
+
+    def snapshot(self, user_id: str) -> dict | None:
+        """Plain-data copy of a user's cached rollups (None if not cached)."""
+        user = self._users.get(user_id)
+        if user is None:
+            return None
+        return {
+            **user.series.snapshot(),
+            "last_payment_at": user.last_payment_at,
+            "streams": {
+                stream_id: {
+                    **rollup.series.snapshot(),
+                    "last_payment_at": rollup.stream.last_payment_at,
+                }
+                for stream_id, rollup in user.streams.items()
+            },
+        }
+
+    def stats(self) -> dict:
+        return {"users": len(self._users), "builds": self.builds, "payments": self.payments}
+
+    def clear(self) -> None:
+        self._users.clear()
+        self.builds = self.payments = 0
@@ -0,0 +1,242 @@
+"""Revenue store — a user's income streams and their monthly history.
+
+The memory store backs development and tests, and is seeded with a year of
+demo history for the demo user so the dashboard has something to show.
+The Supabase store reads and writes the `revenue_streams` and
+`revenue_history` tables.
+"""
+
+import asyncio
+import time
+from datetime import UTC, date, datetime
+from typing import Protocol
+
+from app.models.revenue import RevenueEntry, RevenueStreamRecord
+from app.services.revenue_analytics import current_month, month_index, month_start
+
+
+class RevenueStore(Protocol):
+    """Persistence for revenue streams and history."""
+
+    async def streams(self, user_id: str) -> list[RevenueStreamRecord]: ...
+
+    async def entries(self, user_id: str) -> list[RevenueEntry]:
+        """Every history row of the user's streams."""
+        ...
+
+    async def save_stream(self, stream: RevenueStreamRecord) -> None: ...
+
+    async def user_ids(self) -> list[str]:
+        """Every user with a revenue stream (for batch jobs)."""
+        ...
+
+    async def upsert_entries(self, user_id: str, entries: list[RevenueEntry]) -> None:
+        """Insert history rows, replacing rows of the same (stream, month)."""
+        ...
+
+
+class MemoryRevenueStore:
+    """Store that keeps revenue in memory (development and tests)."""
+
+    def __init__(self):
+        self._streams: dict[str, dict[str, RevenueStreamRecord]] = {}
+        self._entries: dict[str, dict[tuple[str, date], RevenueEntry]] = {}
+
+    async def streams(self, user_id: str) -> list[RevenueStreamRecord]:
+        return list(self._streams.get(user_id, {}).values())
+
+    async def entries(self, user_id: str) -> list[RevenueEntry]:
+        return list(self._entries.get(user_id, {}).values())
+
+    async def save_stream(self, stream: RevenueStreamRecord) -> None:
+        self._streams.setdefault(stream.user_id, {})[stream.id] = stream
+
+    async def user_ids(self) -> list[str]:
+        return [user_id for user_id, streams in self._streams.items() if streams]
+
+    async def upsert_entries(self, user_id: str, entries: list[RevenueEntry]) -> None:
+        rows = self._entries.setdefault(user_id, {})
+        for entry in entries:
+            rows[entry.stream_id, entry.month] = entry
+
+    def clear(self) -> None:
+        self._streams.clear()
+        self._entries.clear()
+
+
+# name, type, platform, revenue this month, change since last month, customers,
+# monthly trend of the months before
+_DEMO_STREAMS = [
+    ("Freelance Design", "Services", "Direct", 2400.0, 0.12, 3, 0.06),
+    ("Consulting", "Services", "Calendly", 1200.0, -0.05, 2, -0.05),
+    ("Online Course", "Digital Products", "Gumroad", 890.0, 0.45, 42, 0.06),
+    ("Template Shop", "Digital Products", "Gumroad", 340.0, 0.28, 18, 0.06),
+]
+
+
+def seed_demo_revenue(store: MemoryRevenueStore, user_id: str, as_of: date | None = None) -> None:
+    """Give `user_id` four streams with twelve months of history ending at `as_of`.
+
+    Each stream ends at its current revenue with its month-over-month change,
+    and follows a steady trend before that (one stream declines, so the
+    demo has insights to show).
+    """
+    last = month_index(as_of or current_month())
+    month_end = datetime.combine(month_start(last + 1), datetime.min.time(), UTC).timestamp()
+    paid_at = min(time.time(), month_end)
+    for n, (name, type_, platform, revenue, change, customers, trend) in enumerate(
+        _DEMO_STREAMS, 1
+    ):
+        stream_id = f"demo-stream-{n}"
+        store._streams.setdefault(user_id, {})[stream_id] = RevenueStreamRecord(
+            id=stream_id,
+            user_id=user_id,
+            name=name,
+            type=type_,
+            platform=platform,
+            last_payment_at=paid_at - 86_400 * n,
+        )
+        rows = store._entries.setdefault(user_id, {})
+        amount = revenue / (1 + change)
+        for month in range(last - 1, last - 12, -1):  # walk back from last month
+            rows[stream_id, month_start(month)] = RevenueEntry(
+                stream_id, month_start(month), round(amount, 2), max(1, round(customers * 0.9))
+            )
+            amount /= 1 + trend
+        rows[stream_id, month_start(last)] = RevenueEntry(
+            stream_id, month_start(last), revenue, customers
+        )
+
+
+def _timestamp(value: float | None) -> str | None:
+    return datetime.fromtimestamp(value, UTC).isoformat() if value is not None else None
+
+
+class SupabaseRevenueStore:
+    """Store backed by the `revenue_streams` and `revenue_history` tables."""
+
+    BATCH_SIZE = 1_000
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self._client = create_client(url, key)
+
+    async def streams(self, user_id: str) -> list[RevenueStreamRecord]:
+        def query():
+            return (
+                self._client.table("revenue_streams")
+                .select("id, user_id, name, type, platform, last_payment_date, is_active")
+                .eq("user_id", user_id)
+                .execute()
+            )
+
+        rows = (await asyncio.to_thread(query)).data
+        return [
+            RevenueStreamRecord(
+                id=row["id"],
+                user_id=row["user_id"],
+                name=row["name"],
+                type=row["type"],
+                platform=row["platform"],
+                last_payment_at=(
+                    datetime.fromisoformat(row["last_payment_date"]).timestamp()
+                    if row["last_payment_date"]
+                    else None
+                ),
+                is_active=row["is_active"],
+            )
+            for row in rows
+        ]
+
+    async def entries(self, user_id: str) -> list[RevenueEntry]:
+        def query():
+            # Responses are capped at the server's max-rows: page through the
+            # history in (stream, month) order, each page after the last row seen.
+            rows, last = [], None
+            while True:
+                request = (
+                    self._client.table("revenue_history")
+                    .select("stream_id, month, revenue, customers")
+                    .eq("user_id", user_id)
+                    .order("stream_id")
+                    .order("month")
+                    .limit(self.BATCH_SIZE)
+                )
+                if last is not None:
+                    stream, month = last["stream_id"], last["month"]
+                    request = request.or_(
+                        f"stream_id.gt.{stream},and(stream_id.eq.{stream},month.gt.{month})"
+                    )
+                batch = request.execute().data
+                rows.extend(batch)
+                if len(batch) < self.BATCH_SIZE:
+                    return rows
+                last = batch[-1]
+
+        rows = await asyncio.to_thread(query)
+        return [
+            RevenueEntry(
+                stream_id=row["stream_id"],
+                month=date.fromisoformat(row["month"]),
+                revenue=float(row["revenue"]),
+                customers=row["customers"] or 0,
+            )
+            for row in rows
+        ]
+
+    async def save_stream(self, stream: RevenueStreamRecord) -> None:
+        row = {
+            "id": stream.id,
+            "user_id": stream.user_id,
+            "name": stream.name,
+            "type": stream.type,
+            "platform": stream.platform,
+            "last_payment_date": _timestamp(stream.last_payment_at),
+            "is_active": stream.is_active,
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+        await asyncio.to_thread(lambda: self._client.table("revenue_streams").upsert(row).execute())
+
+    async def user_ids(self) -> list[str]:
+        def query():
+            # PostgREST has no DISTINCT: page through streams by owner, and
+            # start each page after the last owner seen, skipping their other streams.
+            user_ids, last_id = [], None
+            while True:
+                request = (
+                    self._client.table("revenue_streams")
+                    .select("user_id")
+                    .order("user_id")
+                    .limit(self.BATCH_SIZE)
+                )
+                if last_id is not None:
+                    request = request.gt("user_id", last_id)
+                batch = request.execute().data
+                for row in batch:
+                    if not user_ids or user_ids[-1] != row["user_id"]:
+                        user_ids.append(row["user_id"])
+                if len(batch) < self.BATCH_SIZE:
+                    return user_ids
+                last_id = batch[-1]["user_id"]
+
+        return await asyncio.to_thread(query)
+
+    async def upsert_entries(self, user_id: str, entries: list[RevenueEntry]) -> None:
+        rows = [
+            {
+                "user_id": user_id,
+                "stream_id": entry.stream_id,
+                "month": entry.month.isoformat(),
+                "revenue": entry.revenue,
+                "customers": entry.customers,
+            }
+            for entry in entries
+        ]
+
+        def persist():
+            self._client.table("revenue_history").upsert(
+                rows, on_conflict="stream_id,month"
+            ).execute()
+
+        await asyncio.to_thread(persist)
@@ -0,0 +1,116 @@
+"""Semantic cache — serves stored answers to paraphrased questions.
+
+Embeddings of recently answered messages are kept in a preallocated NumPy
+matrix. A lookup is one brute-force matrix-vector product over at most
+`max_entries` rows, which stays well under a millisecond at the sizes used
+here; no approximate index is needed.
+"""
+
+import time
+from collections.abc import Callable, Sequence
+
+import numpy as np
+
+
+class SemanticCache:
+    """Fixed-capacity embedding-similarity cache, partitioned by agent type.
+
+    When full, an expired entry is overwritten if there is one, otherwise the
+    least recently used.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._vectors: np.ndarray | None = None  # allocated once the dimension is known
+        self._answers: list[str] = []
+        self._agent_codes = np.full(max_entries, -1, dtype=np.int16)
+        self._expires_at = np.zeros(max_entries)
+        self._last_used = np.zeros(max_entries)
+        self._codes: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def lookup(self, agent_type: str, embedding: Sequence[float], threshold: float) -> str | None:
+        """Return the stored answer most similar to `embedding`, if similar enough.
+
+        Args:
+            agent_type: Agent whose answers may be served
+            embedding: Embedding of the incoming message
+            threshold: Minimum cosine similarity for a hit
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        code = self._codes.get(agent_type)
+        size = len(self._answers)
+        if code is None or self._vectors is None or size == 0:
+            self.misses += 1
+            return None
+
+        now = self._clock()
+        similarities = self._vectors[:size] @ _normalize(embedding)
+        eligible = (self._agent_codes[:size] == code) & (self._expires_at[:size] > now)
+        similarities[~eligible] = -1.0
+
+        best = int(np.argmax(similarities))
+        if similarities[best] < threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._last_used[best] = now
+        return self._answers[best]
+
+    def store(self, agent_type: str, embedding: Sequence[float], answer: str) -> None:
+        """Remember an answer under the embedding of the message it answered."""
+        vector = _normalize(embedding)
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        code = self._codes.setdefault(agent_type, len(self._codes))
+
+        now = self._clock()
+        size = len(self._answers)
+        if size < self.max_entries:
+            slot = size
+            self._answers.append(answer)
+        else:
+            expired = np.flatnonzero(self._expires_at <= now)
+            slot = int(expired[0]) if expired.size else int(np.argmin(self._last_used))
+            self._answers[slot] = answer
+            self.evictions += 1
+
+        self._vectors[slot] = vector
+        self._agent_codes[slot] = code
+        self._expires_at[slot] = now + self.ttl
+        self._last_used[slot] = now
+
+    def clear(self) -> None:
+        self._answers.clear()
+        self._agent_codes.fill(-1)
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._answers),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def _normalize(embedding: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,249 @@
+"""Skill index — nearest-neighbour lookup of users with similar skill profiles.
+
+Each user's latest diagnosis is stored as one unit-length embedding (see
+`profile_vector`), so "profiles like yours" is a top-k cosine search.
+
+The local index answers a search with one brute-force matrix-vector product
+and a partial sort; at the configured embedding size that is about a
+millisecond per ten thousand profiles, so no approximate index is needed.
+With a path, vectors are also written to a float16 `.npy` file that is
+memory-mapped rather than rebuilt: a restart reads it back in one cast
+instead of re-embedding every profile. Searches run on a float32 copy,
+because NumPy has no fast float16 matrix product. The pgvector index keeps
+the vectors in the `skill_profile_vectors` table behind the same interface.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+
+
+@dataclass(frozen=True, slots=True)
+class SimilarProfile:
+    """A user whose skill profile is close to the queried one."""
+
+    user_id: str
+    similarity: float  # cosine similarity, 1.0 = same direction
+
+
+class SkillIndex(Protocol):
+    """Storage and similarity search for skill profile embeddings."""
+
+    async def upsert(self, user_id: str, vector: np.ndarray) -> None:
+        """Store a user's profile vector, replacing their previous one."""
+        ...
+
+    async def get(self, user_id: str) -> np.ndarray | None: ...
+
+    async def search(
+        self, vector: np.ndarray, k: int, exclude_user_id: str | None = None
+    ) -> list[SimilarProfile]:
+        """Find the `k` profiles most similar to `vector`, most similar first."""
+        ...
+
+
+def profile_handle(user_id: str, secret: str) -> str:
+    """Opaque, stable handle of a user, so matches can be shown without their user ID."""
+    return hmac.new(secret.encode(), user_id.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def load_handle_secret(path: str | os.PathLike | None) -> str:
+    """The handle secret kept in `path` (created on first use), or a new one without a path.
+
+    Without a path the secret lasts as long as the process, like the
+    in-memory index itself.
+    """
+    if path is None:
+        return secrets.token_hex(32)
+    key_file = Path(path) / "handle.key"
+    try:
+        return key_file.read_text().strip()
+    except FileNotFoundError:
+        key_file.parent.mkdir(parents=True, exist_ok=True)
+        secret = secrets.token_hex(32)
+        fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secret)
+        return secret
+
+
+def profile_vector(skill_vectors: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Combine a profile's skill embeddings into one unit-length vector.
+
+    Args:
+        skill_vectors: One embedding per skill, shape (skills, dimensions)
+        weights: Weight of each skill, e.g. its proficiency
+
+    Returns:
+        The normalized weighted mean of the skill directions
+    """
+    vectors = np.asarray(skill_vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    weights = np.asarray(weights, dtype=np.float32)
+    combined = (weights if weights.sum() > 0 else np.ones_like(weights)) @ vectors
+    return combined / max(float(np.linalg.norm(combined)), 1e-12)
+
+
+class LocalSkillIndex:
+    """In-process index, optionally persisted to a memory-mapped file.
+
+    The files under `path` are `vectors.npy` (float16, one row per user,
+    preallocated in doubling steps) and `users.txt` (the user of each row,
+    one per line, appended as users are added). They are owned by a single
+    process: each process keeps its own row assignments, so several
+    processes sharing a path would overwrite each other's rows. Run one
+    worker, or use the pgvector index, when serving from several processes.
+    """
+
+    INITIAL_CAPACITY = 1_024
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        self._dir = Path(path) if path else None
+        self._user_ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        # float32 search copy, allocated once the dimension is known
+        self._vectors: np.ndarray | None = None
+        self._file: np.memmap | None = None
+        if self._dir is not None and (self._dir / "users.txt").exists():
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def _open(self) -> None:
+        self._user_ids = (self._dir / "users.txt").read_text().splitlines()
+        self._rows = {user_id: row for row, user_id in enumerate(self._user_ids)}
+        self._file = np.lib.format.open_memmap(self._dir / "vectors.npy", mode="r+")
+        self._vectors = np.zeros(self._file.shape, dtype=np.float32)
+        self._vectors[: len(self)] = self._file[: len(self)]
+
+    async def upsert(self, user_id: str, vector: np.ndarray) -> None:
+        vector = np.asarray(vector, dtype=np.float32)
+        if self._vectors is None:
+            self._allocate(self.INITIAL_CAPACITY, vector.shape[0])
+        row = self._rows.get(user_id)
+        if row is None:
+            row = len(self._user_ids)
+            if row == self._vectors.shape[0]:
+                self._allocate(2 * row, vector.shape[0])
+        self._vectors[row] = vector
+        if self._file is not None:
+            self._file[row] = vector
+        if user_id not in self._rows:
+            # The vector is written before its row is claimed, so a crash in
+            # between leaves no user pointing at an empty row.
+            self._rows[user_id] = row
+            self._user_ids.append(user_id)
+            if self._dir is not None:
+                with open(self._dir / "users.txt", "a") as users:
+                    users.write(user_id + "\n")
+
+    def _allocate(self, capacity: int, dimensions: int) -> None:
+        """Grow the search matrix (and the file) to `capacity` rows."""
+        size = len(self._user_ids)
+        vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        if self._vectors is not None:
+            vectors[:size] = self._vectors[:size]
+        self._vectors = vectors
+        if self._dir is None:
+            return
+        self._dir.mkdir(parents=True, exist_ok=True)
+        staging = self._dir / "vectors.npy.tmp"
+        grown = np.lib.format.open_memmap(
+            staging, mode="w+", dtype=np.float16, shape=(capacity, dimensions)
+        )
+        grown[:size] = vectors[:size]
+        grown.flush()
+        del grown
+        os.replace(staging, self._dir / "vectors.npy")
+        self._file = np.lib.format.open_memmap(self._dir / "vectors.npy", mode="r+")
+
+    async def get(self, user_id: str) -> np.ndarray | None:
+        row = self._rows.get(user_id)
+        return None if row is None else self._vectors[row].copy()
+
+    async def search(
+        self, vector: np.ndarray, k: int, exclude_user_id: str | None = None
+    ) -> list[SimilarProfile]:
+        size = len(self._user_ids)
+        if size == 0 or k <= 0:
+            return []
+        scores = self._vectors[:size] @ np.asarray(vector, dtype=np.float32)
+        excluded = self._rows.get(exclude_user_id) if exclude_user_id is not None else None
+        if excluded is not None:
+            scores[excluded] = -np.inf
+        k = min(k, size)
+        top = np.argpartition(-scores, k - 1)[:k] if k < size else np.arange(size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            SimilarProfile(self._user_ids[row], float(scores[row]))
+            for row in top.tolist()
+            if row != excluded
+        ]
+
+    def flush(self) -> None:
+        """Write pending vector pages to disk."""
+        if self._file is not None:
+            self._file.flush()
+
+    def clear(self) -> None:
+        self._user_ids.clear()
+        self._rows.clear()
+
+
+class PgvectorSkillIndex:
+    """Index backed by the `skill_profile_vectors` table and its HNSW index."""
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self._client = create_client(url, key)
+
+    async def upsert(self, user_id: str, vector: np.ndarray) -> None:
+        row = {"user_id": user_id, "embedding": _to_pgvector(vector)}
+
+        def persist():
+            self._client.table("skill_profile_vectors").upsert(row, on_conflict="user_id").execute()
+
+        await asyncio.to_thread(persist)
+
+    async def get(self, user_id: str) -> np.ndarray | None:
+        def query():
+            return (
+                self._client.table("skill_profile_vectors")
+                .select("embedding")
+                .eq("user_id", user_id)
+                .limit(1)
+                .execute()
+            )
+
+        rows = (await asyncio.to_thread(query)).data
+        if not rows:
+            return None
+        return np.array(rows[0]["embedding"].strip("[]").split(","), dtype=np.float32)
+
+    async def search(
+        self, vector: np.ndarray, k: int, exclude_user_id: str | None = None
+    ) -> list[SimilarProfile]:
+        params = {
+            "query_embedding": _to_pgvector(vector),
+            "match_count": k,
+            "exclude_user_id": exclude_user_id,
+        }
+
+        def query():
+            return self._client.rpc("match_skill_profiles", params).execute()
+
+        rows = (await asyncio.to_thread(query)).data or []
+        return [SimilarProfile(row["user_id"], float(row["similarity"])) for row in rows]
+
+
+def _to_pgvector(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.6g}" for value in np.asarray(vector).tolist()) + "]"
@@ -0,0 +1,112 @@
+"""Skill profile store — each user's skills from their latest diagnosis.
+
+Monetization path matching reads the saved profile instead of diagnosing
+again. The memory store backs development and tests; the Supabase store
+keeps one `skill_profiles` row per skill.
+"""
+
+import asyncio
+from typing import Protocol
+
+from app.schemas.skills import SkillProfile
+
+DEMO_SKILLS = [
+    SkillProfile(
+        name="UI/UX Design",
+        category="Design",
+        proficiency_level=85,
+        monetization_potential=92,
+        demand_score=88,
+        suggested_paths=["Freelance consulting", "Course creation", "Template shop"],
+    ),
+    SkillProfile(
+        name="React Development",
+        category="Engineering",
+        proficiency_level=78,
+        monetization_potential=95,
+        demand_score=94,
+        suggested_paths=["SaaS products", "Freelance development", "Technical writing"],
+    ),
+    SkillProfile(
+        name="Content Writing",
+        category="Marketing",
+        proficiency_level=72,
+        monetization_potential=75,
+        demand_score=82,
+        suggested_paths=["Blog monetization", "Copywriting services", "Newsletter"],
+    ),
+]
+
+
+class SkillProfileStore(Protocol):
+    """Persistence for users' diagnosed skills."""
+
+    async def get(self, user_id: str) -> list[SkillProfile]:
+        """The user's skills, or an empty list before their first diagnosis."""
+        ...
+
+    async def save(self, user_id: str, skills: list[SkillProfile]) -> None:
+        """Replace the user's skills with a new diagnosis."""
+        ...
+
+
+class MemorySkillProfileStore:
+    """Store that keeps profiles in memory (development and tests)."""
+
+    def __init__(self):
+        self._skills: dict[str, list[SkillProfile]] = {}
+
+    async def get(self, user_id: str) -> list[SkillProfile]:
+        return list(self._skills.get(user_id, []))
+
+    async def save(self, user_id: str, skills: list[SkillProfile]) -> None:
+        self.put(user_id, skills)
+
+    def put(self, user_id: str, skills: list[SkillProfile]) -> None:
+        """Replace a user's skills without awaiting (e.g. to seed demo data)."""
+        self._skills[user_id] = list(skills)
+
+
+class SupabaseSkillProfileStore:
+    """Store backed by the `skill_profiles` table."""
+
+    _COLUMNS = (
+        "name",
+        "category",
+        "proficiency_level",
+        "monetization_potential",
+        "demand_score",
+        "suggested_paths",
+    )
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self._client = create_client(url, key)
+
+    async def get(self, user_id: str) -> list[SkillProfile]:
+        def query():
+            return (
+                self._client.table("skill_profiles")
+                .select(", ".join(self._COLUMNS))
+                .eq("user_id", user_id)
+                .order("monetization_potential", desc=True)
+                .execute()
+            )
+
+        rows = (await asyncio.to_thread(query)).data
+        return [
+            SkillProfile(**{**row, "suggested_paths": row["suggested_paths"] or []}) for row in rows
+        ]
+
+    async def save(self, user_id: str, skills: list[SkillProfile]) -> None:
+        rows = [
+            {"user_id": user_id, **skill.model_dump(include=set(self._COLUMNS))} for skill in skills
+        ]
+
+        def persist():
+            self._client.table("skill_profiles").delete().eq("user_id", user_id).execute()
+            if rows:
+                self._client.table("skill_profiles").insert(rows).execute()
+
+        await asyncio.to_thread(persist)
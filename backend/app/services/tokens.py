@@ -0,0 +1,110 @@
+"""Local token counting for OpenAI chat prompts.
+
+Counts use the model's tiktoken encoding when it has been loaded at startup
+from TIKTOKEN_CACHE_DIR (see `load_encodings`) and fall back to a
+conservative character-based estimate otherwise. Encodings are never
+downloaded: tiktoken fetches missing BPE files on first use, which would
+block the event loop on a network call in the middle of a request.
+"""
+
+import hashlib
+import logging
+import os
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Tokens the chat format adds per message and to prime the reply
+MESSAGE_OVERHEAD_TOKENS = 3
+REPLY_OVERHEAD_TOKENS = 3
+
+DEFAULT_ENCODING = "o200k_base"
+# tiktoken caches each encoding file under the SHA-1 of the URL it is fetched from
+ENCODING_URL = "https://openaipublic.blob.core.windows.net/encodings/{name}.tiktoken"
+
+_encodings: dict = {}  # encoding name -> tiktoken.Encoding, filled by load_encodings
+
+
+@lru_cache
+def _encoding_name(model: str | None) -> str:
+    try:
+        from tiktoken.model import encoding_name_for_model
+    except ImportError:
+        return DEFAULT_ENCODING
+    try:
+        return encoding_name_for_model(model) if model else DEFAULT_ENCODING
+    except KeyError:
+        return DEFAULT_ENCODING
+
+
+def _encoding(model: str | None):
+    """Get the loaded tiktoken encoding for a model, or None to estimate instead."""
+    return _encodings.get(_encoding_name(model))
+
+
+def load_encodings(cache_dir: str, models: Iterable[str]) -> list[str]:
+    """Load the encodings of `models` from a directory of pre-downloaded tiktoken files.
+
+    Meant to run once at startup, off the event loop. Encodings whose file is
+    not in `cache_dir` are skipped (their counts are estimated) rather than
+    downloaded.
+
+    Returns:
+        The names of the encodings now available
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return []
+    for name in {_encoding_name(model) for model in models}:
+        if name in _encodings:
+            continue
+        key = hashlib.sha1(ENCODING_URL.format(name=name).encode()).hexdigest()
+        if not cache_dir or not (Path(cache_dir) / key).is_file():
+            logger.warning("tiktoken encoding %s is not in TIKTOKEN_CACHE_DIR; estimating", name)
+            continue
+        os.environ["TIKTOKEN_CACHE_DIR"] = cache_dir
+        try:
+            _encodings[name] = tiktoken.get_encoding(name)
+        except Exception:
+            logger.exception("Loading tiktoken encoding %s failed; estimating", name)
+    count_static_tokens.cache_clear()  # drop counts estimated before the load
+    return sorted(_encodings)
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Count the tokens of a text for a model (or the default encoding)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 2) // 3  # ~3 characters per token errs on the high side
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=512)
+def count_static_tokens(text: str, model: str) -> int:
+    """Count the tokens of a text that recurs across calls, such as an agent prompt."""
+    return count_tokens(text, model)
+
+
+def count_message_tokens(messages: list[dict], model: str) -> int:
+    """Count the prompt tokens of a chat completion request.
+
+    The first (agent) system message is counted through the static cache.
+    """
+    total = REPLY_OVERHEAD_TOKENS
+    for index, message in enumerate(messages):
+        static = index == 0 and message["role"] == "system"
+        counter = count_static_tokens if static else count_tokens
+        total += MESSAGE_OVERHEAD_TOKENS + counter(message["content"], model)
+    return total
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str | None = None) -> str:
+    """Cut a text down to at most `max_tokens` tokens, keeping its beginning."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 3]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
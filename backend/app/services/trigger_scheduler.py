@@ -0,0 +1,201 @@
+"""Trigger scheduler — fires time-based workflows when their schedule comes due.
+
+Next fire times live in a min-heap, so firing a workflow costs O(log n) no
+matter how many are scheduled, and nothing is scanned while idle: the loop
+sleeps until the earliest fire time (or until a new schedule is added).
+Removing or rescheduling a workflow bumps its version; stale heap entries
+are discarded when they surface.
+
+Due fires are handed to the `on_fire` callback with bounded concurrency;
+when all slots are busy the loop waits rather than dropping fires. A
+workflow registered with the time it last fired catches up: if fires were
+missed (e.g. while the process was down) it fires once right away, then
+resumes its regular schedule.
+
+Every process runs its own scheduler, so each fire comes due once per
+process; the callback claims it in the workflow repository, which lets
+exactly one of them run the workflow.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.services.triggers import Schedule
+
+logger = logging.getLogger(__name__)
+
+# (workflow_id, scheduled fire time) -> None
+FireCallback = Callable[[str, float], Awaitable[None]]
+
+
+class SimulatedClock:
+    """Manually advanced clock for tests and benchmarks."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@dataclass(slots=True)
+class _Entry:
+    schedule: Schedule
+    next_fire: float
+    version: int
+
+
+class TriggerScheduler:
+    """Min-heap of next fire times for scheduled workflows."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        clock: Callable[[], float] = time.time,
+        max_sleep: float = 60.0,
+    ):
+        self._clock = clock
+        self.max_concurrency = max_concurrency
+        self.max_sleep = max_sleep
+        self._heap: list[tuple[float, int, str]] = []
+        self._entries: dict[str, _Entry] = {}
+        self._versions = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._loop_task: asyncio.Task | None = None
+        self._fires: set[asyncio.Task] = set()
+        self.fired = 0
+        self.caught_up = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self, workflow_id: str, schedule: Schedule, last_fired_at: float | None = None
+    ) -> float:
+        """Schedule a workflow, replacing any schedule it already has.
+
+        Args:
+            workflow_id: Workflow to fire
+            schedule: When to fire it
+            last_fired_at: When it last fired, if ever; a fire missed since
+                then is caught up immediately
+
+        Returns:
+            The workflow's next fire time
+        """
+        now = self._clock()
+        next_fire = schedule.next_after(last_fired_at if last_fired_at is not None else now)
+        entry = _Entry(schedule, next_fire, next(self._versions))
+        self._entries[workflow_id] = entry
+        heapq.heappush(self._heap, (next_fire, entry.version, workflow_id))
+        if self._heap[0][1] == entry.version:
+            self._wakeup.set()  # new earliest fire time
+        return next_fire
+
+    def remove(self, workflow_id: str) -> None:
+        """Stop firing a workflow (its heap entry is dropped lazily)."""
+        self._entries.pop(workflow_id, None)
+
+    def next_fire(self, workflow_id: str) -> float | None:
+        entry = self._entries.get(workflow_id)
+        return entry.next_fire if entry else None
+
+    def due(self, now: float | None = None) -> list[tuple[str, float]]:
+        """Pop every fire due at `now` and reschedule each workflow.
+
+        Returns:
+            (workflow_id, scheduled fire time) pairs, earliest first
+        """
+        now = self._clock() if now is None else now
+        fires = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            fire_time, version, workflow_id = heapq.heappop(heap)
+            entry = self._entries.get(workflow_id)
+            if entry is None or entry.version != version:
+                continue  # removed or rescheduled since this entry was pushed
+            fires.append((workflow_id, fire_time))
+
+            next_fire = entry.schedule.next_after(fire_time)
+            if next_fire <= now:  # behind schedule: skip to the next future fire
+                self.caught_up += 1
+                next_fire = entry.schedule.next_after(now)
+            entry.next_fire = next_fire
+            heapq.heappush(heap, (next_fire, version, workflow_id))
+        self._compact()
+        return fires
+
+    def _compact(self) -> None:
+        """Rebuild the heap once stale entries outnumber live ones."""
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                (entry.next_fire, entry.version, workflow_id)
+                for workflow_id, entry in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def start(self, on_fire: FireCallback) -> None:
+        """Start firing due workflows in the background."""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run(on_fire))
+
+    async def stop(self) -> None:
+        """Stop the loop and wait for fires already handed off."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._loop_task
+            self._loop_task = None
+        if self._fires:
+            await asyncio.gather(*self._fires, return_exceptions=True)
+
+    async def _run(self, on_fire: FireCallback) -> None:
+        while True:
+            for workflow_id, fire_time in self.due():
+                await self._slots.acquire()  # backpressure instead of dropping fires
+                task = asyncio.create_task(self._fire(on_fire, workflow_id, fire_time))
+                self._fires.add(task)
+                task.add_done_callback(self._fires.discard)
+
+            self._wakeup.clear()
+            delay = self.max_sleep
+            if self._heap:
+                delay = min(delay, max(0.0, self._heap[0][0] - self._clock()))
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+
+    async def _fire(self, on_fire: FireCallback, workflow_id: str, fire_time: float) -> None:
+        try:
+            await on_fire(workflow_id, fire_time)
+            self.fired += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Firing scheduled workflow %s failed", workflow_id)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": len(self._entries),
+            "heap_size": len(self._heap),
+            "in_flight": len(self._fires),
+            "fired": self.fired,
+            "caught_up": self.caught_up,
+            "failed": self.failed,
+        }
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._entries.clear()
+        self.fired = self.caught_up = self.failed = 0
@@ -0,0 +1,226 @@
+"""Workflow trigger parsing.
+
+Turns a workflow's free-text `trigger` into a compact schedule the
+scheduler can evaluate cheaply:
+
+- cron expressions ("0 9 * * 0") and macros ("@daily")
+- intervals ("every 15 minutes", "hourly")
+- weekly/daily phrases ("Every Sunday 9:00 AM", "every weekday at 17:30")
+
+Any other trigger names an event ("Gumroad sale webhook"); `event_type`
+normalizes it to the key events are dispatched by ("gumroad_sale").
+
+A cron schedule is five bitmasks, so checking a field is one bit test and
+finding the next matching minute within an hour is one bit scan. All times
+are UTC epoch seconds.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+_MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_DAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_UNIT_SECONDS = {"minute": 60, "hour": 3600, "day": 86_400, "week": 604_800}
+
+_INTERVAL = re.compile(r"^every\s+(?:(\d+)\s+)?(minute|hour|day|week)s?$")
+_ADVERB = {"hourly": 3600, "daily": 86_400, "weekly": 604_800}
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_EVENT_SUFFIXES = ("_webhook", "_event_trigger", "_trigger")
+_AT_TIME = re.compile(
+    r"^every\s+(day|weekday|weekend|(?:sun|mon|tue|wed|thu|fri|sat)[a-z]*?)s?"
+    r"(?:\s+at)?\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)?$"
+)
+
+
+class TriggerParseError(ValueError):
+    """Raised when a trigger looks like a schedule but cannot be parsed."""
+
+
+@dataclass(frozen=True, slots=True)
+class CronSchedule:
+    """Cron schedule as bitmasks (bit n set = value n matches)."""
+
+    minutes: int
+    hours: int
+    days: int  # bits 1-31
+    months: int  # bits 1-12
+    weekdays: int  # bits 0-6, Sunday = 0
+    any_day: bool
+    any_weekday: bool
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = (self.days >> dt.day) & 1
+        weekday_ok = (self.weekdays >> ((dt.weekday() + 1) % 7)) & 1
+        if self.any_day or self.any_weekday:
+            return bool(day_ok and weekday_ok)
+        return bool(day_ok or weekday_ok)  # cron: either restricted field may match
+
+    def next_after(self, timestamp: float) -> float:
+        """First fire time strictly after `timestamp`."""
+        dt = datetime.fromtimestamp(timestamp, UTC).replace(second=0, microsecond=0)
+        dt += timedelta(minutes=1)
+        limit = dt.year + 8  # covers Feb 29 and any other satisfiable schedule
+        while dt.year <= limit:
+            if not (self.months >> dt.month) & 1:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if not (self.hours >> dt.hour) & 1:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            rest = self.minutes >> dt.minute
+            if not rest:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            return dt.replace(minute=dt.minute + (rest & -rest).bit_length() - 1).timestamp()
+        raise TriggerParseError("Schedule never fires")
+
+
+@dataclass(frozen=True, slots=True)
+class IntervalSchedule:
+    """Fixed-interval schedule, aligned to multiples of `seconds` since the epoch."""
+
+    seconds: int
+
+    def next_after(self, timestamp: float) -> float:
+        """First fire time strictly after `timestamp`."""
+        return (timestamp // self.seconds + 1) * self.seconds
+
+
+Schedule = CronSchedule | IntervalSchedule
+
+
+def parse_schedule(trigger: str) -> Schedule | None:
+    """Parse a trigger into a schedule.
+
+    Args:
+        trigger: Free-text trigger of a workflow
+
+    Returns:
+        The schedule, or None if the trigger is not time-based (an event or
+        manual trigger)
+
+    Raises:
+        TriggerParseError: If the trigger is a malformed cron expression
+    """
+    text = " ".join(trigger.lower().split())
+    text = _MACROS.get(text, text)
+
+    if text in _ADVERB:
+        return IntervalSchedule(_ADVERB[text])
+    if match := _INTERVAL.match(text):
+        count = int(match[1] or 1)
+        if count == 0:
+            raise TriggerParseError(f"Invalid interval '{trigger}'")
+        return IntervalSchedule(count * _UNIT_SECONDS[match[2]])
+    if match := _AT_TIME.match(text):
+        return _parse_at_time(*match.groups())
+    fields = text.split(" ")
+    if len(fields) == 5 and all(re.fullmatch(r"[\d*/,\-]+", field) for field in fields[:2]):
+        return parse_cron(text)
+    return None
+
+
+def event_type(trigger: str) -> str:
+    """Normalize an event trigger or event name to its dispatch key.
+
+    "Gumroad sale webhook", "gumroad.sale" and "GUMROAD_SALE" all map to
+    "gumroad_sale", so a workflow's trigger text and the type of the events
+    that fire it meet on the same key.
+    """
+    key = _NON_WORD.sub("_", trigger.lower()).strip("_")
+    for suffix in _EVENT_SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[: -len(suffix)]
+    return key
+
+
+def parse_cron(expression: str) -> CronSchedule:
+    """Parse a five-field cron expression (minute hour day month weekday)."""
+    fields = expression.lower().split()
+    if len(fields) != 5:
+        raise TriggerParseError(f"Cron expression needs 5 fields: '{expression}'")
+    minute, hour, day, month, weekday = fields
+    weekdays = _parse_field(weekday, 0, 7, _DAY_NAMES)
+    if weekdays & (1 << 7):  # 7 is also Sunday
+        weekdays = (weekdays | 1) & ~(1 << 7)
+    return CronSchedule(
+        minutes=_parse_field(minute, 0, 59),
+        hours=_parse_field(hour, 0, 23),
+        days=_parse_field(day, 1, 31),
+        months=_parse_field(month, 1, 12, _MONTH_NAMES, offset=1),
+        weekdays=weekdays,
+        any_day=day == "*",
+        any_weekday=weekday == "*",
+    )
+
+
+def _parse_field(
+    field: str, low: int, high: int, names: list[str] | None = None, offset: int = 0
+) -> int:
+    """Parse one cron field into a bitmask of the values it matches."""
+    mask = 0
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = _parse_value(step_text, 1, high, None, 0)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start = _parse_value(start_text, low, high, names, offset)
+            end = _parse_value(end_text, low, high, names, offset)
+        else:
+            start = _parse_value(part, low, high, names, offset)
+            end = high if step > 1 else start
+        if start > end:
+            raise TriggerParseError(f"Invalid cron range '{part}'")
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask
+
+
+def _parse_value(text: str, low: int, high: int, names: list[str] | None, offset: int) -> int:
+    if names and text[:3] in names:
+        return names.index(text[:3]) + offset
+    if not text.isdigit() or not low <= int(text) <= high:
+        raise TriggerParseError(f"Invalid cron value '{text}'")
+    return int(text)
+
+
+def _parse_at_time(days: str, hour_text: str, minute_text: str | None, meridiem: str | None):
+    hour = int(hour_text)
+    minute = int(minute_text or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise TriggerParseError(f"Invalid hour '{hour_text}{meridiem}'")
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if hour > 23 or minute > 59:
+        raise TriggerParseError(f"Invalid time '{hour_text}:{minute_text}'")
+
+    if days == "day":
+        weekday = "*"
+    elif days == "weekday":
+        weekday = "1-5"
+    elif days == "weekend":
+        weekday = "0,6"
+    elif days[:3] in _DAY_NAMES:
+        weekday = str(_DAY_NAMES.index(days[:3]))
+    else:
+        raise TriggerParseError(f"Unknown day '{days}'")
+    return parse_cron(f"{minute} {hour} * * {weekday}")
@@ -0,0 +1,38 @@
+"""Built-in workflow actions.
+
+These are the action types offered in the workflow builder. Until the
+integrations (Stripe invoices, email, Gumroad, dashboards) are wired up they
+only echo what they would have done, so workflows can be built and run
+end to end.
+"""
+
+from app.services.workflow_engine import ActionContext, ActionRegistry
+
+BUILTIN_ACTION_TYPES = (
+    "generate_invoice",
+    "send_email",
+    "log_revenue",
+    "send_notification",
+    "update_dashboard",
+    "add_to_email_list",
+    "aggregate_data",
+    "generate_insights",
+    "send_report",
+)
+
+
+async def _placeholder_action(context: ActionContext) -> dict:
+    """Record the action without performing it (placeholder until integrations exist)."""
+    return {
+        "action_id": context.action_id,
+        "config": context.config,
+        "idempotency_key": context.idempotency_key,
+    }
+
+
+def create_action_registry() -> ActionRegistry:
+    """Create a registry holding every built-in action type."""
+    registry = ActionRegistry()
+    for action_type in BUILTIN_ACTION_TYPES:
+        registry.register(action_type)(_placeholder_action)
+    return registry
@@ -0,0 +1,439 @@
+"""Workflow engine — runs a workflow's actions as a dependency graph.
+
+A workflow is compiled once into a `WorkflowPlan` (action IDs, in-degrees
+and dependents). A run starts every action whose dependencies have
+succeeded, so independent actions run concurrently; a single semaphore
+shared by all runs bounds how many actions execute at once on this node.
+
+Each action attempt has a timeout and failed attempts are retried with
+exponential backoff (the worker slot is given up while backing off). Every
+action gets an idempotency key derived from its run's key; outputs of
+actions that succeeded are remembered under it, so re-submitting a failed
+run with the same key only re-executes what did not complete.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowValidationError(ValueError):
+    """Raised when a workflow's actions do not form a valid graph."""
+
+
+@dataclass
+class ActionContext:
+    """What an action handler is given to do its work."""
+
+    run_id: str
+    workflow_id: str
+    user_id: str
+    action_id: str
+    config: dict
+    inputs: dict[str, Any]  # outputs of the actions this one depends on, by action ID
+    idempotency_key: str
+    attempt: int
+    event: dict | None = None  # payload of the event that triggered the run, if any
+
+
+ActionHandler = Callable[[ActionContext], Awaitable[Any]]
+
+
+class ActionRegistry:
+    """Maps action types to the handlers that perform them."""
+
+    def __init__(self):
+        self._handlers: dict[str, ActionHandler] = {}
+
+    def register(self, action_type: str) -> Callable[[ActionHandler], ActionHandler]:
+        """Register a handler for an action type (usable as a decorator)."""
+
+        def decorator(handler: ActionHandler) -> ActionHandler:
+            self._handlers[action_type] = handler
+            return handler
+
+        return decorator
+
+    def get(self, action_type: str) -> ActionHandler | None:
+        return self._handlers.get(action_type)
+
+    def __contains__(self, action_type: str) -> bool:
+        return action_type in self._handlers
+
+    def types(self) -> list[str]:
+        return sorted(self._handlers)
+
+
+@dataclass(frozen=True)
+class PlannedAction:
+    """One compiled action of a workflow."""
+
+    id: str
+    type: str
+    config: dict
+    depends_on: tuple[str, ...]
+    timeout: float | None = None
+    max_retries: int | None = None
+
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    """A workflow's actions with their dependency graph precomputed."""
+
+    actions: dict[str, PlannedAction]
+    dependents: dict[str, tuple[str, ...]]
+    roots: tuple[str, ...]
+
+
+def compile_workflow(
+    actions: Iterable[dict], registry: ActionRegistry | None = None
+) -> WorkflowPlan:
+    """Validate a workflow's actions and build its dependency graph.
+
+    An action's `id` defaults to its position. `depends_on` of None means
+    "after the previous action", so plain action lists keep running in order;
+    an empty list means the action has no dependencies.
+
+    Args:
+        actions: Action dicts as stored on the workflow
+        registry: If given, every action type must be registered in it
+
+    Returns:
+        The compiled plan
+
+    Raises:
+        WorkflowValidationError: On duplicate IDs, unknown dependencies or
+            action types, or a dependency cycle
+    """
+    planned: dict[str, PlannedAction] = {}
+    previous: str | None = None
+    for index, action in enumerate(actions):
+        action_id = action.get("id") or str(index)
+        if action_id in planned:
+            raise WorkflowValidationError(f"Duplicate action id '{action_id}'")
+        if registry is not None and action["type"] not in registry:
+            raise WorkflowValidationError(f"Unknown action type '{action['type']}'")
+        depends_on = action.get("depends_on")
+        if depends_on is None:
+            depends_on = [previous] if previous is not None else []
+        planned[action_id] = PlannedAction(
+            id=action_id,
+            type=action["type"],
+            config=action.get("config") or {},
+            depends_on=tuple(depends_on),
+            timeout=action.get("timeout_seconds"),
+            max_retries=action.get("max_retries"),
+        )
+        previous = action_id
+
+    dependents: dict[str, list[str]] = {action_id: [] for action_id in planned}
+    for action in planned.values():
+        for dependency in action.depends_on:
+            if dependency not in planned:
+                raise WorkflowValidationError(
+                    f"Action '{action.id}' depends on unknown action '{dependency}'"
+                )
+            dependents[dependency].append(action.id)
+
+    # Kahn's algorithm: every action must be reachable in topological order.
+    in_degree = {action_id: len(action.depends_on) for action_id, action in planned.items()}
+    ready = [action_id for action_id, degree in in_degree.items() if degree == 0]
+    roots = tuple(ready)
+    ordered = 0
+    while ready:
+        action_id = ready.pop()
+        ordered += 1
+        for dependent in dependents[action_id]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                ready.append(dependent)
+    if ordered != len(planned):
+        raise WorkflowValidationError("Workflow actions contain a dependency cycle")
+
+    return WorkflowPlan(
+        actions=planned,
+        dependents={action_id: tuple(ids) for action_id, ids in dependents.items()},
+        roots=roots,
+    )
+
+
+@dataclass
+class ActionRun:
+    """Execution record of one action within a run."""
+
+    id: str
+    type: str
+    status: str = "pending"  # pending, running, succeeded, failed, skipped
+    attempts: int = 0
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    output: Any = None
+
+    @property
+    def duration_ms(self) -> float | None:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return round(1000 * (self.finished_at - self.started_at), 2)
+
+
+@dataclass
+class WorkflowRun:
+    """Execution record of one workflow run."""
+
+    id: str
+    workflow_id: str
+    user_id: str
+    idempotency_key: str
+    actions: dict[str, ActionRun]
+    event: dict | None = None
+    status: str = "pending"  # pending, running, succeeded, failed
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def duration_ms(self) -> float | None:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return round(1000 * (self.finished_at - self.started_at), 2)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+
+class WorkflowEngine:
+    """Executes workflow runs on a bounded pool of concurrent action slots."""
+
+    def __init__(
+        self,
+        registry: ActionRegistry,
+        max_workers: int = 256,
+        action_timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_runs: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.registry = registry
+        self.action_timeout = action_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_runs = max_runs
+        self._clock = clock
+        self._workers = asyncio.Semaphore(max_workers)
+        self._runs: OrderedDict[str, WorkflowRun] = OrderedDict()
+        self._runs_by_key: dict[str, str] = {}  # run idempotency key -> latest run ID
+        self._completed: OrderedDict[str, Any] = OrderedDict()  # action idempotency key -> output
+        self.runs_succeeded = 0
+        self.runs_failed = 0
+        self.action_attempts = 0
+        self.action_retries = 0
+        self.total_run_seconds = 0.0
+
+    def start(
+        self,
+        plan: WorkflowPlan,
+        workflow_id: str,
+        user_id: str,
+        idempotency_key: str | None = None,
+        event: dict | None = None,
+    ) -> WorkflowRun:
+        """Start a run in the background and return its record immediately.
+
+        A run of the same workflow submitted again with the idempotency key
+        of an earlier run returns that run, unless it failed, in which case a new run starts
+        that reuses the outputs of the actions that had succeeded.
+
+        Args:
+            plan: Compiled workflow to run
+            workflow_id: ID of the workflow
+            user_id: Owner of the workflow
+            idempotency_key: Caller-chosen key identifying this run request
+            event: Payload of the event that triggered the run, passed to
+                every action
+
+        Returns:
+            The run record, updated in place as the run progresses
+        """
+        # Keys are scoped to the workflow: reusing one on another workflow starts a new run
+        key = f"{user_id}:{workflow_id}:{idempotency_key}" if idempotency_key else str(uuid.uuid4())
+        previous = self._runs.get(self._runs_by_key.get(key, ""))
+        if previous is not None and previous.status != "failed":
+            return previous
+
+        run = WorkflowRun(
+            id=str(uuid.uuid4()),
+            workflow_id=workflow_id,
+            user_id=user_id,
+            idempotency_key=key,
+            event=event,
+            actions={
+                action.id: ActionRun(id=action.id, type=action.type)
+                for action in plan.actions.values()
+            },
+        )
+        self._remember_run(run)
+        run.task = asyncio.create_task(self._execute(plan, run))
+        return run
+
+    async def run(
+        self,
+        plan: WorkflowPlan,
+        workflow_id: str,
+        user_id: str,
+        idempotency_key: str | None = None,
+        event: dict | None = None,
+    ) -> WorkflowRun:
+        """Run a workflow to completion (see `start`)."""
+        run = self.start(plan, workflow_id, user_id, idempotency_key, event)
+        if run.task is not None:
+            await asyncio.shield(run.task)
+        return run
+
+    def get_run(self, run_id: str) -> WorkflowRun | None:
+        return self._runs.get(run_id)
+
+    async def _execute(self, plan: WorkflowPlan, run: WorkflowRun) -> None:
+        run.status = "running"
+        run.started_at = self._clock()
+        remaining = {
+            action_id: len(action.depends_on) for action_id, action in plan.actions.items()
+        }
+        in_flight: dict[asyncio.Task, str] = {}
+        failed = False
+
+        def launch(action_id: str) -> None:
+            task = asyncio.create_task(self._run_action(run, plan.actions[action_id]))
+            in_flight[task] = action_id
+
+        for action_id in plan.roots:
+            launch(action_id)
+
+        try:
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    action_id = in_flight.pop(task)
+                    if run.actions[action_id].status != "succeeded":
+                        failed = True
+                        continue
+                    if failed:
+                        continue
+                    for dependent in plan.dependents[action_id]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            launch(dependent)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        for action in run.actions.values():
+            if action.status == "pending":
+                action.status = "skipped"
+        run.finished_at = self._clock()
+        run.status = "failed" if failed else "succeeded"
+        self.total_run_seconds += run.finished_at - run.started_at
+        if failed:
+            self.runs_failed += 1
+        else:
+            self.runs_succeeded += 1
+
+    async def _run_action(self, run: WorkflowRun, action: PlannedAction) -> None:
+        record = run.actions[action.id]
+        key = f"{run.idempotency_key}:{action.id}"
+        if key in self._completed:
+            record.status = "succeeded"
+            record.output = self._completed[key]
+            return
+
+        handler = self.registry.get(action.type)
+        if handler is None:
+            record.status = "failed"
+            record.error = f"Unknown action type '{action.type}'"
+            return
+
+        timeout = action.timeout if action.timeout is not None else self.action_timeout
+        max_retries = action.max_retries if action.max_retries is not None else self.max_retries
+        context = ActionContext(
+            run_id=run.id,
+            workflow_id=run.workflow_id,
+            user_id=run.user_id,
+            action_id=action.id,
+            config=action.config,
+            inputs={dependency: run.actions[dependency].output for dependency in action.depends_on},
+            idempotency_key=key,
+            attempt=0,
+            event=run.event,
+        )
+
+        record.status = "running"
+        record.started_at = self._clock()
+        for attempt in range(max_retries + 1):
+            if attempt:
+                self.action_retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+            context.attempt = attempt
+            record.attempts += 1
+            self.action_attempts += 1
+            try:
+                async with self._workers:
+                    output = await asyncio.wait_for(handler(context), timeout)
+            except TimeoutError:
+                record.error = f"Timed out after {timeout}s"
+            except Exception as exc:
+                record.error = f"{type(exc).__name__}: {exc}"
+            else:
+                record.status = "succeeded"
+                record.error = None
+                record.output = output
+                record.finished_at = self._clock()
+                self._remember_output(key, output)
+                return
+            logger.info("Action %s of run %s failed: %s", action.id, run.id, record.error)
+
+        record.status = "failed"
+        record.finished_at = self._clock()
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter before retry number `attempt`."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _remember_run(self, run: WorkflowRun) -> None:
+        self._runs[run.id] = run
+        self._runs_by_key[run.idempotency_key] = run.id
+        while len(self._runs) > self.max_runs:
+            _, evicted = self._runs.popitem(last=False)
+            if not evicted.done:  # never forget a run that is still executing
+                self._runs[evicted.id] = evicted
+                break
+            if self._runs_by_key.get(evicted.idempotency_key) == evicted.id:
+                del self._runs_by_key[evicted.idempotency_key]
+
+    def _remember_output(self, key: str, output: Any) -> None:
+        self._completed[key] = output
+        while len(self._completed) > self.max_runs * 4:
+            self._completed.popitem(last=False)
+
+    def stats(self) -> dict:
+        finished = self.runs_succeeded + self.runs_failed
+        return {
+            "runs_in_memory": len(self._runs),
+            "runs_succeeded": self.runs_succeeded,
+            "runs_failed": self.runs_failed,
+            "action_attempts": self.action_attempts,
+            "action_retries": self.action_retries,
+            "avg_run_ms": round(1000 * self.total_run_seconds / finished, 2) if finished else 0.0,
+        }
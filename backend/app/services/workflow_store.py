@@ -0,0 +1,346 @@
+"""Workflow repository — stores workflows and lists them page by page.
+
+Listings are newest first and paginated by keyset: a page's cursor encodes
+the (created_at, id) of its last workflow and the next page starts strictly
+after it, so fetching page N costs the same as fetching page 1 and pages
+stay consistent while workflows are added or removed.
+
+The in-memory repository keeps, per user, the sorted keys of all their
+workflows and of each status, so a page is one bisect plus a slice of
+`limit` keys however many workflows the user has. The Supabase repository
+runs the same keyset query against the `workflows` table, served by
+`idx_workflows_user_created` / `idx_workflows_user_status`.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Protocol
+
+from app.models.workflow import WORKFLOW_STATUSES, Workflow
+
+SortKey = tuple[float, str]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor was not issued by a listing."""
+
+
+def encode_cursor(key: SortKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    try:
+        created_at, workflow_id = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        return float(created_at), str(workflow_id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidCursorError(f"Invalid cursor '{cursor}'") from exc
+
+
+@dataclass(slots=True)
+class WorkflowPage:
+    """One page of a user's workflows, newest first."""
+
+    workflows: list[Workflow]
+    next_cursor: str | None  # None on the last page
+
+
+class WorkflowRepository(Protocol):
+    """Persistence for workflows."""
+
+    async def get(self, workflow_id: str) -> Workflow | None: ...
+
+    async def save(self, workflow: Workflow) -> None:
+        """Insert a workflow, or update it after its fields were changed."""
+        ...
+
+    async def delete(self, workflow_id: str) -> bool: ...
+
+    async def claim_fire(self, workflow_id: str, fire_time: float) -> bool:
+        """Record a scheduled fire of an active workflow, once.
+
+        Atomic, so when several processes fire the same schedule exactly
+        one of them gets True and runs the workflow.
+        """
+        ...
+
+    async def list_by_user(
+        self,
+        user_id: str,
+        status: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> WorkflowPage: ...
+
+    async def counts(self, user_id: str) -> dict[str, int]:
+        """Number of a user's workflows per status, plus "total"."""
+        ...
+
+    async def active(self) -> list[Workflow]:
+        """Every active workflow of every user (to register triggers on startup)."""
+        ...
+
+
+def _insert(keys: list[SortKey], key: SortKey) -> None:
+    if not keys or keys[-1] < key:
+        keys.append(key)  # new workflows are the newest: O(1)
+    else:
+        insort(keys, key)
+
+
+def _discard(keys: list[SortKey], key: SortKey) -> None:
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+class MemoryWorkflowRepository:
+    """Repository that keeps workflows in memory (development and tests)."""
+
+    def __init__(self):
+        self._workflows: dict[str, Workflow] = {}
+        # user ID -> status (None = any) -> sorted keys of the user's workflows
+        self._keys: dict[str, dict[str | None, list[SortKey]]] = {}
+        # status each workflow is indexed under; records are mutated in place
+        # before `save`, so their own status may already be the new one
+        self._statuses: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._workflows)
+
+    async def get(self, workflow_id: str) -> Workflow | None:
+        return self._workflows.get(workflow_id)
+
+    async def save(self, workflow: Workflow) -> None:
+        previous = self._statuses.get(workflow.id)
+        self._workflows[workflow.id] = workflow
+        if previous == workflow.status:
+            return
+        keys = self._keys.setdefault(workflow.user_id, {})
+        key = workflow.sort_key
+        if previous is None:
+            _insert(keys.setdefault(None, []), key)
+        else:
+            _discard(keys[previous], key)
+        _insert(keys.setdefault(workflow.status, []), key)
+        self._statuses[workflow.id] = workflow.status
+
+    async def delete(self, workflow_id: str) -> bool:
+        workflow = self._workflows.pop(workflow_id, None)
+        if workflow is None:
+            return False
+        keys = self._keys[workflow.user_id]
+        _discard(keys[None], workflow.sort_key)
+        _discard(keys[self._statuses.pop(workflow_id)], workflow.sort_key)
+        if not keys[None]:
+            del self._keys[workflow.user_id]
+        return True
+
+    async def claim_fire(self, workflow_id: str, fire_time: float) -> bool:
+        workflow = self._workflows.get(workflow_id)
+        if workflow is None or workflow.status != "active":
+            return False
+        if workflow.last_run_at is not None and fire_time <= workflow.last_run_at:
+            return False
+        workflow.last_run_at = fire_time
+        workflow.runs_this_month += 1
+        return True
+
+    async def list_by_user(
+        self,
+        user_id: str,
+        status: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> WorkflowPage:
+        keys = self._keys.get(user_id, {}).get(status, [])
+        end = bisect_left(keys, decode_cursor(cursor)) if cursor else len(keys)
+        start = max(0, end - limit)
+        page = keys[start:end][::-1]
+        return WorkflowPage(
+            workflows=[self._workflows[workflow_id] for _, workflow_id in page],
+            next_cursor=encode_cursor(page[-1]) if start > 0 else None,
+        )
+
+    async def counts(self, user_id: str) -> dict[str, int]:
+        keys = self._keys.get(user_id, {})
+        counts = {status: len(keys.get(status, ())) for status in WORKFLOW_STATUSES}
+        counts["total"] = len(keys.get(None, ()))
+        return counts
+
+    async def active(self) -> list[Workflow]:
+        return [workflow for workflow in self._workflows.values() if workflow.status == "active"]
+
+    def clear(self) -> None:
+        self._workflows.clear()
+        self._keys.clear()
+        self._statuses.clear()
+
+
+def _timestamp(value: float | None) -> str | None:
+    return datetime.fromtimestamp(value, UTC).isoformat() if value is not None else None
+
+
+def _epoch(value: str | None) -> float | None:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+class SupabaseWorkflowRepository:
+    """Repository backed by the `workflows` table."""
+
+    COLUMNS = (
+        "id, user_id, name, description, trigger_type, trigger_config, actions, "
+        "status, last_run_at, runs_this_month, created_at"
+    )
+    ACTIVE_BATCH_SIZE = 1_000
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self._client = create_client(url, key)
+
+    @staticmethod
+    def _to_row(workflow: Workflow) -> dict:
+        return {
+            "id": workflow.id,
+            "user_id": workflow.user_id,
+            "name": workflow.name,
+            "description": workflow.description,
+            "trigger_type": workflow.trigger_type,
+            "trigger_config": {"trigger": workflow.trigger},
+            "actions": workflow.actions,
+            "status": workflow.status,
+            "last_run_at": _timestamp(workflow.last_run_at),
+            "runs_this_month": workflow.runs_this_month,
+            "created_at": _timestamp(workflow.created_at),
+            "updated_at": datetime.now(UTC).isoformat(),
+        }
+
+    @staticmethod
+    def _to_record(row: dict) -> Workflow:
+        return Workflow(
+            id=row["id"],
+            user_id=row["user_id"],
+            name=row["name"],
+            description=row["description"] or "",
+            trigger=(row["trigger_config"] or {}).get("trigger", row["trigger_type"]),
+            trigger_type=row["trigger_type"],
+            actions=row["actions"] or [],
+            status=row["status"],
+            last_run_at=_epoch(row["last_run_at"]),
+            runs_this_month=row["runs_this_month"] or 0,
+            created_at=_epoch(row["created_at"]),
+        )
+
+    async def get(self, workflow_id: str) -> Workflow | None:
+        def query():
+            return (
+                self._client.table("workflows")
+                .select(self.COLUMNS)
+                .eq("id", workflow_id)
+                .limit(1)
+                .execute()
+            )
+
+        result = await asyncio.to_thread(query)
+        return self._to_record(result.data[0]) if result.data else None
+
+    async def save(self, workflow: Workflow) -> None:
+        row = self._to_row(workflow)
+        await asyncio.to_thread(lambda: self._client.table("workflows").upsert(row).execute())
+
+    async def delete(self, workflow_id: str) -> bool:
+        def persist():
+            return self._client.table("workflows").delete().eq("id", workflow_id).execute()
+
+        result = await asyncio.to_thread(persist)
+        return bool(result.data)
+
+    async def claim_fire(self, workflow_id: str, fire_time: float) -> bool:
+        # A conditional update on last_run_at, so only one process claims the fire
+        def persist():
+            params = {"for_workflow_id": workflow_id, "fire_at": _timestamp(fire_time)}
+            return self._client.rpc("claim_workflow_fire", params).execute()
+
+        result = await asyncio.to_thread(persist)
+        return result.data is True
+
+    async def list_by_user(
+        self,
+        user_id: str,
+        status: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> WorkflowPage:
+        after = decode_cursor(cursor) if cursor else None
+
+        def query():
+            request = (
+                self._client.table("workflows")
+                .select(self.COLUMNS)
+                .eq("user_id", user_id)
+                .order("created_at", desc=True)
+                .order("id", desc=True)
+                .limit(limit + 1)  # one extra row tells whether there is a next page
+            )
+            if status is not None:
+                request = request.eq("status", status)
+            if after is not None:
+                created_at, workflow_id = _timestamp(after[0]), after[1]
+                request = request.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{workflow_id})'
+                )
+            return request.execute()
+
+        rows = (await asyncio.to_thread(query)).data
+        workflows = [self._to_record(row) for row in rows[:limit]]
+        more = len(rows) > limit
+        return WorkflowPage(
+            workflows=workflows,
+            next_cursor=encode_cursor(workflows[-1].sort_key) if more else None,
+        )
+
+    async def counts(self, user_id: str) -> dict[str, int]:
+        def query():
+            counts = {}
+            for status in (*WORKFLOW_STATUSES, None):
+                request = (
+                    self._client.table("workflows")
+                    .select("id", count="exact", head=True)
+                    .eq("user_id", user_id)
+                )
+                if status is not None:
+                    request = request.eq("status", status)
+                counts[status or "total"] = request.execute().count or 0
+            return counts
+
+        return await asyncio.to_thread(query)
+
+    async def active(self) -> list[Workflow]:
+        def query():
+            rows, last_id = [], None
+            while True:
+                request = (
+                    self._client.table("workflows")
+                    .select(self.COLUMNS)
+                    .eq("status", "active")
+                    .order("id")
+                    .limit(self.ACTIVE_BATCH_SIZE)
+                )
+                if last_id is not None:
+                    request = request.gt("id", last_id)
+                batch = request.execute().data
+                rows.extend(batch)
+                if len(batch) < self.ACTIVE_BATCH_SIZE:
+                    return rows
+                last_id = batch[-1]["id"]
+
+        return [self._to_record(row) for row in await asyncio.to_thread(query)]
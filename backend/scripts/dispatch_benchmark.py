@@ -0,0 +1,104 @@
+"""Latency benchmark for event-to-workflow dispatch.
+
+Indexes a large number of active event-triggered workflows spread over many
+users and trigger types, then times matching events against the index: per
+user (the webhook case) and across all users of a type. No workflows are
+actually run.
+
+Usage (from backend/):
+    python -m scripts.dispatch_benchmark [--workflows 1000000] [--users 100000] [--events 100000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.services.event_dispatch import WorkflowTriggerIndex
+from app.services.triggers import event_type
+
+TRIGGERS = [
+    "Gumroad sale webhook",
+    "Calendar event ended",
+    "Stripe payment succeeded",
+    "Stripe invoice overdue",
+    "New YouTube subscriber",
+    "Substack new paid subscriber",
+    "Form submitted",
+    "Patreon pledge created",
+]
+
+
+def _percentiles(samples: list[float]) -> dict:
+    cuts = statistics.quantiles(samples, n=100)
+    return {"p50_us": 1e6 * cuts[49], "p99_us": 1e6 * cuts[98]}
+
+
+def benchmark(workflows: int, users: int, events: int) -> dict:
+    index = WorkflowTriggerIndex()
+    types = [event_type(trigger) for trigger in TRIGGERS]
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    for n in range(workflows):
+        index.add(str(n), str(rng.randrange(users)), rng.choice(types))
+    add_seconds = time.perf_counter() - start
+
+    user_latencies = []
+    matched = 0
+    for _ in range(events):
+        trigger_type, user_id = rng.choice(types), str(rng.randrange(users))
+        start = time.perf_counter()
+        matched += len(index.match(trigger_type, user_id))
+        user_latencies.append(time.perf_counter() - start)
+
+    # Broadcast events touch every user with a workflow of the type.
+    type_latencies = []
+    for trigger_type in types:
+        start = time.perf_counter()
+        index.match(trigger_type)
+        type_latencies.append(time.perf_counter() - start)
+
+    # Incremental updates: pause (unindex) a sample of workflows.
+    sample = [str(rng.randrange(workflows)) for _ in range(min(events, workflows))]
+    start = time.perf_counter()
+    for workflow_id in sample:
+        index.remove(workflow_id)
+    remove_seconds = time.perf_counter() - start
+
+    return {
+        "workflows": workflows,
+        "add_us": 1e6 * add_seconds / workflows,
+        "remove_us": 1e6 * remove_seconds / len(sample),
+        "matched_per_event": matched / events,
+        "user": _percentiles(user_latencies),
+        "type_ms": 1e3 * statistics.mean(type_latencies),
+        "type_matches": workflows / len(types),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workflows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    result = benchmark(args.workflows, args.users, args.events)
+    print(
+        f"Indexed {result['workflows']:,} workflows ({result['add_us']:.1f} µs each, "
+        f"{result['remove_us']:.1f} µs per removal)"
+    )
+    print(
+        f"Per-user events: p50 {result['user']['p50_us']:.2f} µs, "
+        f"p99 {result['user']['p99_us']:.2f} µs "
+        f"({result['matched_per_event']:.2f} workflows matched per event)"
+    )
+    print(
+        f"Broadcast events: {result['type_ms']:.1f} ms to match "
+        f"~{result['type_matches']:,.0f} workflows"
+    )
+
+
+if __name__ == "__main__":
+    main()
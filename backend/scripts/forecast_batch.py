@@ -0,0 +1,85 @@
+"""Nightly revenue forecast batch.
+
+Fits and stores the forecast of every user with revenue streams, fanning
+the fits out to a process pool; run it once a night (e.g. from cron) so
+dashboards only read stored forecasts. With --synthetic-users it instead
+forecasts that many generated users in a memory store and reports the
+throughput.
+
+Usage (from backend/):
+    python -m scripts.forecast_batch [--workers 0] [--synthetic-users 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from app.core.config import settings
+from app.core.dependencies import get_forecast_store, get_revenue_store
+from app.models.revenue import RevenueEntry, RevenueStreamRecord
+from app.services.forecast_store import MemoryForecastStore
+from app.services.revenue_analytics import current_month, month_index, month_start
+from app.services.revenue_forecast import forecast_all_users
+from app.services.revenue_store import MemoryRevenueStore
+
+
+def _synthetic_store(users: int, months: int, as_of: date) -> MemoryRevenueStore:
+    """Users with 1-8 streams, each with a noisy growth curve starting some months back."""
+    rng = random.Random(0)
+    store = MemoryRevenueStore()
+    last = month_index(as_of)
+    for u in range(users):
+        user_id = f"user-{u}"
+        for s in range(rng.randint(1, 8)):
+            stream_id = f"{user_id}-stream-{s}"
+            store._streams.setdefault(user_id, {})[stream_id] = RevenueStreamRecord(
+                id=stream_id, user_id=user_id, name=f"Stream {s}", type="Services"
+            )
+            revenue, growth = rng.uniform(50, 5_000), rng.uniform(-0.03, 0.08)
+            rows = store._entries.setdefault(user_id, {})
+            for month in range(last - rng.randint(3, months), last + 1):
+                revenue *= 1 + growth + rng.gauss(0, 0.05)
+                rows[stream_id, month_start(month)] = RevenueEntry(
+                    stream_id, month_start(month), round(max(revenue, 0.0), 2)
+                )
+    return store
+
+
+async def run(workers: int, synthetic_users: int) -> None:
+    if synthetic_users:
+        start = time.perf_counter()
+        store = _synthetic_store(synthetic_users, settings.FORECAST_FIT_MONTHS, current_month())
+        forecasts = MemoryForecastStore()
+        print(f"generated {synthetic_users:,} users in {time.perf_counter() - start:.1f}s")
+    else:
+        store, forecasts = get_revenue_store(), get_forecast_store()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        stored = await forecast_all_users(
+            store,
+            forecasts,
+            horizon=settings.FORECAST_HORIZON_MONTHS,
+            level=settings.FORECAST_INTERVAL,
+            fit_months=settings.FORECAST_FIT_MONTHS,
+            batch_users=settings.FORECAST_BATCH_USERS,
+            executor=executor,
+        )
+    seconds = time.perf_counter() - start
+    print(f"stored {stored:,} forecasts in {seconds:.1f}s ({stored / seconds:,.0f} users/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=settings.FORECAST_WORKERS)
+    parser.add_argument("--synthetic-users", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.workers, args.synthetic_users))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Throughput benchmark for revenue imports.
+
+Generates a CSV payment export on the fly (it is never held in memory as a
+whole) and imports it into the memory store, reporting rows per second and
+how much the process's peak memory grew during the import.
+
+Usage (from backend/):
+    python -m scripts.import_benchmark [--rows 1000000] [--streams 20] [--chunk-kb 64]
+"""
+
+import argparse
+import asyncio
+import random
+import resource
+import time
+
+from app.models.revenue import RevenueStreamRecord
+from app.services.revenue_import import ImportProgress, RevenueImporter
+from app.services.revenue_store import MemoryRevenueStore
+
+
+async def _export(rows: int, streams: int, chunk_kb: int):
+    """Yield a CSV export of `rows` payments in chunks of about `chunk_kb` KB."""
+    rng = random.Random(0)
+    # A pool of random payments, cycled so generating the export stays cheap
+    pool = [
+        f"20{rng.randint(22, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00,"
+        f"s{rng.randrange(streams)},{rng.randint(500, 50_000) / 100},"
+        f"c{rng.randint(0, 5_000)}@example.com"
+        for _ in range(10_007)
+    ]
+    lines_per_chunk = max(1, chunk_kb * 1024 // 48)
+    yield b"Date,Product,Amount,Customer Email\n"
+    for start in range(0, rows, lines_per_chunk):
+        lines = [pool[n % len(pool)] for n in range(start, min(rows, start + lines_per_chunk))]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def benchmark(rows: int, streams: int, chunk_kb: int) -> dict:
+    store = MemoryRevenueStore()
+    for n in range(streams):
+        await store.save_stream(
+            RevenueStreamRecord(id=f"s{n}", user_id="u", name=f"Stream {n}", type="Services")
+        )
+    importer = RevenueImporter(store, "u", await store.streams("u"))
+    progress = ImportProgress(id="benchmark", user_id="u", format="csv")
+
+    peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    await importer.run(_export(rows, streams, chunk_kb), "csv", progress)
+    seconds = time.perf_counter() - start
+    peak_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "rows": progress.rows,
+        "accepted": progress.accepted,
+        "buckets": progress.buckets,
+        "mb": progress.bytes / 1e6,
+        "seconds": seconds,
+        "rows_per_second": progress.rows / seconds,
+        "peak_growth_mb": (peak_after - peak_before) / 1024,  # ru_maxrss is in KB on Linux
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    result = asyncio.run(benchmark(args.rows, args.streams, args.chunk_kb))
+    print(
+        f"{result['rows']:,} rows ({result['mb']:.0f} MB) -> {result['buckets']:,} buckets "
+        f"in {result['seconds']:.2f}s"
+    )
+    print(f"  {result['rows_per_second']:,.0f} rows/s", end=", ")
+    print(f"peak memory grew {result['peak_growth_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
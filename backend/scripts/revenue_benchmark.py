@@ -0,0 +1,71 @@
+"""Latency benchmark for the revenue overview.
+
+Builds revenue history for a user with many streams and years of monthly
+history, then times the vectorized overview (including loading the rows
+into matrices) against the pure-Python reference implementation.
+
+Usage (from backend/):
+    python -m scripts.revenue_benchmark [--streams 300] [--months 60] [--runs 50]
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+
+from app.models.revenue import RevenueEntry, RevenueStreamRecord
+from app.services.revenue_analytics import (
+    RevenueHistory,
+    compute_overview,
+    compute_overview_reference,
+    month_index,
+    month_start,
+)
+
+AS_OF = date(2026, 10, 1)
+
+
+def _timed(fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return 1000 * (time.perf_counter() - start) / runs
+
+
+def benchmark(streams: int, months: int, runs: int) -> dict:
+    rng = random.Random(0)
+    records = [
+        RevenueStreamRecord(id=f"s{n}", user_id="u", name=f"Stream {n}", type="Services")
+        for n in range(streams)
+    ]
+    last = month_index(AS_OF)
+    entries = [
+        RevenueEntry(f"s{n}", month_start(last - m), rng.uniform(0, 5_000), rng.randrange(50))
+        for n in range(streams)
+        for m in range(months)
+    ]
+    history = RevenueHistory.from_entries(records, entries, AS_OF)
+    return {
+        "rows": len(entries),
+        "load_ms": _timed(lambda: RevenueHistory.from_entries(records, entries, AS_OF), runs),
+        "overview_ms": _timed(lambda: compute_overview(history), runs),
+        "reference_ms": _timed(lambda: compute_overview_reference(records, entries, AS_OF), runs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=300)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    result = benchmark(args.streams, args.months, args.runs)
+    print(f"{args.streams} streams x {args.months} months ({result['rows']:,} rows)")
+    print(f"Load into matrices: {result['load_ms']:.2f} ms")
+    print(f"Vectorized overview: {result['overview_ms']:.2f} ms")
+    print(f"Reference overview: {result['reference_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Offline accuracy and latency report for the local intent classifier.
+
+Runs stratified k-fold cross-validation of the local classifier over the
+labelled examples and, with --llm, replays the same examples through the
+LLM Router Agent so the two (and the hybrid local-then-LLM router) can be
+compared. Prints a Markdown report.
+
+Usage (from backend/):
+    python -m scripts.router_report [--folds 5] [--llm]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+from app.agents.intent_classifier import INTENT_LABELS, IntentClassifier, load_examples
+from app.agents.router import route_message_with_llm
+from app.core.config import settings
+from app.core.dependencies import get_openai_client
+
+
+def _folds(examples: list[tuple[str, str]], k: int) -> list[list[tuple[str, str]]]:
+    """Split examples into k folds, round-robin within each label."""
+    by_label = defaultdict(list)
+    for example in examples:
+        by_label[example[1]].append(example)
+    folds: list[list[tuple[str, str]]] = [[] for _ in range(k)]
+    for items in by_label.values():
+        for i, example in enumerate(items):
+            folds[i % k].append(example)
+    return folds
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def cross_validate(examples: list[tuple[str, str]], k: int) -> list[dict]:
+    """Predict every example with a model trained on the other folds."""
+    results = []
+    folds = _folds(examples, k)
+    for i, test_fold in enumerate(folds):
+        train = [example for j, fold in enumerate(folds) if j != i for example in fold]
+        classifier = IntentClassifier.train(train)
+        for text, label in test_fold:
+            start = time.perf_counter()
+            prediction = classifier.predict(text)
+            elapsed = time.perf_counter() - start
+            results.append(
+                {
+                    "text": text,
+                    "label": label,
+                    "local": prediction.label,
+                    "confidence": prediction.confidence,
+                    "local_seconds": elapsed,
+                }
+            )
+    return results
+
+
+async def replay_llm(results: list[dict]) -> None:
+    """Annotate each result with the LLM router's answer and latency."""
+    client = get_openai_client()
+    for result in results:
+        start = time.perf_counter()
+        result["llm"] = await route_message_with_llm(client, result["text"])
+        result["llm_seconds"] = time.perf_counter() - start
+
+
+def _accuracy(predictions: list[str], results: list[dict]) -> float:
+    return sum(p == r["label"] for p, r in zip(predictions, results)) / max(1, len(results))
+
+
+def _row(name: str, accuracy: float, latencies_ms: list[float], digits: int) -> str:
+    p50 = _percentile(latencies_ms, 50)
+    p99 = _percentile(latencies_ms, 99)
+    return f"| {name} | {accuracy:.1%} | {p50:.{digits}f} | {p99:.{digits}f} |"
+
+
+def render(results: list[dict], threshold: float) -> str:
+    """Render the comparison as Markdown."""
+    n = len(results)
+    local = [r["local"] for r in results]
+    local_ms = [r["local_seconds"] * 1000 for r in results]
+    confident = [r for r in results if r["confidence"] >= threshold]
+
+    lines = [
+        "# Router report",
+        "",
+        f"Examples: {n} · confidence threshold: {threshold}",
+        "",
+        "| Router | Accuracy | p50 latency (ms) | p99 latency (ms) |",
+        "|--------|----------|------------------|------------------|",
+        _row("Local", _accuracy(local, results), local_ms, 3),
+    ]
+
+    if "llm" in results[0]:
+        llm = [r["llm"] for r in results]
+        llm_ms = [r["llm_seconds"] * 1000 for r in results]
+        hybrid = [r["local"] if r["confidence"] >= threshold else r["llm"] for r in results]
+        hybrid_ms = [
+            local_ms[i] + (0.0 if r["confidence"] >= threshold else llm_ms[i])
+            for i, r in enumerate(results)
+        ]
+        agreement = sum(a == b for a, b in zip(local, llm)) / n
+        lines += [
+            _row("LLM", _accuracy(llm, results), llm_ms, 1),
+            _row("Hybrid", _accuracy(hybrid, results), hybrid_ms, 1),
+            "",
+            f"Local/LLM agreement: {agreement:.1%}",
+        ]
+
+    confident_accuracy = _accuracy([r["local"] for r in confident], confident)
+    lines += [
+        "",
+        f"Answered locally: {len(confident) / n:.1%} (accuracy on those: {confident_accuracy:.1%})",
+        "",
+        "| Label | Local precision | Local recall |",
+        "|-------|-----------------|--------------|",
+    ]
+    for label in INTENT_LABELS:
+        predicted = [r for r in results if r["local"] == label]
+        actual = [r for r in results if r["label"] == label]
+        precision = sum(r["label"] == label for r in predicted) / max(1, len(predicted))
+        recall = sum(r["local"] == label for r in actual) / max(1, len(actual))
+        lines.append(f"| {label} | {precision:.1%} | {recall:.1%} |")
+
+    mean_us = statistics.mean(local_ms) * 1000
+    lines += ["", f"Mean local prediction time: {mean_us:.1f} µs"]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--llm", action="store_true", help="also replay through the LLM router")
+    args = parser.parse_args()
+
+    results = cross_validate(load_examples(), args.folds)
+    if args.llm:
+        asyncio.run(replay_llm(results))
+    print(render(results, settings.ROUTER_LOCAL_CONFIDENCE))
+
+
+if __name__ == "__main__":
+    main()
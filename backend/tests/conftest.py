@@ -0,0 +1,104 @@
+"""Shared test fixtures."""
+
+import asyncio
+import hashlib
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents.router import ROUTER_SYSTEM_PROMPT
+from app.core.dependencies import (
+    get_batch_rate_limiter,
+    get_conversation_memory,
+    get_credit_ledger,
+    get_rate_limiter,
+    get_response_cache,
+    get_semantic_cache,
+)
+
+
+def fake_embedding(text: str, dimensions: int = 64) -> list[float]:
+    """Hash each word of `text` into one of `dimensions` buckets."""
+    vector = [0.0] * dimensions
+    for word in re.findall(r"\w+", text.lower()):
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % dimensions] += 1.0
+    return vector
+
+
+class FakeOpenAI:
+    """Minimal stand-in for `AsyncOpenAI` that answers chat completions locally.
+
+    `reply` maps the request kwargs to the completion text; by default the
+    router answers GENERAL and every other agent answers a fixed sentence.
+    `delay` makes each completion take that many seconds.
+    """
+
+    def __init__(self, reply=None, route: str = "GENERAL", delay: float = 0.0):
+        self.route = route
+        self.delay = delay
+        self.reply = reply or self._default_reply
+        self.calls: list[dict] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.embeddings = SimpleNamespace(create=self._embed)
+        self.embedding_calls: list[dict] = []
+
+    def _default_reply(self, kwargs: dict) -> str:
+        if kwargs["messages"][0]["content"].startswith(ROUTER_SYSTEM_PROMPT):
+            return self.route
+        return "Here is some helpful coaching advice."
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        text = self.reply(kwargs)
+        usage = SimpleNamespace(
+            prompt_tokens=sum(len(m["content"]) // 4 for m in kwargs["messages"]),
+            completion_tokens=max(1, len(text) // 4),
+        )
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+        if kwargs.get("stream"):
+            return self._stream(text, usage)
+        message = SimpleNamespace(content=text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    async def _embed(self, **kwargs):
+        """Bag-of-words embeddings: texts with the same words embed identically."""
+        self.embedding_calls.append(kwargs)
+        return SimpleNamespace(
+            data=[
+                SimpleNamespace(embedding=fake_embedding(text, kwargs.get("dimensions", 64)))
+                for text in kwargs["input"]
+            ]
+        )
+
+    async def _stream(self, text: str, usage):
+        for word in text.split(" "):
+            delta = SimpleNamespace(content=word + " ")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Route every API handler's OpenAI client to a `FakeOpenAI`."""
+    from app.agents import jobs
+    from app.api import chat, monetization, revenue, skills
+
+    client = FakeOpenAI()
+    for module in (chat, monetization, revenue, skills, jobs):
+        monkeypatch.setattr(module, "get_openai_client", lambda: client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+async def _reset_shared_state():
+    """Keep caches, rate limit budgets and credit balances from leaking between tests."""
+    await get_response_cache().clear()
+    get_semantic_cache().clear()
+    get_rate_limiter().reset()
+    get_batch_rate_limiter().reset()
+    get_credit_ledger().reset()
+    get_credit_ledger().sink.clear()
+    get_conversation_memory().clear()
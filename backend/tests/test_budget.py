@@ -0,0 +1,94 @@
+"""Tests for local token counting and prompt budgeting."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.budget import PromptTooLargeError, fit_user_context, plan_completion
+from app.core.config import settings
+from app.main import app
+from app.services.credits import InsufficientCreditsError, track_usage
+from app.services.tokens import (
+    count_message_tokens,
+    count_static_tokens,
+    count_tokens,
+    load_encodings,
+)
+
+client = TestClient(app)
+
+MODEL = "gpt-4o-mini"
+
+
+def messages(user_message: str) -> list[dict]:
+    return [
+        {"role": "system", "content": "You are a helpful coach."},
+        {"role": "user", "content": user_message},
+    ]
+
+
+def test_static_prompt_counts_are_cached():
+    """Test the agent prompt is only tokenized once across calls."""
+    count_static_tokens.cache_clear()
+    first = count_message_tokens(messages("Hello"), MODEL)
+    count_message_tokens(messages("Something else entirely"), MODEL)
+    assert count_static_tokens.cache_info().hits == 1
+    assert first > count_tokens("Hello", MODEL)
+
+
+def test_missing_encodings_are_estimated_not_downloaded(monkeypatch, tmp_path):
+    """Test an encoding missing from the cache directory is never fetched."""
+    tiktoken_load = pytest.importorskip("tiktoken.load")
+
+    def no_network(blobpath):
+        raise AssertionError(f"tried to download {blobpath}")
+
+    monkeypatch.setattr(tiktoken_load, "read_file", no_network)
+    assert load_encodings(str(tmp_path), [MODEL]) == []
+    assert load_encodings("", [MODEL]) == []
+    assert count_tokens("abcdef", MODEL) == 2  # the character estimate
+
+
+def test_max_tokens_is_capped_by_the_context_window(monkeypatch):
+    """Test the answer is sized to the room the prompt leaves."""
+    monkeypatch.setattr(settings, "MODEL_CONTEXT_WINDOWS", {MODEL: 1000})
+    budget = plan_completion(MODEL, messages("Hello"), max_tokens=2000)
+    assert budget.prompt_tokens + budget.max_tokens == 1000
+
+    with pytest.raises(PromptTooLargeError):
+        plan_completion(MODEL, messages("word " * 2000), max_tokens=2000)
+
+
+def test_max_tokens_is_capped_by_remaining_credits():
+    """Test a user is never sent an answer their credits cannot pay for."""
+    prompt = messages("Hello")
+    with track_usage(token_limit=600):
+        budget = plan_completion(MODEL, prompt, max_tokens=2000)
+    assert budget.estimated_tokens == 600
+
+    with track_usage(token_limit=100), pytest.raises(InsufficientCreditsError):
+        plan_completion(MODEL, prompt, max_tokens=2000)
+
+    assert plan_completion(MODEL, prompt, max_tokens=2000).max_tokens == 2000
+
+
+def test_user_context_is_trimmed_or_rejected():
+    """Test oversized user context is cut to budget, and huge context refused."""
+    assert fit_user_context("Freelance designer") == "Freelance designer"
+
+    trimmed = fit_user_context("detail " * 2000)
+    assert count_tokens(trimmed) <= settings.USER_CONTEXT_MAX_TOKENS
+
+    with pytest.raises(PromptTooLargeError):
+        fit_user_context("detail " * 20_000)
+
+
+def test_oversized_prompt_is_refused_before_calling_openai(fake_openai, monkeypatch):
+    """Test a prompt that cannot fit returns 413, costs no credits and makes no call."""
+    monkeypatch.setattr(settings, "MODEL_CONTEXT_WINDOWS", {MODEL: 500})
+    monkeypatch.setattr(settings, "ROUTER_LOCAL_CONFIDENCE", 0.0)
+    response = client.post("/api/v1/chat/message", json={"message": "word " * 1000})
+    assert response.status_code == 413
+    assert fake_openai.calls == []
+
+    credits = client.get("/api/v1/user/credits").json()
+    assert credits["credits_remaining"] == settings.CREDITS_EXPLORER
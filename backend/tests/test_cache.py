@@ -0,0 +1,159 @@
+"""Tests for agent response caching and request coalescing."""
+
+import asyncio
+
+from app.agents.base import call_agent
+from app.agents.orchestrator import process_message
+from app.agents.skills_diagnosis import SKILLS_DIAGNOSIS_PROMPT
+from app.core.dependencies import get_response_cache, get_single_flight
+from app.services.response_cache import MemoryCache, ResponseCache, make_cache_key
+from app.services.semantic_cache import SemanticCache
+from tests.conftest import FakeOpenAI, fake_embedding
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_memory_cache_ttl_and_lru():
+    """Test entries expire after their TTL and the least recently used is evicted."""
+    clock = FakeClock()
+    cache = MemoryCache(max_entries=2, clock=clock)
+    await cache.set("a", "1", ttl=10)
+    await cache.set("b", "2", ttl=10)
+    assert await cache.get("a") == "1"  # "a" is now most recently used
+
+    await cache.set("c", "3", ttl=10)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "1"
+
+    clock.now = 11
+    assert await cache.get("a") is None
+    assert len(cache) == 1
+
+
+async def test_response_cache_promotes_slower_tier_hits():
+    """Test a hit in a slower tier is copied into the faster ones."""
+    fast, slow = MemoryCache(max_entries=10), MemoryCache(max_entries=10)
+    cache = ResponseCache([fast, slow])
+    await slow.set("k", "v", ttl=60)
+
+    assert await cache.get("k", ttl=60) == "v"
+    assert await fast.get("k") == "v"
+    assert await cache.get("missing", ttl=60) is None
+    assert cache.stats()["hits_by_tier"] == {"MemoryCache": 1}
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_key_normalizes_whitespace():
+    """Test whitespace-only differences share a key but sampling params do not."""
+    key = make_cache_key("gpt-4o-mini", "prompt", "hello  there\n", 0.0, 50)
+    assert key == make_cache_key("gpt-4o-mini", "prompt", " hello there", 0.0, 50)
+    assert key != make_cache_key("gpt-4o-mini", "prompt", "hello there", 0.7, 50)
+
+
+async def test_call_agent_uses_cache_when_opted_in():
+    """Test an opted-in agent call is served from cache the second time."""
+    fake = FakeOpenAI()
+    for _ in range(2):
+        await call_agent(fake, "You are a coach.", "Hi", temperature=0.0, cache_ttl=60)
+    assert len(fake.calls) == 1
+    assert get_response_cache().stats()["hits"] == 1
+
+    await call_agent(fake, "You are a coach.", "Hi", temperature=0.0)
+    assert len(fake.calls) == 2
+
+
+def test_semantic_cache_matches_paraphrases_per_agent():
+    """Test similar questions hit, dissimilar or other-agent questions miss."""
+    cache = SemanticCache(max_entries=10, ttl=60)
+    cache.store("GENERAL", fake_embedding("how do I get started"), "Start here.")
+
+    assert cache.lookup("GENERAL", fake_embedding("How do I get started?"), 0.95) == "Start here."
+    assert cache.lookup("GENERAL", fake_embedding("what are the pricing tiers"), 0.95) is None
+    assert cache.lookup("SKILLS_DIAGNOSIS", fake_embedding("how do I get started"), 0.5) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_semantic_cache_evicts_expired_then_least_recently_used():
+    """Test a full cache overwrites expired entries before live ones."""
+    clock = FakeClock()
+    cache = SemanticCache(max_entries=2, ttl=10, clock=clock)
+    cache.store("GENERAL", [1.0, 0.0], "a")
+    clock.now = 5
+    cache.store("GENERAL", [0.0, 1.0], "b")
+
+    clock.now = 12  # "a" expired, "b" still live
+    cache.store("GENERAL", [1.0, 1.0], "c")
+    assert cache.lookup("GENERAL", [0.0, 1.0], 0.99) == "b"
+
+    cache.store("GENERAL", [1.0, -1.0], "d")  # nothing expired: evicts LRU "c"
+    assert cache.lookup("GENERAL", [1.0, 1.0], 0.99) is None
+    assert len(cache) == 2
+
+
+async def test_process_message_serves_paraphrase_from_semantic_cache():
+    """Test a paraphrased GENERAL question skips the specialist call."""
+    fake = FakeOpenAI()
+    await process_message(fake, "Hello, what can you do?")
+    calls = len(fake.calls)
+
+    response, agent_type = await process_message(fake, "what can you do? hello")
+    assert agent_type == "GENERAL"
+    assert response == "Here is some helpful coaching advice."
+    assert len(fake.calls) == calls
+
+    await process_message(fake, "what can you do? hello", user_context="Tier: CEO")
+    assert len(fake.calls) == calls + 1
+
+
+async def test_skills_diagnosis_is_not_semantically_cached():
+    """Test diagnoses, which are personal, are never served to another asker."""
+    fake = FakeOpenAI(route="SKILLS_DIAGNOSIS")
+    await process_message(fake, "What are my design skills worth?")
+    await process_message(fake, "my design skills, what are they worth?")
+
+    diagnoses = [
+        call
+        for call in fake.calls
+        if call["messages"][0]["content"].startswith(SKILLS_DIAGNOSIS_PROMPT)
+    ]
+    assert len(diagnoses) == 2
+
+
+async def test_concurrent_identical_calls_are_coalesced():
+    """Test identical deterministic calls in flight together share one upstream request."""
+    fake = FakeOpenAI(delay=0.05)
+    folded = get_single_flight().folded
+
+    results = await asyncio.gather(
+        *(call_agent(fake, "You are a router.", "Hi", temperature=0.0) for _ in range(10))
+    )
+
+    assert set(results) == {"Here is some helpful coaching advice."}
+    assert len(fake.calls) == 1
+    assert get_single_flight().folded == folded + 9
+
+
+async def test_coalesced_call_survives_a_cancelled_caller():
+    """Test cancelling the first caller does not cancel the shared request."""
+    fake = FakeOpenAI(delay=0.05)
+    first = asyncio.create_task(call_agent(fake, "You are a router.", "Hi", temperature=0.0))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(call_agent(fake, "You are a router.", "Hi", temperature=0.0))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "Here is some helpful coaching advice."
+    assert len(fake.calls) == 1
+
+
+async def test_sampled_calls_are_not_coalesced():
+    """Test uncached calls with temperature > 0 each get their own completion."""
+    fake = FakeOpenAI(delay=0.01)
+    await asyncio.gather(*(call_agent(fake, "You are a coach.", "Hi") for _ in range(3)))
+    assert len(fake.calls) == 3
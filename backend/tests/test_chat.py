@@ -0,0 +1,191 @@
+"""Tests for the chat endpoints and agent orchestration."""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.agents.intent_classifier import classify_intent
+from app.agents.orchestrator import process_message, speculation_stats
+from app.agents.revenue_tracking import REVENUE_TRACKING_PROMPT
+from app.agents.router import route_message
+from app.api import chat
+from app.core.config import settings
+from app.core.dependencies import get_batch_rate_limiter
+from app.main import app
+from tests.conftest import FakeOpenAI
+
+client = TestClient(app)
+
+CONVERSATION_ID = "5f0c6a52-8d1e-4c3b-9a7e-2b6d4f1e8c90"
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for block in body.replace("\r\n", "\n").strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return events
+
+
+def test_send_chat_message(fake_openai):
+    """Test the buffered chat endpoint returns the routed agent and reply."""
+    fake_openai.route = "CONTENT_CREATION"
+    response = client.post("/api/v1/chat/message", json={"message": "Write a course outline"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["agent_type"] == "Content Creation"
+    assert data["message"] == "Here is some helpful coaching advice."
+
+
+def test_stream_chat_message(fake_openai):
+    """Test the SSE endpoint emits agent, deltas, then done."""
+    fake_openai.route = "REVENUE_TRACKING"
+    response = client.post(
+        "/api/v1/chat/message/stream",
+        json={"message": "How is my revenue doing?", "conversation_id": CONVERSATION_ID},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(response.text)
+    assert events[0] == ("agent", {"agent_type": "Revenue Tracking"})
+    deltas = [data["content"] for name, data in events if name == "delta"]
+    assert "".join(deltas).strip() == "Here is some helpful coaching advice."
+    assert events[-1] == ("done", {"conversation_id": CONVERSATION_ID, "credits_used": 1})
+    assert fake_openai.calls[-1]["stream"] is True
+
+
+def test_chat_batch_isolates_failures_and_keeps_order(fake_openai):
+    """Test batch results come back in message order with per-message errors."""
+
+    def reply(kwargs):
+        if "broken" in kwargs["messages"][-1]["content"]:
+            raise RuntimeError("model exploded")
+        return "Here is some helpful coaching advice."
+
+    fake_openai.reply = reply
+    messages = [
+        {"message": "Write a course outline"},
+        {"message": "Write a broken course outline"},
+        {"message": "How is my revenue doing?"},
+    ]
+    response = client.post("/api/v1/chat/batch", json={"messages": messages})
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [result["index"] for result in data["results"]] == [0, 1, 2]
+    assert data["results"][1] == {"index": 1, "response": None, "error": "AI agent unavailable"}
+    assert data["results"][0]["response"]["message"] == "Here is some helpful coaching advice."
+    assert (data["succeeded"], data["failed"]) == (2, 1)
+
+    too_many = {"messages": [{"message": "hi"}] * (settings.CHAT_BATCH_MAX_MESSAGES + 1)}
+    assert client.post("/api/v1/chat/batch", json=too_many).status_code == 422
+
+
+def test_chat_batch_spends_its_own_hourly_quota(fake_openai):
+    """Test batch messages count against the batch quota, not the per-minute limit."""
+    duplicate = {"messages": [{"message": "hi", "conversation_id": CONVERSATION_ID}] * 2}
+    assert client.post("/api/v1/chat/batch", json=duplicate).status_code == 422
+
+    batch = {"messages": [{"message": f"hi {n}"} for n in range(20)]}  # within the credits
+    response = client.post("/api/v1/chat/batch", json=batch)
+    assert response.status_code == 200 and response.json()["succeeded"] == 20
+    assert client.post("/api/v1/chat/message", json={"message": "hi"}).status_code == 200
+
+    quota = settings.CHAT_BATCH_MESSAGES_PER_HOUR
+    asyncio.run(get_batch_rate_limiter().hit("demo-user-id", quota - 20 - 1))
+    response = client.post("/api/v1/chat/batch", json={"messages": [{"message": "hi"}] * 2})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+
+def test_chat_batch_bounds_concurrency_and_streams_ndjson(fake_openai, monkeypatch):
+    """Test at most CHAT_BATCH_CONCURRENCY messages run at once and NDJSON follows completion."""
+    monkeypatch.setattr(settings, "CHAT_BATCH_CONCURRENCY", 2)
+    running, peak = 0, 0
+
+    async def fake_process_message(client, message, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.2 if message == "slow" else 0.01)
+        running -= 1
+        return f"answer to {message}", "GENERAL"
+
+    monkeypatch.setattr(chat, "process_message", fake_process_message)
+    messages = [{"message": "slow"}] + [{"message": f"quick {i}"} for i in range(5)]
+    response = client.post("/api/v1/chat/batch?stream=true", json={"messages": messages})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == list(range(6))
+    assert lines[0]["index"] == 1  # the slow first message finishes later
+    assert lines[-1]["response"]["message"] == "answer to slow"
+    assert peak == 2
+
+
+async def test_route_message_uses_local_classifier():
+    """Test a clear-cut message is routed without an LLM call."""
+    fake = FakeOpenAI(route="GENERAL")
+    assert await route_message(fake, "Write a blog post about remote work") == "CONTENT_CREATION"
+    assert fake.calls == []
+
+
+async def test_route_message_falls_back_to_llm(monkeypatch):
+    """Test low-confidence messages are sent to the LLM router."""
+    monkeypatch.setattr(settings, "ROUTER_LOCAL_CONFIDENCE", 1.01)
+    fake = FakeOpenAI(route="SKILLS_DIAGNOSIS")
+    assert await route_message(fake, "Write a blog post about remote work") == "SKILLS_DIAGNOSIS"
+    assert len(fake.calls) == 1
+
+
+def test_intent_classifier_confidence():
+    """Test the local classifier is unsure about unseen vocabulary."""
+    assert classify_intent("How is my revenue trending?").label == "REVENUE_TRACKING"
+    assert classify_intent("zxqv blorp").confidence < 0.5
+
+
+def _reply_by_agent(route: str):
+    """Build a FakeOpenAI reply function that names the answering agent."""
+
+    def reply(kwargs: dict) -> str:
+        system = kwargs["messages"][0]["content"]
+        if system.startswith(REVENUE_TRACKING_PROMPT):
+            return "revenue answer"
+        if "Router Agent" in system:
+            return route
+        return "other answer"
+
+    return reply
+
+
+async def test_speculative_hit(monkeypatch):
+    """Test a correct speculative guess is used without a second specialist call."""
+    monkeypatch.setattr(settings, "ROUTER_LOCAL_CONFIDENCE", 1.01)
+    hits = speculation_stats.hits
+    fake = FakeOpenAI(reply=_reply_by_agent("REVENUE_TRACKING"))
+
+    response, agent_type = await process_message(
+        fake, "What about this?", previous_agent_type="REVENUE_TRACKING", speculative=True
+    )
+
+    assert (response, agent_type) == ("revenue answer", "REVENUE_TRACKING")
+    assert len(fake.calls) == 2
+    assert speculation_stats.hits == hits + 1
+
+
+async def test_speculative_miss(monkeypatch):
+    """Test a wrong speculative guess is discarded in favour of the routed agent."""
+    monkeypatch.setattr(settings, "ROUTER_LOCAL_CONFIDENCE", 1.01)
+    misses = speculation_stats.misses
+    fake = FakeOpenAI(reply=_reply_by_agent("REVENUE_TRACKING"))
+
+    response, agent_type = await process_message(
+        fake, "What about this?", previous_agent_type="CONTENT_CREATION", speculative=True
+    )
+
+    assert (response, agent_type) == ("revenue answer", "REVENUE_TRACKING")
+    assert speculation_stats.misses == misses + 1
+    assert "speculation" in client.get("/api/v1/metrics/agents").json()
@@ -0,0 +1,108 @@
+"""Tests for conversation memory and multi-turn chat."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.base import SYSTEM_DISCLAIMER
+from app.main import app
+from app.services.conversations import (
+    ConversationMemory,
+    ConversationNotFoundError,
+    MemoryConversationStore,
+    Turn,
+)
+
+client = TestClient(app)
+
+
+def exchange(n: int) -> list[Turn]:
+    return [Turn("user", f"question {n} " * 20), Turn("assistant", f"answer {n} " * 40)]
+
+
+async def fake_summarizer(summary: str, turns: list[Turn]) -> str:
+    return f"{summary} +{len(turns)}".strip()
+
+
+async def test_context_window_is_bounded():
+    """Test only the newest turns that fit the token budget are sent."""
+    memory = ConversationMemory(MemoryConversationStore(), history_tokens=300)
+    conversation = await memory.get("conv", "user-1")
+    for n in range(20):
+        await memory.append(conversation, exchange(n))
+
+    context = memory.context(conversation)
+    sent = conversation.turns[-len(context) :]
+    assert sum(turn.tokens for turn in sent) <= 300
+    assert context[-1]["content"] == conversation.turns[-1].content
+
+
+async def test_old_turns_are_folded_into_the_summary():
+    """Test history past the threshold is compacted in the background."""
+    store = MemoryConversationStore()
+    memory = ConversationMemory(store, history_tokens=300, summarize_threshold=600)
+    conversation = await memory.get("conv", "user-1")
+    context_sizes = []
+    for n in range(30):
+        await memory.append(conversation, exchange(n), summarizer=fake_summarizer)
+        if conversation.compaction is not None:
+            await conversation.compaction
+        context_sizes.append(sum(len(m["content"]) for m in memory.context(conversation)))
+
+    assert memory.compactions > 0
+    assert conversation.summary.startswith("+")
+    assert conversation.unsummarized_tokens() <= 600
+    assert max(context_sizes[10:]) - min(context_sizes[10:]) < 400  # roughly constant
+    assert store.message_count("conv") == 60
+
+    memory.clear()
+    reloaded = await memory.get("conv", "user-1")
+    assert reloaded.summary == conversation.summary
+    assert reloaded.summarized_turns + len(reloaded.turns) == 60
+
+
+async def test_uncached_memory_reloads_every_turn_from_the_store():
+    """Test a zero-size cache sees turns another process stored meanwhile."""
+    store = MemoryConversationStore()
+    workers = [ConversationMemory(store, max_conversations=0) for _ in range(2)]
+    for n, memory in enumerate(workers * 2):
+        conversation = await memory.get("conv", "user-1")
+        assert len(conversation.turns) == 2 * n
+        await memory.append(conversation, exchange(n))
+    assert workers[0].stats()["active_conversations"] == 0
+
+
+async def test_conversations_are_private():
+    """Test a conversation cannot be continued by another user."""
+    memory = ConversationMemory(MemoryConversationStore())
+    conversation = await memory.get("conv", "user-1")
+    await memory.append(conversation, exchange(0))
+    with pytest.raises(ConversationNotFoundError):
+        await memory.get("conv", "user-2")
+
+
+def test_chat_sends_earlier_turns(fake_openai):
+    """Test a follow-up message is answered with the conversation so far."""
+    first = client.post(
+        "/api/v1/chat/message", json={"message": "I am a freelance illustrator"}
+    ).json()
+    client.post(
+        "/api/v1/chat/message",
+        json={"message": "What should I charge?", "conversation_id": first["conversation_id"]},
+    )
+
+    messages = fake_openai.calls[-1]["messages"]
+    assert messages[0]["content"].endswith(SYSTEM_DISCLAIMER)
+    assert messages[1:] == [
+        {"role": "user", "content": "I am a freelance illustrator"},
+        {"role": "assistant", "content": first["message"]},
+        {"role": "user", "content": "What should I charge?"},
+    ]
+
+
+def test_chat_rejects_conversation_ids_that_are_not_uuids(fake_openai):
+    """Test a client cannot create a conversation under an arbitrary ID."""
+    response = client.post(
+        "/api/v1/chat/message", json={"message": "hi", "conversation_id": "conv-1"}
+    )
+    assert response.status_code == 422
+    assert fake_openai.calls == []
@@ -0,0 +1,159 @@
+"""Tests for AI credit reservation, settlement and write-behind persistence."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.dependencies import get_credit_ledger
+from app.main import app
+from app.services.credits import (
+    CreditLedger,
+    InsufficientCreditsError,
+    MemoryCreditSink,
+    UsageMeter,
+    record_usage,
+    track_usage,
+)
+
+client = TestClient(app)
+
+
+def make_ledger(**kwargs) -> tuple[CreditLedger, MemoryCreditSink]:
+    sink = MemoryCreditSink()
+    return CreditLedger(sink, {"explorer": 10}, tokens_per_credit=1000, **kwargs), sink
+
+
+async def test_settle_charges_real_usage_and_refunds_the_rest():
+    """Test a reservation is replaced by the cost of the tokens actually used."""
+    ledger, _ = make_ledger()
+    reservation = await ledger.reserve("user-1", "explorer", "chat_message", 3)
+    assert await ledger.balance("user-1", "explorer") == 7
+
+    credits = ledger.settle(reservation, UsageMeter(prompt_tokens=900, completion_tokens=300))
+    assert credits == 2
+    assert await ledger.balance("user-1", "explorer") == 8
+    assert ledger.usage_breakdown("user-1") == {"chat_message": 2}
+
+
+async def test_release_returns_the_whole_hold():
+    """Test a failed request costs nothing."""
+    ledger, _ = make_ledger()
+    reservation = await ledger.reserve("user-1", "explorer", "chat_message", 3)
+    ledger.release(reservation)
+    assert await ledger.balance("user-1", "explorer") == 10
+
+
+async def test_charge_settles_a_completed_block_and_releases_a_failed_one():
+    """Test a charged block costs its token usage, or nothing if it raises."""
+    ledger, _ = make_ledger()
+    reservation = await ledger.reserve("user-1", "explorer", "chat_message", 3)
+    async with ledger.charge(reservation) as usage:
+        assert usage.token_limit == 10_000
+        record_usage(UsageMeter(prompt_tokens=1500))
+    assert reservation.credits_used == 2
+    assert await ledger.balance("user-1", "explorer") == 8
+
+    reservation = await ledger.reserve("user-1", "explorer", "chat_message", 3)
+    with pytest.raises(RuntimeError):
+        async with ledger.charge(reservation):
+            record_usage(UsageMeter(prompt_tokens=1500))
+            raise RuntimeError("model unavailable")
+    assert reservation.credits_used is None
+    assert await ledger.balance("user-1", "explorer") == 8
+
+
+async def test_reserve_rejects_when_balance_is_too_low():
+    """Test a user cannot hold more credits than they have left."""
+    ledger, _ = make_ledger()
+    await ledger.reserve("user-1", "explorer", "chat_message", 8)
+    with pytest.raises(InsufficientCreditsError):
+        await ledger.reserve("user-1", "explorer", "chat_message", 3)
+
+
+async def test_balance_is_loaded_from_the_sink_once():
+    """Test a stored balance takes precedence over the tier allowance."""
+    ledger, sink = make_ledger()
+    sink.balances["user-1"] = 4
+    assert await ledger.balance("user-1", "explorer") == 4
+    sink.balances["user-1"] = 0
+    assert await ledger.balance("user-1", "explorer") == 4
+
+
+async def test_usage_rows_are_written_in_batches():
+    """Test settled requests are queued and persisted in one write per flush."""
+    ledger, sink = make_ledger()
+    for _ in range(5):
+        reservation = await ledger.reserve("user-1", "explorer", "chat_message", 1)
+        ledger.settle(reservation, UsageMeter(prompt_tokens=10))
+    assert sink.rows == []
+
+    await ledger.flush()
+    assert sink.writes == 1
+    assert len(sink.rows) == 5
+    assert sink.balances == {"user-1": 5}
+
+
+async def test_processes_sharing_a_sink_never_overwrite_each_others_spending():
+    """Test flushes deduct deltas and bring each process's balance up to date."""
+    sink = MemoryCreditSink()
+    workers = [CreditLedger(sink, {"explorer": 10}, tokens_per_credit=1000) for _ in range(2)]
+    for ledger, credits in zip(workers, (2, 3), strict=True):
+        reservation = await ledger.reserve("user-1", "explorer", "chat_message", 1)
+        ledger.settle(reservation, UsageMeter(prompt_tokens=1000 * credits))
+        await ledger.flush()
+
+    assert sink.balances == {"user-1": 5}
+    assert await workers[1].balance("user-1", "explorer") == 5
+    held = await workers[0].reserve("user-1", "explorer", "chat_message", 1)
+    await workers[0].flush()  # nothing to write: the balance catches up on the next one
+    reservation = await workers[0].reserve("user-1", "explorer", "chat_message", 1)
+    workers[0].settle(reservation, UsageMeter())
+    await workers[0].flush()
+    assert sink.balances == {"user-1": 4}
+    assert await workers[0].balance("user-1", "explorer") == 4 - held.amount
+    assert await workers[0].monthly_usage("user-1") == {"chat_message": 6}
+
+
+async def test_full_batch_triggers_a_flush():
+    """Test the queue is flushed as soon as it reaches the batch size."""
+    ledger, sink = make_ledger(flush_batch_size=2)
+    for _ in range(2):
+        reservation = await ledger.reserve("user-1", "explorer", "chat_message", 1)
+        ledger.settle(reservation, UsageMeter())
+    await ledger._flusher
+    assert len(sink.rows) == 2
+
+
+def test_track_usage_sums_recorded_calls():
+    """Test usage is only recorded inside a tracking block."""
+    usage = type("Usage", (), {"prompt_tokens": 100, "completion_tokens": 50})()
+    record_usage(usage)
+    with track_usage() as meter:
+        record_usage(usage)
+        record_usage(usage)
+    record_usage(usage)
+    assert (meter.total_tokens, meter.calls) == (300, 2)
+
+
+def test_chat_charges_credits_from_token_usage(fake_openai):
+    """Test the chat endpoint reports and deducts the credits it was charged."""
+    default_reply = fake_openai.reply
+    fake_openai.reply = lambda kwargs: (
+        "GENERAL" if default_reply(kwargs) == "GENERAL" else "word " * 4000
+    )
+    response = client.post(f"{settings.API_V1_PREFIX}/chat/message", json={"message": "Hello"})
+    assert response.status_code == 200
+    credits_used = response.json()["credits_used"]
+    assert credits_used == 3  # ~5000 completion tokens at 2000 tokens per credit
+
+    credits = client.get(f"{settings.API_V1_PREFIX}/user/credits").json()
+    assert credits["credits_remaining"] == settings.CREDITS_EXPLORER - credits_used
+    assert credits["usage_breakdown"] == {"chat_message": credits_used}
+
+
+def test_chat_rejects_users_without_credits(fake_openai):
+    """Test a user who cannot cover the reservation gets a 402 and no agent call."""
+    get_credit_ledger()._balances["demo-user-id"] = 1
+    response = client.post(f"{settings.API_V1_PREFIX}/chat/message", json={"message": "Hello"})
+    assert response.status_code == 402
+    assert fake_openai.calls == []
@@ -0,0 +1,96 @@
+"""Tests for event-to-workflow dispatch."""
+
+from fastapi.testclient import TestClient
+
+from app.core.dependencies import (
+    get_trigger_index,
+    get_trigger_scheduler,
+    get_workflow_engine,
+    get_workflow_repository,
+)
+from app.main import app
+from app.services.event_dispatch import WorkflowTriggerIndex
+from app.services.triggers import event_type
+
+client = TestClient(app)
+
+
+def test_event_types_are_normalized():
+    assert event_type("Gumroad sale webhook") == "gumroad_sale"
+    assert event_type("gumroad.sale") == "gumroad_sale"
+    assert event_type("Calendar event ended") == "calendar_event_ended"
+
+
+def test_index_matches_by_type_and_user():
+    index = WorkflowTriggerIndex()
+    index.add("a", "alice", "gumroad_sale")
+    index.add("b", "alice", "calendar_event_ended")
+    index.add("c", "bob", "gumroad_sale")
+
+    assert index.match("gumroad_sale", "alice") == ["a"]
+    assert sorted(index.match("gumroad_sale")) == ["a", "c"]
+    assert index.match("stripe_payment", "alice") == []
+
+    index.add("a", "alice", "calendar_event_ended")  # trigger changed
+    assert index.match("gumroad_sale", "alice") == []
+    assert sorted(index.match("calendar_event_ended", "alice")) == ["a", "b"]
+
+    assert index.remove("c")
+    assert not index.remove("c")
+    assert index.stats()["trigger_types"] == 1
+
+
+async def test_events_run_matching_workflows_until_paused_or_deleted():
+    """Test an event runs only active matching workflows, once per event ID."""
+    create = {
+        "name": "Course Sales Notifier",
+        "trigger": "Gumroad sale webhook",
+        "actions": [{"type": "send_notification"}],
+        "status": "active",
+    }
+    first = client.post("/api/v1/workflows/", json=create).json()
+    second = client.post("/api/v1/workflows/", json=create).json()
+    other = client.post("/api/v1/workflows/", json={**create, "trigger": "Calendar event ended"})
+    assert other.status_code == 200
+    draft = client.post("/api/v1/workflows/", json={**create, "status": "draft"}).json()
+
+    event = {"type": "gumroad.sale", "id": "sale-1", "payload": {"amount": 49}}
+    response = client.post("/api/v1/workflows/events", json=event)
+    assert response.status_code == 202
+    body = response.json()
+    assert body["type"] == "gumroad_sale"
+    assert body["matched"] == 2
+    runs = [get_workflow_engine().get_run(run_id) for run_id in body["runs"]]
+    assert {run.workflow_id for run in runs} == {first["id"], second["id"]}
+    assert runs[0].event == {"amount": 49}
+    assert draft["status"] == "draft"
+
+    redelivered = client.post("/api/v1/workflows/events", json=event).json()
+    assert redelivered["runs"] == body["runs"]
+    repository = get_workflow_repository()
+    assert (await repository.get(first["id"])).runs_this_month == 1
+
+    assert client.post(f"/api/v1/workflows/{first['id']}/pause").json()["status"] == "paused"
+    assert client.delete(f"/api/v1/workflows/{second['id']}").status_code == 204
+    assert await repository.get(second["id"]) is None
+    response = client.post("/api/v1/workflows/events", json={"type": "gumroad_sale"})
+    assert response.json()["matched"] == 0
+
+    get_trigger_index().clear()
+
+
+def test_pause_stops_scheduled_workflow():
+    workflow = client.post(
+        "/api/v1/workflows/",
+        json={
+            "name": "Weekly Revenue Report",
+            "trigger": "Every Sunday 9:00 AM",
+            "actions": [{"type": "send_report"}],
+            "status": "active",
+        },
+    ).json()
+    scheduler = get_trigger_scheduler()
+    assert scheduler.next_fire(workflow["id"]) is not None
+    client.post(f"/api/v1/workflows/{workflow['id']}/pause")
+    assert scheduler.next_fire(workflow["id"]) is None
+    assert workflow["id"] not in get_trigger_index()
@@ -0,0 +1,89 @@
+"""Tests for revenue forecasting."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.revenue import RevenueStreamRecord
+from app.services import revenue_forecast
+from app.services.forecast_store import MemoryForecastStore
+from app.services.revenue_forecast import fit_forecast, forecast_all_users, load_histories
+from app.services.revenue_store import MemoryRevenueStore, seed_demo_revenue
+
+client = TestClient(app)
+
+
+def test_forecast_follows_level_and_trend():
+    months = np.arange(24)
+    series = np.vstack(
+        [
+            100 + 10 * months,  # linear growth
+            np.full(24, 500.0),  # flat
+            np.r_[np.zeros(18), np.full(6, 80.0)],  # started six months ago
+            np.zeros(24),  # no revenue yet
+        ]
+    )
+    forecast = fit_forecast(series, horizon=6)
+
+    growth, flat, late, empty = forecast.point
+    assert 330 < growth[0] < 345 and np.all(np.diff(growth) > 0)  # damped continuation
+    assert np.allclose(flat, 500) and np.allclose(late, 80)  # leading zeros are ignored
+    assert np.allclose(empty, 0) and np.allclose(forecast.upper[3], 0)
+    assert np.all(forecast.lower <= forecast.point) and np.all(forecast.point <= forecast.upper)
+    width = forecast.upper[0] - forecast.lower[0]
+    assert np.all(np.diff(width) > 0)  # uncertainty grows with the horizon
+
+
+def test_forecast_blocks_match_single_fit(monkeypatch):
+    rng = np.random.default_rng(0)
+    series = np.abs(rng.normal(1_000, 300, (50, 30)))
+    whole = fit_forecast(series)
+    monkeypatch.setattr(revenue_forecast, "BLOCK_ROWS", 7)
+    blocked = fit_forecast(series)
+    for name in ("point", "lower", "upper"):
+        assert np.allclose(getattr(whole, name), getattr(blocked, name))
+
+
+@pytest.mark.parametrize("executor", [None, ThreadPoolExecutor(2)])
+async def test_batch_forecasts_every_user(executor):
+    store, forecasts = MemoryRevenueStore(), MemoryForecastStore()
+    as_of = date(2026, 10, 1)
+    for user_id in ("a", "b", "c"):
+        seed_demo_revenue(store, user_id, as_of)
+
+    stored = await forecast_all_users(store, forecasts, batch_users=2, executor=executor)
+
+    assert stored == len(forecasts) == 3
+    forecast = await forecasts.get("b")
+    assert len(forecast.total["point"]) == 12
+    assert set(forecast.streams) == {f"demo-stream-{n}" for n in range(1, 5)}
+    # The total is forecast as its own series, close to the sum of the streams.
+    streams_sum = sum(series["point"][0] for series in forecast.streams.values())
+    assert forecast.total["point"][0] == pytest.approx(streams_sum, rel=0.05)
+    histories = await load_histories(store, ["b"], as_of)
+    assert forecast.total["point"][0] > histories["b"].revenue[:, -2].sum()  # demo revenue grows
+
+
+@pytest.mark.parametrize("executor", [None, ThreadPoolExecutor(2)])
+async def test_batch_skips_users_without_active_streams(executor):
+    store, forecasts = MemoryRevenueStore(), MemoryForecastStore()
+    await store.save_stream(
+        RevenueStreamRecord(id="old", user_id="a", name="Old", type="service", is_active=False)
+    )
+
+    assert await forecast_all_users(store, forecasts, executor=executor) == 0
+    assert len(forecasts) == 0
+
+
+def test_dashboard_reads_stored_forecast():
+    forecast = client.get("/api/v1/revenue/forecast").json()
+    assert len(forecast["months"]) == len(forecast["total"]["point"]) == 12
+    assert {stream["name"] for stream in forecast["streams"]} >= {"Freelance Design"}
+    overview = client.get("/api/v1/revenue/overview").json()
+    assert overview["projected_annual"] == forecast["projected_annual"]
+    # The second read is served from the store, not refitted.
+    assert client.get("/api/v1/revenue/forecast").json()["generated_at"] == forecast["generated_at"]
@@ -0,0 +1,173 @@
+"""Tests for background agent jobs."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.dependencies import get_credit_ledger, get_current_user_id
+from app.main import app
+from app.services.jobs import Job, JobQueue, JobQueueFullError, JobRegistry, MemoryJobStore
+from tests.test_chat import _parse_sse
+from tests.test_skills import DIAGNOSIS, REQUEST
+
+DIAGNOSIS_JOB = {"kind": "skills_diagnosis", "input": REQUEST}
+
+
+@pytest.fixture(scope="module")
+def client():
+    """A client running the app's lifespan, so the job workers are started."""
+    with TestClient(app) as client:
+        yield client
+
+
+def _wait_for(client: TestClient, job_id: str) -> dict:
+    for _ in range(200):
+        job = client.get(f"/api/v1/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_job_is_queued_at_once_and_polled_for_its_result(client, fake_openai):
+    fake_openai.reply = lambda kwargs: json.dumps(DIAGNOSIS)
+    fake_openai.delay = 0.2
+    started = time.perf_counter()
+    response = client.post("/api/v1/jobs", json=DIAGNOSIS_JOB)
+    assert time.perf_counter() - started < fake_openai.delay
+    assert response.status_code == 202
+    assert response.json()["status"] in ("queued", "running")
+
+    job = _wait_for(client, response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"] == DIAGNOSIS
+    assert job["finished_at"] >= job["started_at"] >= job["created_at"]
+
+
+def test_job_events_stream_progress_then_the_result(client, fake_openai):
+    fake_openai.reply = lambda kwargs: json.dumps(DIAGNOSIS)
+    fake_openai.delay = 0.05
+    job_id = client.post("/api/v1/jobs", json=DIAGNOSIS_JOB).json()["id"]
+    events = _parse_sse(client.get(f"/api/v1/jobs/{job_id}/events").text)
+
+    assert [event for event, _ in events] == ["skill", "skill", "done"]
+    assert events[0][1]["name"] == "Illustration"
+    assert events[-1][1]["result"] == DIAGNOSIS
+
+
+def test_failed_job_is_isolated_and_its_credits_released(client, fake_openai):
+    def reply(kwargs):
+        if "broken" in kwargs["messages"][-1]["content"]:
+            raise RuntimeError("model exploded")
+        return "A course outline."
+
+    fake_openai.reply = reply
+    broken = client.post(
+        "/api/v1/jobs", json={"kind": "content_creation", "input": {"prompt": "broken"}}
+    ).json()
+    working = client.post(
+        "/api/v1/jobs", json={"kind": "content_creation", "input": {"prompt": "a course"}}
+    ).json()
+
+    failed = _wait_for(client, broken["id"])
+    succeeded = _wait_for(client, working["id"])
+    assert failed["status"] == "failed" and "model exploded" in failed["error"]
+    assert succeeded["result"] == {"content": "A course outline. "}
+    events = _parse_sse(client.get(f"/api/v1/jobs/{broken['id']}/events").text)
+    assert events == [("error", {"detail": failed["error"]})]
+
+    ledger = get_credit_ledger()
+    assert ledger.usage_breakdown("demo-user-id") == {"content_creation": 1}
+    allowance = ledger.tier_allowances["explorer"]
+    assert asyncio.run(ledger.balance("demo-user-id", "explorer")) == allowance - 1
+
+
+def test_monetization_plan_job_writes_a_plan_for_a_catalog_path(client, fake_openai):
+    plan_job = {
+        "kind": "monetization_plan",
+        "input": {"path_id": "freelance-consulting", "time_commitment_hours_per_week": 10},
+    }
+    job = _wait_for(client, client.post("/api/v1/jobs", json=plan_job).json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["path_id"] == "freelance-consulting"
+    assert job["result"]["plan"].strip() == "Here is some helpful coaching advice."
+    prompt = fake_openai.calls[-1]["messages"][-1]["content"]
+    assert "UI/UX Consulting" in prompt and "10 hours per week" in prompt
+
+    plan_job["input"]["path_id"] = "no-such-path"
+    missing = _wait_for(client, client.post("/api/v1/jobs", json=plan_job).json()["id"])
+    assert missing["status"] == "failed" and "no-such-path" in missing["error"]
+
+
+def test_unknown_and_foreign_jobs_are_not_found(client, fake_openai):
+    assert client.get("/api/v1/jobs/missing").status_code == 404
+    assert client.post("/api/v1/jobs", json={"kind": "mining", "input": {}}).status_code == 422
+
+    job_id = client.post("/api/v1/jobs", json=DIAGNOSIS_JOB).json()["id"]
+    app.dependency_overrides[get_current_user_id] = lambda: "someone-else"
+    try:
+        assert client.get(f"/api/v1/jobs/{job_id}").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_full_queue_rejects_jobs():
+    async def scenario():
+        registry = JobRegistry()
+        registry.register("noop")(lambda context: asyncio.sleep(0))
+        queue = JobQueue(MemoryJobStore(), get_credit_ledger(), max_workers=0, max_pending=1)
+        queue.start(registry)
+        await queue.submit("user", "noop", {})
+        with pytest.raises(JobQueueFullError):
+            await queue.submit("user", "noop", {})
+        with pytest.raises(ValueError):
+            await queue.submit("user", "unknown", {})
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stopping_fails_unfinished_jobs_and_releases_their_credits():
+    ledger = get_credit_ledger()
+
+    async def scenario():
+        registry = JobRegistry()
+        registry.register("forever")(lambda context: asyncio.Event().wait())
+        store = MemoryJobStore()
+        queue = JobQueue(store, ledger, max_workers=1)
+        queue.start(registry)
+        allowance = await ledger.balance("user", "explorer")
+        jobs = [
+            await queue.submit(
+                "user", "forever", {}, reservation=await ledger.reserve("user", "explorer", "x", 5)
+            )
+            for _ in range(2)
+        ]
+        while jobs[0].status != "running":
+            await asyncio.sleep(0)
+        await queue.stop()
+
+        for job in jobs:
+            stored = await store.get(job.id)
+            assert (stored.status, stored.error) == ("failed", "Server shutting down")
+        assert await ledger.balance("user", "explorer") == allowance
+        assert queue.stats()["failed"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_memory_store_expires_jobs():
+    now = [0.0]
+    store = MemoryJobStore(max_jobs=2, clock=lambda: now[0])
+
+    async def scenario():
+        for job_id in ("a", "b", "c"):
+            await store.save(Job(id=job_id, user_id="u", kind="noop", input={}), ttl=10)
+        assert await store.get("a") is None  # evicted by size
+        now[0] = 11
+        assert await store.get("b") is None  # expired
+
+    asyncio.run(scenario())
@@ -0,0 +1,136 @@
+"""Tests for OpenAI call scheduling and API rate limiting."""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import dependencies
+from app.core.config import settings
+from app.main import app
+from app.services.llm_scheduler import (
+    PRIORITY_ROUTER,
+    TIER_PRIORITIES,
+    LLMScheduler,
+    ModelLimits,
+    TokenBucket,
+)
+from app.services.rate_limit import MemoryRateLimiter
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_refills_continuously():
+    """Test the bucket reports how long until enough budget has refilled."""
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)  # one per second
+    bucket.take(60)
+    assert bucket.delay(1) == 1.0
+
+    clock.now = 30
+    assert bucket.delay(30) == 0.0
+    bucket.give_back(100)
+    assert bucket.delay(60) == 0.0  # capped at one minute of budget
+
+
+async def test_scheduler_admits_router_then_higher_tiers_first():
+    """Test queued calls are admitted by priority, not arrival order."""
+    scheduler = LLMScheduler(lambda model: ModelLimits(10_000, 10_000_000, max_concurrency=1))
+    order = []
+
+    async def call(name: str, priority: int):
+        async with scheduler.slot("gpt-4o-mini", tokens=10, priority=priority):
+            order.append(name)
+
+    async with scheduler.slot("gpt-4o-mini", tokens=10, priority=PRIORITY_ROUTER):
+        tasks = [
+            asyncio.create_task(call("explorer", TIER_PRIORITIES["explorer"])),
+            asyncio.create_task(call("ceo", TIER_PRIORITIES["ceo"])),
+            asyncio.create_task(call("router", PRIORITY_ROUTER)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["gpt-4o-mini"]["queued"] == 3
+    await asyncio.gather(*tasks)
+
+    assert order == ["router", "ceo", "explorer"]
+    assert scheduler.stats()["gpt-4o-mini"]["lanes"]["explorer"]["admitted"] == 1
+
+
+async def test_scheduler_delays_calls_over_token_budget():
+    """Test a call over the tokens/min budget waits for refill instead of failing."""
+    scheduler = LLMScheduler(lambda model: ModelLimits(10_000, 60_000, max_concurrency=10))
+    async with scheduler.slot("gpt-4o", tokens=60_000):
+        pass
+
+    start = time.perf_counter()
+    async with scheduler.slot("gpt-4o", tokens=100):  # 1,000 tokens/s refill
+        waited = time.perf_counter() - start
+    assert waited >= 0.08
+
+
+async def test_scheduler_refunds_unused_tokens():
+    """Test reporting actual usage returns the unused estimate to the budget."""
+    scheduler = LLMScheduler(lambda model: ModelLimits(10_000, 60_000, max_concurrency=10))
+    async with scheduler.slot("gpt-4o", tokens=60_000) as slot:
+        slot.used_tokens = 1_000
+
+    start = time.perf_counter()
+    async with scheduler.slot("gpt-4o", tokens=50_000):
+        assert time.perf_counter() - start < 0.05
+
+
+async def test_gcra_allows_burst_then_spaces_requests():
+    """Test a full burst is allowed, then requests are admitted at the steady rate."""
+    clock = FakeClock()
+    limiter = MemoryRateLimiter(limit=6, period=60, clock=clock)  # one per 10 s
+    for _ in range(6):
+        assert (await limiter.hit("user")).allowed
+
+    denied = await limiter.hit("user")
+    assert not denied.allowed
+    assert denied.retry_after == 10
+
+    clock.now = 10
+    assert (await limiter.hit("user")).allowed
+    assert (await limiter.hit("other-user", weight=6)).allowed
+
+
+async def test_gcra_weights_consume_more_budget():
+    """Test a heavy request uses several units of the budget."""
+    limiter = MemoryRateLimiter(limit=10, period=60, clock=FakeClock())
+    assert (await limiter.hit("user", weight=8)).allowed
+    assert not (await limiter.hit("user", weight=3)).allowed
+    assert (await limiter.hit("user", weight=2)).allowed
+
+
+def test_api_returns_429_with_retry_after(monkeypatch):
+    """Test requests over the per-user limit are rejected with Retry-After."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTE_WEIGHTS", {"GET /user/profile": 10})
+    limit = settings.RATE_LIMIT_PER_MINUTE
+    for _ in range(limit // 10):
+        assert client.get("/api/v1/user/profile").status_code == 200
+
+    response = client.get("/api/v1/user/profile")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert client.get("/health").status_code == 200
+
+
+def test_free_routes_skip_the_limiter(monkeypatch):
+    """Test a weight-0 route never reaches the limiter (Redis rejects a zero expiry)."""
+
+    class RefusingLimiter:
+        async def hit(self, key, weight=1):
+            raise AssertionError(f"limiter hit with weight {weight}")
+
+    monkeypatch.setattr(dependencies, "get_rate_limiter", lambda: RefusingLimiter())
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTE_WEIGHTS", {"GET /user/profile": 0})
+    assert client.get("/api/v1/user/profile").status_code == 200
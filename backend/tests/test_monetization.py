@@ -0,0 +1,73 @@
+"""Tests for monetization path matching."""
+
+import asyncio
+import json
+from dataclasses import replace
+
+from fastapi.testclient import TestClient
+
+from app.core.dependencies import get_path_catalog, get_skill_profile_store
+from app.main import app
+from app.schemas.skills import SkillProfile
+from app.services.path_matching import PathCatalog
+
+client = TestClient(app)
+
+
+def _skill(name: str, category: str, proficiency: int = 80, demand: int = 80) -> SkillProfile:
+    return SkillProfile(
+        name=name,
+        category=category,
+        proficiency_level=proficiency,
+        monetization_potential=80,
+        demand_score=demand,
+        suggested_paths=[],
+    )
+
+
+WRITER = [_skill("Content Writing", "Marketing", 90), _skill("SEO", "Marketing", 70)]
+
+
+def test_paths_are_ranked_by_skill_overlap():
+    catalog = get_path_catalog()
+    top = [match.path.id for match in catalog.rank(WRITER, k=3)]
+    assert top[0] == "blog-monetization"  # needs exactly these two skills
+    assert "newsletter" in top
+
+    novice = [skill.model_copy(update={"proficiency_level": 20}) for skill in WRITER]
+    assert catalog.rank(novice, k=1)[0].score < catalog.rank(WRITER, k=1)[0].score
+    assert catalog.rank([], k=2)[0].score == 0
+
+
+def test_ranking_is_deterministic_and_keeps_catalog_order_on_ties():
+    paths = get_path_catalog().paths
+    twins = PathCatalog([paths[0], replace(paths[0], id="twin"), *paths[1:]])
+    skills = [_skill("UI/UX Design", "Design")]
+    ranked = [match.path.id for match in twins.rank(skills, k=10)]
+    assert ranked == [match.path.id for match in twins.rank(skills, k=10)]
+    assert ranked.index("freelance-consulting") + 1 == ranked.index("twin")
+
+
+def test_paths_endpoint_matches_saved_profile_without_ai(fake_openai):
+    asyncio.run(get_skill_profile_store().save("demo-user-id", WRITER))
+    data = client.get("/api/v1/monetization/paths", params={"limit": 4}).json()
+
+    scores = [path["match_score"] for path in data["paths"]]
+    assert len(scores) == 4 and scores == sorted(scores, reverse=True)
+    assert data["paths"][0]["id"] == "blog-monetization"
+    assert "Niche Blog fits your skills best" in data["summary"]
+    assert fake_openai.calls == []
+
+
+def test_personalized_descriptions(fake_openai):
+    asyncio.run(get_skill_profile_store().save("demo-user-id", WRITER))
+    fake_openai.reply = lambda kwargs: json.dumps(
+        {"descriptions": [{"id": "blog-monetization", "description": "Your SEO skills fit."}]}
+    )
+    params = {"limit": 2, "personalize": True}
+    paths = client.get("/api/v1/monetization/paths", params=params).json()["paths"]
+
+    assert paths[0]["description"] == "Your SEO skills fit."
+    catalog = {path.id: path for path in get_path_catalog().paths}
+    assert paths[1]["description"] == catalog[paths[1]["id"]].description  # kept
+    assert fake_openai.calls[0]["response_format"]["json_schema"]["name"] == "path_descriptions"
@@ -0,0 +1,303 @@
+"""Tests for revenue analytics."""
+
+import json
+import random
+from dataclasses import asdict
+from datetime import UTC, date, datetime
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.revenue import RevenueEntry, RevenueStreamRecord
+from app.services.revenue_analytics import (
+    RevenueHistory,
+    compute_overview,
+    compute_overview_reference,
+    month_index,
+    month_start,
+)
+from app.services.revenue_import import ImportFormatError, ImportProgress, RevenueImporter
+from app.services.revenue_insights import detect_insights, history_version
+from app.services.revenue_rollups import (
+    Payment,
+    RevenueRollups,
+    StalePaymentError,
+    UnknownStreamError,
+)
+from app.services.revenue_store import MemoryRevenueStore, seed_demo_revenue
+
+client = TestClient(app)
+
+AS_OF = date(2026, 10, 1)
+
+
+def random_revenue(streams: int, months: int, seed: int = 0):
+    rng = random.Random(seed)
+    records = [
+        RevenueStreamRecord(
+            id=f"s{n}", user_id="u", name=f"Stream {n}", type="Services", is_active=n % 7 != 3
+        )
+        for n in range(streams)
+    ]
+    last = month_index(AS_OF)
+    entries = [
+        RevenueEntry(
+            f"s{n}",
+            month_start(last - m),
+            round(rng.uniform(0, 5_000), 2),
+            rng.randrange(50),
+        )
+        for n in range(streams)
+        for m in range(months)
+        if rng.random() > 0.2  # gaps: months without revenue
+    ]
+    entries.append(RevenueEntry("s0", month_start(last + 1), 99_999.0, 1))  # after as_of
+    return records, entries
+
+
+@pytest.mark.parametrize(("streams", "months"), [(0, 0), (1, 1), (5, 3), (60, 40)])
+def test_vectorized_overview_matches_reference(streams, months):
+    records, entries = random_revenue(streams, months, seed=streams)
+    fast = compute_overview(RevenueHistory.from_entries(records, entries, AS_OF))
+    slow = compute_overview_reference(records, entries, AS_OF)
+
+    fast, slow = asdict(fast), asdict(slow)
+    fast_streams, slow_streams = fast.pop("streams"), slow.pop("streams")
+    assert [s["id"] for s in fast_streams] == [s["id"] for s in slow_streams]
+    for fast_stream, slow_stream in zip(fast_streams, slow_streams, strict=True):
+        assert fast_stream == pytest.approx(slow_stream, abs=0.11)  # percents round to 0.1
+    assert fast.pop("monthly_history") == pytest.approx(slow.pop("monthly_history"))
+    assert fast == pytest.approx(slow, rel=1e-9, abs=0.11)
+
+
+def test_overview_kpis():
+    store = MemoryRevenueStore()
+    seed_demo_revenue(store, "demo", AS_OF)
+    history = RevenueHistory.from_entries(
+        store._streams["demo"].values(), store._entries["demo"].values(), AS_OF
+    )
+    overview = compute_overview(history)
+
+    assert overview.total_monthly_revenue == 4830
+    assert overview.total_customers == 65
+    consulting = next(stream for stream in overview.streams if stream.name == "Consulting")
+    assert (consulting.trend, consulting.trend_percent) == ("down", 5.0)
+    assert [point["month"] for point in overview.monthly_history] == [
+        "May", "Jun", "Jul", "Aug", "Sep", "Oct"
+    ]  # fmt: skip
+    # Growth was capped at 10%/month: less than 12 months at +10% compounded.
+    assert 12 * 4830 < overview.projected_annual < 4830 * 1.1 * 21.4
+
+
+async def test_payments_update_rollups_incrementally():
+    store = MemoryRevenueStore()
+    seed_demo_revenue(store, "demo")
+    rollups = RevenueRollups(store)
+    before = compute_overview(await rollups.history("demo"))
+    now = datetime.now(UTC).timestamp()
+
+    for customer in ("c1", "c2", "c1"):
+        await rollups.ingest(Payment("demo", "demo-stream-4", 10.0, now, customer))
+    after = compute_overview(await rollups.history("demo"))
+
+    assert after.total_monthly_revenue == before.total_monthly_revenue + 30
+    assert after.total_customers == before.total_customers + 2  # c1 counted once
+    assert rollups.stats()["builds"] == 1  # no rebuild on ingest
+    assert rollups.snapshot("demo")["streams"]["demo-stream-4"]["last_payment_at"] == now
+
+    # The written-through history rebuilds to the same rollups.
+    snapshot = rollups.snapshot("demo")
+    await rollups.rebuild("demo")
+    assert rollups.snapshot("demo") == snapshot
+
+    with pytest.raises(UnknownStreamError):
+        await rollups.ingest(Payment("demo", "no-such-stream", 10.0, now))
+    with pytest.raises(StalePaymentError):
+        await rollups.ingest(Payment("demo", "demo-stream-1", 10.0, now - 400 * 86_400))
+
+
+def test_payment_endpoint_updates_overview():
+    total = client.get("/api/v1/revenue/overview").json()["total_monthly_revenue"]
+    response = client.post(
+        "/api/v1/revenue/payments", json={"stream_id": "demo-stream-3", "amount": 49}
+    )
+    assert response.status_code == 201
+    assert client.get("/api/v1/revenue/overview").json()["total_monthly_revenue"] == total + 49
+    response = client.post("/api/v1/revenue/payments", json={"stream_id": "nope", "amount": 1})
+    assert response.status_code == 404
+
+
+def test_revenue_agent_sees_rollups(fake_openai):
+    fake_openai.route = "REVENUE_TRACKING"
+    client.post("/api/v1/chat/message", json={"message": "How is my revenue doing?"})
+    prompt = fake_openai.calls[-1]["messages"][-1]["content"]
+    assert prompt.startswith("Revenue data:")
+    assert "Freelance Design (Services)" in prompt
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def _import(store, data: bytes, format: str = "csv", chunk_size: int = 7):
+    importer = RevenueImporter(store, "demo", await store.streams("demo"), batch_rows=3)
+    progress = ImportProgress(id="import", user_id="demo", format=format)
+    return await importer.run(_chunks(data, chunk_size), format, progress)
+
+
+async def test_import_aggregates_rows_into_monthly_history():
+    store = MemoryRevenueStore()
+    seed_demo_revenue(store, "demo", AS_OF)
+    csv_data = (
+        b"Date,Product,Amount,Customer Email\r\n"
+        b"2025-01-03,demo-stream-3,49.00,a@x.com\r\n"
+        b'2025-01-20 10:00:00,"online course","1,000.50",b@x.com\r\n'
+        b"2025-01-21,demo-stream-3,10,a@x.com\r\n"
+        b"2025-02-01T09:30:00Z,Template Shop,$5,\r\n"
+        b"2025-02-02,no-such-stream,5,c@x.com\r\n"
+        b"2025-02-03,demo-stream-4,five,c@x.com\r\n"
+        b"02/03/2025,demo-stream-4,5,c@x.com\r\n"
+        b"2999-01-01,demo-stream-4,5,c@x.com"  # no trailing newline
+    )
+
+    progress = await _import(store, csv_data)
+
+    assert (progress.status, progress.rows, progress.accepted, progress.rejected) == (
+        "succeeded", 8, 4, 4
+    )  # fmt: skip
+    assert progress.buckets == 2
+    assert [error.split(": ")[1] for error in progress.errors] == [
+        "unknown stream", "invalid amount", "invalid date", "date is in the future"
+    ]  # fmt: skip
+    entries = {(e.stream_id, e.month): e for e in await store.entries("demo")}
+    january = entries["demo-stream-3", date(2025, 1, 1)]
+    assert (january.revenue, january.customers) == (1059.5, 2)
+    assert entries["demo-stream-4", date(2025, 2, 1)].revenue == 5.0
+    streams = {s.id: s for s in await store.streams("demo")}
+    assert streams["demo-stream-3"].last_payment_at > datetime(2025, 1, 21, tzinfo=UTC).timestamp()
+
+    # Importing the same months again replaces them rather than adding up.
+    await _import(store, csv_data, chunk_size=1024)
+    entries = {(e.stream_id, e.month): e for e in await store.entries("demo")}
+    assert entries["demo-stream-3", date(2025, 1, 1)].revenue == 1059.5
+
+
+async def test_import_reads_quoted_fields_spanning_lines_and_chunks():
+    store = MemoryRevenueStore()
+    seed_demo_revenue(store, "demo", AS_OF)
+    csv_data = (
+        b"Date,Product,Amount,Description\r\n"
+        b'2025-01-03,demo-stream-3,49.00,"Course sale\r\nbundle, ""early bird""\r\nrenewal"\r\n'
+        b"2025-01-04,demo-stream-3,10,\r\n"
+        b'2025-01-05,no-such-stream,5,"one\ntwo"\r\n'
+    )
+
+    progress = await _import(store, csv_data, chunk_size=5)  # the note spans many chunks
+
+    assert (progress.rows, progress.accepted, progress.rejected) == (3, 2, 1)
+    assert progress.errors == ["Line 6: unknown stream"]  # counted in physical lines
+    entries = {(e.stream_id, e.month): e for e in await store.entries("demo")}
+    assert entries["demo-stream-3", date(2025, 1, 1)].revenue == 59.0
+
+
+async def test_import_ndjson_and_format_errors():
+    store = MemoryRevenueStore()
+    seed_demo_revenue(store, "demo", AS_OF)
+    rows = [
+        {"stream_id": "demo-stream-1", "amount": 100, "paid_at": "2025-03-01"},
+        {"stream_id": "demo-stream-1", "amount": 50.5, "paid_at": "2025-03-15"},
+    ]
+    data = "\n".join(json.dumps(row) for row in rows).encode() + b"\nnot json\n"
+    progress = await _import(store, data, format="ndjson")
+    assert (progress.accepted, progress.rejected) == (2, 1)
+    entries = {(e.stream_id, e.month): e for e in await store.entries("demo")}
+    assert entries["demo-stream-1", date(2025, 3, 1)].revenue == 150.5
+
+    with pytest.raises(ImportFormatError, match="No amount column"):
+        await _import(store, b"date,stream\n2025-01-01,demo-stream-1\n")
+    with pytest.raises(ImportFormatError, match="No date field"):
+        await _import(store, b'{"stream": "demo-stream-1", "amount": 1}\n', format="ndjson")
+
+
+def test_import_endpoint_refreshes_overview():
+    this_month = datetime.now(UTC).strftime("%Y-%m-15")
+    response = client.post(
+        "/api/v1/revenue/import",
+        content=f"stream_id,amount,date\ndemo-stream-2,1234.5,{this_month}\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 1
+    assert response.json()["rows_per_second"] > 0
+    streams = client.get("/api/v1/revenue/overview").json()["streams"]
+    assert {s["id"]: s["monthly_revenue"] for s in streams}["demo-stream-2"] == 1234.5
+    assert client.get("/api/v1/revenue/imports").json()[0]["id"] == response.json()["id"]
+
+    response = client.post("/api/v1/revenue/import?format=xml", content=b"")
+    assert response.status_code == 415
+
+
+def test_insight_rules_rank_findings_by_impact():
+    kinds = [("Agency", "Services"), ("Course", "Products"), ("Ebook", "Products")]
+    streams = [
+        RevenueStreamRecord(id=f"s{n}", user_id="u", name=name, type=type_)
+        for n, (name, type_) in enumerate([*kinds, ("Coaching", "Services")])
+    ]
+    revenue = np.array(
+        [
+            [6000, 6000, 6000, 6000, 6000, 6000, 6000, 900],  # most of the income
+            [100, 105, 110, 116, 140, 170, 210, 30],  # growth picking up
+            [800, 800, 800, 500, 450, 400, 400, 60],  # declining
+            [400, 400, 400, 400, 400, 400, 400, 50],
+        ],  # the last month is the current, partial one
+        dtype=float,
+    )
+    customers = np.array([[30] * 8, [10] * 8, [100] * 8, [2] * 8])  # Ebook: $4-8 vs $14-21
+    history = RevenueHistory(streams, month_index(AS_OF) - 7, revenue, customers)
+
+    insights = detect_insights(history)
+
+    assert [(i.kind, i.stream_id) for i in insights] == [
+        ("concentration", "s0"), ("pricing", "s2"), ("declining", "s2"), ("accelerating", "s1"),
+    ]  # fmt: skip
+    assert [i.priority for i in insights] == ["high", "medium", "medium", "low"]
+    assert insights[2].impact == "Recover $283/month"
+    assert detect_insights(history, limit=1) == insights[:1]
+
+    version = history_version(history)
+    revenue[1, -1] += 1
+    assert history_version(history) != version
+
+
+def test_partial_current_month_is_not_a_decline():
+    streams = [
+        RevenueStreamRecord(id=f"s{n}", user_id="u", name=f"Stream {n}", type="Services")
+        for n in range(2)
+    ]
+    revenue = np.array([[1000.0] * 7 + [150.0]] * 2)  # flat, a few days into the month
+    customers = np.full(revenue.shape, 10)
+    history = RevenueHistory(streams, month_index(AS_OF) - 7, revenue, customers)
+
+    assert detect_insights(history) == []
+
+
+def test_insights_narrative_is_cached_per_data_version(fake_openai):
+    response = client.get("/api/v1/revenue/insights")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["insights"] and data["narrative"] is None
+    assert not fake_openai.calls  # rules only
+
+    for _ in range(2):
+        narrated = client.get("/api/v1/revenue/insights?narrative=true").json()
+    assert narrated["narrative"] == "Here is some helpful coaching advice."
+    assert narrated["insights"] == data["insights"]
+    assert len(fake_openai.calls) == 1  # the repeat load was served from cache
+
+    client.post("/api/v1/revenue/payments", json={"stream_id": "demo-stream-1", "amount": 5})
+    changed = client.get("/api/v1/revenue/insights?narrative=true").json()
+    assert changed["data_version"] != narrated["data_version"]
+    assert len(fake_openai.calls) == 2
@@ -0,0 +1,158 @@
+"""Tests for the structured skills diagnosis and the skill similarity index."""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.structured import ArrayItemScanner, repair_json
+from app.core.config import settings
+from app.core.dependencies import get_skill_handle_secret, get_skill_index
+from app.main import app
+from app.services.skill_index import LocalSkillIndex, load_handle_secret, profile_handle
+from tests.test_chat import _parse_sse
+
+client = TestClient(app)
+
+DIAGNOSIS = {
+    "skills": [
+        {
+            "name": "Illustration",
+            "category": "Design",
+            "proficiency_level": 80,
+            "monetization_potential": 70,
+            "demand_score": 65,
+            "suggested_paths": ["Commissions", "Print shop"],
+        },
+        {
+            "name": "Python",
+            "category": "Engineering",
+            "proficiency_level": 75,
+            "monetization_potential": 90,
+            "demand_score": 92,
+            "suggested_paths": ["Freelance automation", "Course creation"],
+        },
+    ],
+    "summary": "Lead with Python automation work; illustration is a strong second stream.",
+    "top_opportunity": "Python",
+    "total_monetization_potential": 82,
+}
+REQUEST = {"description": "I draw, and I write Python scripts at my day job."}
+
+
+def test_diagnosis_is_parsed_from_one_completion(fake_openai):
+    fake_openai.reply = lambda kwargs: json.dumps(DIAGNOSIS)
+    response = client.post("/api/v1/skills/diagnose", json=REQUEST)
+
+    assert response.status_code == 200
+    assert response.json() == DIAGNOSIS
+    assert len(fake_openai.calls) == 1
+    response_format = fake_openai.calls[0]["response_format"]
+    assert response_format["type"] == "json_schema"
+    schema = response_format["json_schema"]["schema"]
+    skill = schema["$defs"]["SkillProfile"]
+    assert skill["additionalProperties"] is False and "suggested_paths" in skill["required"]
+
+
+def test_truncated_diagnosis_is_repaired(fake_openai):
+    text = json.dumps(DIAGNOSIS)
+    cut = text.index('"summary"') + 20  # cut off mid-summary by the token limit
+    fake_openai.reply = lambda kwargs: "```json\n" + text[:cut]
+    response = client.post("/api/v1/skills/diagnose", json=REQUEST)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [skill["name"] for skill in data["skills"]] == ["Illustration", "Python"]
+    assert data["top_opportunity"] == "Python"  # derived from the skills
+    assert data["total_monetization_potential"] == 80
+    assert len(fake_openai.calls) == 1  # repaired locally, not asked again
+
+
+def test_unreadable_diagnosis(fake_openai):
+    fake_openai.reply = lambda kwargs: "Sorry, I can't help with that."
+    response = client.post("/api/v1/skills/diagnose", json=REQUEST)
+    assert response.status_code == 502
+
+
+def test_stream_emits_skills_before_the_diagnosis(fake_openai):
+    fake_openai.reply = lambda kwargs: json.dumps(DIAGNOSIS)
+    response = client.post("/api/v1/skills/diagnose/stream", json=REQUEST)
+
+    assert response.status_code == 200
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["skill", "skill", "done"]
+    assert events[0][1] == DIAGNOSIS["skills"][0]
+    assert events[-1][1] == DIAGNOSIS
+    assert fake_openai.calls[0]["stream"] is True
+
+
+def test_json_helpers_handle_strings_and_trailing_commas():
+    text = '{"skills": [{"name": "C{3}", "paths": ["a]", "b",],}, {"name": "\\"x\\""}], "n": 1'
+    scanner = ArrayItemScanner()
+    items = [item for i in range(0, len(text), 7) for item in scanner.feed(text[i : i + 7])]
+    assert items == ['{"name": "C{3}", "paths": ["a]", "b",],}', '{"name": "\\"x\\""}']
+    assert json.loads(repair_json(text + "2, 3")) == {
+        "skills": [{"name": "C{3}", "paths": ["a]", "b"]}, {"name": '"x"'}],
+        "n": 12,
+    }
+    assert json.loads(repair_json("Here you go: " + text + "}\nHope this helps!"))["n"] == 1
+
+
+async def test_local_skill_index_persists_and_searches(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(1_500, 32)).astype(np.float32)  # grows past the first allocation
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = LocalSkillIndex(tmp_path)
+    for row, vector in enumerate(vectors):
+        await index.upsert(f"user-{row}", vector)
+    await index.upsert("user-7", vectors[8])  # replaces, does not add
+    index.flush()
+
+    reopened = LocalSkillIndex(tmp_path)
+    assert len(reopened) == 1_500
+    matches = await reopened.search(vectors[8], k=3, exclude_user_id="user-8")
+    assert matches[0].user_id == "user-7" and matches[0].similarity == pytest.approx(1, abs=1e-3)
+    scores = vectors @ vectors[8]
+    scores[[7, 8]] = -np.inf  # user-8 is excluded and user-7 moved
+    expected = np.argsort(-scores)[:2]
+    assert [m.user_id for m in matches[1:]] == [f"user-{row}" for row in expected]
+
+
+def test_diagnosed_profiles_are_searchable(fake_openai):
+    fake_openai.reply = lambda kwargs: json.dumps(DIAGNOSIS)
+    assert client.get("/api/v1/skills/similar").json() == {"profiles": []}
+    client.post("/api/v1/skills/diagnose", json=REQUEST)
+
+    index = get_skill_index()
+    vector = asyncio.run(index.get("demo-user-id"))
+    assert vector.shape == (settings.SKILL_EMBEDDING_DIMENSIONS,)
+    assert len(fake_openai.embedding_calls) == 1  # every skill in one batch
+    asyncio.run(index.upsert("twin", vector))
+    asyncio.run(index.upsert("opposite", -vector))
+
+    response = client.get("/api/v1/skills/similar", params={"limit": 5})
+    profiles = response.json()["profiles"]
+    secret = get_skill_handle_secret()
+    handles = [profile_handle(user_id, secret) for user_id in ("twin", "opposite")]
+    assert [profile["handle"] for profile in profiles] == handles
+    assert "twin" not in response.text  # user IDs are never exposed
+    assert profiles[0]["similarity"] == pytest.approx(1, abs=1e-5)
+
+
+def test_profile_handles_are_keyed_with_a_secret(tmp_path, monkeypatch):
+    assert profile_handle("twin", "one secret") != profile_handle("twin", "another")
+    assert profile_handle("twin", "one secret") != profile_handle("twin", "")
+
+    # Generated secrets are kept with the index files, and random without them
+    assert load_handle_secret(tmp_path) == load_handle_secret(tmp_path)
+    assert (tmp_path / "handle.key").stat().st_mode & 0o077 == 0
+    assert load_handle_secret(None) != load_handle_secret(None)
+
+    monkeypatch.setattr(settings, "SKILL_INDEX_BACKEND", "pgvector")
+    get_skill_handle_secret.cache_clear()
+    try:
+        assert client.get("/api/v1/skills/similar").status_code == 503
+    finally:
+        get_skill_handle_secret.cache_clear()
@@ -0,0 +1,174 @@
+"""Tests for trigger parsing and the workflow trigger scheduler."""
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.workflows import fire_scheduled_workflow
+from app.core.dependencies import (
+    get_trigger_scheduler,
+    get_workflow_engine,
+    get_workflow_repository,
+)
+from app.main import app
+from app.services.trigger_scheduler import SimulatedClock, TriggerScheduler
+from app.services.triggers import (
+    CronSchedule,
+    IntervalSchedule,
+    TriggerParseError,
+    parse_schedule,
+)
+
+client = TestClient(app)
+
+# Saturday 2026-10-17 10:07 UTC
+SATURDAY = datetime(2026, 10, 17, 10, 7, tzinfo=UTC).timestamp()
+
+
+def at(*args: int) -> float:
+    return datetime(*args, tzinfo=UTC).timestamp()
+
+
+@pytest.mark.parametrize(
+    ("trigger", "expected"),
+    [
+        ("Every Sunday 9:00 AM", at(2026, 10, 18, 9, 0)),
+        ("0 9 * * 0", at(2026, 10, 18, 9, 0)),
+        ("every weekday at 17:30", at(2026, 10, 19, 17, 30)),
+        ("*/15 * * * *", at(2026, 10, 17, 10, 15)),
+        ("@monthly", at(2026, 11, 1, 0, 0)),
+        ("0 12 1 * mon", at(2026, 10, 19, 12, 0)),  # day OR weekday, as in cron
+        ("every 2 hours", at(2026, 10, 17, 12, 0)),
+    ],
+)
+def test_schedules_fire_at_the_expected_time(trigger, expected):
+    """Test phrases, cron expressions and intervals compute the right next fire."""
+    assert parse_schedule(trigger).next_after(SATURDAY) == expected
+
+
+def test_event_triggers_are_not_schedules():
+    """Test webhook-style triggers are left to event dispatch."""
+    assert parse_schedule("Gumroad sale webhook") is None
+    assert parse_schedule("Calendar event ended") is None
+
+
+@pytest.mark.parametrize("trigger", ["61 * * * *", "0 9 * * 8", "every 0 minutes"])
+def test_malformed_schedules_are_rejected(trigger):
+    with pytest.raises(TriggerParseError):
+        parse_schedule(trigger)
+
+
+def test_due_fires_in_order_and_reschedules():
+    """Test each due workflow fires once per period, earliest first."""
+    clock = SimulatedClock(0)
+    scheduler = TriggerScheduler(clock=clock)
+    scheduler.add("fast", IntervalSchedule(60))
+    scheduler.add("slow", IntervalSchedule(300))
+    scheduler.add("gone", IntervalSchedule(60))
+    scheduler.remove("gone")
+
+    fires = []
+    for _ in range(10):
+        clock.advance(60)
+        fires += [workflow_id for workflow_id, _ in scheduler.due()]
+
+    assert fires.count("fast") == 10
+    assert fires.count("slow") == 2
+    assert "gone" not in fires
+    assert scheduler.next_fire("fast") == 660
+
+
+def test_missed_fires_are_caught_up_once():
+    """Test a workflow that missed fires while down fires once, then resumes."""
+    clock = SimulatedClock(at(2026, 10, 17, 12, 0))
+    scheduler = TriggerScheduler(clock=clock)
+    scheduler.add("hourly", IntervalSchedule(3600), last_fired_at=at(2026, 10, 17, 6, 0))
+
+    assert [fire_time for _, fire_time in scheduler.due()] == [at(2026, 10, 17, 7, 0)]
+    assert scheduler.next_fire("hourly") == at(2026, 10, 17, 13, 0)
+    assert scheduler.caught_up == 1
+
+
+async def test_fires_run_with_bounded_concurrency():
+    """Test the loop hands due fires to the callback no more than N at a time."""
+    scheduler = TriggerScheduler(max_concurrency=2)
+    running = peak = 0
+    fired = []
+
+    async def on_fire(workflow_id, fire_time):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        fired.append(workflow_id)
+
+    for n in range(5):
+        scheduler.add(str(n), IntervalSchedule(3600), last_fired_at=0)
+    scheduler.start(on_fire)
+    for _ in range(100):
+        if len(fired) == 5:
+            break
+        await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert sorted(fired) == ["0", "1", "2", "3", "4"]
+    assert peak == 2
+
+
+async def test_activated_workflow_is_scheduled_and_fired():
+    """Test activating a scheduled workflow registers it, and a fire runs it."""
+    workflow = client.post(
+        "/api/v1/workflows/",
+        json={
+            "name": "Weekly Revenue Report",
+            "trigger": "Every Sunday 9:00 AM",
+            "actions": [{"type": "aggregate_data"}, {"type": "send_report"}],
+        },
+    ).json()
+    assert client.post(f"/api/v1/workflows/{workflow['id']}/activate").status_code == 200
+
+    scheduler = get_trigger_scheduler()
+    assert isinstance(scheduler._entries[workflow["id"]].schedule, CronSchedule)
+
+    await fire_scheduled_workflow(workflow["id"], SATURDAY)
+    await fire_scheduled_workflow(workflow["id"], SATURDAY)  # duplicate delivery
+    stored = await get_workflow_repository().get(workflow["id"])
+    assert stored.runs_this_month == 1
+    assert stored.last_run_at == SATURDAY
+    scheduler.remove(workflow["id"])
+
+
+async def test_workflows_sharing_a_fire_time_each_run():
+    """Test two of a user's workflows due at the same moment both run."""
+    workflow_ids = []
+    for name in ("Weekly Revenue Report", "Weekly Newsletter"):
+        workflow = client.post(
+            "/api/v1/workflows/",
+            json={
+                "name": name,
+                "trigger": "Every Sunday 9:00 AM",
+                "actions": [{"type": "send_email"}],
+            },
+        ).json()
+        client.post(f"/api/v1/workflows/{workflow['id']}/activate")
+        workflow_ids.append(workflow["id"])
+
+    for workflow_id in workflow_ids:
+        await fire_scheduled_workflow(workflow_id, SATURDAY)
+
+    runs = [run for run in get_workflow_engine()._runs.values() if run.workflow_id in workflow_ids]
+    assert sorted(run.workflow_id for run in runs) == sorted(workflow_ids)
+    assert all(run.status == "succeeded" for run in runs)
+    for workflow_id in workflow_ids:
+        get_trigger_scheduler().remove(workflow_id)
+
+
+def test_create_rejects_malformed_cron():
+    response = client.post(
+        "/api/v1/workflows/",
+        json={"name": "Bad", "trigger": "61 * * * *", "actions": [{"type": "send_email"}]},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,96 @@
+"""Tests for the workflow repository and workflow listing."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.workflow import Workflow
+from app.services.workflow_store import InvalidCursorError, MemoryWorkflowRepository
+
+client = TestClient(app)
+
+
+def make_workflow(n: int, user_id: str = "alice", status: str = "draft") -> Workflow:
+    return Workflow(
+        id=f"wf-{n:03d}",
+        user_id=user_id,
+        name=f"Workflow {n}",
+        trigger="manual",
+        trigger_type="manual",
+        actions=[],
+        status=status,
+        created_at=1_000.0 + n,
+    )
+
+
+async def test_keyset_pages_cover_every_workflow_newest_first():
+    repository = MemoryWorkflowRepository()
+    for n in (3, 0, 4, 1, 2, 5, 6):  # insertion order does not matter
+        await repository.save(make_workflow(n))
+    await repository.save(make_workflow(99, user_id="bob"))
+
+    seen, cursor = [], None
+    while True:
+        page = await repository.list_by_user("alice", limit=3, cursor=cursor)
+        seen += [workflow.id for workflow in page.workflows]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == [f"wf-{n:03d}" for n in range(6, -1, -1)]
+
+    # A page boundary survives deleting the workflow the cursor points at.
+    first = await repository.list_by_user("alice", limit=2)
+    await repository.delete("wf-005")
+    second = await repository.list_by_user("alice", limit=2, cursor=first.next_cursor)
+    assert [workflow.id for workflow in second.workflows] == ["wf-004", "wf-003"]
+
+
+async def test_status_filter_and_counts_follow_status_changes():
+    repository = MemoryWorkflowRepository()
+    for n in range(4):
+        await repository.save(make_workflow(n))
+    workflow = await repository.get("wf-002")
+    workflow.status = "active"
+    await repository.save(workflow)
+
+    active = await repository.list_by_user("alice", status="active")
+    assert [workflow.id for workflow in active.workflows] == ["wf-002"]
+    assert await repository.counts("alice") == {"draft": 3, "active": 1, "paused": 0, "total": 4}
+
+    assert await repository.delete("wf-002")
+    assert (await repository.counts("alice"))["active"] == 0
+    assert [workflow.id for workflow in await repository.active()] == []
+    with pytest.raises(InvalidCursorError):
+        await repository.list_by_user("alice", cursor="not-a-cursor")
+
+
+async def test_each_scheduled_fire_is_claimed_once():
+    repository = MemoryWorkflowRepository()
+    await repository.save(make_workflow(0, status="active"))
+    await repository.save(make_workflow(1))
+
+    assert await repository.claim_fire("wf-000", 2_000.0)
+    assert not await repository.claim_fire("wf-000", 2_000.0)  # another process's scheduler
+    assert await repository.claim_fire("wf-000", 3_000.0)
+    assert not await repository.claim_fire("wf-001", 2_000.0)  # not active
+    workflow = await repository.get("wf-000")
+    assert (workflow.last_run_at, workflow.runs_this_month) == (3_000.0, 2)
+
+
+def test_list_endpoint_pages_through_created_workflows():
+    created = [
+        client.post(
+            "/api/v1/workflows/",
+            json={"name": f"Listing {n}", "trigger": "manual", "actions": [{"type": "send_email"}]},
+        ).json()["id"]
+        for n in range(3)
+    ]
+    first = client.get("/api/v1/workflows/", params={"limit": 2, "status": "draft"}).json()
+    assert [workflow["id"] for workflow in first["workflows"]] == created[::-1][:2]
+    assert first["total"] >= 3
+    second = client.get(
+        "/api/v1/workflows/", params={"limit": 2, "status": "draft", "cursor": first["next_cursor"]}
+    ).json()
+    assert second["workflows"][0]["id"] == created[0]
+
+    assert client.get("/api/v1/workflows/", params={"cursor": "bogus"}).status_code == 400
@@ -0,0 +1,185 @@
+"""Tests for the workflow DAG engine and run API."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.workflow_engine import (
+    ActionRegistry,
+    WorkflowEngine,
+    WorkflowValidationError,
+    compile_workflow,
+)
+
+client = TestClient(app)
+
+INVOICE_WORKFLOW = [
+    {"id": "invoice", "type": "generate_invoice"},
+    {"id": "email", "type": "send_email", "depends_on": ["invoice"]},
+    {"id": "revenue", "type": "log_revenue", "depends_on": ["invoice"]},
+]
+
+
+class Recorder:
+    """Action handlers that record calls and track how many overlap."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, context):
+        self.calls.append(context.action_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return {"done": context.action_id, "inputs": sorted(context.inputs)}
+
+
+def make_engine(handler, *types: str, **kwargs) -> WorkflowEngine:
+    registry = ActionRegistry()
+    for action_type in types:
+        registry.register(action_type)(handler)
+    kwargs.setdefault("backoff_base", 0.001)
+    return WorkflowEngine(registry, **kwargs)
+
+
+def test_actions_run_in_list_order_by_default():
+    """Test actions without depends_on each wait for the previous one."""
+    plan = compile_workflow([{"type": "a"}, {"type": "b"}, {"type": "c"}])
+    assert plan.roots == ("0",)
+    assert plan.dependents == {"0": ("1",), "1": ("2",), "2": ()}
+
+
+@pytest.mark.parametrize(
+    "actions",
+    [
+        [{"id": "a", "type": "x", "depends_on": ["b"]}, {"id": "b", "type": "x"}],
+        [{"id": "a", "type": "x", "depends_on": ["missing"]}],
+        [{"id": "a", "type": "x"}, {"id": "a", "type": "x"}],
+    ],
+)
+def test_invalid_graphs_are_rejected(actions):
+    """Test cycles, unknown dependencies and duplicate IDs are refused."""
+    with pytest.raises(WorkflowValidationError):
+        compile_workflow(actions)
+
+
+async def test_independent_actions_run_concurrently():
+    """Test actions sharing a finished dependency start together."""
+    recorder = Recorder()
+    engine = make_engine(recorder, "generate_invoice", "send_email", "log_revenue")
+    run = await engine.run(compile_workflow(INVOICE_WORKFLOW), "wf", "user-1")
+
+    assert run.status == "succeeded"
+    assert recorder.calls[0] == "invoice"
+    assert recorder.max_running == 2
+    assert run.actions["email"].output["inputs"] == ["invoice"]
+    assert run.duration_ms is not None
+
+
+async def test_worker_pool_bounds_concurrency():
+    """Test no more actions run at once than there are workers, across runs."""
+    recorder = Recorder()
+    engine = make_engine(recorder, "x", max_workers=3)
+    plan = compile_workflow([{"id": str(i), "type": "x", "depends_on": []} for i in range(5)])
+    runs = await asyncio.gather(*(engine.run(plan, "wf", "user-1") for _ in range(4)))
+
+    assert all(run.status == "succeeded" for run in runs)
+    assert recorder.max_running == 3
+
+
+async def test_failed_attempts_are_retried():
+    """Test a flaky action succeeds on retry."""
+    attempts = []
+
+    async def flaky(context):
+        attempts.append(context.attempt)
+        if context.attempt == 0:
+            raise ConnectionError("upstream hiccup")
+        return "ok"
+
+    engine = make_engine(flaky, "x", max_retries=2)
+    run = await engine.run(compile_workflow([{"type": "x"}]), "wf", "user-1")
+    assert run.status == "succeeded"
+    assert attempts == [0, 1]
+    assert run.actions["0"].attempts == 2
+
+
+async def test_timeout_fails_the_action_and_skips_dependents():
+    """Test a hung action times out and nothing downstream of it runs."""
+    engine = make_engine(Recorder(delay=1.0), "generate_invoice", "send_email", "log_revenue")
+    actions = [{**INVOICE_WORKFLOW[0], "timeout_seconds": 0.01, "max_retries": 0}]
+    run = await engine.run(compile_workflow(actions + INVOICE_WORKFLOW[1:]), "wf", "user-1")
+
+    assert run.status == "failed"
+    assert "Timed out" in run.actions["invoice"].error
+    assert run.actions["email"].status == "skipped"
+
+
+async def test_idempotency_key_deduplicates_runs_and_completed_actions():
+    """Test a repeated request returns its run, and a retried run skips finished actions."""
+    calls = []
+    fail_revenue = True
+
+    async def handler(context):
+        calls.append(context.action_id)
+        if context.action_id == "revenue" and fail_revenue:
+            raise RuntimeError("ledger offline")
+        return context.idempotency_key
+
+    engine = make_engine(handler, "generate_invoice", "send_email", "log_revenue", max_retries=0)
+    plan = compile_workflow(INVOICE_WORKFLOW)
+    first = await engine.run(plan, "wf", "user-1", idempotency_key="req-1")
+    assert first.status == "failed"
+
+    fail_revenue = False
+    calls.clear()
+    second = await engine.run(plan, "wf", "user-1", idempotency_key="req-1")
+    assert second.status == "succeeded"
+    assert calls == ["revenue"]
+    assert (await engine.run(plan, "wf", "user-1", idempotency_key="req-1")) is second
+
+    calls.clear()
+    other = await engine.run(plan, "other-wf", "user-1", idempotency_key="req-1")
+    assert other is not second and other.status == "succeeded"
+    assert sorted(calls) == ["email", "invoice", "revenue"]  # no outputs shared across workflows
+
+
+def test_run_api_executes_workflow():
+    """Test a created workflow can be run and its timing fetched."""
+    created = client.post(
+        "/api/v1/workflows/",
+        json={"name": "Invoices", "trigger": "manual", "actions": INVOICE_WORKFLOW},
+    ).json()
+
+    response = client.post(f"/api/v1/workflows/{created['id']}/runs?wait=true")
+    assert response.status_code == 202
+    run = response.json()
+    assert run["status"] == "succeeded"
+    assert [action["status"] for action in run["actions"]] == ["succeeded"] * 3
+
+    fetched = client.get(f"/api/v1/workflows/runs/{run['id']}").json()
+    assert fetched["duration_ms"] == run["duration_ms"]
+
+
+def test_create_rejects_cyclic_workflow():
+    """Test a workflow whose actions depend on each other in a loop is refused."""
+    response = client.post(
+        "/api/v1/workflows/",
+        json={
+            "name": "Loop",
+            "trigger": "manual",
+            "actions": [
+                {"id": "a", "type": "send_email", "depends_on": ["b"]},
+                {"id": "b", "type": "send_email", "depends_on": ["a"]},
+            ],
+        },
+    )
+    assert response.status_code == 422
@@ -36,6 +36,15 @@ create table if not exists skill_profiles (
     created_at timestamptz default now()
 );
 
+-- One embedding per user's latest skill profile, for "profiles like yours"
+-- lookups; the size matches SKILL_EMBEDDING_DIMENSIONS. Searches span all
+-- users, so only the backend's service role reads it (RLS, no policies)
+create table if not exists skill_profile_vectors (
+    user_id text primary key references users(id) on delete cascade,
+    embedding vector(256) not null,
+    updated_at timestamptz default now()
+);
+
 -- Monetization paths (recommended and tracked)
 create table if not exists monetization_paths (
     id uuid primary key default gen_random_uuid(),
@@ -83,14 +92,24 @@ create table if not exists revenue_history (
     unique (stream_id, month)
 );
 
+-- Revenue forecasts (latest per user, precomputed nightly)
+create table if not exists revenue_forecasts (
+    user_id text primary key references users(id) on delete cascade,
+    first_month date not null,               -- first forecast month
+    level numeric(4, 3) not null,            -- prediction interval coverage, e.g. 0.8
+    total jsonb not null,                    -- {"point": [...], "lower": [...], "upper": [...]}
+    streams jsonb default '{}',              -- stream ID -> series like total
+    generated_at timestamptz default now()
+);
+
 -- Workflows
 create table if not exists workflows (
     id uuid primary key default gen_random_uuid(),
     user_id text references users(id) on delete cascade,
     name text not null,
     description text,
-    trigger_type text not null,
-    trigger_config jsonb default '{}',
+    trigger_type text not null,              -- 'schedule', 'manual' or the event type, e.g. 'gumroad_sale'
+    trigger_config jsonb default '{}',       -- {"trigger": <trigger as entered>}
     actions jsonb default '[]',
     status text default 'draft' check (status in ('draft', 'active', 'paused')),
     last_run_at timestamptz,
@@ -104,6 +123,8 @@ create table if not exists conversations (
     id uuid primary key default gen_random_uuid(),
     user_id text references users(id) on delete cascade,
     title text,
+    summary text,                            -- rolling summary of older turns
+    summarized_turns integer default 0,      -- messages covered by the summary
     created_at timestamptz default now(),
     updated_at timestamptz default now()
 );
@@ -134,21 +155,105 @@ create index if not exists idx_skill_profiles_user on skill_profiles(user_id);
 create index if not exists idx_monetization_paths_user on monetization_paths(user_id);
 create index if not exists idx_revenue_streams_user on revenue_streams(user_id);
 create index if not exists idx_revenue_history_stream on revenue_history(stream_id, month);
-create index if not exists idx_workflows_user on workflows(user_id);
+create index if not exists idx_revenue_history_user on revenue_history(user_id, stream_id, month);
+-- Newest-first keyset pagination of a user's workflows, overall and by status
+-- (they replace the earlier user_id-only index, which they cover)
+drop index if exists idx_workflows_user;
+create index if not exists idx_workflows_user_created
+    on workflows(user_id, created_at desc, id desc);
+create index if not exists idx_workflows_user_status
+    on workflows(user_id, status, created_at desc, id desc);
 create index if not exists idx_conversations_user on conversations(user_id);
-create index if not exists idx_messages_conversation on messages(conversation_id);
+create index if not exists idx_messages_conversation on messages(conversation_id, created_at);
 create index if not exists idx_credit_usage_user on credit_usage(user_id, created_at);
 
 -- Vector similarity search index for skill embeddings
 create index if not exists idx_skill_embedding on skill_profiles
     using ivfflat (embedding vector_cosine_ops) with (lists = 100);
 
+create index if not exists idx_skill_profile_vectors on skill_profile_vectors
+    using hnsw (embedding vector_cosine_ops);
+
+-- Most similar skill profiles to a query embedding, for the pgvector skill index
+create or replace function match_skill_profiles(
+    query_embedding vector(256),
+    match_count integer,
+    exclude_user_id text default null
+)
+returns table (user_id text, similarity double precision)
+language sql stable
+as $$
+    select v.user_id, 1 - (v.embedding <=> query_embedding) as similarity
+    from skill_profile_vectors v
+    where v.user_id is distinct from exclude_user_id
+    order by v.embedding <=> query_embedding
+    limit match_count;
+$$;
+
+-- Store a batch of credit usage rows and deduct them from the users' balances in
+-- one transaction (as deltas, so concurrent writers never overwrite each other)
+create or replace function record_credit_usage(usage jsonb)
+returns table (user_id text, credits_remaining integer)
+language sql
+as $$
+    with inserted as (
+        insert into credit_usage (user_id, action_type, credits_used, metadata, created_at)
+        select r.user_id, r.action_type, r.credits_used, coalesce(r.metadata, '{}'), r.created_at
+        from jsonb_to_recordset(usage) as r(
+            user_id text, action_type text, credits_used integer, metadata jsonb,
+            created_at timestamptz
+        )
+        returning credit_usage.user_id, credit_usage.credits_used
+    ),
+    charged as (
+        select i.user_id, sum(i.credits_used)::integer as credits
+        from inserted i
+        group by i.user_id
+    )
+    update users u
+    set credits_remaining = u.credits_remaining - c.credits
+    from charged c
+    where u.id = c.user_id
+    returning u.id, u.credits_remaining;
+$$;
+
+-- Credits a user was charged since a point in time, by action type
+create or replace function credit_usage_since(for_user_id text, since timestamptz)
+returns table (action_type text, credits_used integer)
+language sql stable
+as $$
+    select c.action_type, sum(c.credits_used)::integer
+    from credit_usage c
+    where c.user_id = for_user_id and c.created_at >= since
+    group by c.action_type;
+$$;
+
+-- Claim one scheduled fire of an active workflow; true for exactly one caller
+create or replace function claim_workflow_fire(for_workflow_id uuid, fire_at timestamptz)
+returns boolean
+language sql
+as $$
+    with claimed as (
+        update workflows
+        set last_run_at = fire_at,
+            runs_this_month = coalesce(runs_this_month, 0) + 1,
+            updated_at = now()
+        where id = for_workflow_id
+          and status = 'active'
+          and (last_run_at is null or last_run_at < fire_at)
+        returning id
+    )
+    select exists (select 1 from claimed);
+$$;
+
 -- Row Level Security policies
 alter table users enable row level security;
 alter table skill_profiles enable row level security;
+alter table skill_profile_vectors enable row level security;
 alter table monetization_paths enable row level security;
 alter table revenue_streams enable row level security;
 alter table revenue_history enable row level security;
+alter table revenue_forecasts enable row level security;
 alter table workflows enable row level security;
 alter table conversations enable row level security;
 alter table messages enable row level security;
@@ -167,6 +272,9 @@ create policy "Users can view own monetization paths" on monetization_paths
 create policy "Users can view own revenue" on revenue_streams
     for all using (user_id = current_setting('app.current_user_id', true));
 
+create policy "Users can view own forecasts" on revenue_forecasts
+    for all using (user_id = current_setting('app.current_user_id', true));
+
 create policy "Users can view own workflows" on workflows
     for all using (user_id = current_setting('app.current_user_id', true));
 